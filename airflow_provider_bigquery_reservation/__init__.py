@@ -9,9 +9,16 @@ def get_provider_info():
         "description": "Airflow Provider to buy reservation in BigQuery",
         "extra-links": [
             "airflow_provider_bigquery_reservation.operators.bigquery_reservation.BigQueryReservationCreateOperator",
+            "airflow_provider_bigquery_reservation.operators.bigquery_reservation.BigQueryReservationBatchCreateOperator",
             "airflow_provider_bigquery_reservation.operators.bigquery_reservation.BigQueryReservationDeleteOperator",
+            "airflow_provider_bigquery_reservation.operators.bigquery_reservation.BigQueryReservationAutoscaleOperator",
+            "airflow_provider_bigquery_reservation.operators.bigquery_reservation.BigQueryReservationPoolLeaseOperator",
+            "airflow_provider_bigquery_reservation.operators.bigquery_reservation.BigQueryReservationPoolReleaseOperator",
+            "airflow_provider_bigquery_reservation.operators.bigquery_reservation.BigQueryReservationPreProvisionOperator",
+            "airflow_provider_bigquery_reservation.operators.bigquery_reservation.BigQueryReservationUtilizationReportOperator",
             "airflow_provider_bigquery_reservation.operators.bigquery_reservation.BigQueryBiEngineReservationCreateOperator",
             "airflow_provider_bigquery_reservation.operators.bigquery_reservation.BigQueryBiEngineReservationDeleteOperator",
+            "airflow_provider_bigquery_reservation.operators.bigquery_reservation.BigQueryBiEngineReservationAdvisorOperator",
         ],
         "versions": [version("airflow_provider_bigquery_reservation")],
     }  # pragma: no cover
@@ -0,0 +1,305 @@
+"""This module contains the assignment attachment detection strategies."""
+from __future__ import annotations
+import asyncio
+import datetime
+import random
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Awaitable, Callable, Iterator
+
+from airflow.exceptions import AirflowException
+from asgiref.sync import sync_to_async
+
+if TYPE_CHECKING:
+    from airflow_provider_bigquery_reservation.hooks.bigquery_reservation import (
+        BigQueryReservationServiceAsyncHook,
+        BigQueryReservationServiceHook,
+    )
+
+
+@dataclass
+class AttachmentTarget:
+    """
+    Assignment whose attachment is awaited.
+
+    :param project_id: GCP project where the slots are assigned
+    :param location: Location where the reservation is attached
+    :param job_type: Type of job of the assignment
+    :param reservation_project_id: GCP project where the reservation is set
+        (default: `project_id`).
+    :param since: Creation date of the assignment (or of the reservation update)
+    """
+
+    project_id: str
+    location: str
+    job_type: str | None = None
+    reservation_project_id: str | None = None
+    since: datetime.datetime | None = None
+
+
+class AttachmentProbe:
+    """Base class of the assignment attachment detection strategies."""
+
+    def is_attached(
+        self, hook: BigQueryReservationServiceHook, target: AttachmentTarget
+    ) -> bool:
+        """
+        Check if the assignment is attached.
+
+        :param hook: Hook used to call the BigQuery APIs
+        :param target: Assignment whose attachment is awaited
+        """
+        raise NotImplementedError()
+
+    async def async_is_attached(
+        self, hook: BigQueryReservationServiceAsyncHook, target: AttachmentTarget
+    ) -> bool:
+        """
+        Check if the assignment is attached, without blocking the event loop.
+
+        The BigQuery jobs API has no async client: by default, `is_attached` is run
+        with the sync hook in a thread.
+
+        :param hook: Async hook used to call the BigQuery APIs
+        :param target: Assignment whose attachment is awaited
+        """
+        sync_hook = await hook.get_sync_hook()
+        return await sync_to_async(self.is_attached, thread_sensitive=False)(
+            sync_hook, target
+        )
+
+
+class QueryAttachmentProbe(AttachmentProbe):
+    """
+    Run a dummy query and check if it has been run on a reservation.
+
+    It is the most reliable strategy but creates a job on each check.
+    """
+
+    def is_attached(
+        self, hook: BigQueryReservationServiceHook, target: AttachmentTarget
+    ) -> bool:
+        """Check if a dummy query is run on a reservation."""
+        return hook._is_assignment_attached_in_query(
+            client=hook.get_bq_client(),
+            project_id=target.project_id,
+            location=target.location,
+        )
+
+
+class AssignmentStateProbe(AttachmentProbe):
+    """
+    No-wait mode: only check the Reservation API reports an active assignment.
+
+    No job is created. The Reservation API reports an assignment active as soon as it
+    is created, so this probe does not wait for the queries to be routed to the
+    reservation: they could still run on-demand for a few minutes. Use it when the
+    first queries may run on-demand, or follow it by a `QueryAttachmentProbe`.
+    """
+
+    def is_attached(
+        self, hook: BigQueryReservationServiceHook, target: AttachmentTarget
+    ) -> bool:
+        """Check the assignment of the project is active."""
+        reservation_project_id = target.reservation_project_id or target.project_id
+        assignment = hook.search_assignment(
+            parent=f"projects/{reservation_project_id}/locations/{target.location}",
+            project_id=target.project_id,
+            job_type=target.job_type or "QUERY",
+        )
+        return assignment is not None
+
+    async def async_is_attached(
+        self, hook: BigQueryReservationServiceAsyncHook, target: AttachmentTarget
+    ) -> bool:
+        """Check the assignment of the project is active with the async Reservation API."""
+        reservation_project_id = target.reservation_project_id or target.project_id
+        assignment = await hook.search_assignment(
+            parent=f"projects/{reservation_project_id}/locations/{target.location}",
+            project_id=target.project_id,
+            job_type=target.job_type or "QUERY",
+        )
+        return assignment is not None
+
+
+class LastJobAttachmentProbe(AttachmentProbe):
+    """
+    Reuse the last jobs of the project instead of creating a new one.
+
+    Look at the jobs created in the target location since the assignment, or since
+    the previous check: if one of them has been run on a reservation, the assignment
+    is attached. Each job is inspected by one check only, so an on-demand job does
+    not fail the next checks. Without any new job, fall back to the `fallback` probe
+    (whose job is then skipped by the next check).
+
+    :param all_users: Look at the jobs of every user (requires `bigquery.jobs.listAll`).
+    :param max_results: Maximum number of recent jobs inspected.
+    :param fallback: Probe used when none recent job could be inspected.
+    """
+
+    def __init__(
+        self,
+        all_users: bool = False,
+        max_results: int = 10,
+        fallback: AttachmentProbe | None = None,
+    ) -> None:
+        self.all_users = all_users
+        self.max_results = max_results
+        self.fallback = fallback or QueryAttachmentProbe()
+        self._checked_at: datetime.datetime | None = None
+
+    def is_attached(
+        self, hook: BigQueryReservationServiceHook, target: AttachmentTarget
+    ) -> bool:
+        """Check if a job created since the last check has been run on a reservation."""
+        since = max(
+            (date for date in (target.since, self._checked_at) if date), default=None
+        )
+        checked_at = datetime.datetime.now(tz=datetime.timezone.utc)
+        jobs = [
+            job
+            for job in hook.get_bq_client().list_jobs(
+                project=target.project_id,
+                all_users=self.all_users,
+                min_creation_time=since,
+                max_results=self.max_results,
+            )
+            if job.location == target.location
+        ]
+        if not jobs:
+            attached = self.fallback.is_attached(hook, target)
+            self._checked_at = datetime.datetime.now(tz=datetime.timezone.utc)
+            return attached
+
+        self._checked_at = checked_at
+        return any(
+            job._properties.get("statistics", {}).get("reservation_id") for job in jobs
+        )
+
+
+ATTACHMENT_PROBES: dict[str, Callable[[], AttachmentProbe]] = {
+    "query": QueryAttachmentProbe,
+    "assignment_state": AssignmentStateProbe,
+    "last_job": LastJobAttachmentProbe,
+}
+
+
+def attachment_probe_name(probe: str | AttachmentProbe) -> str:
+    """
+    Get the name of an attachment probe (see `ATTACHMENT_PROBES`), its class name if custom.
+
+    :param probe: Probe name or instance
+    """
+    if isinstance(probe, str):
+        return probe
+    for name, probe_class in ATTACHMENT_PROBES.items():
+        if type(probe) is probe_class:
+            return name
+    return type(probe).__name__
+
+
+def get_attachment_probe(probe: str | AttachmentProbe) -> AttachmentProbe:
+    """
+    Get an attachment probe from its name (see `ATTACHMENT_PROBES`).
+
+    :param probe: Probe name or instance
+    """
+    if isinstance(probe, AttachmentProbe):
+        return probe
+    try:
+        return ATTACHMENT_PROBES[probe]()
+    except KeyError:
+        raise AirflowException(
+            f"Unknown attachment probe {probe}, expected one of"
+            f" {', '.join(ATTACHMENT_PROBES)}."
+        )
+
+
+@dataclass
+class AttachmentBackoff:
+    """
+    Exponential and jittered intervals between two attachment checks.
+
+    :param initial_interval: First interval (seconds)
+    :param max_interval: Maximum interval (seconds)
+    :param multiplier: Interval growth factor
+    :param jitter: Maximum relative random variation of an interval
+    :param deadline: (Optional) Maximum overall wait (seconds)
+    """
+
+    initial_interval: float = 1.0
+    max_interval: float = 15.0
+    multiplier: float = 2.0
+    jitter: float = 0.2
+    deadline: float | None = None
+
+    def intervals(self) -> Iterator[float]:
+        """Generate the intervals to wait between two checks."""
+        interval = self.initial_interval
+        while True:
+            yield interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+            interval = min(interval * self.multiplier, self.max_interval)
+
+
+def wait_for_attachment(
+    is_attached: Callable[[], bool],
+    backoff: AttachmentBackoff | None = None,
+    sleep: Callable[[float], None] = time.sleep,
+    clock: Callable[[], float] = time.monotonic,
+) -> float:
+    """
+    Check the attachment until it succeeds or the deadline is exceeded.
+
+    :param is_attached: Attachment check
+    :param backoff: Intervals between two checks and overall deadline
+    :param sleep: Sleep function
+    :param clock: Monotonic clock
+
+    :return: The time (seconds) the attachment took.
+    """
+    backoff = backoff or AttachmentBackoff()
+    start = clock()
+    for interval in backoff.intervals():
+        if is_attached():
+            return clock() - start
+
+        elapsed = clock() - start
+        if backoff.deadline is not None:
+            if elapsed >= backoff.deadline:
+                raise AirflowException(
+                    f"Assignment not attached after {elapsed:.0f} seconds."
+                )
+            interval = min(interval, backoff.deadline - elapsed)
+        sleep(interval)
+    raise AirflowException("Assignment attachment wait stopped.")  # pragma: no cover
+
+
+async def async_wait_for_attachment(
+    is_attached: Callable[[], Awaitable[bool]],
+    backoff: AttachmentBackoff | None = None,
+    clock: Callable[[], float] = time.monotonic,
+) -> float:
+    """
+    Check the attachment until it succeeds or the deadline is exceeded, without blocking the event loop.
+
+    :param is_attached: Async attachment check
+    :param backoff: Intervals between two checks and overall deadline
+    :param clock: Monotonic clock
+
+    :return: The time (seconds) the attachment took.
+    """
+    backoff = backoff or AttachmentBackoff()
+    start = clock()
+    for interval in backoff.intervals():
+        if await is_attached():
+            return clock() - start
+
+        elapsed = clock() - start
+        if backoff.deadline is not None:
+            if elapsed >= backoff.deadline:
+                raise AirflowException(
+                    f"Assignment not attached after {elapsed:.0f} seconds."
+                )
+            interval = min(interval, backoff.deadline - elapsed)
+        await asyncio.sleep(interval)
+    raise AirflowException("Assignment attachment wait stopped.")  # pragma: no cover
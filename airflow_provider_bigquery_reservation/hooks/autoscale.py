@@ -0,0 +1,120 @@
+"""This module contains the slot autoscaling policy of the BigQuery reservations."""
+from __future__ import annotations
+from dataclasses import dataclass
+
+from airflow.exceptions import AirflowException
+
+
+# Slots used by the reservation and jobs waiting for slots, by second of the lookback.
+UTILIZATION_QUERY = """
+    WITH periods AS (
+        SELECT
+            period_start,
+            SUM(IF(reservation_id = @reservation_id, period_slot_ms, 0)) / 1000 AS slots,
+            COUNTIF(state = 'PENDING') AS pending_jobs
+        FROM `{project_id}.region-{location}.INFORMATION_SCHEMA.JOBS_TIMELINE`
+        WHERE period_start >= TIMESTAMP_SUB(
+                CURRENT_TIMESTAMP(), INTERVAL @lookback_seconds SECOND
+            )
+            AND (reservation_id = @reservation_id OR state = 'PENDING')
+        GROUP BY period_start
+    )
+    SELECT
+        IFNULL(SUM(slots), 0) / @lookback_seconds AS average_slots,
+        IFNULL(MAX(slots), 0) AS peak_slots,
+        IFNULL(
+            ARRAY_AGG(pending_jobs ORDER BY period_start DESC LIMIT 1)[SAFE_OFFSET(0)], 0
+        ) AS pending_jobs
+    FROM periods
+"""
+
+
+def jobs_reservation_id(reservation_name: str) -> str:
+    """
+    Get the reservation id used by the jobs metadata from a reservation name.
+
+    :param reservation_name: Reservation name e.g. `projects/myproject/locations/US/reservations/test`
+
+    :return: The jobs reservation id e.g. `myproject:US.test`
+    """
+    _, project_id, _, location, _, reservation_id = reservation_name.split("/")
+    return f"{project_id}:{location}.{reservation_id}"
+
+
+@dataclass
+class ReservationUtilization:
+    """
+    Slot utilization of a reservation over a lookback window.
+
+    :param average_slots: Average slots used by the reservation jobs
+    :param peak_slots: Maximum slots used in one second
+    :param pending_jobs: Jobs waiting for slots at the end of the window
+    """
+
+    average_slots: float
+    peak_slots: float
+    pending_jobs: int
+
+
+@dataclass
+class AutoscalePolicy:
+    """
+    Step scaling of a reservation capacity from its utilization.
+
+    The capacity grows by one step when jobs are pending or when the average
+    utilization reaches `scale_up_utilization`, and shrinks by one step when it
+    falls below `scale_down_utilization`, within `min_slots` and `max_slots`.
+
+    :param min_slots: Minimum reservation capacity
+    :param max_slots: Maximum reservation capacity
+    :param step: Slots added or removed by a scaling
+    :param scale_up_utilization: Average utilization ratio triggering a scale up
+    :param scale_down_utilization: Average utilization ratio triggering a scale down
+    """
+
+    min_slots: int
+    max_slots: int
+    step: int = 100
+    scale_up_utilization: float = 0.8
+    scale_down_utilization: float = 0.3
+
+    def __post_init__(self) -> None:
+        """Validate the step, the bounds and the utilization thresholds."""
+        if self.step <= 0 or self.step % 100:
+            raise AirflowException(
+                "Commitment slots can only be created in increments of 100."
+            )
+        if self.min_slots % 100 or self.max_slots % 100:
+            raise AirflowException("Slots bounds must be increments of 100.")
+        if not 0 <= self.min_slots <= self.max_slots:
+            raise AirflowException(
+                f"Invalid slots bounds: {self.min_slots} - {self.max_slots}."
+            )
+        if not 0 <= self.scale_down_utilization < self.scale_up_utilization:
+            raise AirflowException(
+                "The scale down utilization must be lower than the scale up one."
+            )
+
+    def target_slots(
+        self, current_slots: int, utilization: ReservationUtilization
+    ) -> int:
+        """
+        Get the reservation capacity to scale to.
+
+        :param current_slots: Current reservation capacity
+        :param utilization: Reservation utilization
+
+        :return: The target capacity, `current_slots` to keep it.
+        """
+        ratio = (
+            utilization.average_slots / current_slots
+            if current_slots
+            else float(utilization.average_slots > 0)
+        )
+        target = current_slots
+        if utilization.pending_jobs or ratio >= self.scale_up_utilization:
+            target = current_slots + self.step
+        elif ratio < self.scale_down_utilization:
+            target = current_slots - self.step
+
+        return max(self.min_slots, min(self.max_slots, target))
@@ -0,0 +1,223 @@
+"""This module contains the BI Engine reservation preferred tables and sizing helpers."""
+from __future__ import annotations
+import datetime
+import math
+from collections import Counter
+from dataclasses import asdict, dataclass
+from typing import Any, Iterable
+
+from airflow.exceptions import AirflowException
+from google.cloud.bigquery_reservation_v1 import TableReference
+
+
+# Changes of the preferred tables of a BI Engine reservation
+PREFERRED_TABLES_MODES = ("add", "remove", "replace")
+# Maximum BI Engine reservation size (GB) of a project and location
+BI_ENGINE_MAX_SIZE = 250
+GB = 1073741824
+
+# BI Engine statistics of the queries by hour and referenced table. A query referencing
+# several tables is shared between them: its bytes processed and its count are divided
+# by the number of tables.
+BI_ENGINE_JOBS_QUERY = """
+    SELECT
+        TIMESTAMP_TRUNC(creation_time, HOUR) AS hour,
+        FORMAT('%s.%s.%s', t.project_id, t.dataset_id, t.table_id) AS table_id,
+        SUM(1 / ARRAY_LENGTH(referenced_tables)) AS queries,
+        SUM(
+            IF(
+                bi_engine_statistics.acceleration_mode IN ('FULL_INPUT', 'FULL_QUERY')
+                    OR bi_engine_statistics.bi_engine_mode = 'FULL',
+                1 / ARRAY_LENGTH(referenced_tables),
+                0
+            )
+        ) AS accelerated_queries,
+        IFNULL(
+            MAX(DIV(total_bytes_processed, ARRAY_LENGTH(referenced_tables))), 0
+        ) AS bytes_processed,
+        ARRAY_CONCAT_AGG(
+            ARRAY(
+                SELECT reason.code
+                FROM UNNEST(bi_engine_statistics.bi_engine_reasons) AS reason
+            )
+        ) AS reasons
+    FROM `{project_id}.region-{location}.INFORMATION_SCHEMA.JOBS`,
+        UNNEST(referenced_tables) AS t
+    WHERE creation_time >= TIMESTAMP_SUB(
+            CURRENT_TIMESTAMP(), INTERVAL @lookback_hours HOUR
+        )
+        AND job_type = 'QUERY'
+        AND state = 'DONE'
+        AND bi_engine_statistics IS NOT NULL
+    GROUP BY hour, table_id
+"""
+
+
+def parse_table_reference(table: str) -> TableReference:
+    """
+    Convert a table ID into a BI Engine preferred table.
+
+    :param table: Table ID `project.dataset.table`
+    """
+    parts = table.split(".")
+    if len(parts) != 3 or not all(parts):
+        raise AirflowException(
+            f"Invalid preferred table {table}, expected `project.dataset.table`."
+        )
+    project_id, dataset_id, table_id = parts
+    return TableReference(
+        project_id=project_id, dataset_id=dataset_id, table_id=table_id
+    )
+
+
+def format_table_reference(table: TableReference) -> str:
+    """
+    Convert a BI Engine preferred table into a table ID `project.dataset.table`.
+
+    :param table: BI Engine preferred table
+    """
+    return f"{table.project_id}.{table.dataset_id}.{table.table_id}"
+
+
+def merge_preferred_tables(
+    current: Iterable[str], tables: Iterable[str], mode: str
+) -> list[str]:
+    """
+    Apply a change to the preferred tables of a BI Engine reservation.
+
+    :param current: Current preferred table IDs
+    :param tables: Table IDs of the change
+    :param mode: `add` the tables to the current ones, `remove` them from the current
+        ones, or `replace` the current ones by them
+
+    :return: The new preferred table IDs, in their order of addition.
+    """
+    if mode not in PREFERRED_TABLES_MODES:
+        raise AirflowException(
+            f"Unknown preferred tables mode {mode},"
+            f" expected one of {list(PREFERRED_TABLES_MODES)}."
+        )
+    current, tables = list(current), list(tables)
+    for table in tables:
+        parse_table_reference(table)
+    if mode == "replace":
+        merged = tables
+    elif mode == "add":
+        merged = current + tables
+    else:
+        merged = [table for table in current if table not in tables]
+    return list(dict.fromkeys(merged))
+
+
+@dataclass
+class BiEngineTableUsage:
+    """
+    BI Engine statistics of the queries of an hour on a table.
+
+    :param hour: Hour of the queries
+    :param table_id: Table ID `project.dataset.table`
+    :param queries: Queries on the table (shared between the tables of a query)
+    :param accelerated_queries: Queries fully accelerated by BI Engine
+    :param bytes_processed: Maximum bytes processed on the table by a query
+    :param reasons: Codes of the reasons of the queries not (fully) accelerated
+    """
+
+    hour: datetime.datetime
+    table_id: str
+    queries: float
+    accelerated_queries: float
+    bytes_processed: int
+    reasons: list[str]
+
+
+@dataclass
+class BiEngineSizing:
+    """
+    BI Engine reservation size recommended from the past queries.
+
+    :param size: Recommended size (GB)
+    :param target_share: Share of the queries whose hourly working set should fit
+    :param covered_share: Share of the queries whose hourly working set fits in `size`
+    :param queries: Queries of the lookback
+    :param accelerated_share: Share of the queries fully accelerated during the lookback
+    :param reasons: Number of queries by reason of no (full) acceleration
+    :param hourly_working_sets: Working set (bytes) by hour (ISO format): the sum
+        of the bytes processed on each table queried in the hour
+    :param tables: Maximum bytes processed by table
+    """
+
+    size: int
+    target_share: float
+    covered_share: float
+    queries: float
+    accelerated_share: float
+    reasons: dict[str, int]
+    hourly_working_sets: dict[str, int]
+    tables: dict[str, int]
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize the sizing to JSON types."""
+        return asdict(self)
+
+
+def recommend_bi_engine_size(
+    usages: Iterable[BiEngineTableUsage],
+    target_share: float = 0.95,
+    max_size: int = BI_ENGINE_MAX_SIZE,
+) -> BiEngineSizing:
+    """
+    Recommend the smallest BI Engine reservation size covering a share of the queries.
+
+    The working set of an hour is the memory needed by its queries: the sum of the
+    bytes processed on each table queried in the hour. The recommended size is the
+    smallest hourly working set such that the hours whose working set fits in it hold
+    `target_share` of the queries, capped to `max_size`.
+
+    :param usages: BI Engine statistics by hour and table
+    :param target_share: Share of the queries to cover e.g. `0.95`
+    :param max_size: Maximum size (GB)
+    """
+    if not 0 < target_share <= 1:
+        raise AirflowException(
+            f"Invalid target share {target_share}, expected a share in ]0, 1]."
+        )
+    hours: dict[datetime.datetime, list[float]] = {}
+    tables: dict[str, int] = {}
+    reasons: Counter = Counter()
+    accelerated = 0.0
+    for usage in usages:
+        hour = hours.setdefault(usage.hour, [0, 0.0])
+        hour[0] += usage.bytes_processed
+        hour[1] += usage.queries
+        tables[usage.table_id] = max(
+            tables.get(usage.table_id, 0), usage.bytes_processed
+        )
+        reasons.update(usage.reasons)
+        accelerated += usage.accelerated_queries
+
+    queries = sum(hour_queries for _, hour_queries in hours.values())
+    working_set = covered = 0.0
+    for hour_bytes, hour_queries in sorted(hours.values()):
+        if queries and covered >= target_share * queries:
+            break
+        working_set = hour_bytes
+        covered += hour_queries
+    size = min(max_size, math.ceil(working_set / GB))
+
+    return BiEngineSizing(
+        size=size,
+        target_share=target_share,
+        covered_share=(
+            sum(q for b, q in hours.values() if b <= size * GB) / queries
+            if queries
+            else 1.0
+        ),
+        queries=queries,
+        accelerated_share=accelerated / queries if queries else 0.0,
+        reasons=dict(reasons.most_common()),
+        hourly_working_sets={
+            hour.isoformat(): int(hour_bytes)
+            for hour, (hour_bytes, _) in sorted(hours.items())
+        },
+        tables=dict(sorted(tables.items(), key=lambda item: -item[1])),
+    )
@@ -1,29 +1,376 @@
 """This module contains a BigQuery Reservation Hook."""
 from __future__ import annotations
+import asyncio
 import datetime
 import hashlib
+import logging
 import re
+import time
 import uuid
-from time import sleep
-from typing import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Callable, ContextManager, Iterable, Iterator, Sequence, TypeVar
 
 from airflow.exceptions import AirflowException
 from airflow.providers.google.common.consts import CLIENT_INFO
 from airflow.providers.google.common.hooks.base_google import (
     PROVIDE_PROJECT_ID,
+    GoogleBaseAsyncHook,
     GoogleBaseHook,
 )
-from google.api_core import retry
+from airflow_provider_bigquery_reservation.hooks.attachment import (
+    AttachmentBackoff,
+    AttachmentProbe,
+    AttachmentTarget,
+    attachment_probe_name,
+    get_attachment_probe,
+    wait_for_attachment,
+)
+from airflow_provider_bigquery_reservation.hooks.autoscale import (
+    UTILIZATION_QUERY,
+    ReservationUtilization,
+    jobs_reservation_id,
+)
+from airflow_provider_bigquery_reservation.hooks.bi_engine import (
+    BI_ENGINE_JOBS_QUERY,
+    BiEngineTableUsage,
+    format_table_reference,
+    merge_preferred_tables,
+    parse_table_reference,
+)
+from airflow_provider_bigquery_reservation.hooks.client_pool import (
+    CLIENT_POOL,
+    pool_key,
+)
+from airflow_provider_bigquery_reservation.hooks.drain import (
+    DRAIN_JOB_ID_PREFIX,
+    RUNNING_JOBS_QUERY,
+)
+from airflow_provider_bigquery_reservation.hooks.inventory import (
+    ReservationInventory,
+    reservation_name_of,
+    resource_id,
+    resource_label,
+)
+from airflow_provider_bigquery_reservation.hooks.latency import ProvisioningTimeline
+from airflow_provider_bigquery_reservation.hooks.metrics import (
+    ApiMetrics,
+    emit_api_call,
+    emit_wait,
+)
+from airflow_provider_bigquery_reservation.hooks.rate_limiter import (
+    RATE_LIMITER,
+    AsyncRateLimitedClient,
+    RateLimitedClient,
+)
+from airflow_provider_bigquery_reservation.hooks.teardown import (
+    Chain,
+    Deletion,
+    run_teardown,
+)
+from airflow_provider_bigquery_reservation.hooks.utilization import (
+    COMMITMENT_TIMELINE_QUERY,
+    CommitmentTimeline,
+)
+from airflow_provider_bigquery_reservation.hooks.variable_state import (
+    locked_variable_state,
+)
+from asgiref.sync import sync_to_async
+from google.api_core import retry, retry_async
+from google.api_core.exceptions import NotFound
 from google.cloud import bigquery
 from google.cloud.bigquery_reservation_v1 import (
     Assignment,
+    BiReservation,
     CapacityCommitment,
     Reservation,
+    ReservationServiceAsyncClient,
     ReservationServiceClient,
 )
 from google.protobuf import field_mask_pb2
 
 
+T = TypeVar("T")
+
+BI_RESERVATION_LEDGER_PREFIX = "bigquery_reservation_bi_ledger"
+# Read-compare-update attempts of a BI Engine reservation, and their backoff (seconds)
+BI_RESERVATION_UPDATE_ATTEMPTS = 5
+BI_RESERVATION_BACKOFF = (1.0, 10.0)
+# Updates kept by reservation in the ledger
+BI_RESERVATION_LEDGER_SIZE = 100
+# Time (seconds) after which the claim of a BI Engine reservation by another writer expires
+BI_RESERVATION_CLAIM_TIMEOUT = 300
+IDEMPOTENCY_LEDGER_PREFIX = "bigquery_reservation_idempotency"
+# Existing reservation updates kept in the idempotency ledger
+IDEMPOTENCY_LEDGER_SIZE = 1000
+# Time (seconds) after which the claim of a reservation growth by another key expires,
+# and time (seconds) between two checks of a claimed reservation
+RESERVATION_CLAIM_TIMEOUT = 300
+RESERVATION_CLAIM_POLL_INTERVAL = 1.0
+
+
+@contextmanager
+def _reservation_api_call(
+    hook: BigQueryReservationServiceHook | BigQueryReservationServiceAsyncHook,
+    method: str,
+    resource: str,
+    error_message: str,
+) -> Iterator[None]:
+    """
+    Instrument a Reservation API call and convert any error raised into an AirflowException.
+
+    The call duration and outcome are emitted through Airflow `Stats` and recorded
+    in the hook `api_metrics`. Shared by the sync and async hooks.
+
+    :param hook: Calling hook
+    :param method: Reservation API method called
+    :param resource: Resource name or parent targeted by the call
+    :param error_message: Message of the AirflowException raised
+    """
+    start = time.monotonic()
+    success = False
+    try:
+        yield
+        success = True
+    except Exception as e:
+        hook.log.error("%s on %s failed: %s", method, resource, e)
+        raise AirflowException(error_message)
+    finally:
+        _record_api_call(hook, method, time.monotonic() - start, success)
+
+
+def _record_api_call(
+    hook: BigQueryReservationServiceHook | BigQueryReservationServiceAsyncHook,
+    method: str,
+    duration: float,
+    success: bool,
+) -> None:
+    """Record a Reservation API call in the hook `api_metrics` and emit it through `Stats`."""
+    hook.api_metrics.record_call(method, duration, success)
+    emit_api_call(
+        method=method,
+        location=hook.location,
+        outcome="success" if success else "failure",
+        duration=duration,
+    )
+
+
+def _reservation_api_iteration(
+    hook: BigQueryReservationServiceHook,
+    method: str,
+    resource: str,
+    error_message: str,
+    fetch: Callable[[], Iterable[T]],
+    predicate: Callable[[T], bool] | None = None,
+) -> Iterator[T]:
+    """
+    Instrument a Reservation API list call iterated lazily, as `_reservation_api_call`.
+
+    Only the time spent fetching the pages is measured, not the time of the consumer,
+    and closing the iteration early is a success.
+
+    :param hook: Calling hook
+    :param method: Reservation API method called
+    :param resource: Parent targeted by the call
+    :param error_message: Message of the AirflowException raised
+    :param fetch: Call returning the pager
+    :param predicate: (Optional) Client-side filter of the items yielded
+    """
+    duration = 0.0
+    success = False
+    try:
+        start = time.monotonic()
+        try:
+            items = iter(fetch())
+        finally:
+            duration += time.monotonic() - start
+        while True:
+            start = time.monotonic()
+            try:
+                item = next(items)
+            except StopIteration:
+                break
+            finally:
+                duration += time.monotonic() - start
+            if predicate is None or predicate(item):
+                yield item
+        success = True
+    except GeneratorExit:
+        success = True
+        raise
+    except Exception as e:
+        hook.log.error("%s on %s failed: %s", method, resource, e)
+        raise AirflowException(error_message)
+    finally:
+        _record_api_call(hook, method, duration, success)
+
+
+def _list_request(parent: str, page_size: int | None) -> dict:
+    """
+    Build a list request of the Reservation API.
+
+    :param parent: Parent resource name
+    :param page_size: (Optional) Maximum number of resources per page
+    """
+    request: dict = {"parent": parent}
+    if page_size:
+        request["page_size"] = page_size
+    return request
+
+
+def _bi_reservation_fields(
+    bi_reservation: BiReservation, paths: Sequence[str]
+) -> dict[str, Any]:
+    """Get the fields of a BI Engine reservation, preferred tables as table IDs."""
+    fields = {
+        "size": bi_reservation.size,
+        "preferred_tables": sorted(
+            format_table_reference(table) for table in bi_reservation.preferred_tables
+        ),
+    }
+    return {path: fields[path] for path in paths}
+
+
+def _bi_reservation_update(
+    name: str,
+    current: BiReservation,
+    paths: Sequence[str],
+    resize: Callable[[int], int] | None = None,
+    retable: Callable[[list[str]], list[str]] | None = None,
+) -> BiReservation:
+    """
+    Build the update of the fields of a BI Engine reservation from their current values.
+
+    :param name: BI Engine reservation name
+    :param current: BI Engine reservation read before the update
+    :param paths: Fields updated
+    :param resize: (Optional) Function of the current size (Kb) returning the new size (Kb)
+    :param retable: (Optional) Function of the current preferred table IDs
+        returning the new ones (see `merge_preferred_tables`)
+    """
+    bi_reservation = BiReservation(name=name)
+    if "size" in paths and resize is not None:
+        bi_reservation.size = resize(current.size)
+    if "preferred_tables" in paths and retable is not None:
+        bi_reservation.preferred_tables = [
+            parse_table_reference(table)
+            for table in retable(
+                [format_table_reference(table) for table in current.preferred_tables]
+            )
+        ]
+    return bi_reservation
+
+
+def _bi_reservation_overwritten(
+    log: logging.Logger,
+    name: str,
+    current: BiReservation,
+    written: BiReservation,
+    updated: BiReservation,
+    paths: Sequence[str],
+) -> list[str]:
+    """
+    Compare a BI Engine reservation update read back with the values written.
+
+    A field read back with its value from before the update was overwritten by another
+    writer. A size read back with another value was changed after the update, on top
+    of it: it is not overwritten.
+
+    :param log: Logger of the calling hook
+    :param name: BI Engine reservation name
+    :param current: BI Engine reservation read before the update
+    :param written: BI Engine reservation update
+    :param updated: BI Engine reservation read back after the update
+    :param paths: Fields updated
+
+    :return: The fields overwritten.
+    """
+    before = _bi_reservation_fields(current, paths)
+    expected = _bi_reservation_fields(written, paths)
+    after = _bi_reservation_fields(updated, paths)
+    if "size" in paths and after["size"] not in (expected["size"], before["size"]):
+        log.warning(
+            f"{name} size changed after the update:"
+            f" {expected['size']}Kb to {updated.size}Kb."
+        )
+        expected["size"] = after["size"]
+    return [path for path in paths if after[path] != expected[path]]
+
+
+def _claim_bi_reservation(
+    ledger: ContextManager[dict[str, Any]], name: str, writer: str
+) -> dict[str, Any] | None:
+    """
+    Claim the update of a BI Engine reservation in the ledger.
+
+    The claim serializes the updates of the Airflow tasks without holding the ledger
+    lock during the API calls. A claim older than `BI_RESERVATION_CLAIM_TIMEOUT`
+    seconds is taken over, its writer being assumed killed.
+
+    :param ledger: BI Engine reservations ledger
+    :param name: BI Engine reservation name
+    :param writer: Identifier of the update
+
+    :return: The ledger entry of the reservation, `None` if claimed by another writer.
+    """
+    now = datetime.datetime.now(tz=datetime.timezone.utc)
+    with ledger as state:
+        entry = state["reservations"].setdefault(name, {"size": None, "updates": []})
+        claim = entry.get("writer")
+        if (
+            claim
+            and claim["id"] != writer
+            and now - datetime.datetime.fromisoformat(claim["since"])
+            < datetime.timedelta(seconds=BI_RESERVATION_CLAIM_TIMEOUT)
+        ):
+            return None
+        entry["writer"] = {"id": writer, "since": now.isoformat()}
+        return dict(entry)
+
+
+def _release_bi_reservation(
+    ledger: ContextManager[dict[str, Any]],
+    name: str,
+    writer: str,
+    update: dict[str, Any] | None = None,
+) -> None:
+    """
+    Release the claim of a BI Engine reservation, recording its update in the ledger.
+
+    :param ledger: BI Engine reservations ledger
+    :param name: BI Engine reservation name
+    :param writer: Identifier of the update
+    :param update: (Optional) Update recorded, nothing is recorded if not set
+    """
+    with ledger as state:
+        entry = state["reservations"].setdefault(name, {"size": None, "updates": []})
+        if (entry.get("writer") or {}).get("id") == writer:
+            entry["writer"] = None
+        if update is not None:
+            entry["size"] = update["to"]
+            entry["updates"].append(update)
+            del entry["updates"][:-BI_RESERVATION_LEDGER_SIZE]
+        if not entry["updates"] and not entry.get("writer"):
+            del state["reservations"][name]
+
+
+def _bi_reservation_record(
+    current: BiReservation, updated: BiReservation, paths: Sequence[str]
+) -> dict[str, Any]:
+    """Build the ledger record of a BI Engine reservation update."""
+    update: dict[str, Any] = {
+        "at": datetime.datetime.now(tz=datetime.timezone.utc).isoformat(),
+        "from": current.size,
+        "to": updated.size,
+    }
+    if "preferred_tables" in paths:
+        update["preferred_tables"] = _bi_reservation_fields(
+            updated, ["preferred_tables"]
+        )["preferred_tables"]
+    return update
+
+
 class BigQueryReservationServiceHook(GoogleBaseHook):
     """
     Hook for Google Bigquery Reservation API.
@@ -59,7 +406,10 @@ class BigQueryReservationServiceHook(GoogleBaseHook):
         self.commitment: CapacityCommitment | None = None
         self.reservation: Reservation | None = None
         self.assignment: Assignment | None = None
-        self._client: ReservationServiceClient | None = None
+        self.attachment_duration: float | None = None
+        self.provisioning_timeline: ProvisioningTimeline | None = None
+        self.api_metrics = ApiMetrics()
+        self._client: ReservationServiceClient | RateLimitedClient | None = None
 
     def _get_commitment(self):
         return self.commitment  # pragma: no cover
@@ -70,19 +420,35 @@ class BigQueryReservationServiceHook(GoogleBaseHook):
     def _get_assignment(self):
         return self.assignment  # pragma: no cover
 
-    def get_client(self) -> ReservationServiceClient:
+    def _pool_key(self, transport: str) -> tuple:
+        return pool_key(self.gcp_conn_id, self.impersonation_chain, transport)
+
+    def _get_pooled_credentials(self):
+        """Get the credentials shared by the hooks of the process using the same connection."""
+        return CLIENT_POOL.get(self._pool_key("credentials"), self.get_credentials)
+
+    def get_client(self) -> ReservationServiceClient | RateLimitedClient:
         """
         Get reservation service client.
 
+        The client (and its gRPC channel) is shared by the hooks of the process
+        using the same connection and impersonation chain. Its calls are smoothed
+        by the rate limiter of the process (see `RATE_LIMITER`).
+
         :return: Google Bigquery Reservation client
         """
         if not self._client:
-            self._client = ReservationServiceClient(
-                credentials=self.get_credentials(), client_info=CLIENT_INFO
+            self._client = CLIENT_POOL.get(
+                self._pool_key("grpc"),
+                lambda: RateLimitedClient(
+                    ReservationServiceClient(
+                        credentials=self._get_pooled_credentials(),
+                        client_info=CLIENT_INFO,
+                    ),
+                    RATE_LIMITER,
+                ),
             )
-            return self._client
-        else:
-            return self._client
+        return self._client
 
     @staticmethod
     def _verify_slots_conditions(slots: int) -> None:
@@ -103,7 +469,9 @@ class BigQueryReservationServiceHook(GoogleBaseHook):
         """
         return value * 1073741824
 
-    def format_resource_id(self, resource_id: str) -> str:
+    def format_resource_id(
+        self, resource_id: str, idempotency_key: str | None = None
+    ) -> str:
         """
         Generate a unique resource id matching google reservation requirements.
 
@@ -114,17 +482,38 @@ class BigQueryReservationServiceHook(GoogleBaseHook):
             - not finish by a dash
 
         :param resource_id: input resource_id
+        :param idempotency_key: (Optional) Key of the caller e.g. `dag_id/task_id/run_id`:
+            the same key always gives the same resource id. Random by default.
 
         :return: a resource id
         """
-        uniqueness_suffix = hashlib.md5(str(uuid.uuid4()).encode()).hexdigest()[:10]
+        uniqueness_seed = idempotency_key or str(uuid.uuid4())
+        uniqueness_suffix = hashlib.md5(uniqueness_seed.encode()).hexdigest()[:10]
         resource_id = (
-            re.sub(r"[:\_+.]", "-", resource_id.lower())[:59]
-            + f"-{uniqueness_suffix[:10]}"
+            self._format_resource_label(resource_id) + f"-{uniqueness_suffix[:10]}"
         )
 
         return resource_id
 
+    @staticmethod
+    def _format_resource_label(resource_id: str) -> str:
+        """
+        Format a resource id without its uniqueness suffix (see `format_resource_id`).
+
+        :param resource_id: input resource_id
+        """
+        return re.sub(r"[:\_+.]", "-", resource_id.lower())[:59]
+
+    def load_inventory(self, parent: str) -> ReservationInventory:
+        """
+        List and index the commitments, reservations and assignments of a parent.
+
+        :param parent: Parent resource name e.g. `projects/myproject/locations/US`
+
+        :return: Indexed snapshot of the parent resources
+        """
+        return ReservationInventory.load(self, parent)
+
     def create_capacity_commitment(
         self,
         parent: str,
@@ -142,7 +531,13 @@ class BigQueryReservationServiceHook(GoogleBaseHook):
         """
         client = self.get_client()
 
-        try:
+        with _reservation_api_call(
+            self,
+            "create_capacity_commitment",
+            parent,
+            f"Failed to create {slots} slots capacity commitment"
+            f" ({commitments_duration}).",
+        ):
             self.commitment = client.create_capacity_commitment(
                 request={
                     "parent": parent,
@@ -152,33 +547,51 @@ class BigQueryReservationServiceHook(GoogleBaseHook):
                     "capacity_commitment_id": name,
                 }
             )
-            return self.commitment
-
-        except Exception as e:
-            self.log.error(e)
-            raise AirflowException(
-                f"Failed to create {slots} slots capacity commitment"
-                f" ({commitments_duration})."
-            )
+        return self.commitment
 
-    def list_capacity_commitments(self, parent: str) -> list[CapacityCommitment]:
+    def iter_capacity_commitments(
+        self,
+        parent: str,
+        page_size: int | None = None,
+        predicate: Callable[[CapacityCommitment], bool] | None = None,
+    ) -> Iterator[CapacityCommitment]:
         """
-        List the capacity commitments.
+        Iterate lazily over the capacity commitments, page by page.
+
+        Pages are fetched when the previous one is consumed, so stopping the iteration
+        early stops the API calls.
 
         :param parent: Parent resource name e.g. `projects/myproject/locations/US`
+        :param page_size: (Optional) Maximum number of commitments per page
+        :param predicate: (Optional) Client-side filter of the commitments yielded
         """
         client = self.get_client()
 
-        try:
-            commitments = client.list_capacity_commitments(
-                parent=parent,
-            )
+        return _reservation_api_iteration(
+            self,
+            "list_capacity_commitments",
+            parent,
+            f"Failed to list capacity commitment: {parent}.",
+            fetch=lambda: client.list_capacity_commitments(
+                request=_list_request(parent, page_size)
+            ),
+            predicate=predicate,
+        )
 
-            return [commitment for commitment in commitments]
+    def list_capacity_commitments(
+        self,
+        parent: str,
+        page_size: int | None = None,
+        predicate: Callable[[CapacityCommitment], bool] | None = None,
+    ) -> list[CapacityCommitment]:
+        """
+        List the capacity commitments.
 
-        except Exception as e:
-            self.log.error(e)
-            raise AirflowException(f"Failed to list capacity commitment: {parent}.")
+        :param parent: Parent resource name e.g. `projects/myproject/locations/US`
+        :param page_size: (Optional) Maximum number of commitments per page
+        :param predicate: (Optional) Client-side filter of the commitments listed
+        """
+        return list(self.iter_capacity_commitments(parent, page_size, predicate))
 
     def delete_capacity_commitment(self, name: str) -> None:
         """
@@ -188,14 +601,56 @@ class BigQueryReservationServiceHook(GoogleBaseHook):
         """
         client = self.get_client()
 
-        try:
+        with _reservation_api_call(
+            self,
+            "delete_capacity_commitment",
+            name,
+            f"Failed to delete {name} capacity commitment.",
+        ):
             client.delete_capacity_commitment(
                 name=name,
                 retry=retry.Retry(deadline=90, predicate=Exception, maximum=2),
             )
-        except Exception as e:
-            self.log.error(e)
-            raise AirflowException(f"Failed to delete {name} capacity commitment.")
+
+    def get_capacity_commitment(self, name: str) -> CapacityCommitment:
+        """
+        Get capacity commitment.
+
+        :param name: Commitment name e.g. `projects/myproject/locations/US/capacityCommitments/test`
+
+        :return: Corresponding BigQuery capacity commitment
+        """
+        client = self.get_client()
+
+        with _reservation_api_call(
+            self,
+            "get_capacity_commitment",
+            name,
+            f"Failed to get capacity commitment: {name}.",
+        ):
+            return client.get_capacity_commitment(name=name)
+
+    def split_capacity_commitment(
+        self, name: str, slots: int
+    ) -> tuple[CapacityCommitment, CapacityCommitment]:
+        """
+        Split a capacity commitment in two.
+
+        :param name: Commitment name
+        :param slots: Slots number kept by the commitment, the others move to a new commitment
+
+        :return: The commitment split and the new commitment.
+        """
+        client = self.get_client()
+
+        with _reservation_api_call(
+            self,
+            "split_capacity_commitment",
+            name,
+            f"Failed to split {name} capacity commitment to {slots} slots.",
+        ):
+            response = client.split_capacity_commitment(name=name, slot_count=slots)
+        return response.first, response.second
 
     def create_reservation(
         self, parent: str, reservation_id: str, slots: int
@@ -209,17 +664,18 @@ class BigQueryReservationServiceHook(GoogleBaseHook):
         """
         client = self.get_client()
 
-        try:
+        with _reservation_api_call(
+            self,
+            "create_reservation",
+            parent,
+            f"Failed to create {slots} slots reservation.",
+        ):
             self.reservation = client.create_reservation(
                 parent=parent,
                 reservation_id=reservation_id,
                 reservation=Reservation(slot_capacity=slots, ignore_idle_slots=True),
             )
-            return self.reservation
-
-        except Exception as e:
-            self.log.error(e)
-            raise AirflowException(f"Failed to create {slots} slots reservation.")
+        return self.reservation
 
     def get_reservation(self, name: str) -> Reservation:
         """
@@ -231,33 +687,54 @@ class BigQueryReservationServiceHook(GoogleBaseHook):
         """
         client = self.get_client()
 
-        try:
+        with _reservation_api_call(
+            self, "get_reservation", name, f"Failed to get reservation: {name}."
+        ):
             reservation = client.get_reservation(
                 name=name,
             )
-            return reservation
+        return reservation
 
-        except Exception as e:
-            self.log.error(e)
-            raise AirflowException(f"Failed to get reservation: {name}.")
-
-    def list_reservations(self, parent: str) -> list[Reservation]:
+    def iter_reservations(
+        self,
+        parent: str,
+        page_size: int | None = None,
+        predicate: Callable[[Reservation], bool] | None = None,
+    ) -> Iterator[Reservation]:
         """
-        List the reservations.
+        Iterate lazily over the reservations, page by page.
 
         :param parent: Parent resource name e.g. `projects/myproject/locations/US`
+        :param page_size: (Optional) Maximum number of reservations per page
+        :param predicate: (Optional) Client-side filter of the reservations yielded
         """
         client = self.get_client()
 
-        try:
-            reservations = client.list_reservations(
-                parent=parent,
-            )
-            return [reservation for reservation in reservations]
+        return _reservation_api_iteration(
+            self,
+            "list_reservations",
+            parent,
+            f"Failed to list reservation: {parent}.",
+            fetch=lambda: client.list_reservations(
+                request=_list_request(parent, page_size)
+            ),
+            predicate=predicate,
+        )
 
-        except Exception as e:
-            self.log.error(e)
-            raise AirflowException(f"Failed to list reservation: {parent}.")
+    def list_reservations(
+        self,
+        parent: str,
+        page_size: int | None = None,
+        predicate: Callable[[Reservation], bool] | None = None,
+    ) -> list[Reservation]:
+        """
+        List the reservations.
+
+        :param parent: Parent resource name e.g. `projects/myproject/locations/US`
+        :param page_size: (Optional) Maximum number of reservations per page
+        :param predicate: (Optional) Client-side filter of the reservations listed
+        """
+        return list(self.iter_reservations(parent, page_size, predicate))
 
     def update_reservation(self, name: str, slots: int) -> None:
         """
@@ -270,18 +747,17 @@ class BigQueryReservationServiceHook(GoogleBaseHook):
         new_reservation = Reservation(name=name, slot_capacity=slots)
         field_mask = field_mask_pb2.FieldMask(paths=["slot_capacity"])
 
-        try:
+        with _reservation_api_call(
+            self,
+            "update_reservation",
+            name,
+            f"Failed to update {name} reservation: modification of the slot"
+            f" capacity to {slots} slots.",
+        ):
             client.update_reservation(
                 reservation=new_reservation, update_mask=field_mask
             )
-            self.reservation = new_reservation
-
-        except Exception as e:
-            self.log.error(e)
-            raise AirflowException(
-                f"Failed to update {name} reservation: modification of the slot"
-                f" capacity to {slots} slots."
-            )
+        self.reservation = new_reservation
 
     def delete_reservation(self, name: str) -> None:
         """
@@ -290,11 +766,13 @@ class BigQueryReservationServiceHook(GoogleBaseHook):
         :param name: Reservation name e.g. `projects/myproject/locations/US/reservations/test`
         """
         client = self.get_client()
-        try:
+        with _reservation_api_call(
+            self,
+            "delete_reservation",
+            name,
+            f"Failed to delete {name} reservation.",
+        ):
             client.delete_reservation(name=name)
-        except Exception as e:
-            self.log.error(e)
-            raise AirflowException(f"Failed to delete {name} reservation.")
 
     def create_assignment(
         self, parent: str, project_id: str, job_type: str
@@ -309,41 +787,66 @@ class BigQueryReservationServiceHook(GoogleBaseHook):
         client = self.get_client()
         assignee = f"projects/{project_id}"
 
-        try:
+        with _reservation_api_call(
+            self,
+            "create_assignment",
+            parent,
+            f"Failed to create slots assignment with assignee {assignee} and"
+            f" job_type {job_type}",
+        ):
             self.assignment = client.create_assignment(
                 parent=parent,
                 assignment=Assignment(job_type=job_type, assignee=assignee),
             )
-            return self.assignment
-
-        except Exception as e:
-            self.log.error(e)
-            raise AirflowException(
-                "Failed to create slots assignment with assignee {assignee} and"
-                " job_type {job_type}"
-            )
+        return self.assignment
 
-    def list_assignments(self, parent: str) -> list[Assignment]:
+    def iter_assignments(
+        self,
+        parent: str,
+        page_size: int | None = None,
+        predicate: Callable[[Assignment], bool] | None = None,
+    ) -> Iterator[Assignment]:
         """
-        List the assignments.
+        Iterate lazily over the assignments, page by page.
 
         :param parent: Parent resource name e.g. `projects/myproject/locations/US/reservations/-`
+        :param page_size: (Optional) Maximum number of assignments per page
+        :param predicate: (Optional) Client-side filter of the assignments yielded
         """
         client = self.get_client()
 
-        try:
-            reservations = client.list_assignments(
-                parent=parent,
-            )
+        return _reservation_api_iteration(
+            self,
+            "list_assignments",
+            parent,
+            f"Failed to list assignments: {parent}.",
+            fetch=lambda: client.list_assignments(
+                request=_list_request(parent, page_size)
+            ),
+            predicate=predicate,
+        )
 
-            return [reservation for reservation in reservations]
+    def list_assignments(
+        self,
+        parent: str,
+        page_size: int | None = None,
+        predicate: Callable[[Assignment], bool] | None = None,
+    ) -> list[Assignment]:
+        """
+        List the assignments.
 
-        except Exception as e:
-            self.log.error(e)
-            raise AirflowException(f"Failed to list capacity commitment: {parent}.")
+        :param parent: Parent resource name e.g. `projects/myproject/locations/US/reservations/-`
+        :param page_size: (Optional) Maximum number of assignments per page
+        :param predicate: (Optional) Client-side filter of the assignments listed
+        """
+        return list(self.iter_assignments(parent, page_size, predicate))
 
     def search_assignment(
-        self, parent: str, project_id: str, job_type: str
+        self,
+        parent: str,
+        project_id: str,
+        job_type: str,
+        inventory: ReservationInventory | None = None,
     ) -> Assignment | None:
         """
         Search the assignment which matches with the specific conditions.
@@ -356,14 +859,24 @@ class BigQueryReservationServiceHook(GoogleBaseHook):
         :param name: Parent resource name e.g. `projects/myproject/locations/US`
         :param project_id: GCP project where you wich to assign slots
         :param job_type: Type of job for assignment
+        :param inventory: (Optional) Snapshot of the parent resources searched
+            instead of calling the API.
 
         :return: Corresponding BigQuery assignment
         """
+        if inventory is not None and inventory.parent == parent:
+            return inventory.search_assignment(project_id=project_id, job_type=job_type)
+
         client = self.get_client()
 
         query = f"assignee=projects/{project_id}"
 
-        try:
+        with _reservation_api_call(
+            self,
+            "search_all_assignments",
+            parent,
+            "Failed to search the list of reservation assignment.",
+        ):
             assignments = client.search_all_assignments(parent=parent, query=query)
             # Filter status active and corresponding job_type
             for assignment in assignments:
@@ -373,11 +886,6 @@ class BigQueryReservationServiceHook(GoogleBaseHook):
                 ):
                     return assignment
             return None
-        except Exception as e:
-            self.log.error(e)
-            raise AirflowException(
-                "Failed to search the list of reservation assignment."
-            )
 
     def delete_assignment(self, name: str) -> None:
         """
@@ -387,75 +895,326 @@ class BigQueryReservationServiceHook(GoogleBaseHook):
                      e.g. `projects/myproject/locations/US/reservations/test/assignments/8950226598037373530`
         """
         client = self.get_client()
-        try:
+        with _reservation_api_call(
+            self,
+            "delete_assignment",
+            name,
+            f"Failed to delete {name} assignment.",
+        ):
             client.delete_assignment(
                 name=name,
             )
-        except Exception as e:
-            self.log.error(e)
-            raise AirflowException(f"Failed to delete {name} reservation.")
+
+    def _bi_reservation_ledger(self) -> ContextManager[dict[str, Any]]:
+        """Lock the BI Engine reservations ledger Variable row, yield its state then save it."""
+        return locked_variable_state(
+            f"{BI_RESERVATION_LEDGER_PREFIX}-{self.location}",
+            default={"reservations": {}},
+            description=f"BI Engine reservation updates in {self.location}.",
+        )
+
+    def _update_bi_reservation(
+        self,
+        name: str,
+        error_message: str,
+        resize: Callable[[int], int] | None = None,
+        retable: Callable[[list[str]], list[str]] | None = None,
+    ) -> BiReservation:
+        """
+        Update the size and/or the preferred tables of a BI Engine reservation from their current values.
+
+        Only the fields updated are in the update mask. A BI Engine reservation has
+        no etag: the updates of the Airflow tasks are serialized by claims in the ledger
+        (an Airflow Variable locked only to claim and release the reservation, not during
+        the API calls), and each update is read back. A field read back with its value
+        from before the update was overwritten by another writer: it is read and updated
+        again, with a bounded exponential backoff. A size read back with another value
+        was changed after the update, on top of it: it is not resized again.
+
+        :param name: BI Engine reservation name
+        :param error_message: Message of the AirflowException raised by a failed call
+        :param resize: (Optional) Function of the current size (Kb) returning the new size (Kb)
+        :param retable: (Optional) Function of the current preferred table IDs
+            returning the new ones (see `merge_preferred_tables`)
+
+        :return: The BI Engine reservation updated.
+        """
+        client = self.get_client()
+        writer = uuid.uuid4().hex
+        paths = [
+            path
+            for path, update in (("size", resize), ("preferred_tables", retable))
+            if update is not None
+        ]
+
+        for attempt in range(BI_RESERVATION_UPDATE_ATTEMPTS):
+            entry = _claim_bi_reservation(self._bi_reservation_ledger(), name, writer)
+            while entry is None:
+                time.sleep(BI_RESERVATION_BACKOFF[0])
+                entry = _claim_bi_reservation(
+                    self._bi_reservation_ledger(), name, writer
+                )
+
+            record = None
+            try:
+                with _reservation_api_call(
+                    self, "get_bi_reservation", name, error_message
+                ):
+                    current = client.get_bi_reservation(name=name)
+                if entry["size"] is not None and current.size != entry["size"]:
+                    self.log.warning(
+                        f"{name} size changed outside the ledger:"
+                        f" {entry['size']}Kb to {current.size}Kb."
+                    )
+                bi_reservation = _bi_reservation_update(
+                    name, current, paths, resize=resize, retable=retable
+                )
+                with _reservation_api_call(
+                    self, "update_bi_reservation", name, error_message
+                ):
+                    client.update_bi_reservation(
+                        bi_reservation=bi_reservation,
+                        update_mask=field_mask_pb2.FieldMask(paths=paths),
+                    )
+                with _reservation_api_call(
+                    self, "get_bi_reservation", name, error_message
+                ):
+                    updated = client.get_bi_reservation(name=name)
+
+                overwritten = _bi_reservation_overwritten(
+                    self.log, name, current, bi_reservation, updated, paths
+                )
+                if not overwritten:
+                    record = _bi_reservation_record(current, updated, paths)
+            finally:
+                _release_bi_reservation(
+                    self._bi_reservation_ledger(), name, writer, record
+                )
+            if record is not None:
+                return updated
+
+            # Only the fields overwritten are updated again.
+            paths = overwritten
+            self.log.warning(
+                f"{name} update of {', '.join(paths)} overwritten, retrying"
+                f" ({attempt + 1}/{BI_RESERVATION_UPDATE_ATTEMPTS})."
+            )
+            time.sleep(
+                min(
+                    BI_RESERVATION_BACKOFF[1],
+                    BI_RESERVATION_BACKOFF[0] * 2**attempt,
+                )
+            )
+
+        self.log.error(
+            f"{name} update of {', '.join(paths)} overwritten"
+            f" {BI_RESERVATION_UPDATE_ATTEMPTS} times."
+        )
+        raise AirflowException(error_message)
 
     @GoogleBaseHook.fallback_to_default_project_id
-    def create_bi_reservation(self, project_id: str, size: int) -> None:
+    def create_bi_reservation(
+        self,
+        project_id: str,
+        size: int,
+        preferred_tables: Sequence[str] | None = None,
+        preferred_tables_mode: str = "add",
+    ) -> None:
         """
         Create BI Engine reservation.
 
+        The size is added to the current size atomically (see `_update_bi_reservation`),
+        with the preferred tables change in the same update.
+
         :param project_id: The name of the project where we want to create/update
             the BI Engine reservation.
         :param size: The BI Engine reservation size in Gb.
+        :param preferred_tables: (Optional) Table IDs `project.dataset.table` accelerated
+            in priority by the reservation. Without them, the preferred tables are unchanged.
+        :param preferred_tables_mode: `add` the preferred tables to the current ones,
+            `remove` them from the current ones or `replace` the current ones by them.
         """
         parent = f"projects/{project_id}/locations/{self.location}/biReservation"
-        client = self.get_client()
         size = self._convert_gb_to_kb(value=size)
+        retable = None
+        if preferred_tables is not None:
+            retable = partial(
+                merge_preferred_tables,
+                tables=preferred_tables,
+                mode=preferred_tables_mode,
+            )
 
-        try:
-            bi_reservation = client.get_bi_reservation(name=parent)
-            bi_reservation.size = size + bi_reservation.size
+        bi_reservation = self._update_bi_reservation(
+            parent,
+            f"Failed to create BI engine reservation of {size}.",
+            resize=lambda current: current + size,
+            retable=retable,
+        )
 
-            client.update_bi_reservation(bi_reservation=bi_reservation)
+        self.log.info(
+            f"BI Engine reservation {parent} have been updated to"
+            f" {bi_reservation.size}Kb."
+        )
+        if retable is not None:
+            tables = [
+                format_table_reference(t) for t in bi_reservation.preferred_tables
+            ]
+            self.log.info(f"BI Engine reservation {parent} preferred tables: {tables}.")
 
-            self.log.info(
-                "BI Engine reservation {parent} have been updated to {bi_reservation.size}Kb."
+    @GoogleBaseHook.fallback_to_default_project_id
+    def update_bi_reservation_preferred_tables(
+        self,
+        project_id: str,
+        preferred_tables: Sequence[str],
+        mode: str = "replace",
+    ) -> list[str]:
+        """
+        Change the preferred tables of a BI Engine reservation, keeping its size.
+
+        :param project_id: The name of the project of the BI Engine reservation.
+        :param preferred_tables: Table IDs `project.dataset.table` of the change.
+        :param mode: `add` the preferred tables to the current ones, `remove` them
+            from the current ones or `replace` the current ones by them.
+
+        :return: The preferred table IDs of the reservation.
+        """
+        parent = f"projects/{project_id}/locations/{self.location}/biReservation"
+
+        bi_reservation = self._update_bi_reservation(
+            parent,
+            f"Failed to update the preferred tables of {parent}.",
+            retable=partial(merge_preferred_tables, tables=preferred_tables, mode=mode),
+        )
+
+        tables = [format_table_reference(t) for t in bi_reservation.preferred_tables]
+        self.log.info(f"BI Engine reservation {parent} preferred tables: {tables}.")
+        return tables
+
+    @GoogleBaseHook.fallback_to_default_project_id
+    def resize_bi_reservation(self, project_id: str, size: int) -> None:
+        """
+        Set the size of a BI Engine reservation, whatever its current size.
+
+        :param project_id: The name of the project of the BI Engine reservation.
+        :param size: The BI Engine reservation size in Gb.
+        """
+        parent = f"projects/{project_id}/locations/{self.location}/biReservation"
+        size_kb = self._convert_gb_to_kb(value=size)
+
+        self._update_bi_reservation(
+            parent,
+            f"Failed to resize BI engine reservation to {size}.",
+            resize=lambda current: size_kb,
+        )
+
+        self.log.info(f"BI Engine reservation {parent} have been resized to {size}Gb.")
+
+    def get_bi_engine_usage(
+        self, project_id: str, lookback_hours: int = 168
+    ) -> list[BiEngineTableUsage]:
+        """
+        Get the BI Engine statistics of the queries of a project by hour and table.
+
+        See https://cloud.google.com/bigquery/docs/information-schema-jobs
+
+        :param project_id: GCP project of the queries
+        :param lookback_hours: Window (hours) of the statistics
+        """
+        query = BI_ENGINE_JOBS_QUERY.format(
+            project_id=project_id, location=self.location.lower()
+        )
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ScalarQueryParameter(
+                    "lookback_hours", "INT64", lookback_hours
+                ),
+            ],
+            use_query_cache=False,
+        )
+        try:
+            rows = (
+                self.get_bq_client()
+                .query(
+                    query,
+                    project=project_id,
+                    location=self.location,
+                    job_id_prefix="bi_engine_usage",
+                    job_config=job_config,
+                )
+                .result()
             )
+            return [
+                BiEngineTableUsage(
+                    hour=row["hour"],
+                    table_id=row["table_id"],
+                    queries=row["queries"],
+                    accelerated_queries=row["accelerated_queries"],
+                    bytes_processed=row["bytes_processed"],
+                    reasons=list(row["reasons"]),
+                )
+                for row in rows
+            ]
         except Exception as e:
             self.log.error(e)
-            raise AirflowException(f"Failed to create BI engine reservation of {size}.")
+            raise AirflowException(
+                f"Failed to get the BI Engine statistics of {project_id}."
+            )
 
     @GoogleBaseHook.fallback_to_default_project_id
-    def delete_bi_reservation(self, project_id: str, size: int | None = None) -> None:
+    def delete_bi_reservation(
+        self,
+        project_id: str,
+        size: int | None = None,
+        preferred_tables: Sequence[str] | None = None,
+    ) -> None:
         """
         Delete/Update BI Engine reservation with the specified memory size.
 
+        The size is subtracted from the current size atomically (see `_update_bi_reservation`),
+        with the preferred tables removed in the same update.
+
         :param project_id: The name of the project where we want to delete/update
             the BI Engine reservation.
         :param size: The BI Engine reservation size in Gb.
+        :param preferred_tables: (Optional) Table IDs `project.dataset.table` removed
+            from the preferred tables.
         """
         parent = f"projects/{project_id}/locations/{self.location}/biReservation"
-        client = self.get_client()
-        try:
-            bi_reservation = client.get_bi_reservation(name=parent)
-            if size is not None:
-                size = self._convert_gb_to_kb(size)
-                bi_reservation.size = max(bi_reservation.size - size, 0)
-            else:
-                bi_reservation.size = 0
-
-            client.update_bi_reservation(bi_reservation=bi_reservation)
-            self.log.info(
-                "BI Engine reservation {parent} have been updated to {bi_reservation.size}Kb."
+        size_kb = self._convert_gb_to_kb(size) if size is not None else None
+        retable = None
+        if preferred_tables is not None:
+            retable = partial(
+                merge_preferred_tables, tables=preferred_tables, mode="remove"
             )
-        except Exception as e:
-            self.log.error(e)
-            raise AirflowException(f"Failed to delete BI engine reservation of {size}.")
+
+        bi_reservation = self._update_bi_reservation(
+            parent,
+            f"Failed to delete BI engine reservation of {size}.",
+            resize=lambda current: max(current - size_kb, 0)
+            if size_kb is not None
+            else 0,
+            retable=retable,
+        )
+
+        self.log.info(
+            f"BI Engine reservation {parent} have been updated to"
+            f" {bi_reservation.size}Kb."
+        )
 
     def get_bq_client(self) -> bigquery.Client:
         """
         Get BQ service client.
 
+        The client (and its HTTP session) is shared by the hooks of the process
+        using the same connection and impersonation chain.
+
         :return: Google Bigquery client
         """
-        return bigquery.Client(
-            credentials=self.get_credentials(), client_info=CLIENT_INFO
+        return CLIENT_POOL.get(
+            self._pool_key("http"),
+            lambda: bigquery.Client(
+                credentials=self._get_pooled_credentials(), client_info=CLIENT_INFO
+            ),
         )
 
     def _is_assignment_attached_in_query(
@@ -485,14 +1244,273 @@ class BigQueryReservationServiceHook(GoogleBaseHook):
         else:
             return False
 
-    @GoogleBaseHook.fallback_to_default_project_id
-    def create_commitment_reservation_and_assignment(
+    def wait_assignment_attachment(
         self,
-        slots: int,
-        assignment_job_type: str,
-        commitments_duration: str,
+        target: AttachmentTarget,
+        probe: str | AttachmentProbe = "query",
+        backoff: AttachmentBackoff | None = None,
+    ) -> float:
+        """
+        Wait the assignment has been attached to the queries of the project.
+
+        See https://cloud.google.com/bigquery/docs/reservations-assignments#assign-project-to-none
+
+        :param target: Assignment whose attachment is awaited
+        :param probe: Attachment detection strategy name (see `ATTACHMENT_PROBES`) or instance
+        :param backoff: Intervals between two checks and overall deadline
+
+        :return: The time (seconds) the attachment took.
+        """
+        attachment_probe = get_attachment_probe(probe)
+        self.log.info("Waiting assignments attachment")
+
+        self.attachment_duration = wait_for_attachment(
+            lambda: attachment_probe.is_attached(self, target), backoff=backoff
+        )
+        self.api_metrics.record_wait(self.attachment_duration)
+        emit_wait("attachment", self.location, self.attachment_duration)
+        self.log.info(
+            f"Assignment attached on the project {target.project_id}"
+            f" in {self.attachment_duration:.1f} seconds."
+        )
+        return self.attachment_duration
+
+    def log_api_summary(self) -> None:
+        """Log the time spent in Reservation API calls against the wait time."""
+        self.log.info(self.api_metrics.summary())
+
+    def _get_existing_assignment_and_reservation(
+        self, parent: str, project_id: str, job_type: str
+    ) -> tuple[Assignment | None, Reservation | None]:
+        """
+        Get the active assignment of the project and its reservation, if they exist.
+
+        Cannot create multiple assignments to the same project on the same job_type.
+        So if it has been already exist update the reservation only to attribute the slots desired.
+
+        :param parent: Parent resource name e.g. `projects/myproject/locations/US`
+        :param project_id: GCP project where you wich to assign slots
+        :param job_type: Type of job for assignment
+        """
+        existing_assignment = self.search_assignment(
+            parent=parent, project_id=project_id, job_type=job_type
+        )
+        if not existing_assignment:
+            return None, None
+
+        self.assignment = existing_assignment
+        reservation_parent = existing_assignment.name.split("/assignments")[0]
+        return existing_assignment, self.get_reservation(name=reservation_parent)
+
+    def _get_if_exists(self, method: str, name: str) -> Any | None:
+        """
+        Get a resource, `None` if it does not exist.
+
+        :param method: Reservation API get method e.g. `get_reservation`
+        :param name: Resource name
+        """
+        client = self.get_client()
+
+        with _reservation_api_call(self, method, name, f"Failed to get {name}."):
+            try:
+                return getattr(client, method)(name=name)
+            except NotFound:
+                return None
+
+    def _get_or_create_capacity_commitment(
+        self,
+        parent: str,
+        slots: int,
+        commitments_duration: str,
+        name: str,
+        adopt: bool,
+    ) -> tuple[CapacityCommitment, bool]:
+        """
+        Create a capacity commitment, or adopt it if it already exists.
+
+        :param parent: Parent resource name e.g. `projects/myproject/locations/US`
+        :param slots: Slots number
+        :param commitments_duration: Commitment minimum durations (FLEX, MONTH, YEAR).
+        :param name: capacity commitment name
+        :param adopt: Look up the commitment before creating it
+
+        :return: The commitment, and whether it already existed.
+        """
+        if adopt:
+            commitment = self._get_if_exists(
+                "get_capacity_commitment", f"{parent}/capacityCommitments/{name}"
+            )
+            if commitment is not None:
+                self.log.info(f"Adopt the existing capacity commitment {name}.")
+                self.commitment = commitment
+                return commitment, True
+        commitment = self.create_capacity_commitment(
+            parent=parent,
+            slots=slots,
+            commitments_duration=commitments_duration,
+            name=name,
+        )
+        return commitment, False
+
+    def _idempotency_ledger(self) -> ContextManager[dict[str, Any]]:
+        """Lock the idempotency ledger Variable row, yield its state then save it."""
+        return locked_variable_state(
+            f"{IDEMPOTENCY_LEDGER_PREFIX}-{self.location}",
+            default={"updates": {}},
+            description=f"BigQuery reservations updated by a task in {self.location}.",
+        )
+
+    def _claim_reservation_growth(
+        self,
+        reservation_name: str,
+        commitment_name: str,
+        idempotency_key: str,
+        commitment_adopted: bool,
+    ) -> bool:
+        """
+        Claim the growth of a reservation by an idempotency key in the ledger.
+
+        The claim serializes the growths of the reservation by the Airflow tasks without
+        holding the ledger lock during the API calls. A claim older than
+        `RESERVATION_CLAIM_TIMEOUT` seconds is taken over, its task being assumed killed.
+
+        :param reservation_name: Reservation grown
+        :param commitment_name: Commitment of the slots added
+        :param idempotency_key: Key of the caller
+        :param commitment_adopted: The commitment existed before the call
+
+        :return: False if the reservation was already grown with the commitment slots.
+        """
+        while True:
+            now = datetime.datetime.now(tz=datetime.timezone.utc)
+            with self._idempotency_ledger() as ledger:
+                update = ledger["updates"].get(idempotency_key)
+                # Updates recorded before the commitments were: reservation name only
+                if isinstance(update, str):
+                    update = {"reservation": update, "commitment": commitment_name}
+                # A commitment bought again (e.g. by a cleared task) after its deletion
+                # released the slots of the previous growth: the reservation is grown again.
+                if commitment_adopted and update == {
+                    "reservation": reservation_name,
+                    "commitment": commitment_name,
+                }:
+                    return False
+                claims = ledger.setdefault("claims", {})
+                claim = claims.get(reservation_name)
+                if (
+                    not claim
+                    or claim["key"] == idempotency_key
+                    or now - datetime.datetime.fromisoformat(claim["since"])
+                    >= datetime.timedelta(seconds=RESERVATION_CLAIM_TIMEOUT)
+                ):
+                    claims[reservation_name] = {
+                        "key": idempotency_key,
+                        "since": now.isoformat(),
+                    }
+                    return True
+            time.sleep(RESERVATION_CLAIM_POLL_INTERVAL)
+
+    def _release_reservation_growth(
+        self,
+        reservation_name: str,
+        commitment_name: str,
+        idempotency_key: str,
+        grown: bool,
+    ) -> None:
+        """
+        Release the claim of a reservation growth, recording it in the ledger.
+
+        :param reservation_name: Reservation grown
+        :param commitment_name: Commitment of the slots added
+        :param idempotency_key: Key of the caller
+        :param grown: The reservation was grown, otherwise its update is forgotten
+        """
+        with self._idempotency_ledger() as ledger:
+            claims = ledger.setdefault("claims", {})
+            if (claims.get(reservation_name) or {}).get("key") == idempotency_key:
+                del claims[reservation_name]
+            updates = ledger["updates"]
+            updates.pop(idempotency_key, None)
+            if grown:
+                updates[idempotency_key] = {
+                    "reservation": reservation_name,
+                    "commitment": commitment_name,
+                }
+                for key in list(updates)[:-IDEMPOTENCY_LEDGER_SIZE]:
+                    del updates[key]
+
+    def _grow_reservation(
+        self,
+        reservation: Reservation,
+        slots: int,
+        idempotency_key: str | None,
+        commitment_adopted: bool = False,
+    ) -> None:
+        """
+        Add slots to an existing reservation, once by idempotency key and commitment.
+
+        With an idempotency key, the growth is claimed in the ledger, the capacity read
+        again and updated outside the ledger lock, then the growth is recorded with its
+        commitment. Its retries skip the update while that commitment still exists.
+
+        :param reservation: Reservation to update, read again with an idempotency key
+        :param slots: Slots number to add
+        :param idempotency_key: (Optional) Key of the caller, recorded with the
+            reservation updated to skip the update on its retries
+        :param commitment_adopted: The commitment of the slots existed before the call
+        """
+        if idempotency_key is None:
+            self.update_reservation(
+                name=reservation.name, slots=reservation.slot_capacity + slots
+            )
+            return
+
+        commitment_name = self.commitment.name if self.commitment else ""
+        if not self._claim_reservation_growth(
+            reservation.name, commitment_name, idempotency_key, commitment_adopted
+        ):
+            self.log.info(
+                f"Reservation {reservation.name} already updated by"
+                f" {idempotency_key}."
+            )
+            self.reservation = reservation
+            return
+
+        grown = False
+        try:
+            # The capacity is read again after the claim: a concurrent growth of the
+            # reservation by another key is not overwritten.
+            reservation = self.get_reservation(name=reservation.name)
+            self.update_reservation(
+                name=reservation.name, slots=reservation.slot_capacity + slots
+            )
+            grown = True
+        finally:
+            self._release_reservation_growth(
+                reservation.name, commitment_name, idempotency_key, grown
+            )
+
+    def _forget_reservation_update(self, idempotency_key: str) -> None:
+        """
+        Remove the reservation update of an idempotency key, once its slots are removed.
+
+        :param idempotency_key: Key of the caller
+        """
+        with self._idempotency_ledger() as ledger:
+            ledger["updates"].pop(idempotency_key, None)
+
+    @GoogleBaseHook.fallback_to_default_project_id
+    def create_commitment_reservation_and_assignment(
+        self,
+        slots: int,
+        assignment_job_type: str,
+        commitments_duration: str,
         project_id: str = PROVIDE_PROJECT_ID,
         reservation_project_id: str | None = None,
+        wait_assignment_attachment: bool = True,
+        attachment_probe: str | AttachmentProbe = "query",
+        attachment_deadline: float | None = None,
+        idempotency_key: str | None = None,
     ) -> None:
         """
         Create a commitment for a specific amount of slots.
@@ -500,12 +1518,28 @@ class BigQueryReservationServiceHook(GoogleBaseHook):
         Attach this commitment to a specified project by creating a new reservation and assignment
         or updating the existing one corresponding to the project assignment.
         Wait the assignment has been attached to a query.
+        The stages timestamps are kept in `provisioning_timeline`.
         See https://cloud.google.com/bigquery/docs/reservations-assignments
 
+        With an idempotency key, the resources ids are derived from the key and the
+        resources already created with the key (e.g. by a previous try of the task
+        killed before its cleanup) are adopted instead of bought again. The updates of
+        an existing reservation are recorded by key in an Airflow Variable of the
+        metadata DB (`bigquery_reservation_idempotency-<location>`).
+
         :param slots: Slots number to purchase and assign
         :param assignment_job_type: Type of job for assignment
         :param commitments_duration: Commitment minimum durations (FLEX, MONTH, YEAR).
         :param project_id: GCP project where you wich to assign slots
+        :param reservation_project_id: GCP project where the reservation is set
+            (default: `project_id`).
+        :param wait_assignment_attachment: Wait the assignment has been attached to a query
+            before returning. Set it to False to delegate the wait (e.g. to a trigger).
+        :param attachment_probe: Attachment detection strategy name
+            (see `ATTACHMENT_PROBES`) or instance.
+        :param attachment_deadline: (Optional) Maximum attachment wait (seconds).
+        :param idempotency_key: (Optional) Key of the purchase, the same across its
+            retries e.g. `dag_id/task_id/run_id/map_index`.
         """
         reservation_project_id = reservation_project_id or project_id
         self.log.info(
@@ -514,29 +1548,69 @@ class BigQueryReservationServiceHook(GoogleBaseHook):
 
         self._verify_slots_conditions(slots=slots)
         parent = f"projects/{reservation_project_id}/locations/{self.location}"
-        resource_name = self.format_resource_id(f"airflow_{project_id}_assignement")
+        resource_name = self.format_resource_id(
+            f"airflow_{project_id}_assignement", idempotency_key=idempotency_key
+        )
+        adopt = idempotency_key is not None
+        since = datetime.datetime.now(tz=datetime.timezone.utc)
+        timeline = self.provisioning_timeline = ProvisioningTimeline(
+            location=self.location,
+            project_id=project_id,
+            job_type=assignment_job_type,
+            probe=attachment_probe_name(attachment_probe),
+            started_at=since,
+        )
 
         try:
-            capacity_commitment = self.create_capacity_commitment(
-                parent=parent,
-                slots=slots,
-                commitments_duration=commitments_duration,
-                name=resource_name,
-            )
-
-            # Cannot create multiple assignments to the same project on the same job_type.
-            # So if it has been already exist update the reservation only to attribute the slots desired.
-            existing_assignment = self.search_assignment(
-                parent=parent, project_id=project_id, job_type=assignment_job_type
-            )
+            # The commitment purchase and the existing resources lookups are independent:
+            # run them concurrently and wait for all before handling any failure.
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                commitment_future = executor.submit(
+                    self._get_or_create_capacity_commitment,
+                    parent=parent,
+                    slots=slots,
+                    commitments_duration=commitments_duration,
+                    name=resource_name,
+                    adopt=adopt,
+                )
+                commitment_future.add_done_callback(
+                    lambda _: timeline.mark("commitment_created")
+                )
+                existing_future = executor.submit(
+                    self._get_existing_assignment_and_reservation,
+                    parent=parent,
+                    project_id=project_id,
+                    job_type=assignment_job_type,
+                )
+                adopted_future = (
+                    executor.submit(
+                        self._get_if_exists,
+                        "get_reservation",
+                        f"{parent}/reservations/{resource_name}",
+                    )
+                    if adopt
+                    else None
+                )
+            _, commitment_adopted = commitment_future.result()
+            existing_assignment, current_reservation = existing_future.result()
+            adopted_reservation = adopted_future.result() if adopted_future else None
 
-            if existing_assignment:
-                self.assignment = existing_assignment
-                reservation_parent = existing_assignment.name.split("/assignments")[0]
-                current_reservation = self.get_reservation(name=reservation_parent)
-                new_slots_reservation = current_reservation.slot_capacity + slots
-                self.update_reservation(
-                    name=current_reservation.name, slots=new_slots_reservation
+            if adopted_reservation is not None:
+                self.log.info(f"Adopt the existing reservation {resource_name}.")
+                self.reservation = adopted_reservation
+                if (
+                    existing_assignment is None
+                    or current_reservation is None
+                    or current_reservation.name != adopted_reservation.name
+                ):
+                    self.create_assignment(
+                        parent=adopted_reservation.name,
+                        project_id=project_id,
+                        job_type=assignment_job_type,
+                    )
+            elif existing_assignment and current_reservation is not None:
+                self._grow_reservation(
+                    current_reservation, slots, idempotency_key, commitment_adopted
                 )
             else:
                 reservation = self.create_reservation(
@@ -547,15 +1621,26 @@ class BigQueryReservationServiceHook(GoogleBaseHook):
                     project_id=project_id,
                     job_type=assignment_job_type,
                 )
+            timeline.new_reservation = (
+                adopted_reservation is not None or not existing_assignment
+            )
+            timeline.mark("assignment_created")
 
-            # Waiting the assignment attachment to send a dummy query every 15 seconds
-            self.log.info("Waiting assignments attachment")
+            if not wait_assignment_attachment:
+                return
 
-            bq_client = self.get_bq_client()
-            while not self._is_assignment_attached_in_query(
-                client=bq_client, project_id=project_id, location=self.location
-            ):
-                sleep(15)  # pragma: no cover
+            self.wait_assignment_attachment(
+                target=AttachmentTarget(
+                    project_id=project_id,
+                    location=self.location,
+                    job_type=assignment_job_type,
+                    reservation_project_id=reservation_project_id,
+                    since=since,
+                ),
+                probe=attachment_probe,
+                backoff=AttachmentBackoff(deadline=attachment_deadline),
+            )
+            timeline.mark("attached")
 
         except Exception as e:
             self.log.error(e)
@@ -567,6 +1652,7 @@ class BigQueryReservationServiceHook(GoogleBaseHook):
                 reservation_name=reservation_name,
                 assignment_name=assignment_name,
                 slots=slots,
+                idempotency_key=idempotency_key,
             )
             raise AirflowException(
                 "Failed to purchase, to reserve and to attribute"
@@ -579,6 +1665,7 @@ class BigQueryReservationServiceHook(GoogleBaseHook):
         commitment_name: str | None = None,
         reservation_name: str | None = None,
         assignment_name: str | None = None,
+        idempotency_key: str | None = None,
     ) -> None:
         """
         If it exists, delete/update the commitment, reservation and assignment resources.
@@ -592,6 +1679,8 @@ class BigQueryReservationServiceHook(GoogleBaseHook):
         :param commitment_name: Commitment name e.g. `projects/myproject/locations/US/commitments/test`
         :param reservation_name: Reservation name e.g. `projects/myproject/locations/US/reservations/test`
         :param assignment_name: Assignment name e.g. `projects/myproject/locations/US/reservations/test/assignments/8950226598037373530`
+        :param idempotency_key: (Optional) Key of the purchase, whose reservation update
+            is removed from the ledger once its slots are removed
         """
         try:
             if reservation_name:
@@ -629,6 +1718,9 @@ class BigQueryReservationServiceHook(GoogleBaseHook):
                 self.log.info(f"BigQuery commitment {commitment_name} has been deleted")
             else:
                 self.log.warning("None BigQuery commitment to delete")
+
+            if idempotency_key is not None and reservation_name:
+                self._forget_reservation_update(idempotency_key)
         except Exception as e:
             self.log.error(e)
             raise AirflowException(
@@ -638,31 +1730,87 @@ class BigQueryReservationServiceHook(GoogleBaseHook):
                 + "commitments: {commitment_name}."
             )
 
-    def delete_all_commitments(self, project_id: str, location: str) -> None:
+    def delete_all_commitments(
+        self, project_id: str, location: str, max_workers: int = 8
+    ) -> None:
         """
         Delete all commitments, reservation and assignment associated to a specific project and location.
 
+        Resources are deleted concurrently by dependency chain: the assignments of a
+        reservation, then the reservation, then the commitment created with the same
+        identifier. Commitments matching none reservation are deleted once every chain
+        is done. Failures are collected and reported at the end of the teardown.
+
         :param project_id: Commitment project
         :param location: Commitment location
+        :param max_workers: Maximum number of dependency chains deleted concurrently
         """
         parent = f"projects/{project_id}/locations/{self.location}"
         try:
-            commitments = self.list_capacity_commitments(parent)
-            reservations = self.list_reservations(parent)
-            assignments = self.list_assignments(f"{parent}/reservations/-")
+            inventory = self.load_inventory(parent)
+        except Exception as e:
+            self.log.error(e)
+            raise AirflowException(f"Failed to delete commitments in {parent}")
 
-            for assignment in assignments:
-                self.delete_assignment(name=assignment.name)
+        failures = run_teardown(
+            self._build_teardown_phases(inventory), max_workers=max_workers
+        )
+        if failures:
+            raise AirflowException(
+                f"Failed to delete commitments in {parent}:"
+                f" {len(failures)} resources not deleted ({', '.join(failures)})."
+            )
 
-            for reservation in reservations:
-                self.delete_reservation(name=reservation.name)
+    def _build_teardown_phases(
+        self, inventory: ReservationInventory
+    ) -> list[list[Chain]]:
+        """
+        Group the resources by dependency chain: assignments -> reservation -> commitment.
 
-            for commitment in commitments:
-                self.delete_capacity_commitment(name=commitment.name)
+        :param inventory: Snapshot of the resources to delete
+        """
 
-        except Exception as e:
-            self.log.error(e)
-            raise AirflowException(f"Failed to delete commitments in {parent}")
+        def deletion(delete: Callable[..., None], name: str) -> Deletion:
+            return name, partial(delete, name=name)
+
+        chained_assignments: set[str] = set()
+        chained_commitments: set[str] = set()
+
+        chains: list[Chain] = []
+        for reservation in inventory.reservations.values():
+            assignments = inventory.assignments_of_reservation(reservation.name)
+            chained_assignments.update(assignment.name for assignment in assignments)
+            chain: Chain = [
+                [
+                    deletion(self.delete_assignment, assignment.name)
+                    for assignment in assignments
+                ],
+                [deletion(self.delete_reservation, reservation.name)],
+            ]
+            commitment = inventory.commitment_by_id(resource_id(reservation.name))
+            if commitment:
+                chained_commitments.add(commitment.name)
+                chain.append(
+                    [deletion(self.delete_capacity_commitment, commitment.name)]
+                )
+            chains.append(chain)
+
+        # Assignments of reservations which are not listed
+        orphan_assignments = [
+            assignment
+            for name, assignment in inventory.assignments.items()
+            if name not in chained_assignments
+        ]
+        for assignment in orphan_assignments:
+            chains.append([[deletion(self.delete_assignment, assignment.name)]])
+
+        # Commitments matching none reservation could back any of them
+        remaining_commitments: list[Chain] = [
+            [[deletion(self.delete_capacity_commitment, name)]]
+            for name in inventory.commitments
+            if name not in chained_commitments
+        ]
+        return [chains, remaining_commitments]
 
     def delete_commitments_assignment_associated(
         self, project_id: str, location: str, reservation_project_id: str
@@ -676,35 +1824,760 @@ class BigQueryReservationServiceHook(GoogleBaseHook):
         """
         parent = f"projects/{reservation_project_id}/locations/{self.location}"
         try:
-            assignments = self.list_assignments(f"{parent}/reservations/-")
-            assignments_updated = []
+            inventory = self.load_inventory(parent)
             reservations = set()
-            commitments = self.list_capacity_commitments(parent)
 
-            for assignment in assignments:
-                if assignment.assignee == f"projects/{project_id}":
-                    reservations.add(assignment.name.split("/assignments")[0])
-                    self.delete_assignment(name=assignment.name)
-                else:
-                    assignments_updated.append(assignment)
+            for assignment in inventory.assignments_of_assignee(project_id):
+                reservations.add(reservation_name_of(assignment))
+                self.delete_assignment(name=assignment.name)
+                inventory.remove_assignment(assignment)
 
             for reservation in reservations:
-                assert all(
-                    [
-                        False
-                        if reservation == assignment.name.split("/assignments")[0]
-                        else True
-                        for assignment in assignments_updated
-                    ]
+                assert not inventory.assignments_of_reservation(
+                    reservation
                 ), "Reservation is in use. We cannot delete it."
                 self.delete_reservation(name=reservation)
 
-            for commitment in commitments:
-                if f"airflow-{project_id}-assignement" in commitment.name:
-                    self.delete_capacity_commitment(name=commitment.name)
+            label = self._format_resource_label(f"airflow_{project_id}_assignement")
+            for commitment in inventory.commitments_with_label(label):
+                self.delete_capacity_commitment(name=commitment.name)
 
         except Exception as e:
             self.log.error(e)
             raise AirflowException(
                 f"Failed to delete commitments in {parent} for project assignee {project_id}."
             )
+
+    def get_reservation_utilization(
+        self, project_id: str, reservation_name: str, lookback_seconds: int = 300
+    ) -> ReservationUtilization:
+        """
+        Get the slot utilization of a reservation from the jobs timeline of a project.
+
+        See https://cloud.google.com/bigquery/docs/information-schema-jobs-timeline
+
+        :param project_id: GCP project whose jobs run on the reservation
+        :param reservation_name: Reservation name e.g. `projects/myproject/locations/US/reservations/test`
+        :param lookback_seconds: Window (seconds) of the utilization
+        """
+        query = UTILIZATION_QUERY.format(
+            project_id=project_id, location=self.location.lower()
+        )
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ScalarQueryParameter(
+                    "reservation_id", "STRING", jobs_reservation_id(reservation_name)
+                ),
+                bigquery.ScalarQueryParameter(
+                    "lookback_seconds", "INT64", lookback_seconds
+                ),
+            ],
+            use_query_cache=False,
+        )
+        try:
+            (row,) = (
+                self.get_bq_client()
+                .query(
+                    query,
+                    project=project_id,
+                    location=self.location,
+                    job_id_prefix="reservation_utilization",
+                    job_config=job_config,
+                )
+                .result()
+            )
+        except Exception as e:
+            self.log.error(e)
+            raise AirflowException(
+                f"Failed to get the utilization of {reservation_name} reservation."
+            )
+        return ReservationUtilization(
+            average_slots=row["average_slots"],
+            peak_slots=row["peak_slots"],
+            pending_jobs=row["pending_jobs"],
+        )
+
+    def count_reservation_running_jobs(
+        self, project_id: str, reservation_name: str
+    ) -> int:
+        """
+        Count the jobs of a project running on a reservation.
+
+        See https://cloud.google.com/bigquery/docs/information-schema-jobs
+
+        :param project_id: GCP project whose jobs run on the reservation
+        :param reservation_name: Reservation name e.g. `projects/myproject/locations/US/reservations/test`
+        """
+        query = RUNNING_JOBS_QUERY.format(
+            project_id=project_id, location=self.location.lower()
+        )
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ScalarQueryParameter(
+                    "reservation_id", "STRING", jobs_reservation_id(reservation_name)
+                ),
+                bigquery.ScalarQueryParameter(
+                    "job_id_prefix", "STRING", DRAIN_JOB_ID_PREFIX
+                ),
+            ],
+            use_query_cache=False,
+        )
+        try:
+            (row,) = (
+                self.get_bq_client()
+                .query(
+                    query,
+                    project=project_id,
+                    location=self.location,
+                    job_id_prefix=DRAIN_JOB_ID_PREFIX,
+                    job_config=job_config,
+                )
+                .result()
+            )
+        except Exception as e:
+            self.log.error(e)
+            raise AirflowException(
+                f"Failed to count the jobs running on {reservation_name} reservation."
+            )
+        return row["running_jobs"]
+
+    def get_commitment_timeline(
+        self,
+        project_id: str,
+        reservation_name: str,
+        start: datetime.datetime,
+        end: datetime.datetime,
+    ) -> CommitmentTimeline:
+        """
+        Get the slot usage of a reservation by second from the jobs timeline of a project.
+
+        See https://cloud.google.com/bigquery/docs/information-schema-jobs-timeline
+
+        :param project_id: GCP project whose jobs run on the reservation
+        :param reservation_name: Reservation name e.g. `projects/myproject/locations/US/reservations/test`
+        :param start: Start of the window
+        :param end: End of the window
+        """
+        query = COMMITMENT_TIMELINE_QUERY.format(
+            project_id=project_id, location=self.location.lower()
+        )
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ScalarQueryParameter(
+                    "reservation_id", "STRING", jobs_reservation_id(reservation_name)
+                ),
+                bigquery.ScalarQueryParameter("start", "TIMESTAMP", start),
+                bigquery.ScalarQueryParameter("end", "TIMESTAMP", end),
+            ],
+            use_query_cache=False,
+        )
+        try:
+            rows = list(
+                self.get_bq_client()
+                .query(
+                    query,
+                    project=project_id,
+                    location=self.location,
+                    job_id_prefix="commitment_timeline",
+                    job_config=job_config,
+                )
+                .result()
+            )
+        except Exception as e:
+            self.log.error(e)
+            raise AirflowException(
+                f"Failed to get the jobs timeline of {reservation_name} reservation."
+            )
+        return CommitmentTimeline(
+            seconds=[row["second"] for row in rows],
+            slot_ms=[row["slot_ms"] for row in rows],
+            jobs=[row["jobs"] for row in rows],
+        )
+
+    def scale_reservation(
+        self,
+        reservation_name: str,
+        slots: int,
+        commitments: list[dict] | None = None,
+        commitments_duration: str = "FLEX",
+    ) -> list[dict]:
+        """
+        Grow or shrink a reservation capacity with the commitments backing the difference.
+
+        A growth buys a commitment of the added slots before updating the reservation.
+        A shrink updates the reservation before deleting the last `commitments` bought
+        by the previous scalings: the capacity cannot go below the capacity they do not back.
+
+        :param reservation_name: Reservation name e.g. `projects/myproject/locations/US/reservations/test`
+        :param slots: New slots capacity
+        :param commitments: Commitments bought by the previous scalings, as `name`
+            and `slots` mappings, last bought last
+        :param commitments_duration: Commitment minimum durations (FLEX, MONTH, YEAR).
+
+        :return: The commitments bought by the scalings, last bought last.
+        """
+        self._verify_slots_conditions(slots=slots)
+        commitments = list(commitments or [])
+        current_slots = self.get_reservation(name=reservation_name).slot_capacity
+        parent = reservation_name.split("/reservations")[0]
+
+        if slots == current_slots:
+            return commitments
+        if slots > current_slots:
+            commitment = self.create_capacity_commitment(
+                parent=parent,
+                slots=slots - current_slots,
+                commitments_duration=commitments_duration,
+                name=self.format_resource_id(
+                    f"airflow-autoscale-{resource_label(reservation_name)}"
+                ),
+            )
+            try:
+                self.update_reservation(name=reservation_name, slots=slots)
+            except AirflowException:
+                self.delete_capacity_commitment(name=commitment.name)
+                raise
+            commitments.append(
+                {"name": commitment.name, "slots": commitment.slot_count}
+            )
+        elif slots < current_slots:
+            released: list[dict] = []
+            while (
+                commitments
+                and sum(c["slots"] for c in released) + commitments[-1]["slots"]
+                <= current_slots - slots
+            ):
+                released.append(commitments.pop())
+            if not released:
+                self.log.warning(
+                    f"None commitment bought by the scaling of {reservation_name}"
+                    f" could be released to reach {slots} slots."
+                )
+                return commitments
+            slots = current_slots - sum(c["slots"] for c in released)
+            self.update_reservation(name=reservation_name, slots=slots)
+            for released_commitment in released:
+                self.delete_capacity_commitment(name=released_commitment["name"])
+
+        self.log.info(
+            f"BigQuery reservation {reservation_name} scaled from {current_slots}"
+            f" to {slots} slots."
+        )
+        return commitments
+
+
+class BigQueryReservationServiceAsyncHook(GoogleBaseAsyncHook):
+    """
+    Async hook for Google Bigquery Reservation API.
+
+    It shares the error handling of `BigQueryReservationServiceHook` and is used by the
+    triggers, or to run many reservation operations at once in a single event loop.
+
+    :param location: Location where the reservation is attached.
+    :param gcp_conn_id: The connection ID used to connect to Google Cloud.
+    :param impersonation_chain: Optional service account to impersonate using short-term
+        credentials, or chained list of accounts required to get the access_token
+        of the last account in the list, which will be impersonated in the request.
+        If set as a string, the account must grant the originating account
+        the Service Account Token Creator IAM role.
+        If set as a sequence, the identities from the list must grant
+        Service Account Token Creator IAM role to the directly preceding identity, with first
+        account from the list granting this role to the originating account (templated).
+    """
+
+    sync_hook_class = BigQueryReservationServiceHook
+
+    def __init__(
+        self,
+        location: str,
+        gcp_conn_id: str = GoogleBaseHook.default_conn_name,
+        impersonation_chain: str | Sequence[str] | None = None,
+    ) -> None:
+        super().__init__(
+            location=location,
+            gcp_conn_id=gcp_conn_id,
+            impersonation_chain=impersonation_chain,
+        )
+        self.location = location
+        self.api_metrics = ApiMetrics()
+        self._client: ReservationServiceAsyncClient | AsyncRateLimitedClient | None = (
+            None
+        )
+
+    async def get_client(
+        self,
+    ) -> ReservationServiceAsyncClient | AsyncRateLimitedClient:
+        """
+        Get reservation service async client.
+
+        As the sync client, it is shared through the client pool and its calls are
+        smoothed by the rate limiter of the process (see `RATE_LIMITER`). Its gRPC channel
+        is bound to the event loop: the client is shared by the hooks of the same loop.
+
+        :return: Google Bigquery Reservation async client
+        """
+        if not self._client:
+            sync_hook = await self.get_sync_hook()
+            credentials = await sync_to_async(sync_hook._get_pooled_credentials)()
+            self._client = CLIENT_POOL.get(
+                (*sync_hook._pool_key("grpc_asyncio"), asyncio.get_running_loop()),
+                lambda: AsyncRateLimitedClient(
+                    ReservationServiceAsyncClient(
+                        credentials=credentials, client_info=CLIENT_INFO
+                    ),
+                    RATE_LIMITER,
+                ),
+            )
+        return self._client
+
+    def _bi_reservation_ledger(self) -> ContextManager[dict[str, Any]]:
+        """Lock the BI Engine reservations ledger Variable row, shared with the sync hook."""
+        return locked_variable_state(
+            f"{BI_RESERVATION_LEDGER_PREFIX}-{self.location}",
+            default={"reservations": {}},
+            description=f"BI Engine reservation updates in {self.location}.",
+        )
+
+    async def create_capacity_commitment(
+        self,
+        parent: str,
+        slots: int,
+        commitments_duration: str,
+        name: str,
+    ) -> CapacityCommitment:
+        """
+        Create capacity commitment.
+
+        :param parent: Parent resource name e.g. `projects/myproject/locations/US`
+        :param slots: Slots number
+        :param commitments_duration: Commitment minimum durations (FLEX, MONTH, YEAR).
+        :param name: capacity commitment name
+        """
+        client = await self.get_client()
+
+        with _reservation_api_call(
+            self,
+            "create_capacity_commitment",
+            parent,
+            f"Failed to create {slots} slots capacity commitment"
+            f" ({commitments_duration}).",
+        ):
+            return await client.create_capacity_commitment(
+                request={
+                    "parent": parent,
+                    "capacity_commitment": CapacityCommitment(
+                        plan=commitments_duration, slot_count=slots
+                    ),
+                    "capacity_commitment_id": name,
+                }
+            )
+
+    async def list_capacity_commitments(self, parent: str) -> list[CapacityCommitment]:
+        """
+        List the capacity commitments.
+
+        :param parent: Parent resource name e.g. `projects/myproject/locations/US`
+        """
+        client = await self.get_client()
+
+        with _reservation_api_call(
+            self,
+            "list_capacity_commitments",
+            parent,
+            f"Failed to list capacity commitment: {parent}.",
+        ):
+            commitments = await client.list_capacity_commitments(parent=parent)
+            return [commitment async for commitment in commitments]
+
+    async def delete_capacity_commitment(self, name: str) -> None:
+        """
+        Delete capacity commitment.
+
+        :param name: Commitment name
+        """
+        client = await self.get_client()
+
+        with _reservation_api_call(
+            self,
+            "delete_capacity_commitment",
+            name,
+            f"Failed to delete {name} capacity commitment.",
+        ):
+            await client.delete_capacity_commitment(
+                name=name,
+                retry=retry_async.AsyncRetry(
+                    deadline=90,
+                    predicate=retry_async.if_exception_type(Exception),
+                    maximum=2,
+                ),
+            )
+
+    async def create_reservation(
+        self, parent: str, reservation_id: str, slots: int
+    ) -> Reservation:
+        """
+        Create reservation.
+
+        :param parent: Parent resource name e.g. `projects/myproject/locations/US`
+        :param reservation_id: reservation identifier
+        :param slots: Slots number
+        """
+        client = await self.get_client()
+
+        with _reservation_api_call(
+            self,
+            "create_reservation",
+            parent,
+            f"Failed to create {slots} slots reservation.",
+        ):
+            return await client.create_reservation(
+                parent=parent,
+                reservation_id=reservation_id,
+                reservation=Reservation(slot_capacity=slots, ignore_idle_slots=True),
+            )
+
+    async def get_reservation(self, name: str) -> Reservation:
+        """
+        Get reservation.
+
+        :param name: Resource name e.g. `projects/myproject/locations/US/reservations/test`
+
+        :return: Corresponding BigQuery Reservation
+        """
+        client = await self.get_client()
+
+        with _reservation_api_call(
+            self, "get_reservation", name, f"Failed to get reservation: {name}."
+        ):
+            return await client.get_reservation(name=name)
+
+    async def list_reservations(self, parent: str) -> list[Reservation]:
+        """
+        List the reservations.
+
+        :param parent: Parent resource name e.g. `projects/myproject/locations/US`
+        """
+        client = await self.get_client()
+
+        with _reservation_api_call(
+            self,
+            "list_reservations",
+            parent,
+            f"Failed to list reservation: {parent}.",
+        ):
+            reservations = await client.list_reservations(parent=parent)
+            return [reservation async for reservation in reservations]
+
+    async def update_reservation(self, name: str, slots: int) -> Reservation:
+        """
+        Update reservation with a new slots capacity.
+
+        :param name: Reservation name e.g. `projects/myproject/locations/US/reservations/test`
+        :param slots: New slots capacity
+        """
+        client = await self.get_client()
+        new_reservation = Reservation(name=name, slot_capacity=slots)
+        field_mask = field_mask_pb2.FieldMask(paths=["slot_capacity"])
+
+        with _reservation_api_call(
+            self,
+            "update_reservation",
+            name,
+            f"Failed to update {name} reservation: modification of the slot"
+            f" capacity to {slots} slots.",
+        ):
+            return await client.update_reservation(
+                reservation=new_reservation, update_mask=field_mask
+            )
+
+    async def delete_reservation(self, name: str) -> None:
+        """
+        Delete reservation.
+
+        :param name: Reservation name e.g. `projects/myproject/locations/US/reservations/test`
+        """
+        client = await self.get_client()
+
+        with _reservation_api_call(
+            self,
+            "delete_reservation",
+            name,
+            f"Failed to delete {name} reservation.",
+        ):
+            await client.delete_reservation(name=name)
+
+    async def create_assignment(
+        self, parent: str, project_id: str, job_type: str
+    ) -> Assignment:
+        """
+        Create assignment.
+
+        :param parent: Parent resource name e.g. `projects/myproject/locations/US/reservations/team1-prod`
+        :param project_id: GCP project where you wich to assign slots
+        :param job_type: Type of job for assignment
+        """
+        client = await self.get_client()
+        assignee = f"projects/{project_id}"
+
+        with _reservation_api_call(
+            self,
+            "create_assignment",
+            parent,
+            f"Failed to create slots assignment with assignee {assignee} and"
+            f" job_type {job_type}",
+        ):
+            return await client.create_assignment(
+                parent=parent,
+                assignment=Assignment(job_type=job_type, assignee=assignee),
+            )
+
+    async def list_assignments(self, parent: str) -> list[Assignment]:
+        """
+        List the assignments.
+
+        :param parent: Parent resource name e.g. `projects/myproject/locations/US/reservations/-`
+        """
+        client = await self.get_client()
+
+        with _reservation_api_call(
+            self,
+            "list_assignments",
+            parent,
+            f"Failed to list assignments: {parent}.",
+        ):
+            assignments = await client.list_assignments(parent=parent)
+            return [assignment async for assignment in assignments]
+
+    async def search_assignment(
+        self, parent: str, project_id: str, job_type: str
+    ) -> Assignment | None:
+        """
+        Search the assignment which matches with the specific conditions.
+
+        Conditions:
+            - Assignee to the specified project_id
+            - active state
+            - the job type corresponding to the job type specified
+
+        :param parent: Parent resource name e.g. `projects/myproject/locations/US`
+        :param project_id: GCP project where you wich to assign slots
+        :param job_type: Type of job for assignment
+
+        :return: Corresponding BigQuery assignment
+        """
+        client = await self.get_client()
+        query = f"assignee=projects/{project_id}"
+
+        with _reservation_api_call(
+            self,
+            "search_all_assignments",
+            parent,
+            "Failed to search the list of reservation assignment.",
+        ):
+            assignments = await client.search_all_assignments(
+                parent=parent, query=query
+            )
+            async for assignment in assignments:
+                if (
+                    assignment.state.name == "ACTIVE"
+                    and assignment.job_type.name == job_type
+                ):
+                    return assignment
+            return None
+
+    async def delete_assignment(self, name: str) -> None:
+        """
+        Delete assignment.
+
+        :param name: Assignement name
+                     e.g. `projects/myproject/locations/US/reservations/test/assignments/8950226598037373530`
+        """
+        client = await self.get_client()
+
+        with _reservation_api_call(
+            self,
+            "delete_assignment",
+            name,
+            f"Failed to delete {name} assignment.",
+        ):
+            await client.delete_assignment(name=name)
+
+    async def count_reservation_running_jobs(
+        self, project_id: str, reservation_name: str
+    ) -> int:
+        """
+        Count the jobs of a project running on a reservation.
+
+        The BigQuery jobs API has no async client: the count is run with the sync
+        hook in a thread (see `BigQueryReservationServiceHook.count_reservation_running_jobs`).
+
+        :param project_id: GCP project whose jobs are counted
+        :param reservation_name: Reservation name e.g. `projects/myproject/locations/US/reservations/test`
+        """
+        sync_hook = await self.get_sync_hook()
+        return await sync_to_async(
+            sync_hook.count_reservation_running_jobs, thread_sensitive=False
+        )(project_id=project_id, reservation_name=reservation_name)
+
+    async def get_bi_reservation(self, project_id: str) -> BiReservation:
+        """
+        Get BI Engine reservation.
+
+        :param project_id: The name of the project of the BI Engine reservation.
+        """
+        name = f"projects/{project_id}/locations/{self.location}/biReservation"
+        client = await self.get_client()
+
+        with _reservation_api_call(
+            self,
+            "get_bi_reservation",
+            name,
+            f"Failed to get BI engine reservation: {name}.",
+        ):
+            return await client.get_bi_reservation(name=name)
+
+    async def _update_bi_reservation(
+        self,
+        name: str,
+        error_message: str,
+        resize: Callable[[int], int] | None = None,
+        retable: Callable[[list[str]], list[str]] | None = None,
+    ) -> BiReservation:
+        """
+        Update the size and/or the preferred tables of a BI Engine reservation from their current values.
+
+        The updates are claimed in the ledger, read back and retried as by the sync hook
+        (see `BigQueryReservationServiceHook._update_bi_reservation`). The ledger is
+        claimed and released in a thread, it is never locked during the API calls.
+
+        :param name: BI Engine reservation name
+        :param error_message: Message of the AirflowException raised by a failed call
+        :param resize: (Optional) Function of the current size (Kb) returning the new size (Kb)
+        :param retable: (Optional) Function of the current preferred table IDs
+            returning the new ones (see `merge_preferred_tables`)
+
+        :return: The BI Engine reservation updated.
+        """
+        client = await self.get_client()
+        writer = uuid.uuid4().hex
+        claim = sync_to_async(_claim_bi_reservation, thread_sensitive=False)
+        release = sync_to_async(_release_bi_reservation, thread_sensitive=False)
+        paths = [
+            path
+            for path, update in (("size", resize), ("preferred_tables", retable))
+            if update is not None
+        ]
+
+        for attempt in range(BI_RESERVATION_UPDATE_ATTEMPTS):
+            entry = await claim(self._bi_reservation_ledger(), name, writer)
+            while entry is None:
+                await asyncio.sleep(BI_RESERVATION_BACKOFF[0])
+                entry = await claim(self._bi_reservation_ledger(), name, writer)
+
+            record = None
+            try:
+                with _reservation_api_call(
+                    self, "get_bi_reservation", name, error_message
+                ):
+                    current = await client.get_bi_reservation(name=name)
+                if entry["size"] is not None and current.size != entry["size"]:
+                    self.log.warning(
+                        f"{name} size changed outside the ledger:"
+                        f" {entry['size']}Kb to {current.size}Kb."
+                    )
+                bi_reservation = _bi_reservation_update(
+                    name, current, paths, resize=resize, retable=retable
+                )
+                with _reservation_api_call(
+                    self, "update_bi_reservation", name, error_message
+                ):
+                    await client.update_bi_reservation(
+                        bi_reservation=bi_reservation,
+                        update_mask=field_mask_pb2.FieldMask(paths=paths),
+                    )
+                with _reservation_api_call(
+                    self, "get_bi_reservation", name, error_message
+                ):
+                    updated = await client.get_bi_reservation(name=name)
+
+                overwritten = _bi_reservation_overwritten(
+                    self.log, name, current, bi_reservation, updated, paths
+                )
+                if not overwritten:
+                    record = _bi_reservation_record(current, updated, paths)
+            finally:
+                await release(self._bi_reservation_ledger(), name, writer, record)
+            if record is not None:
+                return updated
+
+            # Only the fields overwritten are updated again.
+            paths = overwritten
+            self.log.warning(
+                f"{name} update of {', '.join(paths)} overwritten, retrying"
+                f" ({attempt + 1}/{BI_RESERVATION_UPDATE_ATTEMPTS})."
+            )
+            await asyncio.sleep(
+                min(BI_RESERVATION_BACKOFF[1], BI_RESERVATION_BACKOFF[0] * 2**attempt)
+            )
+
+        self.log.error(
+            f"{name} update of {', '.join(paths)} overwritten"
+            f" {BI_RESERVATION_UPDATE_ATTEMPTS} times."
+        )
+        raise AirflowException(error_message)
+
+    async def create_bi_reservation(self, project_id: str, size: int) -> None:
+        """
+        Create BI Engine reservation.
+
+        The size is added to the current size atomically (see `_update_bi_reservation`).
+
+        :param project_id: The name of the project where we want to create/update
+            the BI Engine reservation.
+        :param size: The BI Engine reservation size in Gb.
+        """
+        parent = f"projects/{project_id}/locations/{self.location}/biReservation"
+        size = BigQueryReservationServiceHook._convert_gb_to_kb(value=size)
+
+        bi_reservation = await self._update_bi_reservation(
+            parent,
+            f"Failed to create BI engine reservation of {size}.",
+            resize=lambda current: current + size,
+        )
+
+        self.log.info(
+            f"BI Engine reservation {parent} have been updated to"
+            f" {bi_reservation.size}Kb."
+        )
+
+    async def delete_bi_reservation(
+        self, project_id: str, size: int | None = None
+    ) -> None:
+        """
+        Delete/Update BI Engine reservation with the specified memory size.
+
+        The size is subtracted from the current size atomically (see `_update_bi_reservation`).
+
+        :param project_id: The name of the project where we want to delete/update
+            the BI Engine reservation.
+        :param size: The BI Engine reservation size in Gb.
+        """
+        parent = f"projects/{project_id}/locations/{self.location}/biReservation"
+        size_kb = (
+            BigQueryReservationServiceHook._convert_gb_to_kb(size)
+            if size is not None
+            else None
+        )
+
+        bi_reservation = await self._update_bi_reservation(
+            parent,
+            f"Failed to delete BI engine reservation of {size}.",
+            resize=lambda current: max(current - size_kb, 0)
+            if size_kb is not None
+            else 0,
+        )
+
+        self.log.info(
+            f"BI Engine reservation {parent} have been updated to"
+            f" {bi_reservation.size}Kb."
+        )
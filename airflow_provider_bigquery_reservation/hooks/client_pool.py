@@ -0,0 +1,152 @@
+"""This module contains a process-wide pool of Google clients and credentials."""
+from __future__ import annotations
+import asyncio
+import contextlib
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Sequence, TypeVar
+
+
+T = TypeVar("T")
+
+
+def pool_key(
+    gcp_conn_id: str,
+    impersonation_chain: str | Sequence[str] | None,
+    transport: str,
+) -> tuple[Hashable, ...]:
+    """
+    Build the pool key of a client.
+
+    :param gcp_conn_id: The connection ID used to connect to Google Cloud.
+    :param impersonation_chain: Service account(s) impersonated by the client.
+    :param transport: Client kind e.g. `grpc` (Reservation API), `http` (BigQuery API)
+        or `credentials`.
+    """
+    if impersonation_chain is not None and not isinstance(impersonation_chain, str):
+        impersonation_chain = tuple(impersonation_chain)
+    return (gcp_conn_id, impersonation_chain, transport)
+
+
+def close_entry(entry: Any) -> None:
+    """
+    Close the gRPC channel or HTTP session of an evicted client.
+
+    Reservation API clients close their transport, BigQuery clients themselves.
+    The transports of async clients are closed by a task of the running event loop,
+    if any. Entries without transport (e.g. credentials) are left as is and closing
+    errors are ignored: the entry is not used anymore.
+
+    :param entry: Evicted pool entry
+    """
+    close = getattr(getattr(entry, "transport", None), "close", None) or getattr(
+        entry, "close", None
+    )
+    if callable(close):
+        with contextlib.suppress(Exception):
+            closing = close()
+            if inspect.iscoroutine(closing):
+                try:
+                    asyncio.get_running_loop().create_task(closing)
+                except RuntimeError:
+                    closing.close()
+
+
+class ClientPool:
+    """
+    Thread-safe pool of clients shared by every hook of a worker process.
+
+    Reusing clients keeps gRPC channels, HTTP sessions and refreshed credentials
+    across hooks and task runs instead of building them on every call.
+    Entries older than `max_age` are evicted and the least recently used entries
+    are evicted when the pool holds more than `max_size` entries. The evicted clients
+    are closed (see `close_entry`): `max_age` should exceed the task runs duration.
+
+    :param max_age: Maximum age (seconds) of a pooled entry.
+    :param max_size: Maximum number of pooled entries.
+    """
+
+    def __init__(self, max_age: float = 3600.0, max_size: int = 32) -> None:
+        self.max_age = max_age
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Count the pooled entries."""
+        with self._lock:
+            return len(self._entries)
+
+    def _evict_stale(self, now: float) -> list[Any]:
+        stale_keys = [
+            key
+            for key, (created_at, _) in self._entries.items()
+            if now - created_at > self.max_age
+        ]
+        return [self._entries.pop(key)[1] for key in stale_keys]
+
+    @staticmethod
+    def _close(entries: list[Any]) -> None:
+        """Close evicted entries, outside the pool lock."""
+        for entry in entries:
+            close_entry(entry)
+
+    def get(self, key: Hashable, factory: Callable[[], T]) -> T:
+        """
+        Get the pooled entry of the key or create it with the factory.
+
+        The factory is called outside the pool lock: it could make blocking calls
+        or use the pool itself. If two threads create the same entry concurrently,
+        the first one stored is kept.
+
+        :param key: Pool key (see `pool_key`)
+        :param factory: Callable creating the entry
+        """
+        with self._lock:
+            evicted = self._evict_stale(time.monotonic())
+            pooled = self._entries.get(key)
+            if pooled is not None:
+                self._entries.move_to_end(key)
+        self._close(evicted)
+        if pooled is not None:
+            return pooled[1]
+
+        entry = factory()
+
+        with self._lock:
+            pooled = self._entries.get(key)
+            if pooled is None:
+                self._entries[key] = (time.monotonic(), entry)
+                evicted = [
+                    self._entries.popitem(last=False)[1][1]
+                    for _ in range(len(self._entries) - self.max_size)
+                ]
+        if pooled is not None:
+            # Another thread stored the entry first: the one created is not shared
+            self._close([entry])
+            return pooled[1]
+        self._close(evicted)
+        return entry
+
+    def evict(self, key: Hashable) -> None:
+        """
+        Evict a pooled entry e.g. after a credentials error.
+
+        :param key: Pool key (see `pool_key`)
+        """
+        with self._lock:
+            pooled = self._entries.pop(key, None)
+        if pooled is not None:
+            self._close([pooled[1]])
+
+    def clear(self) -> None:
+        """Evict all the pooled entries."""
+        with self._lock:
+            evicted = [entry for _, entry in self._entries.values()]
+            self._entries.clear()
+        self._close(evicted)
+
+
+CLIENT_POOL = ClientPool()
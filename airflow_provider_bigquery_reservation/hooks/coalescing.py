@@ -0,0 +1,427 @@
+"""This module contains the coalescing of concurrent BigQuery slot purchases."""
+from __future__ import annotations
+import datetime
+import time
+import uuid
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, ContextManager
+
+from airflow.exceptions import AirflowException
+from airflow.utils import timezone
+from airflow.utils.log.logging_mixin import LoggingMixin
+from airflow_provider_bigquery_reservation.hooks.variable_state import (
+    locked_variable_state,
+)
+
+if TYPE_CHECKING:
+    from airflow_provider_bigquery_reservation.hooks.bigquery_reservation import (
+        BigQueryReservationServiceHook,
+    )
+
+
+COALESCING_VARIABLE_PREFIX = "bigquery_reservation_coalescing"
+# Time (seconds) after which the release of a share by another task is taken over
+RELEASE_CLAIM_TIMEOUT = 300
+
+
+class PurchaseCoalescer(LoggingMixin):
+    """
+    Merge the concurrent slot purchases of a project and job type into one commitment.
+
+    The first request opens a batch for `window` seconds and becomes its leader. The
+    requests of the same project, job type, reservation project and commitment
+    duration made meanwhile join the batch. Once the window is over, the leader buys
+    one commitment of the combined slots and updates the reservation once, while
+    the other requesters wait for it.
+    Each requester gets a release handle freeing only its share: the reservation
+    shrinks by the share and the share is split off the commitment then deleted.
+    The last release deletes the commitment, the reservation and the assignment.
+    The releases of a batch are serialized by a claim in the batch, the API calls
+    being made outside the Variable lock.
+    Each purchase expires the batches failed or left open or provisioning (by a killed
+    leader) for more than `timeout` seconds, and releases the shares of a ready batch
+    not claimed by their requester (killed while waiting) within `timeout` seconds.
+
+    The batches are stored in an Airflow Variable of the metadata DB
+    (`bigquery_reservation_coalescing-<location>`), shared by the tasks of every worker.
+
+    :param hook: Hook of the purchases location
+    :param window: Time (seconds) a batch accepts new requests
+    :param poll_interval: Time (seconds) between two checks of a batch provisioned by its leader
+    :param timeout: Maximum time (seconds) a requester waits for the batch leader
+    :param clock: Clock returning the current aware datetime
+    :param sleep: Sleep function
+    """
+
+    def __init__(
+        self,
+        hook: BigQueryReservationServiceHook,
+        window: float = 5.0,
+        poll_interval: float = 1.0,
+        timeout: float = 3600.0,
+        clock: Callable[[], datetime.datetime] = timezone.utcnow,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        super().__init__()
+        self.hook = hook
+        self.window = window
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.clock = clock
+        self.sleep = sleep
+
+    @property
+    def key(self) -> str:
+        """Key of the Variable storing the batches."""
+        return f"{COALESCING_VARIABLE_PREFIX}-{self.hook.location}"
+
+    def _locked_state(self) -> ContextManager[dict[str, Any]]:
+        """Lock the batches Variable row, yield its state then save it."""
+        return locked_variable_state(
+            self.key,
+            default={"open": {}, "batches": {}},
+            description="Coalesced BigQuery slot purchases.",
+        )
+
+    def _expire(self) -> None:
+        """Delete the failed and orphaned batches, then release the unclaimed shares."""
+        unclaimed = []
+        with self._locked_state() as state:
+            expired_at = self.clock() - datetime.timedelta(seconds=self.timeout)
+            for batch_id, batch in list(state["batches"].items()):
+                if batch["status"] == "ready":
+                    if datetime.datetime.fromisoformat(batch["ready_at"]) <= expired_at:
+                        unclaimed += [
+                            f"{batch_id}/{request_id}"
+                            for request_id in batch["shares"]
+                            if request_id not in batch["claimed"]
+                        ]
+                    continue
+                since = batch.get("failed_at") or batch["closes_at"]
+                if datetime.datetime.fromisoformat(since) <= expired_at:
+                    self.log.warning(
+                        f"Coalesced purchase batch {batch_id} expired {batch['status']}."
+                    )
+                    del state["batches"][batch_id]
+                    state["open"] = {
+                        key: open_id
+                        for key, open_id in state["open"].items()
+                        if open_id != batch_id
+                    }
+
+        for handle in unclaimed:
+            self.log.warning(f"Coalesced purchase {handle} not claimed: release it.")
+            try:
+                self._release(handle, wait=False)
+            except AirflowException as e:
+                self.log.error(
+                    f"Failed to release the coalesced purchase {handle}: {e}"
+                )
+
+    def _join_or_open(
+        self, batch_key: str, request_id: str, slots: int
+    ) -> tuple[str, bool]:
+        """Add a request to the open batch of its key, or open one (leader)."""
+        with self._locked_state() as state:
+            now = self.clock()
+            batch_id = state["open"].get(batch_key)
+            batch = state["batches"].get(batch_id)
+            leader = (
+                batch is None
+                or batch["status"] != "open"
+                or now >= datetime.datetime.fromisoformat(batch["closes_at"])
+            )
+            if leader:
+                batch_id = uuid.uuid4().hex
+                batch = state["batches"][batch_id] = {
+                    "status": "open",
+                    "closes_at": (
+                        now + datetime.timedelta(seconds=self.window)
+                    ).isoformat(),
+                    "requests": {},
+                }
+                state["open"][batch_key] = batch_id
+            batch["requests"][request_id] = slots
+        return batch_id, leader
+
+    def _fail(self, batch_id: str, request_id: str, error: str | None = None) -> None:
+        """Mark a batch failed and remove a request, deleting the batch left without any."""
+        with self._locked_state() as state:
+            batch = state["batches"].get(batch_id)
+            if batch is None:
+                return
+            if error is not None:
+                batch.update(
+                    status="failed", failed_at=self.clock().isoformat(), error=error
+                )
+            batch["requests"].pop(request_id, None)
+            if not batch["requests"]:
+                del state["batches"][batch_id]
+
+    def _provision(
+        self, batch_key: str, batch_id: str, request_id: str, **create_kwargs
+    ) -> dict[str, Any]:
+        """Close the batch when its window is over, then buy the combined slots."""
+        with self._locked_state() as state:
+            closes_at = state["batches"][batch_id]["closes_at"]
+        wait = datetime.datetime.fromisoformat(closes_at) - self.clock()
+        self.sleep(max(0.0, wait.total_seconds()))
+
+        with self._locked_state() as state:
+            batch = state["batches"][batch_id]
+            batch["status"] = "provisioning"
+            if state["open"].get(batch_key) == batch_id:
+                del state["open"][batch_key]
+            requests = dict(batch["requests"])
+        slots = sum(requests.values())
+        self.log.info(
+            f"{len(requests)} purchases of {batch_key} coalesced into {slots} slots."
+        )
+
+        try:
+            self.hook.create_commitment_reservation_and_assignment(
+                slots=slots, **create_kwargs
+            )
+        except Exception as e:
+            self._fail(batch_id, request_id, error=str(e))
+            raise
+
+        with self._locked_state() as state:
+            # The batch may have expired meanwhile: its unclaimed shares are released.
+            batch = state["batches"].setdefault(batch_id, {"requests": requests})
+            batch.update(
+                status="ready",
+                commitment_name=self.hook._get_commitment().name,
+                reservation_name=self.hook._get_reservation().name,
+                assignment_name=self.hook._get_assignment().name,
+                committed_slots=slots,
+                shares=requests,
+                claimed=[request_id],
+                ready_at=self.clock().isoformat(),
+                releases={},
+            )
+            return batch
+
+    def _wait(self, batch_id: str, request_id: str) -> dict[str, Any]:
+        """Wait for the batch leader to buy the combined slots, then claim the share."""
+        start = time.monotonic()
+        while True:
+            with self._locked_state() as state:
+                batch = state["batches"].get(batch_id)
+                if batch is not None and batch["status"] == "ready":
+                    batch["claimed"].append(request_id)
+            if batch is None or batch["status"] == "failed":
+                self._fail(batch_id, request_id)
+                raise AirflowException(
+                    "The coalesced slots purchase failed: "
+                    f"{batch['error'] if batch else 'batch not found'}."
+                )
+            if batch["status"] == "ready":
+                return batch
+            if time.monotonic() - start > self.timeout:
+                raise AirflowException(
+                    f"The coalesced slots purchase is still {batch['status']}"
+                    f" after {self.timeout} seconds."
+                )
+            self.sleep(self.poll_interval)
+
+    def purchase(
+        self,
+        project_id: str,
+        slots: int,
+        job_type: str = "QUERY",
+        reservation_project_id: str | None = None,
+        commitments_duration: str = "FLEX",
+        **create_kwargs,
+    ) -> dict[str, Any]:
+        """
+        Buy and assign slots for a project, coalesced with the concurrent purchases.
+
+        :param project_id: GCP project where the slots are assigned
+        :param slots: Slots number (increment of 100)
+        :param job_type: Type of job for assignment
+        :param reservation_project_id: GCP project where the reservation is set
+        :param commitments_duration: Commitment minimum durations (FLEX, MONTH, YEAR)
+        :param create_kwargs: Other arguments of `create_commitment_reservation_and_assignment`
+            e.g. `wait_assignment_attachment`
+
+        :return: The purchase: `handle` (to release the slots), `slots`, `total_slots`
+            (of the coalesced purchase), `commitment_name`, `reservation_name`
+            and `assignment_name`.
+        """
+        self.hook._verify_slots_conditions(slots=slots)
+        batch_key = "/".join(
+            [
+                project_id,
+                job_type,
+                reservation_project_id or project_id,
+                commitments_duration,
+            ]
+        )
+        self._expire()
+        request_id = uuid.uuid4().hex
+        batch_id, leader = self._join_or_open(batch_key, request_id, slots)
+
+        if leader:
+            batch = self._provision(
+                batch_key,
+                batch_id,
+                request_id,
+                assignment_job_type=job_type,
+                commitments_duration=commitments_duration,
+                project_id=project_id,
+                reservation_project_id=reservation_project_id,
+                **create_kwargs,
+            )
+        else:
+            batch = self._wait(batch_id, request_id)
+
+        return {
+            "handle": f"{batch_id}/{request_id}",
+            "slots": slots,
+            "total_slots": batch["committed_slots"],
+            "commitment_name": batch["commitment_name"],
+            "reservation_name": batch["reservation_name"],
+            "assignment_name": batch["assignment_name"],
+        }
+
+    def _claim_release(
+        self, batch_id: str, request_id: str, releaser: str
+    ) -> tuple[bool, dict[str, Any] | None]:
+        """
+        Claim the release of a share, the releases of a batch being serialized.
+
+        A claim older than `RELEASE_CLAIM_TIMEOUT` seconds is taken over, its releaser
+        being assumed killed.
+
+        :param batch_id: Batch of the share
+        :param request_id: Request of the share
+        :param releaser: Identifier of the release
+
+        :return: Whether the release is claimed, and the batch (`None` if the share
+            is not found).
+        """
+        with self._locked_state() as state:
+            now = self.clock()
+            batch = state["batches"].get(batch_id)
+            if batch is None or request_id not in batch.get("shares", {}):
+                return False, None
+            claim = batch.get("releasing")
+            if (
+                claim
+                and claim["releaser"] != releaser
+                and now - datetime.datetime.fromisoformat(claim["since"])
+                < datetime.timedelta(seconds=RELEASE_CLAIM_TIMEOUT)
+            ):
+                return False, batch
+            batch["releasing"] = {"releaser": releaser, "since": now.isoformat()}
+            batch["releases"].setdefault(
+                request_id,
+                {"slots": batch["shares"][request_id], "step": "reservation"},
+            )
+            return True, batch
+
+    def _record_release(
+        self,
+        batch_id: str,
+        request_id: str,
+        releaser: str,
+        batch: dict[str, Any],
+        final: bool = False,
+    ) -> None:
+        """
+        Record the progress of a share release, removing the share once released.
+
+        :param batch_id: Batch of the share
+        :param request_id: Request of the share
+        :param releaser: Identifier of the release
+        :param batch: Batch claimed, with the progress of the release
+        :param final: End the release claim
+        """
+        with self._locked_state() as state:
+            saved = state["batches"].get(batch_id)
+            if saved is None:
+                return
+            release = batch["releases"][request_id]
+            saved["committed_slots"] = batch["committed_slots"]
+            saved["releases"][request_id] = release
+            if release["step"] == "done":
+                saved["shares"].pop(request_id, None)
+                del saved["releases"][request_id]
+            if final and (saved.get("releasing") or {}).get("releaser") == releaser:
+                saved["releasing"] = None
+            if not saved["shares"]:
+                del state["batches"][batch_id]
+
+    def _release_share(
+        self, batch: dict[str, Any], request_id: str, record: Callable[[], None]
+    ) -> None:
+        """Free a share of a batch claimed, recording the progress after each step."""
+        release = batch["releases"][request_id]
+        slots = release["slots"]
+        if len(batch["shares"]) == 1:
+            self.hook.delete_commitment_reservation_and_assignment(
+                slots=slots,
+                commitment_name=batch["commitment_name"],
+                reservation_name=batch["reservation_name"],
+                assignment_name=batch["assignment_name"],
+            )
+            release["step"] = "done"
+            return
+
+        if release["step"] == "reservation":
+            reservation = self.hook.get_reservation(name=batch["reservation_name"])
+            self.hook.update_reservation(
+                name=batch["reservation_name"], slots=reservation.slot_capacity - slots
+            )
+            release["step"] = "split"
+            record()
+        if release["step"] == "split":
+            _, share = self.hook.split_capacity_commitment(
+                name=batch["commitment_name"], slots=batch["committed_slots"] - slots
+            )
+            batch["committed_slots"] -= slots
+            release.update(step="delete", commitment_name=share.name)
+            record()
+        if release["step"] == "delete":
+            self.hook.delete_capacity_commitment(name=release["commitment_name"])
+            release["step"] = "done"
+
+    def _release(self, handle: str, wait: bool) -> None:
+        """
+        Release the slots of a coalesced purchase.
+
+        :param handle: Release handle returned by `purchase`
+        :param wait: Wait for the release of another share of the batch, otherwise
+            skip the release
+        """
+        batch_id, request_id = handle.split("/")
+        releaser = uuid.uuid4().hex
+        claimed, batch = self._claim_release(batch_id, request_id, releaser)
+        while wait and not claimed and batch is not None:
+            self.sleep(self.poll_interval)
+            claimed, batch = self._claim_release(batch_id, request_id, releaser)
+        if batch is None:
+            self.log.warning(f"Coalesced purchase {handle} not found.")
+            return
+        if not claimed:
+            self.log.info(f"Another share of {handle} batch is being released.")
+            return
+
+        record = partial(self._record_release, batch_id, request_id, releaser, batch)
+        try:
+            self._release_share(batch, request_id, record)
+        finally:
+            record(final=True)
+        self.log.info(f"Coalesced purchase {handle} released.")
+
+    def release(self, handle: str) -> None:
+        """
+        Release the slots of a coalesced purchase.
+
+        The API calls are made outside the Variable lock, the progress being recorded
+        after each step: a failed release resumes from it when releasing the handle again.
+
+        :param handle: Release handle returned by `purchase`
+        """
+        self._release(handle, wait=True)
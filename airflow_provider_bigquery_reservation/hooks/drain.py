@@ -0,0 +1,17 @@
+"""This module contains the detection of the jobs running on a BigQuery reservation."""
+from __future__ import annotations
+
+
+# Job ID prefix of the running jobs query, excluded from its own count
+DRAIN_JOB_ID_PREFIX = "reservation_drain"
+
+# Jobs of a project running on a reservation. A query job runs at most 6 hours:
+# the jobs created more than one day ago are skipped.
+RUNNING_JOBS_QUERY = """
+    SELECT COUNT(*) AS running_jobs
+    FROM `{project_id}.region-{location}.INFORMATION_SCHEMA.JOBS`
+    WHERE creation_time >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 1 DAY)
+        AND state = 'RUNNING'
+        AND reservation_id = @reservation_id
+        AND NOT STARTS_WITH(job_id, @job_id_prefix)
+"""
@@ -0,0 +1,178 @@
+"""This module contains an indexed snapshot of the BigQuery reservation resources."""
+from __future__ import annotations
+import re
+from typing import TYPE_CHECKING, Iterable
+
+from google.cloud.bigquery_reservation_v1 import (
+    Assignment,
+    CapacityCommitment,
+    Reservation,
+)
+
+if TYPE_CHECKING:
+    from airflow_provider_bigquery_reservation.hooks.bigquery_reservation import (
+        BigQueryReservationServiceHook,
+    )
+
+
+# Uniqueness suffix added by `BigQueryReservationServiceHook.format_resource_id`
+UNIQUENESS_SUFFIX = re.compile(r"-[0-9a-f]{10}$")
+
+
+def resource_id(name: str) -> str:
+    """
+    Get the resource id of a resource name.
+
+    :param name: Resource name e.g. `projects/myproject/locations/US/reservations/myreservation`
+    """
+    return name.split("/")[-1]
+
+
+def reservation_name_of(assignment: Assignment) -> str:
+    """
+    Get the reservation name of an assignment.
+
+    :param assignment: Reservation assignment
+    """
+    return assignment.name.split("/assignments")[0]
+
+
+def resource_label(name: str) -> str:
+    """
+    Get the resource id of a resource name without its uniqueness suffix.
+
+    :param name: Resource name e.g. `.../capacityCommitments/airflow-myproject-assignement-0123456789`
+    """
+    return UNIQUENESS_SUFFIX.sub("", resource_id(name))
+
+
+class ReservationInventory:
+    """
+    In-memory snapshot of the commitments, reservations and assignments of a parent.
+
+    The resources are listed once and indexed by assignee, by reservation and by
+    commitment id and label (the id without its uniqueness suffix), so cleanup and
+    search lookups do not rescan the lists.
+    The snapshot is not refreshed: use `remove_assignment` to keep it consistent
+    with the deletions made while using it.
+
+    :param parent: Parent resource name e.g. `projects/myproject/locations/US`
+    :param commitments: Capacity commitments of the parent
+    :param reservations: Reservations of the parent
+    :param assignments: Assignments of every reservation of the parent
+    """
+
+    def __init__(
+        self,
+        parent: str,
+        commitments: Iterable[CapacityCommitment] = (),
+        reservations: Iterable[Reservation] = (),
+        assignments: Iterable[Assignment] = (),
+    ) -> None:
+        self.parent = parent
+        self.commitments: dict[str, CapacityCommitment] = {}
+        self.reservations: dict[str, Reservation] = {}
+        self.assignments: dict[str, Assignment] = {}
+        self._commitments_by_id: dict[str, CapacityCommitment] = {}
+        self._commitments_by_label: dict[str, list[CapacityCommitment]] = {}
+        self._assignments_by_assignee: dict[str, dict[str, Assignment]] = {}
+        self._assignments_by_reservation: dict[str, dict[str, Assignment]] = {}
+
+        for commitment in commitments:
+            self.commitments[commitment.name] = commitment
+            self._commitments_by_id[resource_id(commitment.name)] = commitment
+            self._commitments_by_label.setdefault(
+                resource_label(commitment.name), []
+            ).append(commitment)
+        for reservation in reservations:
+            self.reservations[reservation.name] = reservation
+        for assignment in assignments:
+            self.assignments[assignment.name] = assignment
+            self._assignments_by_assignee.setdefault(assignment.assignee, {})[
+                assignment.name
+            ] = assignment
+            self._assignments_by_reservation.setdefault(
+                reservation_name_of(assignment), {}
+            )[assignment.name] = assignment
+
+    @classmethod
+    def load(
+        cls, hook: BigQueryReservationServiceHook, parent: str
+    ) -> ReservationInventory:
+        """
+        List the resources of a parent and index them.
+
+        :param hook: Hook used to list the resources
+        :param parent: Parent resource name e.g. `projects/myproject/locations/US`
+        """
+        return cls(
+            parent=parent,
+            commitments=hook.list_capacity_commitments(parent),
+            reservations=hook.list_reservations(parent),
+            assignments=hook.list_assignments(f"{parent}/reservations/-"),
+        )
+
+    def assignments_of_assignee(self, project_id: str) -> list[Assignment]:
+        """
+        Get the assignments of an assignee project.
+
+        :param project_id: Assignee GCP project
+        """
+        return list(
+            self._assignments_by_assignee.get(f"projects/{project_id}", {}).values()
+        )
+
+    def assignments_of_reservation(self, reservation_name: str) -> list[Assignment]:
+        """
+        Get the assignments of a reservation.
+
+        :param reservation_name: Reservation name
+        """
+        return list(self._assignments_by_reservation.get(reservation_name, {}).values())
+
+    def search_assignment(self, project_id: str, job_type: str) -> Assignment | None:
+        """
+        Search the active assignment of a project for a job type.
+
+        :param project_id: Assignee GCP project
+        :param job_type: Type of job for assignment
+        """
+        for assignment in self._assignments_by_assignee.get(
+            f"projects/{project_id}", {}
+        ).values():
+            if (
+                assignment.state.name == "ACTIVE"
+                and assignment.job_type.name == job_type
+            ):
+                return assignment
+        return None
+
+    def commitment_by_id(self, commitment_id: str) -> CapacityCommitment | None:
+        """
+        Get a commitment from its id (e.g. the id of the reservation created with it).
+
+        :param commitment_id: Commitment id
+        """
+        return self._commitments_by_id.get(commitment_id)
+
+    def commitments_with_label(self, label: str) -> list[CapacityCommitment]:
+        """
+        Get the commitments whose id without uniqueness suffix is the label.
+
+        :param label: Commitment label e.g. `airflow-myproject-assignement`
+        """
+        return list(self._commitments_by_label.get(label, []))
+
+    def remove_assignment(self, assignment: Assignment) -> None:
+        """
+        Remove a deleted assignment from the snapshot and its indexes.
+
+        :param assignment: Deleted assignment
+        """
+        self.assignments.pop(assignment.name, None)
+        self._assignments_by_assignee.get(assignment.assignee, {}).pop(
+            assignment.name, None
+        )
+        self._assignments_by_reservation.get(reservation_name_of(assignment), {}).pop(
+            assignment.name, None
+        )
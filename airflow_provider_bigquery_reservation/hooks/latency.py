@@ -0,0 +1,299 @@
+"""This module contains the history and the estimation of the slots provisioning latency."""
+from __future__ import annotations
+import argparse
+import datetime
+import math
+import sys
+from dataclasses import asdict, dataclass
+from typing import Any, ContextManager, Iterable
+
+from airflow.exceptions import AirflowException
+from airflow.models import Variable
+from airflow.utils.log.logging_mixin import LoggingMixin
+from airflow_provider_bigquery_reservation.hooks.variable_state import (
+    locked_variable_state,
+)
+
+
+HISTORY_VARIABLE_PREFIX = "bigquery_reservation_provisioning_history"
+# Attachment probe of the provisionings recorded before their probe was
+DEFAULT_PROBE = "query"
+
+
+def percentile(values: Iterable[float], percent: float) -> float:
+    """
+    Get a percentile of the values (nearest rank).
+
+    :param values: Measured values, at least one
+    :param percent: Percentile e.g. 95
+    """
+    ordered = sorted(values)
+    if not ordered:
+        raise ValueError("No value to compute a percentile of.")
+    rank = max(0, math.ceil(len(ordered) * percent / 100) - 1)
+    return ordered[rank]
+
+
+def provisioning_lead_time(
+    durations: Iterable[float], percent: float, default: float
+) -> float:
+    """
+    Get the time needed to buy, reserve and attach slots from the past provisionings.
+
+    :param durations: Durations (seconds) of the past provisionings, up to the attachment
+    :param percent: Percentile of the durations covered e.g. 95
+    :param default: Lead time (seconds) without past provisionings
+    """
+    durations = list(durations)
+    return percentile(durations, percent) if durations else default
+
+
+# Durations of a provisioning, from the start to the end stage of each.
+PROVISIONING_STAGES = {
+    "commitment": ("started", "commitment_created"),
+    "assignment": ("started", "assignment_created"),
+    "attachment": ("assignment_created", "attached"),
+    "total": ("started", "attached"),
+}
+
+
+@dataclass
+class ProvisioningTimeline:
+    """
+    Timestamps of a slots provisioning: purchase, reservation and assignment, attachment.
+
+    :param location: Location of the reservation
+    :param project_id: GCP project where the slots are assigned
+    :param job_type: Type of job of the assignment
+    :param new_reservation: Whether a new reservation and assignment were created,
+        `False` when the existing reservation of the project was updated
+    :param probe: Attachment probe (see `ATTACHMENT_PROBES`): the attachment durations
+        of the probes not waiting for the queries (e.g. `assignment_state`) are shorter
+    :param started_at: Start of the provisioning
+    :param commitment_created_at: Commitment purchase completion
+    :param assignment_created_at: Reservation and assignment creation (or update) completion
+    :param attached_at: First query of the project backed by the reservation
+    """
+
+    location: str
+    project_id: str
+    job_type: str
+    started_at: datetime.datetime
+    new_reservation: bool | None = None
+    probe: str | None = None
+    commitment_created_at: datetime.datetime | None = None
+    assignment_created_at: datetime.datetime | None = None
+    attached_at: datetime.datetime | None = None
+
+    def mark(self, stage: str) -> None:
+        """
+        Set the timestamp of a stage to now.
+
+        :param stage: Stage name e.g. `attached`
+        """
+        setattr(self, f"{stage}_at", datetime.datetime.now(tz=datetime.timezone.utc))
+
+    def durations(self) -> dict[str, float]:
+        """Get the time (seconds) taken by each stage completed."""
+        return {
+            stage: (
+                getattr(self, f"{end}_at") - getattr(self, f"{start}_at")
+            ).total_seconds()
+            for stage, (start, end) in PROVISIONING_STAGES.items()
+            if getattr(self, f"{start}_at") and getattr(self, f"{end}_at")
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize the timeline to JSON types."""
+        return {
+            name: value.isoformat() if isinstance(value, datetime.datetime) else value
+            for name, value in asdict(self).items()
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> ProvisioningTimeline:
+        """
+        Deserialize a timeline.
+
+        :param data: Timeline serialized by `to_dict`
+        """
+        return cls(
+            **{
+                name: datetime.datetime.fromisoformat(value)
+                if name.endswith("_at") and value
+                else value
+                for name, value in data.items()
+            }
+        )
+
+
+class ProvisioningHistory(LoggingMixin):
+    """
+    Timelines of the last provisionings of a location, to get their latency percentiles.
+
+    The history is stored in an Airflow Variable of the metadata DB
+    (`bigquery_reservation_provisioning_history-<location>`) shared by the workers,
+    keeping the last `max_records` provisionings.
+
+    :param location: Location of the reservations
+    :param max_records: Number of provisionings kept
+    """
+
+    def __init__(self, location: str, max_records: int = 1000) -> None:
+        super().__init__()
+        self.location = location
+        self.max_records = max_records
+
+    @property
+    def key(self) -> str:
+        """Key of the Variable storing the history."""
+        return f"{HISTORY_VARIABLE_PREFIX}-{self.location}"
+
+    def _locked_state(self) -> ContextManager[dict[str, Any]]:
+        """Lock the history Variable row, yield its state then save it."""
+        return locked_variable_state(
+            self.key,
+            default={"records": []},
+            description=f"Last BigQuery slots provisionings in {self.location}.",
+        )
+
+    def _load_state(self) -> dict[str, Any]:
+        """Read the history Variable."""
+        return Variable.get(
+            self.key, default_var={"records": []}, deserialize_json=True
+        )
+
+    def record(self, timeline: ProvisioningTimeline) -> None:
+        """
+        Add a provisioning to the history, dropping the oldest beyond `max_records`.
+
+        :param timeline: Provisioning timeline
+        """
+        with self._locked_state() as state:
+            state["records"].append(timeline.to_dict())
+            del state["records"][: -self.max_records]
+
+    def timelines(
+        self,
+        job_type: str | None = None,
+        project_id: str | None = None,
+        new_reservation: bool | None = None,
+        probe: str | None = None,
+    ) -> list[ProvisioningTimeline]:
+        """
+        Get the provisionings of the history, oldest first.
+
+        :param job_type: (Optional) Only the provisionings of this job type
+        :param project_id: (Optional) Only the provisionings of this project
+        :param new_reservation: (Optional) Only the provisionings creating (`True`)
+            or updating (`False`) a reservation
+        :param probe: (Optional) Only the provisionings attached with this probe,
+            `DEFAULT_PROBE` for the provisionings recorded without their probe
+        """
+        timelines = [
+            ProvisioningTimeline.from_dict(record)
+            for record in self._load_state()["records"]
+        ]
+        return [
+            timeline
+            for timeline in timelines
+            if (job_type is None or timeline.job_type == job_type)
+            and (project_id is None or timeline.project_id == project_id)
+            and (new_reservation is None or timeline.new_reservation == new_reservation)
+            and (probe is None or (timeline.probe or DEFAULT_PROBE) == probe)
+        ]
+
+    def percentiles(
+        self,
+        stage: str = "attachment",
+        percents: Iterable[float] = (50, 95, 99),
+        probe: str | None = DEFAULT_PROBE,
+        **filters,
+    ) -> dict[float, float]:
+        """
+        Get percentiles of a stage duration over the history.
+
+        The provisionings of different attachment probes are not mixed: only the ones
+        of `probe` are used, by default those waiting for a query to be attached.
+
+        :param stage: Stage (see `PROVISIONING_STAGES`) e.g. `attachment` or `total`
+        :param percents: Percentiles e.g. `(50, 95, 99)`
+        :param probe: Attachment probe of the provisionings, `None` for all
+        :param filters: Filters of `timelines` e.g. `job_type`
+
+        :return: The durations (seconds) by percentile, empty without provisionings.
+        """
+        if stage not in PROVISIONING_STAGES:
+            raise AirflowException(
+                f"Unknown stage {stage}, expected one of {list(PROVISIONING_STAGES)}."
+            )
+        durations = [
+            timeline.durations()[stage]
+            for timeline in self.timelines(probe=probe, **filters)
+            if stage in timeline.durations()
+        ]
+        if not durations:
+            return {}
+        return {percent: percentile(durations, percent) for percent in percents}
+
+
+def record_provisioning(timeline: ProvisioningTimeline | None) -> None:
+    """
+    Add an attached provisioning to the history of its location.
+
+    The history is not needed by the provisioning: a failure is only logged.
+
+    :param timeline: Provisioning timeline, ignored if `None` or not attached
+    """
+    if timeline is None or timeline.attached_at is None:
+        return
+    history = ProvisioningHistory(timeline.location)
+    try:
+        history.record(timeline)
+    except Exception as e:
+        history.log.warning(f"Failed to record the provisioning latency: {e}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Print the provisioning latency percentiles of a location by job type and reservation."""
+    parser = argparse.ArgumentParser(
+        description="Percentiles of the BigQuery slots provisioning latency."
+    )
+    parser.add_argument("--location", required=True, help="Reservations location")
+    parser.add_argument("--job-type", default=None, help="Assignment job type")
+    parser.add_argument("--project-id", default=None, help="Assigned project")
+    parser.add_argument(
+        "--probe", default=DEFAULT_PROBE, help="Attachment probe of the provisionings"
+    )
+    parser.add_argument(
+        "--percentiles", type=float, nargs="+", default=[50, 95, 99], help="Percentiles"
+    )
+    args = parser.parse_args(argv)
+
+    timelines = ProvisioningHistory(args.location).timelines(
+        job_type=args.job_type, project_id=args.project_id, probe=args.probe
+    )
+    groups: dict[tuple[str, str], list[ProvisioningTimeline]] = {}
+    for timeline in timelines:
+        reservation = "new" if timeline.new_reservation else "updated"
+        groups.setdefault((timeline.job_type, reservation), []).append(timeline)
+
+    for (job_type, reservation), group in sorted(groups.items()):
+        for stage in PROVISIONING_STAGES:
+            durations = [t.durations()[stage] for t in group if stage in t.durations()]
+            if durations:
+                values = ", ".join(
+                    f"p{percent:g} {percentile(durations, percent):.1f}s"
+                    for percent in args.percentiles
+                )
+                print(
+                    f"{args.location} {job_type} {reservation} reservation"
+                    f" {stage}: {len(durations)} provisionings, {values}"
+                )
+    if not groups:
+        print(f"No provisioning recorded in {args.location}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""This module contains the instrumentation of the BigQuery reservation hooks."""
+from __future__ import annotations
+import datetime
+import threading
+from typing import Any, Iterable
+
+from airflow.stats import Stats
+
+
+METRICS_PREFIX = "bigquery_reservation"
+
+
+def _emit(kind: str, stat: str, value: Any, tags: dict[str, str]) -> None:
+    """
+    Emit a metric with its tags, untagged with the Airflow versions before 2.6.
+
+    The loggers of Airflow before 2.6 do not accept tags: the metric is then emitted
+    by its name only, which carries the tag values needed (e.g. the method).
+
+    :param kind: `Stats` method e.g. `timing`
+    :param stat: Metric name
+    :param value: Metric value
+    :param tags: Metric tags
+    """
+    emit = getattr(Stats, kind)
+    try:
+        emit(stat, value, tags=tags)
+    except TypeError:
+        emit(stat, value)
+
+
+def emit_api_call(method: str, location: str, outcome: str, duration: float) -> None:
+    """
+    Emit the timer and the outcome counter of a Reservation API call.
+
+    Metrics are emitted with tags (Datadog, OpenTelemetry) and with the method
+    and outcome in the name for the StatsD backends without tags support.
+
+    :param method: Reservation API method called
+    :param location: Location of the hook
+    :param outcome: `success` or `failure`
+    :param duration: Call duration (seconds)
+    """
+    tags = {"method": method, "location": location, "outcome": outcome}
+    _emit(
+        "timing",
+        f"{METRICS_PREFIX}.api.{method}.duration",
+        datetime.timedelta(seconds=duration),
+        tags,
+    )
+    _emit("incr", f"{METRICS_PREFIX}.api.{method}.{outcome}", 1, tags)
+
+
+def emit_wait(name: str, location: str, duration: float) -> None:
+    """
+    Emit the timer of a wait e.g. the assignment attachment.
+
+    :param name: Wait name
+    :param location: Location of the hook
+    :param duration: Wait duration (seconds)
+    """
+    _emit(
+        "timing",
+        f"{METRICS_PREFIX}.wait.{name}.duration",
+        datetime.timedelta(seconds=duration),
+        {"wait": name, "location": location},
+    )
+
+
+def emit_commitment_utilization(location: str, **gauges: float) -> None:
+    """
+    Emit the gauges of a commitment utilization report.
+
+    :param location: Location of the commitment
+    :param gauges: Gauge values by name e.g. `utilization=0.8`
+    """
+    for name, value in gauges.items():
+        _emit(
+            "gauge",
+            f"{METRICS_PREFIX}.commitment.{name}",
+            value,
+            {"location": location},
+        )
+
+
+class ApiMetrics:
+    """Thread-safe accumulator of the API calls and waits of a hook."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.api_time = 0.0
+        self.wait_time = 0.0
+        self.time_by_method: dict[str, float] = {}
+
+    def record_call(self, method: str, duration: float, success: bool) -> None:
+        """
+        Record a Reservation API call.
+
+        :param method: Reservation API method called
+        :param duration: Call duration (seconds)
+        :param success: Whether the call succeeded
+        """
+        with self._lock:
+            self.calls += 1
+            self.failures += not success
+            self.api_time += duration
+            self.time_by_method[method] = (
+                self.time_by_method.get(method, 0.0) + duration
+            )
+
+    def record_wait(self, duration: float) -> None:
+        """
+        Record a wait e.g. the assignment attachment.
+
+        :param duration: Wait duration (seconds)
+        """
+        with self._lock:
+            self.wait_time += duration
+
+    @classmethod
+    def merge(cls, metrics: Iterable[ApiMetrics]) -> ApiMetrics:
+        """
+        Sum several accumulators e.g. the hooks of a batch.
+
+        Concurrent calls are summed: the total could exceed the task wall-clock time.
+
+        :param metrics: Accumulators summed
+        """
+        merged = cls()
+        for item in metrics:
+            merged.calls += item.calls
+            merged.failures += item.failures
+            merged.api_time += item.api_time
+            merged.wait_time += item.wait_time
+            for method, duration in item.time_by_method.items():
+                merged.time_by_method[method] = (
+                    merged.time_by_method.get(method, 0.0) + duration
+                )
+        return merged
+
+    def summary(self) -> str:
+        """Summarize the API time, by method, against the wait time."""
+        by_method = ", ".join(
+            f"{method}: {duration:.2f}s"
+            for method, duration in sorted(
+                self.time_by_method.items(), key=lambda item: -item[1]
+            )
+        )
+        return (
+            f"{self.calls} Reservation API calls ({self.failures} failed)"
+            f" in {self.api_time:.2f}s [{by_method}], wait time {self.wait_time:.2f}s."
+        )
@@ -0,0 +1,427 @@
+"""This module contains a pool of warm BigQuery slots leased by the tasks."""
+from __future__ import annotations
+import datetime
+import time
+import uuid
+from typing import TYPE_CHECKING, Any, Callable, ContextManager
+
+from airflow.exceptions import AirflowException
+from airflow.utils import timezone
+from airflow.utils.log.logging_mixin import LoggingMixin
+from airflow_provider_bigquery_reservation.hooks.variable_state import (
+    locked_variable_state,
+)
+
+if TYPE_CHECKING:
+    from airflow_provider_bigquery_reservation.hooks.bigquery_reservation import (
+        BigQueryReservationServiceHook,
+    )
+
+
+POOL_VARIABLE_PREFIX = "bigquery_reservation_pool"
+# Time (seconds) after which the deletion of an entry by another task is retried
+DELETION_TIMEOUT = 3600
+# Time (seconds) after which an entry provisioned or grown by another task is reclaimed
+PROVISIONING_TIMEOUT = 3600
+
+
+class SlotPool(LoggingMixin):
+    """
+    Warm slots kept between tasks and leased to them, by assignee project and job type.
+
+    The first lease of a project buys a commitment, creates a reservation and an
+    assignment, then waits for its attachment. Once released, these resources stay
+    warm for `ttl` seconds: a new lease of the project skips the purchase and the
+    attachment wait, buying only the slots missing when the leases exceed the warm
+    capacity. The resources idle for more than `ttl` seconds are deleted by `reap`,
+    called on each lease and release.
+    Leases of a project provisioned, grown (or deleted) by another task wait for it.
+    An entry still provisioned or grown after `PROVISIONING_TIMEOUT` seconds is
+    reclaimed by `reap`, its task being assumed killed. A lease not released after
+    `lease_ttl` seconds is reclaimed by `reap` too, its holder being assumed killed.
+
+    The pool state is an Airflow Variable of the metadata DB
+    (`bigquery_reservation_pool-<name>-<location>`), locked while it is updated:
+    the leases are shared by the tasks of every worker.
+
+    :param hook: Hook of the pool location
+    :param name: Pool name
+    :param ttl: Time (seconds) the released slots are kept warm
+    :param lease_ttl: Maximum time (seconds) a lease is held before being reclaimed
+    :param poll_interval: Time (seconds) between two checks of a pool entry
+        provisioned by another task
+    :param clock: Clock returning the current aware datetime
+    """
+
+    def __init__(
+        self,
+        hook: BigQueryReservationServiceHook,
+        name: str = "default",
+        ttl: float = 600.0,
+        lease_ttl: float = 86400.0,
+        poll_interval: float = 5.0,
+        clock: Callable[[], datetime.datetime] = timezone.utcnow,
+    ) -> None:
+        super().__init__()
+        self.hook = hook
+        self.name = name
+        self.ttl = ttl
+        self.lease_ttl = lease_ttl
+        self.poll_interval = poll_interval
+        self.clock = clock
+
+    @property
+    def key(self) -> str:
+        """Key of the Variable storing the pool state."""
+        return f"{POOL_VARIABLE_PREFIX}-{self.name}-{self.hook.location}"
+
+    def _locked_state(self) -> ContextManager[dict[str, Any]]:
+        """Lock the pool Variable row, yield its state then save it."""
+        return locked_variable_state(
+            self.key,
+            default={"entries": {}},
+            description=f"Leases of the {self.name} BigQuery slots pool.",
+        )
+
+    @staticmethod
+    def _entry_key(project_id: str, job_type: str) -> str:
+        return f"{project_id}/{job_type}"
+
+    @staticmethod
+    def _elapsed(since: str, now: datetime.datetime) -> float:
+        return (now - datetime.datetime.fromisoformat(since)).total_seconds()
+
+    @staticmethod
+    def _leased_slots(entry: dict[str, Any]) -> int:
+        return sum(lease["slots"] for lease in entry["leases"].values())
+
+    def _new_lease(self, slots: int, holder: str | None) -> dict[str, Any]:
+        return {
+            "slots": slots,
+            "holder": holder,
+            "leased_at": self.clock().isoformat(),
+            "ttl": self.lease_ttl,
+        }
+
+    def _reclaim_leases(
+        self, key: str, entry: dict[str, Any], now: datetime.datetime
+    ) -> None:
+        """Remove the leases of an entry held for more than their TTL."""
+        for lease_id, lease in list(entry["leases"].items()):
+            # Leases stored before their TTL: their TTL starts now.
+            if not isinstance(lease, dict):
+                lease = entry["leases"][lease_id] = {
+                    "slots": lease,
+                    "holder": None,
+                    "leased_at": now.isoformat(),
+                    "ttl": self.lease_ttl,
+                }
+            if self._elapsed(lease["leased_at"], now) >= lease["ttl"]:
+                self.log.warning(
+                    f"Lease {lease_id} of {key} held by {lease['holder']}"
+                    f" since {lease['leased_at']} reclaimed."
+                )
+                del entry["leases"][lease_id]
+                if not entry["leases"]:
+                    entry["idle_since"] = now.isoformat()
+
+    def _is_reapable(self, entry: dict[str, Any], now: datetime.datetime) -> bool:
+        """Whether an entry is idle for more than its TTL, stale, or its deletion failed."""
+        if entry["status"] == "deleting":
+            since = entry["deleting_since"]
+            return since is None or self._elapsed(since, now) >= DELETION_TIMEOUT
+        if entry["status"] == "provisioning":
+            return self._elapsed(entry["since"], now) >= PROVISIONING_TIMEOUT
+        return (
+            entry["status"] == "ready"
+            and not entry["leases"]
+            and entry["idle_since"] is not None
+            and self._elapsed(entry["idle_since"], now) >= entry["ttl"]
+        )
+
+    def _delete_entry(self, entry: dict[str, Any]) -> None:
+        """Delete the resources of an entry, removing them from the entry as they go."""
+        if entry["reservation_name"]:
+            self.hook.delete_commitment_reservation_and_assignment(
+                slots=entry["slots"],
+                reservation_name=entry["reservation_name"],
+                assignment_name=entry["assignment_name"],
+            )
+            entry["reservation_name"] = entry["assignment_name"] = None
+        while entry["commitments"]:
+            self.hook.delete_capacity_commitment(name=entry["commitments"][-1]["name"])
+            entry["commitments"].pop()
+
+    def reap(self) -> list[str]:
+        """
+        Delete the resources of the entries idle for more than their TTL.
+
+        An entry whose deletion fails is kept, with the resources left, and retried
+        by the next reap. The entries provisioned for more than `PROVISIONING_TIMEOUT`
+        seconds are deleted, and the entries grown for as long are marked ready again.
+        The leases held for more than their TTL are reclaimed first.
+
+        :return: The keys of the entries deleted.
+        """
+        with self._locked_state() as state:
+            now = self.clock()
+            for key, entry in state["entries"].items():
+                if entry["status"] in ("ready", "scaling"):
+                    self._reclaim_leases(key, entry, now)
+            reapable = {
+                key: entry
+                for key, entry in state["entries"].items()
+                if self._is_reapable(entry, now)
+            }
+            for key, entry in state["entries"].items():
+                if (
+                    entry["status"] == "scaling"
+                    and self._elapsed(entry["since"], now) >= PROVISIONING_TIMEOUT
+                ):
+                    self.log.warning(f"Growth of the warm slots of {key} reclaimed.")
+                    entry["status"] = "ready"
+            for key, entry in reapable.items():
+                if entry["status"] == "provisioning":
+                    self.log.warning(f"Provisioning of {key} reclaimed.")
+                entry.update(status="deleting", deleting_since=now.isoformat())
+
+        deleted = []
+        for key, entry in reapable.items():
+            try:
+                self._delete_entry(entry)
+            except AirflowException as e:
+                self.log.error(f"Failed to delete the warm slots of {key}: {e}")
+                entry["deleting_since"] = None
+                with self._locked_state() as state:
+                    state["entries"][key] = entry
+            else:
+                self.log.info(f"Warm slots of {key} expired and have been deleted.")
+                with self._locked_state() as state:
+                    del state["entries"][key]
+                deleted.append(key)
+        return deleted
+
+    def _lease_warm(
+        self,
+        state: dict[str, Any],
+        key: str,
+        lease_id: str,
+        slots: int,
+        holder: str | None,
+    ) -> int:
+        """
+        Lease slots of a ready entry, marking it `scaling` if its reservation must grow.
+
+        :return: The slots missing to the reservation of the entry.
+        """
+        entry = state["entries"][key]
+        missing_slots = slots - (entry["slots"] - self._leased_slots(entry))
+        entry["leases"][lease_id] = self._new_lease(slots, holder)
+        entry["idle_since"] = None
+        entry["ttl"] = self.ttl
+        if missing_slots <= 0:
+            return 0
+        entry.update(status="scaling", since=self.clock().isoformat())
+        return missing_slots
+
+    def _grow(self, key: str, lease_id: str, slots: int) -> dict[str, Any]:
+        """Grow the reservation of a `scaling` entry by some slots, then mark it ready."""
+        with self._locked_state() as state:
+            entry = state["entries"][key]
+        try:
+            # The reservation may be shared: grow its current capacity.
+            current_slots = self.hook.get_reservation(
+                name=entry["reservation_name"]
+            ).slot_capacity
+            commitments = self.hook.scale_reservation(
+                reservation_name=entry["reservation_name"],
+                slots=current_slots + slots,
+                commitments=entry["commitments"],
+                commitments_duration=entry["commitments_duration"],
+            )
+        except Exception:
+            with self._locked_state() as state:
+                entry = state["entries"][key]
+                entry["status"] = "ready"
+                entry["leases"].pop(lease_id, None)
+                if not entry["leases"]:
+                    entry["idle_since"] = self.clock().isoformat()
+            raise
+
+        with self._locked_state() as state:
+            entry = state["entries"][key]
+            entry.update(
+                status="ready", commitments=commitments, slots=entry["slots"] + slots
+            )
+            return entry
+
+    def _provision(
+        self,
+        key: str,
+        lease_id: str,
+        project_id: str,
+        slots: int,
+        job_type: str,
+        reservation_project_id: str | None,
+        commitments_duration: str,
+        attachment_probe: str,
+        attachment_deadline: float | None,
+        holder: str | None,
+    ) -> dict[str, Any]:
+        """Create the resources of a new entry, then mark it ready."""
+        try:
+            self.hook.create_commitment_reservation_and_assignment(
+                slots=slots,
+                assignment_job_type=job_type,
+                commitments_duration=commitments_duration,
+                project_id=project_id,
+                reservation_project_id=reservation_project_id,
+                attachment_probe=attachment_probe,
+                attachment_deadline=attachment_deadline,
+            )
+        except Exception:
+            with self._locked_state() as state:
+                if state["entries"].get(key, {}).get("owner") == lease_id:
+                    del state["entries"][key]
+            raise
+
+        commitment = self.hook._get_commitment()
+        with self._locked_state() as state:
+            entry = state["entries"].get(key)
+            reclaimed = entry is None or entry.get("owner") != lease_id
+            if not reclaimed:
+                entry.update(
+                    status="ready",
+                    reservation_name=self.hook._get_reservation().name,
+                    assignment_name=self.hook._get_assignment().name,
+                    commitments=[{"name": commitment.name, "slots": slots}],
+                    slots=slots,
+                    leases={lease_id: self._new_lease(slots, holder)},
+                    idle_since=None,
+                    ttl=self.ttl,
+                )
+        if reclaimed:
+            self.hook.delete_commitment_reservation_and_assignment(
+                slots=slots,
+                commitment_name=commitment.name,
+                reservation_name=self.hook._get_reservation().name,
+                assignment_name=self.hook._get_assignment().name,
+            )
+            raise AirflowException(
+                f"Provisioning of {key} reclaimed after {PROVISIONING_TIMEOUT} seconds."
+            )
+        return entry
+
+    def lease(
+        self,
+        project_id: str,
+        slots: int,
+        job_type: str = "QUERY",
+        reservation_project_id: str | None = None,
+        commitments_duration: str = "FLEX",
+        attachment_probe: str = "query",
+        attachment_deadline: float | None = None,
+        holder: str | None = None,
+    ) -> dict[str, Any]:
+        """
+        Lease slots for a project, from its warm resources when there are some.
+
+        :param project_id: GCP project where the slots are assigned
+        :param slots: Slots number (increment of 100)
+        :param job_type: Type of job for assignment
+        :param reservation_project_id: GCP project where the reservation is set
+        :param commitments_duration: Commitment minimum durations (FLEX, MONTH, YEAR)
+        :param attachment_probe: Attachment detection strategy of a new assignment
+        :param attachment_deadline: (Optional) Maximum attachment wait (seconds)
+        :param holder: (Optional) Holder of the lease e.g. `dag_id/task_id/run_id/map_index`,
+            logged when the lease is reclaimed
+
+        :return: The lease: `lease_id`, `project_id`, `slots`, `reservation_name`,
+            `assignment_name` and `warm` (whether warm resources were reused).
+        """
+        self.hook._verify_slots_conditions(slots=slots)
+        self.reap()
+        key = self._entry_key(project_id, job_type)
+        lease_id = uuid.uuid4().hex
+        start = time.monotonic()
+
+        while True:
+            warm, missing_slots = False, 0
+            with self._locked_state() as state:
+                entry = state["entries"].get(key)
+                if entry is None:
+                    state["entries"][key] = {
+                        "status": "provisioning",
+                        "owner": lease_id,
+                        "since": self.clock().isoformat(),
+                        "reservation_name": None,
+                        "assignment_name": None,
+                        "commitments": [],
+                        "commitments_duration": commitments_duration,
+                        "leases": {},
+                    }
+                elif entry["status"] == "ready":
+                    missing_slots = self._lease_warm(
+                        state, key, lease_id, slots, holder
+                    )
+                    warm = True
+            if warm:
+                if missing_slots:
+                    entry = self._grow(key, lease_id, missing_slots)
+                break
+            if entry is None:
+                entry = self._provision(
+                    key,
+                    lease_id,
+                    project_id,
+                    slots,
+                    job_type,
+                    reservation_project_id,
+                    commitments_duration,
+                    attachment_probe,
+                    attachment_deadline,
+                    holder,
+                )
+                break
+
+            # Another task is creating, growing or deleting the resources of the project.
+            if (
+                attachment_deadline is not None
+                and time.monotonic() - start > attachment_deadline
+            ):
+                raise AirflowException(
+                    f"Warm slots of {key} are still {entry['status']} by another task."
+                )
+            time.sleep(self.poll_interval)
+            self.reap()
+
+        self.log.info(
+            f"{slots} slots leased to {project_id} ({lease_id}),"
+            f" {'from warm' if warm else 'on new'} reservation {entry['reservation_name']}."
+        )
+        return {
+            "lease_id": lease_id,
+            "project_id": project_id,
+            "slots": slots,
+            "reservation_name": entry["reservation_name"],
+            "assignment_name": entry["assignment_name"],
+            "warm": warm,
+        }
+
+    def release(self, lease_id: str) -> None:
+        """
+        Release a lease, its slots stay warm for the pool TTL.
+
+        :param lease_id: Lease identifier
+        """
+        with self._locked_state() as state:
+            for key, entry in state["entries"].items():
+                if lease_id in entry["leases"]:
+                    del entry["leases"][lease_id]
+                    if not entry["leases"]:
+                        entry["idle_since"] = self.clock().isoformat()
+                    self.log.info(f"Lease {lease_id} of {key} released.")
+                    break
+            else:
+                self.log.warning(f"Lease {lease_id} not found in the pool {self.key}.")
+        self.reap()
@@ -0,0 +1,438 @@
+"""This module contains a rate limiter shared by the Reservation API calls of a process."""
+from __future__ import annotations
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple
+
+from airflow.configuration import conf
+from google.api_core.exceptions import ResourceExhausted, TooManyRequests
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+
+log = logging.getLogger(__name__)
+
+CONFIG_SECTION = "bigquery_reservation"
+QUOTA_ERRORS = (ResourceExhausted, TooManyRequests)
+RESOURCE_LOCATION = re.compile(r"projects/([^/]+)/locations/([^/]+)")
+
+# Rate limits (`rate`, `capacity`) by project and location
+RateLimits = Dict[Tuple[str, str], Dict[str, Optional[float]]]
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Tokens are refilled at `rate` tokens per second up to `capacity` tokens, each call
+    takes one token and waits for it when the bucket is empty.
+
+    :param rate: Refill rate (tokens per second)
+    :param capacity: Maximum number of tokens i.e. allowed burst
+    :param sleep: Sleep function
+    :param clock: Clock (seconds)
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.sleep = sleep
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._state: dict[str, float] = {"tokens": capacity, "updated_at": clock()}
+
+    @contextmanager
+    def _locked_state(self) -> Iterator[dict[str, float]]:
+        with self._lock:
+            yield self._state
+
+    def _take(self, tokens: float) -> float:
+        """Take tokens if available, otherwise return the time to wait for them."""
+        with self._locked_state() as state:
+            now = self.clock()
+            available = min(
+                self.capacity,
+                state["tokens"] + max(0.0, now - state["updated_at"]) * self.rate,
+            )
+            state["updated_at"] = now
+            if available >= tokens:
+                state["tokens"] = available - tokens
+                return 0.0
+            state["tokens"] = available
+            return (tokens - available) / self.rate
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens, waiting for them if needed.
+
+        :param tokens: Number of tokens taken
+
+        :return: The time (seconds) waited.
+        """
+        waited = 0.0
+        while True:
+            wait = self._take(tokens)
+            if not wait:
+                return waited
+            self.sleep(wait)
+            waited += wait
+
+    async def acquire_async(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens as `acquire`, waiting for them without blocking the event loop.
+
+        :param tokens: Number of tokens taken
+
+        :return: The time (seconds) waited.
+        """
+        waited = 0.0
+        while True:
+            wait = self._take(tokens)
+            if not wait:
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+
+
+class FileTokenBucket(TokenBucket):
+    """
+    Token bucket shared by the processes of a host through a locked state file.
+
+    :param path: State file path
+    :param rate: Refill rate (tokens per second)
+    :param capacity: Maximum number of tokens i.e. allowed burst
+    :param sleep: Sleep function
+    """
+
+    def __init__(
+        self,
+        path: str,
+        rate: float,
+        capacity: float,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        # Wall clock: the monotonic clock is not shared by the processes.
+        super().__init__(rate, capacity, sleep=sleep, clock=time.time)
+        self.path = path
+
+    @contextmanager
+    def _locked_state(self) -> Iterator[dict[str, float]]:
+        with self._lock, open(self.path, "a+") as state_file:
+            fcntl.flock(state_file, fcntl.LOCK_EX)
+            try:
+                state_file.seek(0)
+                try:
+                    state = json.loads(state_file.read())
+                except ValueError:
+                    state = {"tokens": self.capacity, "updated_at": self.clock()}
+                yield state
+                state_file.seek(0)
+                state_file.truncate()
+                state_file.write(json.dumps(state))
+                state_file.flush()
+            finally:
+                fcntl.flock(state_file, fcntl.LOCK_UN)
+
+
+class RateLimiter:
+    """
+    Token buckets of the Reservation API calls by project and location.
+
+    Limits default to the `[bigquery_reservation]` Airflow configuration:
+    `api_requests_per_second`, `api_burst`, `api_rate_limits` (JSON mapping of
+    `project/location` to `{"rate": ..., "capacity": ...}`) and `api_rate_limit_lock_dir`
+    (directory of the state files shared by the processes of the host, optional).
+
+    :param rate: Default refill rate (requests per second), `None` disables the limiter
+    :param capacity: Default maximum burst
+    :param limits: Rate and capacity by `(project_id, location)`
+    :param lock_dir: (Optional) Directory of the state files shared by the processes
+    :param max_retries: Maximum number of retries of a call failing on a quota error
+    :param initial_backoff: First wait (seconds) before retrying a quota error
+    :param max_backoff: Maximum wait (seconds) before retrying a quota error
+    """
+
+    def __init__(
+        self,
+        rate: float | None = 5.0,
+        capacity: float = 10.0,
+        limits: RateLimits | None = None,
+        lock_dir: str | None = None,
+        max_retries: int = 5,
+        initial_backoff: float = 1.0,
+        max_backoff: float = 32.0,
+    ) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.limits: RateLimits = dict(limits or {})
+        self.lock_dir = lock_dir
+        self.max_retries = max_retries
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.sleep: Callable[[float], None] = time.sleep
+        self._lock = threading.Lock()
+        self._buckets: dict[tuple[str, str], TokenBucket | None] = {}
+
+    @classmethod
+    def from_conf(cls) -> RateLimiter:
+        """Create the rate limiter from the Airflow configuration."""
+        limits: RateLimits = {}
+        for key, limit in json.loads(
+            conf.get(CONFIG_SECTION, "api_rate_limits", fallback="{}") or "{}"
+        ).items():
+            project_id, location = key.split("/", 1)
+            limits[(project_id, location)] = limit
+        return cls(
+            rate=conf.getfloat(CONFIG_SECTION, "api_requests_per_second", fallback=5.0),
+            capacity=conf.getfloat(CONFIG_SECTION, "api_burst", fallback=10.0),
+            limits=limits,
+            lock_dir=conf.get(CONFIG_SECTION, "api_rate_limit_lock_dir", fallback="")
+            or None,
+        )
+
+    def configure(
+        self,
+        rate: float | None,
+        capacity: float,
+        project_id: str | None = None,
+        location: str | None = None,
+    ) -> None:
+        """
+        Set the limit of a project and location, or the default limit.
+
+        :param rate: Refill rate (requests per second), `None` disables the limiter
+        :param capacity: Maximum burst
+        :param project_id: (Optional) Project limited, default limit if not set
+        :param location: (Optional) Location limited, default limit if not set
+        """
+        with self._lock:
+            if project_id and location:
+                self.limits[(project_id, location)] = {
+                    "rate": rate,
+                    "capacity": capacity,
+                }
+            else:
+                self.rate, self.capacity = rate, capacity
+            self._buckets.clear()
+
+    def clear(self) -> None:
+        """Drop the token buckets, they are recreated with the current limits."""
+        with self._lock:
+            self._buckets.clear()
+
+    def _create_bucket(self, key: tuple[str, str]) -> TokenBucket | None:
+        limit = self.limits.get(key, {"rate": self.rate, "capacity": self.capacity})
+        rate, capacity = limit.get("rate"), limit.get("capacity")
+        if not rate:
+            return None
+        capacity = float(capacity if capacity is not None else self.capacity)
+        if self.lock_dir:
+            if fcntl is not None:
+                os.makedirs(self.lock_dir, exist_ok=True)
+                path = os.path.join(self.lock_dir, "-".join(key) + ".json")
+                return FileTokenBucket(path, rate, capacity, sleep=self.sleep)
+            log.warning(  # pragma: no cover
+                "File locks are not supported: the rate limit is only shared in the process."
+            )
+        return TokenBucket(rate, capacity, sleep=self.sleep)
+
+    def get_bucket(self, project_id: str, location: str) -> TokenBucket | None:
+        """
+        Get the token bucket of a project and location (`None` if not limited).
+
+        :param project_id: GCP project of the resource called
+        :param location: Location of the resource called
+        """
+        key = (project_id, location)
+        with self._lock:
+            if key not in self._buckets:
+                self._buckets[key] = self._create_bucket(key)
+            return self._buckets[key]
+
+    def _bucket_of(self, resource: str | None) -> TokenBucket | None:
+        """Get the token bucket of the resource project and location."""
+        match = RESOURCE_LOCATION.search(resource or "")
+        key = match.groups() if match else ("-", "-")
+        return self.get_bucket(*key)
+
+    def acquire(self, resource: str | None) -> float:
+        """
+        Wait for the rate limit of the resource project and location.
+
+        :param resource: Resource name e.g. `projects/myproject/locations/US/reservations/test`
+
+        :return: The time (seconds) waited.
+        """
+        bucket = self._bucket_of(resource)
+        if bucket is None:
+            return 0.0
+
+        waited = bucket.acquire()
+        if waited:
+            log.info("Reservation API call on %s delayed %.2fs.", resource, waited)
+        return waited
+
+    async def acquire_async(self, resource: str | None) -> float:
+        """
+        Wait for the rate limit of the resource project and location, as `acquire`, in an event loop.
+
+        :param resource: Resource name e.g. `projects/myproject/locations/US/reservations/test`
+
+        :return: The time (seconds) waited.
+        """
+        bucket = self._bucket_of(resource)
+        if bucket is None:
+            return 0.0
+
+        waited = await bucket.acquire_async()
+        if waited:
+            log.info("Reservation API call on %s delayed %.2fs.", resource, waited)
+        return waited
+
+    def call(self, resource: str | None, func: Callable[..., Any], *args, **kwargs):
+        """
+        Call a Reservation API method within the rate limit, retrying on quota errors.
+
+        :param resource: Resource name used to pick the rate limit
+        :param func: API method
+        """
+        backoff = self.initial_backoff
+        for attempt in range(self.max_retries + 1):
+            self.acquire(resource)
+            try:
+                return func(*args, **kwargs)
+            except QUOTA_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                wait = backoff * random.uniform(0.5, 1.5)
+                log.warning(
+                    "Quota exceeded on %s, retrying in %.1fs: %s", resource, wait, e
+                )
+                self.sleep(wait)
+                backoff = min(backoff * 2, self.max_backoff)
+
+    async def call_async(
+        self, resource: str | None, func: Callable[..., Awaitable[Any]], *args, **kwargs
+    ):
+        """
+        Call an async Reservation API method within the rate limit, retrying on quota errors.
+
+        :param resource: Resource name used to pick the rate limit
+        :param func: Async API method
+        """
+        backoff = self.initial_backoff
+        for attempt in range(self.max_retries + 1):
+            await self.acquire_async(resource)
+            try:
+                return await func(*args, **kwargs)
+            except QUOTA_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                wait = backoff * random.uniform(0.5, 1.5)
+                log.warning(
+                    "Quota exceeded on %s, retrying in %.1fs: %s", resource, wait, e
+                )
+                await asyncio.sleep(wait)
+                backoff = min(backoff * 2, self.max_backoff)
+
+
+def _resource_of(args: tuple, kwargs: dict) -> str | None:
+    """Find the resource name of a Reservation API call."""
+    for value in (*args, *kwargs.values()):
+        if isinstance(value, dict):
+            value = value.get("parent") or value.get("name")
+        elif not isinstance(value, str):
+            value = getattr(value, "name", None)
+        if isinstance(value, str) and RESOURCE_LOCATION.search(value):
+            return value
+    return None
+
+
+class RateLimitedClient:
+    """
+    Reservation API client whose method calls go through a rate limiter.
+
+    The next pages of the list methods pagers are fetched through the rate limiter too.
+
+    :param client: Reservation API client
+    :param rate_limiter: Rate limiter applied to the calls
+    """
+
+    def __init__(self, client: Any, rate_limiter: RateLimiter) -> None:
+        self._wrapped_client = client
+        self._rate_limiter = rate_limiter
+
+    def __getattr__(self, name: str) -> Any:
+        """Get a client attribute, API methods are wrapped by the rate limiter."""
+        attribute = getattr(self._wrapped_client, name)
+        # Resource path helpers do not call the API.
+        if (
+            name.startswith(("_", "parse_", "common_"))
+            or name.endswith("_path")
+            or not callable(attribute)
+        ):
+            return attribute
+        return self._rate_limited(attribute)
+
+    def _rate_limited(self, method: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap an API method by the rate limiter."""
+
+        def call(*args, **kwargs):
+            resource = _resource_of(args, kwargs)
+            result = self._rate_limiter.call(resource, method, *args, **kwargs)
+            # Pagers fetch their next pages with the API method they were built with.
+            if "_method" in getattr(result, "__dict__", {}):
+                result._method = partial(
+                    self._rate_limiter.call, resource, result._method
+                )
+            return result
+
+        return call
+
+
+class AsyncRateLimitedClient(RateLimitedClient):
+    """
+    Reservation API async client whose method calls go through a rate limiter.
+
+    The rate limiter waits in the event loop. The next pages of the list methods
+    async pagers are fetched through the rate limiter too.
+
+    :param client: Reservation API async client
+    :param rate_limiter: Rate limiter applied to the calls
+    """
+
+    def _rate_limited(self, method: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap an async API method by the rate limiter."""
+
+        async def call(*args, **kwargs):
+            resource = _resource_of(args, kwargs)
+            result = await self._rate_limiter.call_async(
+                resource, method, *args, **kwargs
+            )
+            if "_method" in getattr(result, "__dict__", {}):
+                result._method = partial(
+                    self._rate_limiter.call_async, resource, result._method
+                )
+            return result
+
+        return call
+
+
+RATE_LIMITER = RateLimiter.from_conf()
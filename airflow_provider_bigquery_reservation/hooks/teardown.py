@@ -0,0 +1,62 @@
+"""This module contains a concurrent teardown engine for BigQuery reservation resources."""
+from __future__ import annotations
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Sequence, Tuple
+
+
+log = logging.getLogger(__name__)
+
+#: A resource name and the callable deleting it.
+Deletion = Tuple[str, Callable[[], None]]
+#: Ordered stages of deletions: a stage starts once the previous one succeeded.
+Chain = List[List[Deletion]]
+
+
+def run_teardown(phases: Sequence[Sequence[Chain]], max_workers: int = 8) -> dict:
+    """
+    Run dependency chains of deletions concurrently.
+
+    Phases run one after the other, the chains of a phase run in parallel on a bounded
+    worker pool and the stages of a chain run in order (e.g. assignments, then
+    reservation, then commitment). A failure does not stop the teardown: the remaining
+    stages of the failed chain are skipped and every other chain goes on.
+
+    :param phases: Chains grouped by phase.
+    :param max_workers: Maximum number of chains deleted concurrently.
+
+    :return: Failed or skipped resource names with the corresponding error message.
+    """
+    failures: dict[str, str] = {}
+    lock = threading.Lock()
+
+    def run_chain(chain: Chain) -> None:
+        for index, stage in enumerate(chain):
+            stage_failures = {}
+            for name, delete in stage:
+                try:
+                    delete()
+                except Exception as e:
+                    stage_failures[name] = str(e)
+
+            if stage_failures:
+                skipped = {
+                    name: f"Skipped: depends on {', '.join(stage_failures)}."
+                    for later_stage in chain[index + 1 :]
+                    for name, _ in later_stage
+                }
+                with lock:
+                    failures.update(stage_failures)
+                    failures.update(skipped)
+                return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for chains in phases:
+            # Consume the results to wait the end of the phase.
+            list(executor.map(run_chain, chains))
+
+    for name, error in failures.items():
+        log.error("Failed to delete %s: %s", name, error)
+
+    return failures
@@ -0,0 +1,136 @@
+"""This module contains the utilization report of a BigQuery capacity commitment."""
+from __future__ import annotations
+from dataclasses import asdict, dataclass
+from typing import Any, Sequence
+
+from airflow.exceptions import AirflowException
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore[assignment]
+
+
+# Slot-ms used and jobs running on a reservation by second of a window. The jobs
+# timeline is partitioned by the job creation: a query job runs at most 6 hours.
+COMMITMENT_TIMELINE_QUERY = """
+    SELECT
+        TIMESTAMP_DIFF(period_start, @start, SECOND) AS second,
+        SUM(period_slot_ms) AS slot_ms,
+        COUNT(DISTINCT IF(period_slot_ms > 0, job_id, NULL)) AS jobs
+    FROM `{project_id}.region-{location}.INFORMATION_SCHEMA.JOBS_TIMELINE`
+    WHERE job_creation_time >= TIMESTAMP_SUB(@start, INTERVAL 6 HOUR)
+        AND period_start >= @start
+        AND period_start < @end
+        AND reservation_id = @reservation_id
+    GROUP BY second
+"""
+
+
+@dataclass
+class CommitmentTimeline:
+    """
+    Slot usage of a reservation by second of a window, only the seconds with jobs.
+
+    :param seconds: Seconds since the start of the window
+    :param slot_ms: Slot-ms used in each second
+    :param jobs: Jobs using slots in each second
+    """
+
+    seconds: list[int]
+    slot_ms: list[int]
+    jobs: list[int]
+
+
+@dataclass
+class CommitmentUtilization:
+    """
+    Utilization of the slots bought by a commitment over a window.
+
+    :param window_seconds: Window duration (seconds)
+    :param slots: Slots bought
+    :param slot_ms_bought: Slot-ms bought over the window
+    :param slot_ms_used: Slot-ms used by the reservation jobs, including the slots
+        of its other commitments or borrowed idle slots
+    :param utilization: Share of the slot-ms bought used: the slot-ms used in each
+        second are counted up to the slots bought, so it is at most 1
+    :param peak_slots: Maximum slots used in one second
+    :param peak_jobs: Maximum jobs using slots in one second
+    :param idle_share: Share of the window seconds without slots used
+    """
+
+    window_seconds: int
+    slots: int
+    slot_ms_bought: int
+    slot_ms_used: int
+    utilization: float
+    peak_slots: float
+    peak_jobs: int
+    idle_share: float
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize the utilization to JSON types."""
+        return asdict(self)
+
+
+def _dense(values: Sequence[int], seconds: Sequence[int], window_seconds: int):
+    """Spread the values of the seconds with jobs over every second of the window."""
+    timeline = np.zeros(window_seconds, dtype=np.int64)
+    np.add.at(timeline, np.asarray(seconds, dtype=np.int64), values)
+    return timeline
+
+
+def summarize_utilization(
+    timeline: CommitmentTimeline, window_seconds: int, slots: int
+) -> CommitmentUtilization:
+    """
+    Compute the utilization of the slots bought over a window from its timeline.
+
+    The computation is vectorized over the per-second timeline with numpy when it is
+    installed (`numpy` extra).
+
+    :param timeline: Slot usage by second of the window
+    :param window_seconds: Window duration (seconds)
+    :param slots: Slots bought
+    """
+    if window_seconds <= 0:
+        raise AirflowException(f"Invalid utilization window of {window_seconds}s.")
+    if any(not 0 <= second < window_seconds for second in timeline.seconds):
+        raise AirflowException("Timeline seconds outside of the utilization window.")
+
+    slot_ms_per_second = slots * 1000
+    if np is not None:
+        slot_ms = _dense(timeline.slot_ms, timeline.seconds, window_seconds)
+        jobs = _dense(timeline.jobs, timeline.seconds, window_seconds)
+        slot_ms_used = int(slot_ms.sum())
+        slot_ms_used_bought = int(np.minimum(slot_ms, slot_ms_per_second).sum())
+        peak_slot_ms = int(slot_ms.max())
+        peak_jobs = int(jobs.max())
+        idle_seconds = int(np.count_nonzero(slot_ms == 0))
+    else:
+        used: dict[int, int] = {}
+        running: dict[int, int] = {}
+        for second, value, count in zip(
+            timeline.seconds, timeline.slot_ms, timeline.jobs
+        ):
+            used[second] = used.get(second, 0) + value
+            running[second] = running.get(second, 0) + count
+        slot_ms_used = sum(used.values())
+        slot_ms_used_bought = sum(
+            min(value, slot_ms_per_second) for value in used.values()
+        )
+        peak_slot_ms = max(used.values(), default=0)
+        peak_jobs = max(running.values(), default=0)
+        idle_seconds = window_seconds - sum(1 for value in used.values() if value)
+
+    slot_ms_bought = slot_ms_per_second * window_seconds
+    return CommitmentUtilization(
+        window_seconds=window_seconds,
+        slots=slots,
+        slot_ms_bought=slot_ms_bought,
+        slot_ms_used=slot_ms_used,
+        utilization=slot_ms_used_bought / slot_ms_bought if slot_ms_bought else 0.0,
+        peak_slots=peak_slot_ms / 1000,
+        peak_jobs=peak_jobs,
+        idle_share=idle_seconds / window_seconds,
+    )
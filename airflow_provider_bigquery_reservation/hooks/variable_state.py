@@ -0,0 +1,42 @@
+"""This module contains the state shared by the tasks of every worker in Airflow Variables."""
+from __future__ import annotations
+import json
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from airflow.models import Variable
+from airflow.utils.session import create_session
+from sqlalchemy.exc import IntegrityError  # type: ignore[import]
+
+
+@contextmanager
+def locked_variable_state(
+    key: str, default: dict[str, Any], description: str | None = None
+) -> Iterator[dict[str, Any]]:
+    """
+    Lock the row of a JSON Airflow Variable, yield its state then save it.
+
+    The row stays locked (`SELECT ... FOR UPDATE`) until the state is saved, so the
+    tasks of every worker update it one at a time: keep the block to state reads and
+    writes, without API calls or sleeps. The state is not saved if an error is raised.
+
+    :param key: Variable key
+    :param default: State of a new Variable
+    :param description: (Optional) Description of a new Variable
+    """
+    with create_session() as session:
+        query = session.query(Variable).filter(Variable.key == key).with_for_update()
+        variable = query.one_or_none()
+        if variable is None:
+            try:
+                with session.begin_nested():
+                    variable = Variable(
+                        key=key, val=json.dumps(default), description=description
+                    )
+                    session.add(variable)
+            except IntegrityError:
+                # Another task created the Variable meanwhile: lock its row.
+                variable = query.one()
+        state = json.loads(variable.val)
+        yield state
+        variable.val = json.dumps(state)
@@ -1,11 +1,49 @@
 """This module contains Google BigQuery reservation operators."""
 from __future__ import annotations
-from typing import Any, Sequence
+import datetime
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Sequence, cast
 
-from airflow.models import BaseOperator
+from airflow.exceptions import AirflowException
+from airflow.models import BaseOperator, DagModel, XCom
+from airflow.triggers.temporal import DateTimeTrigger, TimeDeltaTrigger
+from airflow.utils import timezone
+from airflow_provider_bigquery_reservation.hooks.attachment import (
+    AttachmentBackoff,
+    AttachmentTarget,
+    get_attachment_probe,
+    wait_for_attachment,
+)
+from airflow_provider_bigquery_reservation.hooks.autoscale import AutoscalePolicy
+from airflow_provider_bigquery_reservation.hooks.bi_engine import (
+    BI_ENGINE_MAX_SIZE,
+    recommend_bi_engine_size,
+)
 from airflow_provider_bigquery_reservation.hooks.bigquery_reservation import (
     BigQueryReservationServiceHook,
 )
+from airflow_provider_bigquery_reservation.hooks.coalescing import PurchaseCoalescer
+from airflow_provider_bigquery_reservation.hooks.latency import (
+    ProvisioningHistory,
+    ProvisioningTimeline,
+    provisioning_lead_time,
+    record_provisioning,
+)
+from airflow_provider_bigquery_reservation.hooks.metrics import (
+    ApiMetrics,
+    emit_commitment_utilization,
+    emit_wait,
+)
+from airflow_provider_bigquery_reservation.hooks.pool import SlotPool
+from airflow_provider_bigquery_reservation.hooks.utilization import (
+    summarize_utilization,
+)
+from airflow_provider_bigquery_reservation.triggers.bigquery_reservation import (
+    BigQueryReservationAssignmentAttachedTrigger,
+    BigQueryReservationDrainedTrigger,
+)
 
 
 bq_reservation_operator_color = "#9c5fff"
@@ -26,6 +64,13 @@ class BigQueryReservationCreateOperator(BaseOperator):
     For BigQuery reservation API see here:
         https://cloud.google.com/bigquery/docs/reference/reservations
 
+    The stages timestamps of the provisioning are added to the provisioning history
+    of the location (see `ProvisioningHistory`).
+
+    Without coalescing, the resources ids are derived from the task instance
+    (`dag_id/task_id/run_id/map_index`): a retry adopts the resources left by its
+    previous tries instead of buying new slots. This idempotency key is pushed to
+    XCom (`idempotency_key`), to give to `BigQueryReservationDeleteOperator`.
 
     :param project_id: Google Cloud Project where the reservation is assigned.
     :param reservation_project_id: Google Cloud Project where the reservation is set.
@@ -43,6 +88,16 @@ class BigQueryReservationCreateOperator(BaseOperator):
         Service Account Token Creator IAM role to the directly preceding identity, with first
         account from the list granting this role to the originating account (templated).
     :param cancel_on_kill: Flag which indicates whether cancel the hook's job or not, when on_kill is called
+    :param deferrable: Run operator in the deferrable mode: the assignment attachment wait
+        is done by the triggerer and the worker slot is released.
+    :param poll_interval: (Deferrable mode only) Maximum time (seconds) to wait between two attachment checks.
+    :param attachment_probe: Attachment detection strategy: `query` (default, dummy query),
+        `assignment_state` (no-wait mode: active assignment, no job created) or `last_job` (recent jobs of the project).
+    :param attachment_deadline: (Optional) Maximum attachment wait (seconds).
+    :param coalesce_window: (Optional) Time (seconds) the purchase waits for concurrent
+        purchases of the same project and job type, to buy their slots in one commitment
+        and update the reservation once. The release handle of the task slots is pushed
+        to XCom (`coalescing_handle`), to give to `BigQueryReservationDeleteOperator`.
     """
 
     template_fields: Sequence[str] = (
@@ -65,6 +120,11 @@ class BigQueryReservationCreateOperator(BaseOperator):
         gcp_conn_id: str = "google_cloud_default",
         impersonation_chain: str | Sequence[str] | None = None,
         cancel_on_kill: bool = True,
+        deferrable: bool = False,
+        poll_interval: float = 15.0,
+        attachment_probe: str = "query",
+        attachment_deadline: float | None = None,
+        coalesce_window: float | None = None,
         **kwargs,
     ) -> None:
         super().__init__(**kwargs)
@@ -77,7 +137,79 @@ class BigQueryReservationCreateOperator(BaseOperator):
         self.gcp_conn_id = gcp_conn_id
         self.impersonation_chain = impersonation_chain
         self.cancel_on_kill = cancel_on_kill
+        self.deferrable = deferrable
+        self.poll_interval = poll_interval
+        self.attachment_probe = attachment_probe
+        self.attachment_deadline = attachment_deadline
+        self.coalesce_window = coalesce_window
         self.hook: BigQueryReservationServiceHook | None = None
+        self.coalescing_handle: str | None = None
+        self.idempotency_key: str | None = None
+
+    @staticmethod
+    def _idempotency_key(context: Any) -> str:
+        """Get the key of the task instance, the same across its tries."""
+        ti = context["ti"]
+        return f"{ti.dag_id}/{ti.task_id}/{ti.run_id}/{ti.map_index}"
+
+    def _purchase(self, idempotency_key: str | None = None) -> tuple[str, str, str]:
+        """Buy and assign the slots, return the resources names."""
+        assert self.hook is not None
+        if self.coalesce_window is None:
+            self.hook.create_commitment_reservation_and_assignment(
+                slots=self.slots_provisioning,
+                assignment_job_type=self.assignment_job_type,
+                commitments_duration=self.commitments_duration,
+                project_id=self.project_id,
+                reservation_project_id=self.reservation_project_id,
+                wait_assignment_attachment=not self.deferrable,
+                attachment_probe=self.attachment_probe,
+                attachment_deadline=self.attachment_deadline,
+                idempotency_key=idempotency_key,
+            )
+            return (
+                self.hook._get_commitment().name,
+                self.hook._get_reservation().name,
+                self.hook._get_assignment().name,
+            )
+
+        purchase = PurchaseCoalescer(self.hook, window=self.coalesce_window).purchase(
+            project_id=self.project_id or self.hook.project_id,
+            slots=self.slots_provisioning,
+            job_type=self.assignment_job_type,
+            reservation_project_id=self.reservation_project_id,
+            commitments_duration=self.commitments_duration,
+            wait_assignment_attachment=not self.deferrable,
+            attachment_probe=self.attachment_probe,
+            attachment_deadline=self.attachment_deadline,
+        )
+        self.coalescing_handle = purchase["handle"]
+        return (
+            purchase["commitment_name"],
+            purchase["reservation_name"],
+            purchase["assignment_name"],
+        )
+
+    def _release(
+        self,
+        hook: BigQueryReservationServiceHook,
+        commitment_name: str | None,
+        reservation_name: str | None,
+        assignment_name: str | None,
+        coalescing_handle: str | None,
+        idempotency_key: str | None = None,
+    ) -> None:
+        """Delete the resources created by the task, or release its coalesced share."""
+        if coalescing_handle:
+            PurchaseCoalescer(hook).release(coalescing_handle)
+        elif commitment_name:
+            hook.delete_commitment_reservation_and_assignment(
+                commitment_name=commitment_name,
+                reservation_name=reservation_name,
+                assignment_name=assignment_name,
+                slots=self.slots_provisioning,
+                idempotency_key=idempotency_key,
+            )
 
     def execute(self, context: Any) -> None:
         """Create a slot reservation."""
@@ -86,45 +218,430 @@ class BigQueryReservationCreateOperator(BaseOperator):
             impersonation_chain=self.impersonation_chain,
             location=self.location,
         )
+        since = timezone.utcnow()
+        if self.coalesce_window is None:
+            self.idempotency_key = self._idempotency_key(context)
 
-        self.hook.create_commitment_reservation_and_assignment(
-            slots=self.slots_provisioning,
-            assignment_job_type=self.assignment_job_type,
+        try:
+            commitment_name, reservation_name, assignment_name = self._purchase(
+                self.idempotency_key
+            )
+        finally:
+            self.hook.log_api_summary()
+        record_provisioning(self.hook.provisioning_timeline)
+
+        context["ti"].xcom_push(key="commitment_name", value=commitment_name)
+        context["ti"].xcom_push(key="reservation_name", value=reservation_name)
+        context["ti"].xcom_push(key="assignment_name", value=assignment_name)
+        if self.coalescing_handle:
+            context["ti"].xcom_push(
+                key="coalescing_handle", value=self.coalescing_handle
+            )
+        if self.idempotency_key:
+            context["ti"].xcom_push(key="idempotency_key", value=self.idempotency_key)
+
+        if self.deferrable:
+            self.defer(
+                trigger=BigQueryReservationAssignmentAttachedTrigger(
+                    project_id=self.project_id or self.hook.project_id,
+                    location=self.location,
+                    gcp_conn_id=self.gcp_conn_id,
+                    impersonation_chain=self.impersonation_chain,
+                    poll_interval=self.poll_interval,
+                    job_type=self.assignment_job_type,
+                    reservation_project_id=self.reservation_project_id,
+                    attachment_probe=self.attachment_probe,
+                    deadline=self.attachment_deadline,
+                    since=since,
+                ),
+                method_name="execute_complete",
+                kwargs={
+                    "commitment_name": commitment_name,
+                    "reservation_name": reservation_name,
+                    "assignment_name": assignment_name,
+                    "coalescing_handle": self.coalescing_handle,
+                    "idempotency_key": self.idempotency_key,
+                    "provisioning_timeline": (
+                        self.hook.provisioning_timeline.to_dict()
+                        if self.hook.provisioning_timeline
+                        else None
+                    ),
+                },
+            )
+
+    def execute_complete(
+        self,
+        context: Any,
+        event: dict[str, Any],
+        commitment_name: str | None = None,
+        reservation_name: str | None = None,
+        assignment_name: str | None = None,
+        coalescing_handle: str | None = None,
+        idempotency_key: str | None = None,
+        provisioning_timeline: dict[str, Any] | None = None,
+    ) -> None:
+        """
+        Act as a callback for when the trigger fires.
+
+        If the attachment wait failed, delete the resources created by the task
+        (or release its share of a coalesced purchase).
+        """
+        if event["status"] == "error":
+            hook = BigQueryReservationServiceHook(
+                gcp_conn_id=self.gcp_conn_id,
+                impersonation_chain=self.impersonation_chain,
+                location=self.location,
+            )
+            self._release(
+                hook,
+                commitment_name=commitment_name,
+                reservation_name=reservation_name,
+                assignment_name=assignment_name,
+                coalescing_handle=coalescing_handle,
+                idempotency_key=idempotency_key,
+            )
+            raise AirflowException(
+                f"Failed to wait the assignment attachment: {event['message']}"
+            )
+        self.log.info(event["message"])
+        self.log.info(f"Wait time {event.get('attachment_duration', 0.0):.2f}s.")
+        if provisioning_timeline and event.get("attached_at"):
+            timeline = ProvisioningTimeline.from_dict(provisioning_timeline)
+            timeline.attached_at = datetime.datetime.fromisoformat(event["attached_at"])
+            record_provisioning(timeline)
+
+    def on_kill(self) -> None:
+        """Delete the reservation if task is cancelled."""
+        super().on_kill()
+        if self.hook is None:
+            return
+        if self.coalesce_window is not None:
+            # The resources of a coalesced purchase are shared: only the task share is freed.
+            self._release(self.hook, None, None, None, self.coalescing_handle)
+            return
+        self._release(
+            self.hook,
+            commitment_name=(
+                self.hook.commitment.name if self.hook.commitment else None
+            ),
+            reservation_name=(
+                self.hook.reservation.name if self.hook.reservation else None
+            ),
+            assignment_name=(
+                self.hook.assignment.name if self.hook.assignment else None
+            ),
+            coalescing_handle=None,
+            idempotency_key=self.idempotency_key,
+        )
+
+
+class BigQueryReservationBatchCreateOperator(BaseOperator):
+    """
+    Buy BigQuery slots and assign them to several GCP projects at once.
+
+    The projects are provisioned concurrently (commitment, reservation and assignment
+    as `BigQueryReservationCreateOperator` does), then the assignment attachments of
+    every project are awaited in one shared poll loop.
+    The projects whose existing assignment points to the same reservation are
+    provisioned one after the other: each growth reads the capacity updated by the
+    previous one.
+    Provisioning is all or nothing: if a project fails, the resources of every
+    project are deleted.
+
+    A result is pushed to XCom per project with the project id as key::
+
+        {
+            "commitment_name": ...,
+            "reservation_name": ...,
+            "assignment_name": ...,
+            "slots": ...,
+            "job_type": ...,
+            "attachment_duration": ...,
+        }
+
+    :param projects: Slots to provision by Google Cloud Project assigned, either a
+        number of slots or a mapping with `slots` and `job_type` (optional) keys
+        e.g. `{"project-a": 100, "project-b": {"slots": 200, "job_type": "PIPELINE"}}`.
+    :param location: Location where the reservations are attached.
+    :param reservation_project_id: Google Cloud Project where the reservations are set
+        (default: the assigned project).
+    :param commitments_duration: Commitment minimum durations i.e. one minute (FLEX, default), one month (MONTH) or one year (YEAR).
+    :param assignment_job_type: Default assignment job type (PIPELINE, QUERY, ML_EXTERNAL, BACKGROUND)
+    :param gcp_conn_id: Connection ID used to connect to Google Cloud.
+    :param impersonation_chain: Optional service account to impersonate using short-term
+        credentials, or chained list of accounts required to get the access_token
+        of the last account in the list, which will be impersonated in the request.
+        If set as a string, the account must grant the originating account
+        the Service Account Token Creator IAM role.
+        If set as a sequence, the identities from the list must grant
+        Service Account Token Creator IAM role to the directly preceding identity, with first
+        account from the list granting this role to the originating account (templated).
+    :param max_workers: Maximum number of projects provisioned or checked concurrently.
+    :param poll_interval: Maximum time (seconds) to wait between two attachment checks.
+    :param attachment_probe: Attachment detection strategy: `query` (default, dummy query),
+        `assignment_state` (no-wait mode: active assignment, no job created) or `last_job` (recent jobs of the project).
+    :param attachment_deadline: (Optional) Maximum attachment wait (seconds).
+    """
+
+    template_fields: Sequence[str] = (
+        "projects",
+        "reservation_project_id",
+        "location",
+        "commitments_duration",
+    )
+    ui_color = bq_reservation_operator_color
+
+    def __init__(
+        self,
+        projects: dict[str, int | dict[str, Any]],
+        location: str,
+        reservation_project_id: str | None = None,
+        commitments_duration: str = "FLEX",
+        assignment_job_type: str = "QUERY",
+        gcp_conn_id: str = "google_cloud_default",
+        impersonation_chain: str | Sequence[str] | None = None,
+        max_workers: int = 8,
+        poll_interval: float = 15.0,
+        attachment_probe: str = "query",
+        attachment_deadline: float | None = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.projects = projects
+        self.reservation_project_id = reservation_project_id
+        self.location = location
+        self.commitments_duration = commitments_duration
+        self.assignment_job_type = assignment_job_type
+        self.gcp_conn_id = gcp_conn_id
+        self.impersonation_chain = impersonation_chain
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self.attachment_probe = attachment_probe
+        self.attachment_deadline = attachment_deadline
+        self.hooks: dict[str, BigQueryReservationServiceHook] = {}
+        self.provisioned: list[str] = []
+        self.attachment_wait = 0.0
+
+    def _get_hook(self) -> BigQueryReservationServiceHook:
+        return BigQueryReservationServiceHook(
+            gcp_conn_id=self.gcp_conn_id,
+            impersonation_chain=self.impersonation_chain,
+            location=self.location,
+        )
+
+    def _get_requests(self) -> dict[str, dict[str, Any]]:
+        """Normalize the projects mapping to slots and job type by project."""
+        requests = {}
+        for project_id, request in self.projects.items():
+            if not isinstance(request, dict):
+                request = {"slots": request}
+            requests[project_id] = {
+                "slots": int(request["slots"]),
+                "job_type": request.get("job_type", self.assignment_job_type),
+            }
+        return requests
+
+    def _provision(self, project_id: str, slots: int, job_type: str) -> None:
+        self.hooks[project_id].create_commitment_reservation_and_assignment(
+            slots=slots,
+            assignment_job_type=job_type,
             commitments_duration=self.commitments_duration,
-            project_id=self.project_id,
+            project_id=project_id,
             reservation_project_id=self.reservation_project_id,
+            wait_assignment_attachment=False,
         )
+        self.provisioned.append(project_id)
 
-        context["ti"].xcom_push(
-            key="commitment_name", value=self.hook._get_commitment().name
-        )
-        context["ti"].xcom_push(
-            key="reservation_name", value=self.hook._get_reservation().name
+    def _target_reservation(self, project_id: str, job_type: str) -> str:
+        """
+        Get the reservation the provisioning of a project grows.
+
+        :return: The reservation of the existing project assignment, else the project
+            id (a new reservation is created).
+        """
+        parent = (
+            f"projects/{self.reservation_project_id or project_id}"
+            f"/locations/{self.location}"
         )
-        context["ti"].xcom_push(
-            key="assignment_name", value=self.hook._get_assignment().name
+        assignment = self.hooks[project_id].search_assignment(
+            parent=parent, project_id=project_id, job_type=job_type
         )
+        return assignment.name.split("/assignments")[0] if assignment else project_id
 
-    def on_kill(self) -> None:
-        """Delete the reservation if task is cancelled."""
-        super().on_kill()
-        if self.hook is not None:
-            commitment_name = (
-                self.hook.commitment.name if self.hook.commitment else None
+    def _provision_group(
+        self, project_ids: list[str], requests: dict[str, dict[str, Any]]
+    ) -> dict[str, BaseException]:
+        """
+        Provision the projects growing the same reservation one after the other.
+
+        :return: The failure of the group by project, empty on success.
+        """
+        for project_id in project_ids:
+            try:
+                self._provision(project_id, **requests[project_id])
+            except Exception as e:
+                return {project_id: e}
+        return {}
+
+    def _wait_attachments(
+        self, requests: dict[str, dict[str, Any]], since: datetime.datetime
+    ) -> dict[str, float]:
+        """
+        Wait the assignments of every project are attached in one poll loop.
+
+        :return: The time (seconds) the attachment took by project.
+        """
+        probe = get_attachment_probe(self.attachment_probe)
+        targets = {
+            project_id: AttachmentTarget(
+                project_id=project_id,
+                location=self.location,
+                job_type=request["job_type"],
+                reservation_project_id=self.reservation_project_id,
+                since=since,
             )
-            reservation_name = (
-                self.hook.reservation.name if self.hook.reservation else None
+            for project_id, request in requests.items()
+        }
+        durations: dict[str, float] = {}
+        start = time.monotonic()
+        self.attachment_wait = 0.0
+
+        def is_attached(project_id: str) -> bool:
+            return probe.is_attached(self.hooks[project_id], targets[project_id])
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+
+            def all_attached() -> bool:
+                pending = [p for p in targets if p not in durations]
+                for project_id, attached in zip(
+                    pending, executor.map(is_attached, pending)
+                ):
+                    if attached:
+                        durations[project_id] = time.monotonic() - start
+                        self.log.info(
+                            f"Assignment attached on the project {project_id}"
+                            f" in {durations[project_id]:.1f} seconds."
+                        )
+                return len(durations) == len(targets)
+
+            self.attachment_wait = wait_for_attachment(
+                all_attached,
+                backoff=AttachmentBackoff(
+                    max_interval=self.poll_interval,
+                    deadline=self.attachment_deadline,
+                ),
             )
-            assignment_name = (
-                self.hook.assignment.name if self.hook.assignment else None
+        emit_wait("attachment", self.location, self.attachment_wait)
+        return durations
+
+    def _log_api_summary(self) -> None:
+        """Log the Reservation API time of every project against the wait time."""
+        metrics = ApiMetrics.merge(hook.api_metrics for hook in self.hooks.values())
+        metrics.wait_time = self.attachment_wait
+        self.log.info(metrics.summary())
+
+    def _cleanup(self, requests: dict[str, dict[str, Any]]) -> None:
+        """Delete the resources of the provisioned projects."""
+
+        def delete(project_id: str) -> None:
+            hook = self.hooks[project_id]
+            hook.delete_commitment_reservation_and_assignment(
+                commitment_name=hook.commitment.name if hook.commitment else None,
+                reservation_name=hook.reservation.name if hook.reservation else None,
+                assignment_name=hook.assignment.name if hook.assignment else None,
+                slots=requests[project_id]["slots"],
             )
-            if commitment_name:
-                self.hook.delete_commitment_reservation_and_assignment(
-                    commitment_name=commitment_name,
-                    reservation_name=reservation_name,
-                    assignment_name=assignment_name,
-                    slots=self.slots_provisioning,
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                project_id: executor.submit(delete, project_id)
+                for project_id in self.provisioned
+            }
+        for project_id, future in futures.items():
+            if future.exception():
+                self.log.error(
+                    f"Failed to clean up the project {project_id}: {future.exception()}"
                 )
+        self.provisioned = []
+
+    def _provision_and_wait(
+        self, requests: dict[str, dict[str, Any]], since: datetime.datetime
+    ) -> dict[str, float]:
+        """
+        Provision every project concurrently then wait their attachments.
+
+        The projects are grouped by the reservation they grow: the groups are
+        provisioned concurrently, the projects of a group sequentially.
+
+        :return: The time (seconds) the attachment took by project.
+        """
+        groups: dict[str, list[str]] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            targets = executor.map(
+                lambda project_id: self._target_reservation(
+                    project_id, requests[project_id]["job_type"]
+                ),
+                requests,
+            )
+            for project_id, target in zip(requests, targets):
+                groups.setdefault(target, []).append(project_id)
+
+            futures = [
+                executor.submit(self._provision_group, project_ids, requests)
+                for project_ids in groups.values()
+            ]
+
+        failures = {
+            project_id: e
+            for future in futures
+            for project_id, e in future.result().items()
+        }
+        if failures:
+            self.log.error(f"Failed to provision the projects: {failures}")
+            self._cleanup(requests)
+            raise AirflowException(
+                f"Failed to provision the projects {', '.join(failures)}."
+            )
+
+        try:
+            return self._wait_attachments(requests, since)
+        except Exception as e:
+            self.log.error(e)
+            self._cleanup(requests)
+            raise AirflowException(
+                f"Failed to wait the assignment attachments of the projects: {e}"
+            )
+
+    def execute(self, context: Any) -> None:
+        """Create slot reservations for every project."""
+        requests = self._get_requests()
+        self.hooks = {project_id: self._get_hook() for project_id in requests}
+        since = timezone.utcnow()
+
+        try:
+            durations = self._provision_and_wait(requests, since)
+        finally:
+            self._log_api_summary()
+
+        for project_id, request in requests.items():
+            hook = self.hooks[project_id]
+            context["ti"].xcom_push(
+                key=project_id,
+                value={
+                    "commitment_name": hook._get_commitment().name,
+                    "reservation_name": hook._get_reservation().name,
+                    "assignment_name": hook._get_assignment().name,
+                    "slots": request["slots"],
+                    "job_type": request["job_type"],
+                    "attachment_duration": durations[project_id],
+                },
+            )
+
+    def on_kill(self) -> None:
+        """Delete the reservations if task is cancelled."""
+        super().on_kill()
+        if self.provisioned:
+            self._cleanup(self._get_requests())
 
 
 class BigQueryReservationDeleteOperator(BaseOperator):
@@ -145,6 +662,18 @@ class BigQueryReservationDeleteOperator(BaseOperator):
             e.g. `projects/myproject/locations/US/reservations/test`.
     :param assignment_name: Assignment name
             e.g. `projects/myproject/locations/US/reservations/test/assignments/8950226598037373530`.
+    :param coalescing_handle: Release handle of a coalesced purchase
+        (`coalescing_handle` XCom of `BigQueryReservationCreateOperator`): only the
+        task share of the shared resources is released.
+    :param idempotency_key: (Optional) Idempotency key of the purchase
+        (`idempotency_key` XCom of `BigQueryReservationCreateOperator`): its reservation
+        update is removed from the ledger, so a new try of the purchase grows it again.
+    :param drain: Wait, deferred, for the jobs of `project_id` running on `reservation_name`
+        to finish before deleting the commitment, the reservation and the assignment,
+        so they do not fall back to on-demand or slow down.
+    :param drain_timeout: Maximum drain wait (seconds): the resources are deleted
+        once it passes, even if jobs are still running.
+    :param drain_poll_interval: Time (seconds) between two counts of the running jobs.
     :param gcp_conn_id: Connection ID used to connect to Google Cloud.
     :param impersonation_chain: Optional service account to impersonate using short-term
         credentials, or chained list of accounts required to get the access_token
@@ -165,6 +694,8 @@ class BigQueryReservationDeleteOperator(BaseOperator):
         "commitment_name",
         "reservation_name",
         "assignment_name",
+        "coalescing_handle",
+        "idempotency_key",
     )
     ui_color = bq_reservation_operator_color
 
@@ -177,6 +708,11 @@ class BigQueryReservationDeleteOperator(BaseOperator):
         commitment_name: str | None = None,
         reservation_name: str | None = None,
         assignment_name: str | None = None,
+        coalescing_handle: str | None = None,
+        idempotency_key: str | None = None,
+        drain: bool = False,
+        drain_timeout: float = 3600.0,
+        drain_poll_interval: float = 30.0,
         gcp_conn_id: str = "google_cloud_default",
         impersonation_chain: str | Sequence[str] | None = None,
         cancel_on_kill: bool = True,
@@ -190,28 +726,81 @@ class BigQueryReservationDeleteOperator(BaseOperator):
         self.commitment_name = commitment_name
         self.reservation_name = reservation_name
         self.assignment_name = assignment_name
+        self.coalescing_handle = coalescing_handle
+        self.idempotency_key = idempotency_key
+        self.drain = drain
+        self.drain_timeout = drain_timeout
+        self.drain_poll_interval = drain_poll_interval
         self.gcp_conn_id = gcp_conn_id
         self.impersonation_chain = impersonation_chain
         self.cancel_on_kill = cancel_on_kill
 
     def execute(self, context: Any):
-        """Delete a slot reservation."""
+        """Delete a slot reservation, once drained in drain mode."""
+        if self.drain:
+            if not (
+                self.project_id and self.reservation_name and not self.coalescing_handle
+            ):
+                raise AirflowException(
+                    "Need to define `project_id` and `reservation_name`, without"
+                    " `coalescing_handle`, to drain the reservation."
+                )
+            self.defer(
+                trigger=BigQueryReservationDrainedTrigger(
+                    project_id=self.project_id,
+                    location=self.location,
+                    reservation_name=self.reservation_name,
+                    gcp_conn_id=self.gcp_conn_id,
+                    impersonation_chain=self.impersonation_chain,
+                    poll_interval=self.drain_poll_interval,
+                    end=timezone.utcnow()
+                    + datetime.timedelta(seconds=self.drain_timeout),
+                ),
+                method_name="execute_complete",
+            )
+        self._delete()
+
+    def execute_complete(self, context: Any, event: dict[str, Any]) -> None:
+        """
+        Act as a callback for when the drain trigger fires, then delete the resources.
+
+        A failed drain wait does not keep the slots: the resources are deleted anyway.
+        """
+        if event["status"] == "error":
+            self.log.warning(
+                f"Failed to wait the drain of {self.reservation_name}:"
+                f" {event['message']}"
+            )
+        else:
+            self.log.info(event["message"])
+        self._delete()
+
+    def _delete(self) -> None:
         hook = BigQueryReservationServiceHook(
             gcp_conn_id=self.gcp_conn_id,
             impersonation_chain=self.impersonation_chain,
             location=self.location,
         )
 
-        if self.commitment_name or self.reservation_name or self.assignment_name:
+        if self.coalescing_handle:
+            try:
+                PurchaseCoalescer(hook).release(self.coalescing_handle)
+            finally:
+                hook.log_api_summary()
+        elif self.commitment_name or self.reservation_name or self.assignment_name:
             assert (
                 self.slots_provisioning
             ), "Need to define `slots_provisioning`: Number of slots to delete"
-            hook.delete_commitment_reservation_and_assignment(
-                commitment_name=self.commitment_name,
-                reservation_name=self.reservation_name,
-                assignment_name=self.assignment_name,
-                slots=self.slots_provisioning,
-            )
+            try:
+                hook.delete_commitment_reservation_and_assignment(
+                    commitment_name=self.commitment_name,
+                    reservation_name=self.reservation_name,
+                    assignment_name=self.assignment_name,
+                    slots=self.slots_provisioning,
+                    idempotency_key=self.idempotency_key,
+                )
+            finally:
+                hook.log_api_summary()
         else:
             reservation_project_id = self.reservation_project_id or self.project_id
             self.log.info(
@@ -224,11 +813,690 @@ class BigQueryReservationDeleteOperator(BaseOperator):
                 "Delete all reservations on"
                 f" projects/{self.reservation_project_id}/locations/{self.location}"
             )
-            hook.delete_commitments_assignment_associated(
+            try:
+                hook.delete_commitments_assignment_associated(
+                    project_id=self.project_id,
+                    location=self.location,
+                    reservation_project_id=reservation_project_id,
+                )
+            finally:
+                hook.log_api_summary()
+
+
+class BigQueryReservationAutoscaleOperator(BaseOperator):
+    """
+    Scale a BigQuery reservation capacity with its slot utilization.
+
+    The operator loops until `autoscale_duration` elapses, deferring between two
+    evaluations so it does not hold a worker slot. Each evaluation reads the reservation
+    utilization over `lookback` seconds from the `INFORMATION_SCHEMA.JOBS_TIMELINE` of
+    `project_id`, then grows or shrinks the capacity by one `slots_step` within
+    `min_slots` and `max_slots`. The added slots are backed by commitments bought
+    by the operator, released when the capacity shrinks, when the operator fails
+    or when it is killed. The commitments bought are pushed to XCom (`commitments`)
+    after each evaluation, so the slots left by a task cleared while deferred can be released.
+    See documentation: https://cloud.google.com/bigquery/docs/information-schema-jobs-timeline
+
+    :param project_id: Google Cloud Project whose jobs run on the reservation.
+    :param reservation_name: Reservation name
+            e.g. `projects/myproject/locations/US/reservations/test`.
+    :param location: Location where the reservation is attached.
+    :param min_slots: Minimum reservation capacity.
+    :param max_slots: Maximum reservation capacity.
+    :param slots_step: Slots added or removed by a scaling (increment of 100).
+    :param scale_up_utilization: Average utilization ratio triggering a scale up.
+    :param scale_down_utilization: Average utilization ratio triggering a scale down.
+    :param lookback: Utilization window (seconds).
+    :param interval: Time (seconds) between two evaluations.
+    :param autoscale_duration: Time (seconds) the reservation is autoscaled.
+    :param release_on_completion: Release the slots added by the operator when it completes.
+    :param commitments_duration: Commitment minimum durations i.e. one minute (FLEX, default), one month (MONTH) or one year (YEAR).
+    :param gcp_conn_id: Connection ID used to connect to Google Cloud.
+    :param impersonation_chain: Optional service account to impersonate using short-term
+        credentials, or chained list of accounts required to get the access_token
+        of the last account in the list, which will be impersonated in the request.
+        If set as a string, the account must grant the originating account
+        the Service Account Token Creator IAM role.
+        If set as a sequence, the identities from the list must grant
+        Service Account Token Creator IAM role to the directly preceding identity, with first
+        account from the list granting this role to the originating account (templated).
+    """
+
+    template_fields: Sequence[str] = (
+        "project_id",
+        "reservation_name",
+        "location",
+        "min_slots",
+        "max_slots",
+    )
+    ui_color = bq_reservation_operator_color
+
+    def __init__(
+        self,
+        project_id: str,
+        reservation_name: str,
+        location: str,
+        min_slots: int,
+        max_slots: int,
+        slots_step: int = 100,
+        scale_up_utilization: float = 0.8,
+        scale_down_utilization: float = 0.3,
+        lookback: int = 300,
+        interval: float = 60.0,
+        autoscale_duration: float = 3600.0,
+        release_on_completion: bool = True,
+        commitments_duration: str = "FLEX",
+        gcp_conn_id: str = "google_cloud_default",
+        impersonation_chain: str | Sequence[str] | None = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.project_id = project_id
+        self.reservation_name = reservation_name
+        self.location = location
+        self.min_slots = min_slots
+        self.max_slots = max_slots
+        self.slots_step = slots_step
+        self.scale_up_utilization = scale_up_utilization
+        self.scale_down_utilization = scale_down_utilization
+        self.lookback = lookback
+        self.interval = interval
+        self.autoscale_duration = autoscale_duration
+        self.release_on_completion = release_on_completion
+        self.commitments_duration = commitments_duration
+        self.gcp_conn_id = gcp_conn_id
+        self.impersonation_chain = impersonation_chain
+        self.hook: BigQueryReservationServiceHook | None = None
+        self.commitments: list[dict] = []
+
+    def _get_hook(self) -> BigQueryReservationServiceHook:
+        return BigQueryReservationServiceHook(
+            gcp_conn_id=self.gcp_conn_id,
+            impersonation_chain=self.impersonation_chain,
+            location=self.location,
+        )
+
+    def _release_commitments(self, hook: BigQueryReservationServiceHook) -> None:
+        """Shrink the reservation by the slots of the commitments bought by the operator."""
+        if not self.commitments:
+            return
+        self.log.info("Release the slots added by the autoscaling.")
+        current_slots = hook.get_reservation(self.reservation_name).slot_capacity
+        self.commitments = hook.scale_reservation(
+            reservation_name=self.reservation_name,
+            slots=current_slots - sum(c["slots"] for c in self.commitments),
+            commitments=self.commitments,
+        )
+
+    def _get_policy(self) -> AutoscalePolicy:
+        return AutoscalePolicy(
+            min_slots=int(self.min_slots),
+            max_slots=int(self.max_slots),
+            step=self.slots_step,
+            scale_up_utilization=self.scale_up_utilization,
+            scale_down_utilization=self.scale_down_utilization,
+        )
+
+    def execute(self, context: Any) -> None:
+        """Start the autoscaling loop."""
+        self._get_policy()
+        self.evaluate(
+            context,
+            commitments=[],
+            end=timezone.utcnow() + datetime.timedelta(seconds=self.autoscale_duration),
+        )
+
+    def evaluate(
+        self,
+        context: Any,
+        event: Any = None,
+        commitments: list[dict] | None = None,
+        end: datetime.datetime | None = None,
+    ) -> None:
+        """
+        Scale the reservation from its utilization, then defer until the next evaluation.
+
+        :param context: Airflow context
+        :param event: Event of the `TimeDeltaTrigger`
+        :param commitments: Commitments bought by the previous scalings
+        :param end: End of the autoscaling
+        """
+        hook = self.hook = self._get_hook()
+        self.commitments = list(commitments or [])
+        try:
+            utilization = hook.get_reservation_utilization(
                 project_id=self.project_id,
+                reservation_name=self.reservation_name,
+                lookback_seconds=self.lookback,
+            )
+            current_slots = hook.get_reservation(self.reservation_name).slot_capacity
+            target_slots = self._get_policy().target_slots(current_slots, utilization)
+            self.log.info(
+                f"Reservation {self.reservation_name}: {current_slots} slots,"
+                f" {utilization.average_slots:.1f} used on average"
+                f" ({utilization.peak_slots:.0f} at peak),"
+                f" {utilization.pending_jobs} pending jobs -> {target_slots} slots."
+            )
+            self.commitments = hook.scale_reservation(
+                reservation_name=self.reservation_name,
+                slots=target_slots,
+                commitments=self.commitments,
+                commitments_duration=self.commitments_duration,
+            )
+            context["ti"].xcom_push(key="commitments", value=self.commitments)
+
+            if end is None or timezone.utcnow() >= end:
+                if self.release_on_completion:
+                    self._release_commitments(hook)
+                    context["ti"].xcom_push(key="commitments", value=self.commitments)
+                return
+        except Exception:
+            self.log.error("Autoscaling failed: release the slots it added.")
+            self._release_commitments(hook)
+            raise
+        finally:
+            hook.log_api_summary()
+
+        self.defer(
+            trigger=TimeDeltaTrigger(datetime.timedelta(seconds=self.interval)),
+            method_name="evaluate",
+            kwargs={"commitments": self.commitments, "end": end},
+        )
+
+    def on_kill(self) -> None:
+        """Release the slots added by the autoscaling if task is cancelled."""
+        super().on_kill()
+        if self.hook is None:
+            return
+        self._release_commitments(self.hook)
+
+
+class BigQueryReservationPoolLeaseOperator(BaseOperator):
+    """
+    Lease BigQuery slots for a GCP project from a pool of warm slots.
+
+    The first lease of a project buys and assigns the slots as
+    `BigQueryReservationCreateOperator` does. Released slots stay warm for `warm_ttl`
+    seconds: the next leases of the project skip the purchase and the attachment wait.
+    Lease state is stored in an Airflow Variable of the metadata DB, shared by the workers.
+    Push to XCom the `lease_id`, `reservation_name` and `assignment_name`.
+
+    :param project_id: Google Cloud Project where the slots are assigned.
+    :param location: Location where the reservation is attached.
+    :param slots_provisioning: Slots number to lease. Slots can only be reserved in increments of 100.
+    :param reservation_project_id: Google Cloud Project where the reservation is set.
+    :param assignment_job_type: Commitment assignment job type (PIPELINE, QUERY, ML_EXTERNAL, BACKGROUND)
+    :param commitments_duration: Commitment minimum durations i.e. one minute (FLEX, default), one month (MONTH) or one year (YEAR).
+    :param slot_pool: Name of the pool of warm slots.
+    :param warm_ttl: Time (seconds) the slots are kept warm once released.
+    :param lease_ttl: Maximum time (seconds) the lease is held: a lease not released by then
+        (e.g. its DAG run was killed) is reclaimed by the pool. It must exceed the time until its release.
+    :param attachment_probe: Attachment detection strategy of a new assignment: `query` (default, dummy query),
+        `assignment_state` (no-wait mode: active assignment, no job created) or `last_job` (recent jobs of the project).
+    :param attachment_deadline: (Optional) Maximum attachment wait (seconds).
+    :param gcp_conn_id: Connection ID used to connect to Google Cloud.
+    :param impersonation_chain: Optional service account to impersonate using short-term
+        credentials, or chained list of accounts required to get the access_token
+        of the last account in the list, which will be impersonated in the request.
+        If set as a string, the account must grant the originating account
+        the Service Account Token Creator IAM role.
+        If set as a sequence, the identities from the list must grant
+        Service Account Token Creator IAM role to the directly preceding identity, with first
+        account from the list granting this role to the originating account (templated).
+    """
+
+    template_fields: Sequence[str] = (
+        "project_id",
+        "reservation_project_id",
+        "location",
+        "slots_provisioning",
+        "slot_pool",
+    )
+    ui_color = bq_reservation_operator_color
+
+    def __init__(
+        self,
+        project_id: str,
+        location: str,
+        slots_provisioning: int,
+        reservation_project_id: str | None = None,
+        assignment_job_type: str = "QUERY",
+        commitments_duration: str = "FLEX",
+        slot_pool: str = "default",
+        warm_ttl: float = 600.0,
+        lease_ttl: float = 86400.0,
+        attachment_probe: str = "query",
+        attachment_deadline: float | None = None,
+        gcp_conn_id: str = "google_cloud_default",
+        impersonation_chain: str | Sequence[str] | None = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.project_id = project_id
+        self.location = location
+        self.slots_provisioning = slots_provisioning
+        self.reservation_project_id = reservation_project_id
+        self.assignment_job_type = assignment_job_type
+        self.commitments_duration = commitments_duration
+        self.slot_pool = slot_pool
+        self.warm_ttl = warm_ttl
+        self.lease_ttl = lease_ttl
+        self.attachment_probe = attachment_probe
+        self.attachment_deadline = attachment_deadline
+        self.gcp_conn_id = gcp_conn_id
+        self.impersonation_chain = impersonation_chain
+
+    def _get_pool(self) -> SlotPool:
+        return SlotPool(
+            BigQueryReservationServiceHook(
+                gcp_conn_id=self.gcp_conn_id,
+                impersonation_chain=self.impersonation_chain,
+                location=self.location,
+            ),
+            name=self.slot_pool,
+            ttl=self.warm_ttl,
+            lease_ttl=self.lease_ttl,
+        )
+
+    def execute(self, context: Any) -> dict[str, Any]:
+        """Lease slots from the pool."""
+        pool = self._get_pool()
+        ti = context["ti"]
+        try:
+            lease = pool.lease(
+                project_id=self.project_id,
+                slots=int(self.slots_provisioning),
+                job_type=self.assignment_job_type,
+                reservation_project_id=self.reservation_project_id,
+                commitments_duration=self.commitments_duration,
+                attachment_probe=self.attachment_probe,
+                attachment_deadline=self.attachment_deadline,
+                holder=f"{ti.dag_id}/{ti.task_id}/{ti.run_id}/{ti.map_index}",
+            )
+        finally:
+            pool.hook.log_api_summary()
+
+        ti.xcom_push(key="lease_id", value=lease["lease_id"])
+        ti.xcom_push(key="reservation_name", value=lease["reservation_name"])
+        ti.xcom_push(key="assignment_name", value=lease["assignment_name"])
+        return lease
+
+
+class BigQueryReservationPoolReleaseOperator(BaseOperator):
+    """
+    Release BigQuery slots leased from a pool of warm slots.
+
+    The slots stay warm for the TTL of the lease, then are deleted by the next
+    release or lease of the pool. Without `lease_id`, only delete the expired warm
+    slots (e.g. from a scheduled cleanup DAG).
+
+    :param location: Location where the reservation is attached.
+    :param lease_id: (Optional) Lease identifier pushed to XCom by `BigQueryReservationPoolLeaseOperator`.
+    :param slot_pool: Name of the pool of warm slots.
+    :param gcp_conn_id: Connection ID used to connect to Google Cloud.
+    :param impersonation_chain: Optional service account to impersonate using short-term
+        credentials, or chained list of accounts required to get the access_token
+        of the last account in the list, which will be impersonated in the request.
+        If set as a string, the account must grant the originating account
+        the Service Account Token Creator IAM role.
+        If set as a sequence, the identities from the list must grant
+        Service Account Token Creator IAM role to the directly preceding identity, with first
+        account from the list granting this role to the originating account (templated).
+    """
+
+    template_fields: Sequence[str] = ("location", "lease_id", "slot_pool")
+    ui_color = bq_reservation_operator_color
+
+    def __init__(
+        self,
+        location: str,
+        lease_id: str | None = None,
+        slot_pool: str = "default",
+        gcp_conn_id: str = "google_cloud_default",
+        impersonation_chain: str | Sequence[str] | None = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.location = location
+        self.lease_id = lease_id
+        self.slot_pool = slot_pool
+        self.gcp_conn_id = gcp_conn_id
+        self.impersonation_chain = impersonation_chain
+
+    def _get_pool(self) -> SlotPool:
+        return SlotPool(
+            BigQueryReservationServiceHook(
+                gcp_conn_id=self.gcp_conn_id,
+                impersonation_chain=self.impersonation_chain,
                 location=self.location,
-                reservation_project_id=reservation_project_id,
+            ),
+            name=self.slot_pool,
+        )
+
+    def execute(self, context: Any) -> None:
+        """Release the lease and delete the expired warm slots."""
+        pool = self._get_pool()
+        try:
+            if self.lease_id:
+                pool.release(self.lease_id)
+            else:
+                pool.reap()
+        finally:
+            pool.hook.log_api_summary()
+
+
+class BigQueryReservationPreProvisionOperator(BaseOperator):
+    """
+    Buy and assign BigQuery slots so they are attached when the next run of a DAG starts.
+
+    The operator reads the next run of `target_dag_id` from its timetable (the date
+    the scheduler creates it), then defers until this date minus the provisioning
+    lead time and `safety_margin`. The lead time is the `latency_percentile` of the
+    past provisioning durations of the task (commitment, reservation, assignment and
+    attachment wait), pushed to XCom (`provisioning_duration`) by each run. Before the
+    first run, the durations of the provisioning history of the location and job type
+    (see `ProvisioningHistory`) are used, or `default_lead_time` without history.
+    The resources names are pushed to XCom as `BigQueryReservationCreateOperator` does.
+
+    :param target_dag_id: DAG whose next run uses the slots.
+    :param project_id: Google Cloud Project where the reservation is assigned.
+    :param location: Location where the reservation is attached.
+    :param slots_provisioning: Slots number to provision. Slots can only be reserved in increments of 100.
+    :param reservation_project_id: Google Cloud Project where the reservation is set.
+    :param commitments_duration: Commitment minimum durations i.e. one minute (FLEX, default), one month (MONTH) or one year (YEAR).
+    :param assignment_job_type: Commitment assignment job type (PIPELINE, QUERY, ML_EXTERNAL, BACKGROUND)
+    :param latency_percentile: Percentile of the past provisioning durations used as lead time.
+    :param default_lead_time: Lead time (seconds) without past provisionings.
+    :param safety_margin: Time (seconds) the slots should be attached before the run.
+    :param history_size: Number of past provisionings considered.
+    :param gcp_conn_id: Connection ID used to connect to Google Cloud.
+    :param impersonation_chain: Optional service account to impersonate using short-term
+        credentials, or chained list of accounts required to get the access_token
+        of the last account in the list, which will be impersonated in the request.
+        If set as a string, the account must grant the originating account
+        the Service Account Token Creator IAM role.
+        If set as a sequence, the identities from the list must grant
+        Service Account Token Creator IAM role to the directly preceding identity, with first
+        account from the list granting this role to the originating account (templated).
+    :param attachment_probe: Attachment detection strategy: `query` (default, dummy query),
+        `assignment_state` (no-wait mode: active assignment, no job created) or `last_job` (recent jobs of the project).
+    :param attachment_deadline: (Optional) Maximum attachment wait (seconds).
+    """
+
+    template_fields: Sequence[str] = (
+        "target_dag_id",
+        "project_id",
+        "reservation_project_id",
+        "location",
+        "slots_provisioning",
+        "commitments_duration",
+    )
+    ui_color = bq_reservation_operator_color
+
+    def __init__(
+        self,
+        target_dag_id: str,
+        project_id: str | None,
+        location: str,
+        slots_provisioning: int,
+        reservation_project_id: str | None = None,
+        commitments_duration: str = "FLEX",
+        assignment_job_type: str = "QUERY",
+        latency_percentile: float = 95,
+        default_lead_time: float = 600.0,
+        safety_margin: float = 60.0,
+        history_size: int = 20,
+        gcp_conn_id: str = "google_cloud_default",
+        impersonation_chain: str | Sequence[str] | None = None,
+        attachment_probe: str = "query",
+        attachment_deadline: float | None = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.target_dag_id = target_dag_id
+        self.project_id = project_id
+        self.location = location
+        self.slots_provisioning = slots_provisioning
+        self.reservation_project_id = reservation_project_id
+        self.commitments_duration = commitments_duration
+        self.assignment_job_type = assignment_job_type
+        self.latency_percentile = latency_percentile
+        self.default_lead_time = default_lead_time
+        self.safety_margin = safety_margin
+        self.history_size = history_size
+        self.gcp_conn_id = gcp_conn_id
+        self.impersonation_chain = impersonation_chain
+        self.attachment_probe = attachment_probe
+        self.attachment_deadline = attachment_deadline
+
+    def _get_hook(self) -> BigQueryReservationServiceHook:
+        return BigQueryReservationServiceHook(
+            gcp_conn_id=self.gcp_conn_id,
+            impersonation_chain=self.impersonation_chain,
+            location=self.location,
+        )
+
+    def _get_next_run(self) -> datetime.datetime:
+        """Get the date the next run of the target DAG is created."""
+        dag_model = DagModel.get_dagmodel(self.target_dag_id)
+        if dag_model is None or dag_model.next_dagrun_create_after is None:
+            self.log.error(f"{self.target_dag_id} has no next run scheduled.")
+            raise AirflowException(
+                f"Failed to get the next run of the DAG {self.target_dag_id}."
+            )
+        return dag_model.next_dagrun_create_after
+
+    def _get_provisioning_history(self, context: Any) -> list[float]:
+        """Get the past provisioning durations (seconds) of the task, or of the location."""
+        xcoms = XCom.get_many(
+            key="provisioning_duration",
+            dag_ids=self.dag_id,
+            task_ids=self.task_id,
+            include_prior_dates=True,
+            limit=self.history_size,
+            run_id=context["run_id"],
+        )
+        durations = [float(XCom.deserialize_value(xcom)) for xcom in xcoms]
+        if durations:
+            return durations
+        timelines = ProvisioningHistory(self.location).timelines(
+            job_type=self.assignment_job_type, probe=self.attachment_probe
+        )
+        return [
+            timeline.durations()["total"]
+            for timeline in timelines[-self.history_size :]
+            if "total" in timeline.durations()
+        ]
+
+    def execute(self, context: Any) -> None:
+        """Defer until the slots should be provisioned, then provision them."""
+        self.provision(context)
+
+    def provision(self, context: Any, event: Any = None) -> None:
+        """
+        Provision the slots if the lead time of the next run is reached, defer otherwise.
+
+        The next run is read again after each deferral, as the timetable could change.
+        """
+        next_run = self._get_next_run()
+        lead_time = provisioning_lead_time(
+            self._get_provisioning_history(context),
+            self.latency_percentile,
+            self.default_lead_time,
+        )
+        start = next_run - datetime.timedelta(seconds=lead_time + self.safety_margin)
+        self.log.info(
+            f"Next run of {self.target_dag_id} at {next_run.isoformat()},"
+            f" provisioning lead time {lead_time:.0f}s: provisioning at {start.isoformat()}."
+        )
+        if timezone.utcnow() < start:
+            self.defer(
+                trigger=DateTimeTrigger(moment=start),
+                method_name="provision",
+            )
+
+        hook = self._get_hook()
+        begin = time.monotonic()
+        try:
+            hook.create_commitment_reservation_and_assignment(
+                slots=self.slots_provisioning,
+                assignment_job_type=self.assignment_job_type,
+                commitments_duration=self.commitments_duration,
+                project_id=self.project_id,
+                reservation_project_id=self.reservation_project_id,
+                attachment_probe=self.attachment_probe,
+                attachment_deadline=self.attachment_deadline,
             )
+        finally:
+            hook.log_api_summary()
+        duration = time.monotonic() - begin
+        record_provisioning(hook.provisioning_timeline)
+
+        ready_before = (next_run - timezone.utcnow()).total_seconds()
+        self.log.info(
+            f"Slots attached in {duration:.1f}s, {ready_before:.0f}s before the next run"
+            f" of {self.target_dag_id}."
+            if ready_before >= 0
+            else f"Slots attached in {duration:.1f}s, {-ready_before:.0f}s after the"
+            f" next run of {self.target_dag_id}."
+        )
+        ti = context["ti"]
+        ti.xcom_push(key="commitment_name", value=hook._get_commitment().name)
+        ti.xcom_push(key="reservation_name", value=hook._get_reservation().name)
+        ti.xcom_push(key="assignment_name", value=hook._get_assignment().name)
+        ti.xcom_push(key="provisioning_duration", value=duration)
+
+
+class BigQueryReservationUtilizationReportOperator(BaseOperator):
+    """
+    Report how much of the slots bought by a commitment were used by a reservation.
+
+    The operator reads the per-second jobs timeline of the reservation over its active
+    window (from the commitment start, at most `max_window` seconds, to `end`) from the
+    `INFORMATION_SCHEMA.JOBS_TIMELINE` of `project_id`, then computes the slot-ms used
+    against the slot-ms bought, the peak concurrency and the idle share of the window.
+    The summary is pushed to XCom (`commitment_utilization`) and emitted as metrics.
+    Run it before the deletion of the commitment, or give `slots` and `start`.
+    See documentation: https://cloud.google.com/bigquery/docs/information-schema-jobs-timeline
+
+    :param project_id: Google Cloud Project whose jobs run on the reservation. (templated)
+    :param location: Location of the commitment. (templated)
+    :param commitment_name: Commitment name e.g. the `commitment_name` XCom
+        of `BigQueryReservationCreateOperator`. (templated)
+    :param reservation_name: Reservation name e.g. the `reservation_name` XCom
+        of `BigQueryReservationCreateOperator`. (templated)
+    :param slots: (Optional) Slots bought, by default the commitment slots. (templated)
+    :param start: (Optional) Start of the window, by default the commitment start. (templated)
+    :param end: (Optional) End of the window, by default now. (templated)
+    :param max_window: Maximum window duration (seconds).
+    :param gcp_conn_id: Connection ID used to connect to Google Cloud.
+    :param impersonation_chain: Optional service account to impersonate using short-term
+        credentials, or chained list of accounts required to get the access_token
+        of the last account in the list, which will be impersonated in the request.
+        If set as a string, the account must grant the originating account
+        the Service Account Token Creator IAM role.
+        If set as a sequence, the identities from the list must grant
+        Service Account Token Creator IAM role to the directly preceding identity, with first
+        account from the list granting this role to the originating account (templated).
+    """
+
+    template_fields: Sequence[str] = (
+        "project_id",
+        "location",
+        "commitment_name",
+        "reservation_name",
+        "slots",
+        "start",
+        "end",
+        "impersonation_chain",
+    )
+    ui_color = bq_reservation_operator_color
+
+    def __init__(
+        self,
+        project_id: str,
+        location: str,
+        commitment_name: str,
+        reservation_name: str,
+        slots: int | None = None,
+        start: str | datetime.datetime | None = None,
+        end: str | datetime.datetime | None = None,
+        max_window: int = 86400,
+        gcp_conn_id: str = "google_cloud_default",
+        impersonation_chain: str | Sequence[str] | None = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.project_id = project_id
+        self.location = location
+        self.commitment_name = commitment_name
+        self.reservation_name = reservation_name
+        self.slots = slots
+        self.start = start
+        self.end = end
+        self.max_window = max_window
+        self.gcp_conn_id = gcp_conn_id
+        self.impersonation_chain = impersonation_chain
+
+    @staticmethod
+    def _parse(value: str | datetime.datetime) -> datetime.datetime:
+        return timezone.parse(value) if isinstance(value, str) else value
+
+    def execute(self, context: Any) -> None:
+        """Report the commitment utilization over its active window."""
+        hook = BigQueryReservationServiceHook(
+            gcp_conn_id=self.gcp_conn_id,
+            impersonation_chain=self.impersonation_chain,
+            location=self.location,
+        )
+
+        slots = self.slots
+        start = self._parse(self.start) if self.start else None
+        if slots is None or start is None:
+            commitment = hook.get_capacity_commitment(name=self.commitment_name)
+            slots = commitment.slot_count if slots is None else slots
+            if start is None:
+                # proto-plus returns the timestamps as datetimes
+                start = cast(datetime.datetime, commitment.commitment_start_time)
+        end = self._parse(self.end) if self.end else timezone.utcnow()
+        start = max(start, end - datetime.timedelta(seconds=self.max_window)).replace(
+            microsecond=0
+        )
+        window_seconds = math.ceil((end - start).total_seconds())
+
+        utilization = summarize_utilization(
+            hook.get_commitment_timeline(
+                project_id=self.project_id,
+                reservation_name=self.reservation_name,
+                start=start,
+                end=end,
+            ),
+            window_seconds=window_seconds,
+            slots=int(slots),
+        )
+        self.log.info(
+            f"{self.commitment_name}: {utilization.utilization:.0%} of the"
+            f" {utilization.slots} slots used over {window_seconds}s, peak of"
+            f" {utilization.peak_slots:.0f} slots and {utilization.peak_jobs} jobs,"
+            f" idle {utilization.idle_share:.0%} of the time."
+        )
+        emit_commitment_utilization(
+            self.location,
+            utilization=utilization.utilization,
+            idle_share=utilization.idle_share,
+            peak_slots=utilization.peak_slots,
+            peak_jobs=utilization.peak_jobs,
+        )
+        context["ti"].xcom_push(
+            key="commitment_utilization",
+            value={
+                "commitment_name": self.commitment_name,
+                "reservation_name": self.reservation_name,
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+                **utilization.to_dict(),
+            },
+        )
 
 
 class BigQueryBiEngineReservationCreateOperator(BaseOperator):
@@ -239,6 +1507,11 @@ class BigQueryBiEngineReservationCreateOperator(BaseOperator):
     :param size: The BI Engine reservation memory size (GB). (templated)
     :param project_id: (Optional) The name of the project where the reservation
         will be attached from. (templated)
+    :param preferred_tables: (Optional) Table IDs `project.dataset.table` accelerated
+        in priority by the reservation, the other tables get no BI Engine memory.
+        Without them, the preferred tables are unchanged. (templated)
+    :param preferred_tables_mode: `add` the preferred tables to the current ones,
+        `remove` them from the current ones or `replace` the current ones by them.
     :param gcp_conn_id: (Optional) The connection ID used to connect to Google Cloud. (templated)
     :param impersonation_chain: Optional service account to impersonate using short-term
         credentials, or chained list of accounts required to get the access_token
@@ -255,6 +1528,7 @@ class BigQueryBiEngineReservationCreateOperator(BaseOperator):
         "project_id",
         "location",
         "size",
+        "preferred_tables",
         "gcp_conn_id",
         "impersonation_chain",
     )
@@ -264,6 +1538,8 @@ class BigQueryBiEngineReservationCreateOperator(BaseOperator):
         location: str,
         size: int,
         project_id: str | None = None,
+        preferred_tables: Sequence[str] | None = None,
+        preferred_tables_mode: str = "add",
         gcp_conn_id: str = "google_cloud_default",
         impersonation_chain: str | Sequence[str] | None = None,
         cancel_on_kill: bool = True,
@@ -273,6 +1549,8 @@ class BigQueryBiEngineReservationCreateOperator(BaseOperator):
         self.project_id = project_id
         self.location = location
         self.size = size
+        self.preferred_tables = preferred_tables
+        self.preferred_tables_mode = preferred_tables_mode
         self.gcp_conn_id = gcp_conn_id
         self.impersonation_chain = impersonation_chain
         self.cancel_on_kill = cancel_on_kill
@@ -285,7 +1563,12 @@ class BigQueryBiEngineReservationCreateOperator(BaseOperator):
             location=self.location,
         )
 
-        hook.create_bi_reservation(project_id=self.project_id, size=self.size)
+        hook.create_bi_reservation(
+            project_id=self.project_id,
+            size=self.size,
+            preferred_tables=self.preferred_tables,
+            preferred_tables_mode=self.preferred_tables_mode,
+        )
 
 
 class BigQueryBiEngineReservationDeleteOperator(BaseOperator):
@@ -295,6 +1578,8 @@ class BigQueryBiEngineReservationDeleteOperator(BaseOperator):
     :param project_id: Google Cloud Project where the reservation is attached. (templated)
     :param location: Location where the reservation is attached. (templated)
     :param size: (Optional) BI Engine reservation size to delete (GB).
+    :param preferred_tables: (Optional) Table IDs `project.dataset.table` removed
+        from the preferred tables. (templated)
     :param gcp_conn_id: The connection ID used to connect to Google Cloud. (templated)
     :param impersonation_chain: Optional service account to impersonate using short-term
         credentials, or chained list of accounts required to get the access_token
@@ -311,6 +1596,7 @@ class BigQueryBiEngineReservationDeleteOperator(BaseOperator):
         "project_id",
         "location",
         "size",
+        "preferred_tables",
         "gcp_conn_id",
         "impersonation_chain",
     )
@@ -320,6 +1606,7 @@ class BigQueryBiEngineReservationDeleteOperator(BaseOperator):
         project_id: str | None,
         location: str,
         size: int | None = None,
+        preferred_tables: Sequence[str] | None = None,
         gcp_conn_id: str = "google_cloud_default",
         impersonation_chain: str | Sequence[str] | None = None,
         cancel_on_kill: bool = True,
@@ -329,6 +1616,7 @@ class BigQueryBiEngineReservationDeleteOperator(BaseOperator):
         self.project_id = project_id
         self.location = location
         self.size = size
+        self.preferred_tables = preferred_tables
         self.gcp_conn_id = gcp_conn_id
         self.impersonation_chain = impersonation_chain
         self.cancel_on_kill = cancel_on_kill
@@ -344,4 +1632,91 @@ class BigQueryBiEngineReservationDeleteOperator(BaseOperator):
         hook.delete_bi_reservation(
             project_id=self.project_id,
             size=self.size,
+            preferred_tables=self.preferred_tables,
+        )
+
+
+class BigQueryBiEngineReservationAdvisorOperator(BaseOperator):
+    """
+    Recommend, or apply, a BI Engine reservation size from the past queries.
+
+    The operator reads the BI Engine statistics of the queries of `project_id` over
+    `lookback_hours` from `INFORMATION_SCHEMA.JOBS`: acceleration mode, reasons of no
+    acceleration and bytes processed by table. The working set of each hour is the
+    sum of the bytes processed on the tables queried in the hour, and the size
+    recommended is the smallest one fitting the hourly working sets of
+    `target_share` of the queries. The sizing is pushed to XCom (`bi_engine_sizing`)
+    for audit.
+    See documentation: https://cloud.google.com/bigquery/docs/information-schema-jobs
+
+    :param project_id: Google Cloud Project of the queries and the BI Engine reservation. (templated)
+    :param location: Location of the BI Engine reservation. (templated)
+    :param lookback_hours: Window (hours) of the queries statistics.
+    :param target_share: Share of the queries whose hourly working set should fit
+        in the reservation e.g. `0.95`.
+    :param max_size: Maximum size recommended (GB).
+    :param apply: Resize the BI Engine reservation to the recommended size.
+    :param gcp_conn_id: The connection ID used to connect to Google Cloud. (templated)
+    :param impersonation_chain: Optional service account to impersonate using short-term
+        credentials, or chained list of accounts required to get the access_token
+        of the last account in the list, which will be impersonated in the request.
+        If set as a string, the account must grant the originating account
+        the Service Account Token Creator IAM role.
+        If set as a sequence, the identities from the list must grant
+        Service Account Token Creator IAM role to the directly preceding identity, with first
+        account from the list granting this role to the originating account. (templated)
+    """
+
+    template_fields: Sequence[str] = (
+        "project_id",
+        "location",
+        "gcp_conn_id",
+        "impersonation_chain",
+    )
+
+    def __init__(
+        self,
+        project_id: str,
+        location: str,
+        lookback_hours: int = 168,
+        target_share: float = 0.95,
+        max_size: int = BI_ENGINE_MAX_SIZE,
+        apply: bool = False,
+        gcp_conn_id: str = "google_cloud_default",
+        impersonation_chain: str | Sequence[str] | None = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.project_id = project_id
+        self.location = location
+        self.lookback_hours = lookback_hours
+        self.target_share = target_share
+        self.max_size = max_size
+        self.apply = apply
+        self.gcp_conn_id = gcp_conn_id
+        self.impersonation_chain = impersonation_chain
+
+    def execute(self, context: Any) -> None:
+        """Recommend a BI Engine reservation size, then apply it if requested."""
+        hook = BigQueryReservationServiceHook(
+            gcp_conn_id=self.gcp_conn_id,
+            impersonation_chain=self.impersonation_chain,
+            location=self.location,
         )
+
+        sizing = recommend_bi_engine_size(
+            hook.get_bi_engine_usage(
+                project_id=self.project_id, lookback_hours=self.lookback_hours
+            ),
+            target_share=self.target_share,
+            max_size=self.max_size,
+        )
+        self.log.info(
+            f"BI Engine size of {sizing.size}GB recommended for {self.project_id}:"
+            f" {sizing.covered_share:.0%} of the {sizing.queries:.0f} queries covered,"
+            f" {sizing.accelerated_share:.0%} accelerated."
+        )
+        if self.apply:
+            hook.resize_bi_reservation(project_id=self.project_id, size=sizing.size)
+
+        context["ti"].xcom_push(key="bi_engine_sizing", value=sizing.to_dict())
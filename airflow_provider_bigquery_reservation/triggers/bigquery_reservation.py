@@ -0,0 +1,241 @@
+"""This module contains Google BigQuery reservation triggers."""
+from __future__ import annotations
+import asyncio
+import datetime
+import time
+from typing import Any, AsyncIterator, Sequence
+
+from airflow.triggers.base import BaseTrigger, TriggerEvent
+from airflow.utils import timezone
+from airflow_provider_bigquery_reservation.hooks.attachment import (
+    AttachmentBackoff,
+    AttachmentTarget,
+    async_wait_for_attachment,
+    get_attachment_probe,
+)
+from airflow_provider_bigquery_reservation.hooks.bigquery_reservation import (
+    BigQueryReservationServiceAsyncHook,
+)
+from airflow_provider_bigquery_reservation.hooks.metrics import emit_wait
+
+
+class BigQueryReservationAssignmentAttachedTrigger(BaseTrigger):
+    """
+    Wait, on the triggerer, that a reservation assignment is attached to the project queries.
+
+    The attachment is checked with the `attachment_probe` strategy (by default a dummy
+    query run on a reservation or not) with exponential and jittered intervals.
+    See documentation: https://cloud.google.com/bigquery/docs/reservations-assignments#assign-project-to-none
+
+    :param project_id: Google Cloud Project where the reservation is assigned.
+    :param location: Location where the reservation is attached.
+    :param gcp_conn_id: Connection ID used to connect to Google Cloud.
+    :param impersonation_chain: Optional service account to impersonate using short-term
+        credentials, or chained list of accounts required to get the access_token
+        of the last account in the list, which will be impersonated in the request.
+        If set as a string, the account must grant the originating account
+        the Service Account Token Creator IAM role.
+        If set as a sequence, the identities from the list must grant
+        Service Account Token Creator IAM role to the directly preceding identity, with first
+        account from the list granting this role to the originating account.
+    :param poll_interval: Maximum time (seconds) to wait between two attachment checks.
+    :param job_type: Assignment job type.
+    :param reservation_project_id: Google Cloud Project where the reservation is set.
+    :param attachment_probe: Attachment detection strategy name (see `ATTACHMENT_PROBES`).
+    :param deadline: (Optional) Maximum attachment wait (seconds).
+    :param since: (Optional) Creation date of the assignment.
+    """
+
+    def __init__(
+        self,
+        project_id: str,
+        location: str,
+        gcp_conn_id: str = "google_cloud_default",
+        impersonation_chain: str | Sequence[str] | None = None,
+        poll_interval: float = 15.0,
+        job_type: str = "QUERY",
+        reservation_project_id: str | None = None,
+        attachment_probe: str = "query",
+        deadline: float | None = None,
+        since: datetime.datetime | None = None,
+    ) -> None:
+        super().__init__()
+        self.project_id = project_id
+        self.location = location
+        self.gcp_conn_id = gcp_conn_id
+        self.impersonation_chain = impersonation_chain
+        self.poll_interval = poll_interval
+        self.job_type = job_type
+        self.reservation_project_id = reservation_project_id
+        self.attachment_probe = attachment_probe
+        self.deadline = deadline
+        self.since = since
+
+    def serialize(self) -> tuple[str, dict[str, Any]]:
+        """Serialize the trigger arguments and classpath."""
+        return (
+            "airflow_provider_bigquery_reservation.triggers.bigquery_reservation."
+            "BigQueryReservationAssignmentAttachedTrigger",
+            {
+                "project_id": self.project_id,
+                "location": self.location,
+                "gcp_conn_id": self.gcp_conn_id,
+                "impersonation_chain": self.impersonation_chain,
+                "poll_interval": self.poll_interval,
+                "job_type": self.job_type,
+                "reservation_project_id": self.reservation_project_id,
+                "attachment_probe": self.attachment_probe,
+                "deadline": self.deadline,
+                "since": self.since,
+            },
+        )
+
+    def _get_hook(self) -> BigQueryReservationServiceAsyncHook:
+        return BigQueryReservationServiceAsyncHook(
+            gcp_conn_id=self.gcp_conn_id,
+            impersonation_chain=self.impersonation_chain,
+            location=self.location,
+        )
+
+    async def run(self) -> AsyncIterator[TriggerEvent]:
+        """Poll the assignment attachment until it could be used by a query."""
+        try:
+            hook = self._get_hook()
+            probe = get_attachment_probe(self.attachment_probe)
+            target = AttachmentTarget(
+                project_id=self.project_id,
+                location=self.location,
+                job_type=self.job_type,
+                reservation_project_id=self.reservation_project_id,
+                since=self.since,
+            )
+
+            attachment_duration = await async_wait_for_attachment(
+                lambda: probe.async_is_attached(hook, target),
+                backoff=AttachmentBackoff(
+                    initial_interval=min(1.0, self.poll_interval),
+                    max_interval=self.poll_interval,
+                    deadline=self.deadline,
+                ),
+            )
+
+            emit_wait("attachment", self.location, attachment_duration)
+
+            yield TriggerEvent(
+                {
+                    "status": "success",
+                    "message": f"Assignment attached on the project {self.project_id}"
+                    f" in {attachment_duration:.1f} seconds.",
+                    "attachment_duration": attachment_duration,
+                    "attached_at": timezone.utcnow().isoformat(),
+                }
+            )
+        except Exception as e:
+            self.log.exception(e)
+            yield TriggerEvent({"status": "error", "message": str(e)})
+
+
+class BigQueryReservationDrainedTrigger(BaseTrigger):
+    """
+    Wait, on the triggerer, that the jobs of a project running on a reservation finish.
+
+    The running jobs are counted from the `INFORMATION_SCHEMA.JOBS` of the project
+    every `poll_interval` seconds, until there are none or `end` passes.
+    See documentation: https://cloud.google.com/bigquery/docs/information-schema-jobs
+
+    :param project_id: Google Cloud Project whose jobs run on the reservation.
+    :param location: Location of the reservation.
+    :param reservation_name: Reservation name
+        e.g. `projects/myproject/locations/US/reservations/test`.
+    :param gcp_conn_id: Connection ID used to connect to Google Cloud.
+    :param impersonation_chain: Optional service account to impersonate using short-term
+        credentials, or chained list of accounts required to get the access_token
+        of the last account in the list, which will be impersonated in the request.
+        If set as a string, the account must grant the originating account
+        the Service Account Token Creator IAM role.
+        If set as a sequence, the identities from the list must grant
+        Service Account Token Creator IAM role to the directly preceding identity, with first
+        account from the list granting this role to the originating account.
+    :param poll_interval: Time (seconds) between two counts of the running jobs.
+    :param end: (Optional) End of the wait, even if jobs are still running.
+    """
+
+    def __init__(
+        self,
+        project_id: str,
+        location: str,
+        reservation_name: str,
+        gcp_conn_id: str = "google_cloud_default",
+        impersonation_chain: str | Sequence[str] | None = None,
+        poll_interval: float = 30.0,
+        end: datetime.datetime | None = None,
+    ) -> None:
+        super().__init__()
+        self.project_id = project_id
+        self.location = location
+        self.reservation_name = reservation_name
+        self.gcp_conn_id = gcp_conn_id
+        self.impersonation_chain = impersonation_chain
+        self.poll_interval = poll_interval
+        self.end = end
+
+    def serialize(self) -> tuple[str, dict[str, Any]]:
+        """Serialize the trigger arguments and classpath."""
+        return (
+            "airflow_provider_bigquery_reservation.triggers.bigquery_reservation."
+            "BigQueryReservationDrainedTrigger",
+            {
+                "project_id": self.project_id,
+                "location": self.location,
+                "reservation_name": self.reservation_name,
+                "gcp_conn_id": self.gcp_conn_id,
+                "impersonation_chain": self.impersonation_chain,
+                "poll_interval": self.poll_interval,
+                "end": self.end,
+            },
+        )
+
+    def _get_hook(self) -> BigQueryReservationServiceAsyncHook:
+        return BigQueryReservationServiceAsyncHook(
+            gcp_conn_id=self.gcp_conn_id,
+            impersonation_chain=self.impersonation_chain,
+            location=self.location,
+        )
+
+    async def run(self) -> AsyncIterator[TriggerEvent]:
+        """Poll the jobs running on the reservation until they finish or the end passes."""
+        start = time.monotonic()
+        try:
+            hook = self._get_hook()
+            while True:
+                running_jobs = await hook.count_reservation_running_jobs(
+                    project_id=self.project_id,
+                    reservation_name=self.reservation_name,
+                )
+                if not running_jobs or (self.end and timezone.utcnow() >= self.end):
+                    break
+                self.log.info(
+                    f"{running_jobs} jobs of {self.project_id} still running"
+                    f" on {self.reservation_name}."
+                )
+                await asyncio.sleep(self.poll_interval)
+
+            drain_duration = time.monotonic() - start
+            emit_wait("drain", self.location, drain_duration)
+
+            yield TriggerEvent(
+                {
+                    "status": "success",
+                    "message": f"Reservation {self.reservation_name} drained"
+                    f" in {drain_duration:.1f} seconds."
+                    if not running_jobs
+                    else f"{running_jobs} jobs still running on"
+                    f" {self.reservation_name} at the end of the drain.",
+                    "drained": not running_jobs,
+                    "running_jobs": running_jobs,
+                    "drain_duration": drain_duration,
+                }
+            )
+        except Exception as e:
+            self.log.exception(e)
+            yield TriggerEvent({"status": "error", "message": str(e)})
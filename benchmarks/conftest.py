@@ -0,0 +1,118 @@
+"""Fixtures of the hook benchmarks run against the in-memory Reservation API fake."""
+from __future__ import annotations
+import os
+import tracemalloc
+from typing import Callable
+from unittest import mock
+
+import pytest
+from airflow_provider_bigquery_reservation.hooks.bigquery_reservation import (
+    BigQueryReservationServiceHook,
+)
+from google.cloud.bigquery_reservation_v1 import (
+    Assignment,
+    CapacityCommitment,
+    Reservation,
+)
+
+from tests.fake_reservation import FakeReservationApi
+from tests.utils import mock_base_gcp_hook_no_default_project_id
+
+
+PROJECT_ID = "bench-project"
+LOCATION = "US"
+PARENT = f"projects/{PROJECT_ID}/locations/{LOCATION}"
+SLOTS = 100
+# Simulated latency (seconds) of each Reservation API call
+RPC_LATENCY = float(os.environ.get("BENCHMARK_RPC_LATENCY", "0.0005"))
+INVENTORY_SIZES = [10, 100, 1000, 10000]
+
+
+def new_hook() -> BigQueryReservationServiceHook:
+    """Create a hook without connection, its clients are patched by the fake."""
+    with mock.patch(
+        "airflow_provider_bigquery_reservation.hooks."
+        + "bigquery_reservation.GoogleBaseHook.__init__",
+        new=mock_base_gcp_hook_no_default_project_id,
+    ):
+        return BigQueryReservationServiceHook(location=LOCATION)
+
+
+def populate(api: FakeReservationApi, size: int, assignee_every: int = 0) -> None:
+    """
+    Reset the fake with `size` chains of commitment, reservation and assignment.
+
+    :param api: Fake Reservation API
+    :param size: Number of chains
+    :param assignee_every: Assign one chain out of `assignee_every` to `PROJECT_ID`
+        (the others are assigned to distinct projects), 0 to assign none.
+    """
+    api.reset()
+    with api.lock:
+        for index in range(size):
+            resource_id = f"airflow-project-{index}-assignement-{index:010x}"
+            commitment = CapacityCommitment(
+                name=f"{PARENT}/capacityCommitments/{resource_id}", slot_count=SLOTS
+            )
+            reservation = Reservation(
+                name=f"{PARENT}/reservations/{resource_id}", slot_capacity=SLOTS
+            )
+            assignee = (
+                PROJECT_ID
+                if assignee_every and not index % assignee_every
+                else f"project-{index}"
+            )
+            assignment = Assignment(
+                name=f"{reservation.name}/assignments/{index}",
+                assignee=f"projects/{assignee}",
+                job_type="QUERY",
+                state="ACTIVE",
+            )
+            api.add_commitment(commitment)
+            api.add_reservation(reservation)
+            # Created long ago: attached to the queries
+            api.add_assignment(assignment, created_at=float("-inf"))
+
+
+def measure_once(api: FakeReservationApi, setup: Callable, target: Callable) -> dict:
+    """
+    Run the target once, out of the timed rounds, to count its RPCs and peak memory.
+
+    :param api: Fake Reservation API
+    :param setup: Callable returning the target args and kwargs
+    :param target: Benchmarked callable
+    """
+    args, kwargs = setup()
+    rpc_counts = api.rpc_counts.copy()
+    tracemalloc.start()
+    try:
+        target(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "rpc_count": sum((api.rpc_counts - rpc_counts).values()),
+        "rpc_by_method": dict(api.rpc_counts - rpc_counts),
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+
+@pytest.fixture
+def fake_api():
+    """Patch the hooks clients with a fake Reservation API of simulated latency."""
+    api = FakeReservationApi(latency=RPC_LATENCY)
+    with api.patch():
+        yield api
+
+
+@pytest.fixture
+def run_benchmark(benchmark, fake_api):
+    """Benchmark a hook path: timed rounds on a fresh inventory, then one measured run."""
+
+    def run(setup: Callable, target: Callable, size: int) -> None:
+        rounds = 5 if size <= 100 else 1
+        benchmark.extra_info.update(measure_once(fake_api, setup, target))
+        benchmark.extra_info["inventory_size"] = size
+        benchmark.pedantic(target, setup=setup, rounds=rounds, iterations=1)
+
+    return run
@@ -0,0 +1,340 @@
+"""
+Load test of the provisioning and teardown operators run by concurrent DAG runs.
+
+Every simulated DAG run provisions slots for an assignee project with
+`BigQueryReservationCreateOperator` then releases them with
+`BigQueryReservationDeleteOperator`. All the reservations are on the same admin
+project and the Reservation API is the shared in-memory fake, with a simulated latency.
+
+The report gives the throughput and the latency percentiles of each operation, then
+checks the final state: the slots left committed and reserved must be the slots of
+the DAG runs whose deletion failed, none otherwise.
+
+    python -m benchmarks.load_test --runs 200 --concurrency 50 --projects 200
+"""
+from __future__ import annotations
+import argparse
+import logging
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable
+from unittest import mock
+
+from airflow_provider_bigquery_reservation.hooks.bigquery_reservation import (
+    BigQueryReservationServiceHook,
+)
+from airflow_provider_bigquery_reservation.hooks.latency import percentile
+from airflow_provider_bigquery_reservation.hooks.rate_limiter import (
+    RateLimitedClient,
+    RateLimiter,
+)
+from airflow_provider_bigquery_reservation.operators.bigquery_reservation import (
+    BigQueryReservationCreateOperator,
+    BigQueryReservationDeleteOperator,
+)
+
+from tests.fake_reservation import FakeReservationApi
+from tests.utils import VariableState, mock_base_gcp_hook_no_default_project_id
+
+
+ADMIN_PROJECT = "load-admin-project"
+LOCATION = "US"
+PARENT = f"projects/{ADMIN_PROJECT}/locations/{LOCATION}"
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class OperationStats:
+    """Latencies (seconds) of the successful calls of an operation and its failures."""
+
+    durations: list[float] = field(default_factory=list)
+    failures: int = 0
+
+    def summary(self, elapsed: float) -> str:
+        """
+        Summarize the throughput and tail latency of the operation.
+
+        :param elapsed: Load test wall time (seconds)
+        """
+        calls = len(self.durations) + self.failures
+        if not self.durations:
+            return f"{calls} calls, {self.failures} failed"
+        return (
+            f"{calls} calls, {self.failures} failed, {calls / elapsed:.1f} ops/s,"
+            f" mean {statistics.mean(self.durations):.3f}s,"
+            f" p50 {percentile(self.durations, 50):.3f}s,"
+            f" p95 {percentile(self.durations, 95):.3f}s,"
+            f" p99 {percentile(self.durations, 99):.3f}s"
+        )
+
+
+@dataclass
+class LoadTestReport:
+    """Outcome of a load test."""
+
+    elapsed: float
+    operations: dict[str, OperationStats]
+    rpc_count: int
+    checks: dict[str, tuple[bool, str]]
+
+    @property
+    def consistent(self) -> bool:
+        """Whether every final state check passed."""
+        return all(ok for ok, _ in self.checks.values())
+
+    def summary(self) -> str:
+        """Format the report."""
+        lines = [
+            f"Elapsed {self.elapsed:.2f}s, {self.rpc_count} Reservation API calls"
+            f" ({self.rpc_count / self.elapsed:.1f}/s)"
+        ]
+        lines += [
+            f"  {name}: {stats.summary(self.elapsed)}"
+            for name, stats in self.operations.items()
+        ]
+        lines += [
+            f"  [{'OK' if ok else 'FAILED'}] {name}: {detail}"
+            for name, (ok, detail) in self.checks.items()
+        ]
+        return "\n".join(lines)
+
+
+class FakeTaskInstance:
+    """
+    Task instance keeping the XComs pushed by an operator.
+
+    :param dag_id: DAG id
+    :param task_id: Task id
+    :param run_id: DAG run id
+    :param map_index: Map index, -1 when the task is not mapped
+    """
+
+    def __init__(
+        self, dag_id: str, task_id: str, run_id: str, map_index: int = -1
+    ) -> None:
+        self.dag_id = dag_id
+        self.task_id = task_id
+        self.run_id = run_id
+        self.map_index = map_index
+        self.xcom: dict[str, Any] = {}
+
+    def xcom_push(self, key: str, value: Any) -> None:
+        """Keep an XCom pushed by the operator."""
+        self.xcom[key] = value
+
+
+class LoadTest:
+    """
+    Concurrent DAG runs provisioning and releasing slots on the same admin project.
+
+    :param runs: Number of DAG runs
+    :param concurrency: Number of DAG runs executed at the same time (threads)
+    :param projects: Number of assignee projects, DAG runs share a project when lower than `runs`
+    :param slots: Slots provisioned by each DAG run
+    :param latency: Mean latency (seconds) of a Reservation API call
+    :param attachment_delay: Time (seconds) before an assignment is used by the queries
+    :param attachment_probe: Attachment detection strategy of the create operator
+    :param attachment_deadline: Maximum attachment wait (seconds) of the create operator
+    :param rate: (Optional) Reservation API requests per second, `None` disables the limiter
+    :param burst: Reservation API burst
+    """
+
+    def __init__(
+        self,
+        runs: int = 200,
+        concurrency: int = 50,
+        projects: int | None = None,
+        slots: int = 100,
+        latency: float = 0.05,
+        attachment_delay: float = 0.5,
+        attachment_probe: str = "query",
+        attachment_deadline: float = 60.0,
+        rate: float | None = None,
+        burst: float = 10.0,
+    ) -> None:
+        self.runs = runs
+        self.concurrency = concurrency
+        self.projects = projects or runs
+        self.slots = slots
+        self.latency = latency
+        self.attachment_probe = attachment_probe
+        self.attachment_deadline = attachment_deadline
+        self.api = FakeReservationApi(
+            latency=lambda: self.latency * random.uniform(0.5, 1.5),
+            attachment_delay=attachment_delay,
+        )
+        # Calls go through a rate limiter of their own, as with `get_client`.
+        self.api.reservation_client = RateLimitedClient(
+            self.api.reservation_client, RateLimiter(rate=rate, capacity=burst)
+        )
+        self.operations = {
+            "create": OperationStats(),
+            "delete": OperationStats(),
+        }
+        self.provisioned_slots = 0
+        self.idempotency_ledger = VariableState({"updates": {}})
+        self._lock = threading.Lock()
+
+    def _timed(self, operation: str, func: Callable[[], Any]) -> bool:
+        """Run an operation, record its latency and return whether it succeeded."""
+        start = time.monotonic()
+        try:
+            func()
+        except Exception as e:
+            log.debug("%s failed: %s", operation, e)
+            with self._lock:
+                self.operations[operation].failures += 1
+            return False
+        with self._lock:
+            self.operations[operation].durations.append(time.monotonic() - start)
+        return True
+
+    def dag_run(self, index: int) -> None:
+        """
+        Provision then release slots, as a DAG run of two tasks.
+
+        :param index: DAG run index
+        """
+        ti = FakeTaskInstance(
+            dag_id="load_test", task_id=f"create_{index}", run_id=f"run_{index}"
+        )
+        create = BigQueryReservationCreateOperator(
+            task_id=ti.task_id,
+            project_id=f"load-project-{index % self.projects}",
+            reservation_project_id=ADMIN_PROJECT,
+            location=LOCATION,
+            slots_provisioning=self.slots,
+            attachment_probe=self.attachment_probe,
+            attachment_deadline=self.attachment_deadline,
+        )
+        if not self._timed("create", lambda: create.execute({"ti": ti})):
+            return
+        with self._lock:
+            self.provisioned_slots += self.slots
+
+        delete = BigQueryReservationDeleteOperator(
+            task_id=f"delete_{index}",
+            location=LOCATION,
+            slots_provisioning=self.slots,
+            commitment_name=ti.xcom["commitment_name"],
+            reservation_name=ti.xcom["reservation_name"],
+            assignment_name=ti.xcom["assignment_name"],
+            idempotency_key=ti.xcom.get("idempotency_key"),
+        )
+        if self._timed("delete", lambda: delete.execute({"ti": ti})):
+            with self._lock:
+                self.provisioned_slots -= self.slots
+
+    def check(self) -> dict[str, tuple[bool, str]]:
+        """Check the final slot capacities against the DAG runs outcomes."""
+        committed = self.api.committed_slots(PARENT)
+        reserved = self.api.reserved_slots(PARENT)
+        expected = self.provisioned_slots
+        checks = {
+            "committed slots": (
+                committed == expected,
+                f"{committed} committed, {expected} expected",
+            ),
+            "reserved slots": (
+                reserved == expected,
+                f"{reserved} reserved, {expected} expected",
+            ),
+        }
+        if not expected:
+            left = (
+                len(self.api.commitments),
+                len(self.api.reservations),
+                len(self.api.assignments),
+            )
+            checks["resources released"] = (
+                not any(left),
+                "%d commitments, %d reservations, %d assignments left" % left,
+            )
+        return checks
+
+    def run(self) -> LoadTestReport:
+        """Run the DAG runs concurrently and check the final state."""
+        # The provisioning history and the idempotency ledger are stored in the Airflow
+        # metadata DB, not load tested: the ledger is kept in memory.
+        with self.api.patch(), mock.patch(
+            "airflow_provider_bigquery_reservation.hooks."
+            + "bigquery_reservation.GoogleBaseHook.__init__",
+            new=mock_base_gcp_hook_no_default_project_id,
+        ), mock.patch(
+            "airflow_provider_bigquery_reservation.operators."
+            + "bigquery_reservation.record_provisioning"
+        ), mock.patch.object(
+            BigQueryReservationServiceHook,
+            "_idempotency_ledger",
+            new=lambda hook: self.idempotency_ledger.locked(),
+        ):
+            start = time.monotonic()
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                list(executor.map(self.dag_run, range(self.runs)))
+            elapsed = time.monotonic() - start
+
+        return LoadTestReport(
+            elapsed=elapsed,
+            operations=self.operations,
+            rpc_count=sum(self.api.rpc_counts.values()),
+            checks=self.check(),
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the load test from the command line, exit with 1 if the final state is inconsistent."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--runs", type=int, default=200, help="DAG runs")
+    parser.add_argument("--concurrency", type=int, default=50, help="Threads")
+    parser.add_argument(
+        "--projects", type=int, default=None, help="Assignee projects (default: runs)"
+    )
+    parser.add_argument("--slots", type=int, default=100, help="Slots by DAG run")
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="API call latency (seconds)"
+    )
+    parser.add_argument(
+        "--attachment-delay", type=float, default=0.5, help="Attachment delay (seconds)"
+    )
+    parser.add_argument("--attachment-probe", default="query")
+    parser.add_argument(
+        "--attachment-deadline",
+        type=float,
+        default=60.0,
+        help="Maximum attachment wait (seconds)",
+    )
+    parser.add_argument(
+        "--rate", type=float, default=None, help="API requests per second (no limit)"
+    )
+    parser.add_argument("--burst", type=float, default=10.0, help="API burst")
+    parser.add_argument("--verbose", action="store_true", help="Log the operators")
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        # Operators log every call, failures are counted in the report.
+        logging.disable(logging.ERROR)
+
+    report = LoadTest(
+        runs=args.runs,
+        concurrency=args.concurrency,
+        projects=args.projects,
+        slots=args.slots,
+        latency=args.latency,
+        attachment_delay=args.attachment_delay,
+        attachment_probe=args.attachment_probe,
+        attachment_deadline=args.attachment_deadline,
+        rate=args.rate,
+        burst=args.burst,
+    ).run()
+    print(report.summary())
+    return 0 if report.consistent else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
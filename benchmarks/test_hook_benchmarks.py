@@ -0,0 +1,92 @@
+"""Benchmarks of the provisioning and teardown paths of BigQueryReservationServiceHook."""
+import pytest
+
+from benchmarks.conftest import (
+    INVENTORY_SIZES,
+    PARENT,
+    PROJECT_ID,
+    SLOTS,
+    new_hook,
+    populate,
+)
+
+
+@pytest.mark.parametrize("size", INVENTORY_SIZES)
+def test_create_commitment_reservation_and_assignment(run_benchmark, fake_api, size):
+    def setup():
+        populate(fake_api, size)
+        return (new_hook(),), {}
+
+    def target(hook):
+        hook.create_commitment_reservation_and_assignment(
+            slots=SLOTS,
+            assignment_job_type="QUERY",
+            commitments_duration="FLEX",
+            project_id=PROJECT_ID,
+        )
+
+    run_benchmark(setup, target, size)
+
+
+@pytest.mark.parametrize("size", INVENTORY_SIZES)
+def test_delete_commitment_reservation_and_assignment(run_benchmark, fake_api, size):
+    def setup():
+        populate(fake_api, size)
+        name = sorted(fake_api.assignments)[0]
+        reservation_name = name.split("/assignments")[0]
+        commitment_name = reservation_name.replace(
+            "/reservations/", "/capacityCommitments/"
+        )
+        return (new_hook(),), {
+            "slots": SLOTS,
+            "commitment_name": commitment_name,
+            "reservation_name": reservation_name,
+            "assignment_name": name,
+        }
+
+    def target(hook, **kwargs):
+        hook.delete_commitment_reservation_and_assignment(**kwargs)
+
+    run_benchmark(setup, target, size)
+
+
+@pytest.mark.parametrize("size", INVENTORY_SIZES)
+def test_delete_commitments_assignment_associated(run_benchmark, fake_api, size):
+    def setup():
+        # One resource chain out of ten belongs to the project
+        populate(fake_api, size, assignee_every=10)
+        return (new_hook(),), {}
+
+    def target(hook):
+        hook.delete_commitments_assignment_associated(
+            project_id=PROJECT_ID,
+            location="US",
+            reservation_project_id=PROJECT_ID,
+        )
+
+    run_benchmark(setup, target, size)
+
+
+@pytest.mark.parametrize("size", INVENTORY_SIZES)
+def test_delete_all_commitments(run_benchmark, fake_api, size):
+    def setup():
+        populate(fake_api, size)
+        return (new_hook(),), {}
+
+    def target(hook):
+        hook.delete_all_commitments(project_id=PROJECT_ID, location="US")
+        assert not fake_api.commitments
+
+    run_benchmark(setup, target, size)
+
+
+@pytest.mark.parametrize("size", INVENTORY_SIZES)
+def test_list_assignments(run_benchmark, fake_api, size):
+    def setup():
+        populate(fake_api, size)
+        return (new_hook(),), {}
+
+    def target(hook):
+        assert len(hook.list_assignments(f"{PARENT}/reservations/-")) == size
+
+    run_benchmark(setup, target, size)
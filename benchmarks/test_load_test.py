@@ -0,0 +1,32 @@
+"""Smoke test of the load test harness."""
+from benchmarks.load_test import LoadTest, main
+
+
+def test_load_test_distinct_projects_consistent():
+    report = LoadTest(
+        runs=20, concurrency=8, latency=0.0, attachment_delay=0.0, rate=None
+    ).run()
+
+    assert report.consistent, report.summary()
+    assert len(report.operations["create"].durations) == 20
+    assert len(report.operations["delete"].durations) == 20
+    assert "p99" in report.summary()
+
+
+def test_load_test_rate_limited():
+    load_test = LoadTest(
+        runs=4, concurrency=4, latency=0.0, attachment_delay=0.0, rate=100.0, burst=1.0
+    )
+
+    report = load_test.run()
+
+    assert report.consistent, report.summary()
+    # One token per call, refilled at 100 calls per second
+    assert report.elapsed >= (report.rpc_count - 1) / 100 * 0.5
+
+
+def test_main_exit_code(capsys):
+    argv = ["--runs", "4", "--latency", "0", "--attachment-delay", "0", "--verbose"]
+
+    assert main(argv) == 0
+    assert "[OK] committed slots" in capsys.readouterr().out
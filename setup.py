@@ -24,6 +24,7 @@ setup(
         "google-cloud-bigquery-reservation>=1.0.0",
         "google-cloud-bigquery>=2.0.0",
     ],
+    extras_require={"numpy": ["numpy"]},
     setup_requires=["setuptools", "wheel"],
     author="Pierre Cardona",
     author_email="pierre@data-fullstack.com",
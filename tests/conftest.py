@@ -0,0 +1,14 @@
+"""Shared fixtures of the tests."""
+import pytest
+from airflow_provider_bigquery_reservation.hooks.client_pool import CLIENT_POOL
+from airflow_provider_bigquery_reservation.hooks.rate_limiter import RATE_LIMITER
+
+
+@pytest.fixture(autouse=True)
+def clear_client_pool():
+    """Isolate the tests from the clients and rate limits of the process."""
+    CLIENT_POOL.clear()
+    RATE_LIMITER.clear()
+    yield
+    CLIENT_POOL.clear()
+    RATE_LIMITER.clear()
@@ -0,0 +1,524 @@
+"""Stateful in-memory fakes of the Reservation API and of the BigQuery query probe."""
+from __future__ import annotations
+import contextlib
+import datetime
+import itertools
+import re
+import threading
+import time
+from collections import Counter
+from typing import Callable, Iterator
+from unittest import mock
+
+from airflow_provider_bigquery_reservation.hooks.bigquery_reservation import (
+    BigQueryReservationServiceHook,
+)
+from airflow_provider_bigquery_reservation.hooks.rate_limiter import RateLimitedClient
+from google.api_core.exceptions import (
+    AlreadyExists,
+    FailedPrecondition,
+    InvalidArgument,
+    NotFound,
+)
+from google.cloud.bigquery_reservation_v1 import (
+    Assignment,
+    BiReservation,
+    CapacityCommitment,
+    Reservation,
+    SplitCapacityCommitmentResponse,
+)
+
+
+ASSIGNEE_QUERY = re.compile(r"assignee=(\S+)")
+LOCATION_OF = re.compile(r"projects/[^/]+/locations/([^/]+)")
+
+
+def _copy(message):
+    """Copy a proto-plus message so callers cannot mutate the fake state."""
+    return type(message).deserialize(type(message).serialize(message))
+
+
+class FakePager:
+    """Pager fetching the pages lazily, one (counted) RPC per page."""
+
+    def __init__(self, fetch_page: Callable[[int], list], page_size: int) -> None:
+        self._fetch_page = fetch_page
+        self._page_size = page_size
+
+    def __iter__(self) -> Iterator:
+        """Iterate over the items, fetching the pages lazily."""
+        for page in itertools.count():
+            items = self._fetch_page(page)
+            yield from items
+            if len(items) < self._page_size:
+                return
+
+
+class FakeReservationApi:
+    """
+    Shared state of the fake Reservation API and BigQuery clients.
+
+    :param latency: Latency (seconds) of each RPC, or callable returning it
+    :param page_size: Default page size of the list RPCs
+    :param attachment_delay: Time (seconds) before a new assignment is used by the queries
+    :param enforce_capacity: Reject reservations exceeding the committed slots
+    :param clock: Clock (seconds)
+    :param sleep: Sleep function
+    """
+
+    def __init__(
+        self,
+        latency: float | Callable[[], float] = 0.0,
+        page_size: int = 50,
+        attachment_delay: float = 0.0,
+        enforce_capacity: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.latency = latency
+        self.page_size = page_size
+        self.attachment_delay = attachment_delay
+        self.enforce_capacity = enforce_capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.lock = threading.RLock()
+        self.commitments: dict[str, CapacityCommitment] = {}
+        self.reservations: dict[str, Reservation] = {}
+        self.assignments: dict[str, Assignment] = {}
+        self.assignment_created_at: dict[str, float] = {}
+        self.bi_reservations: dict[str, BiReservation] = {}
+        self.jobs: list[FakeQueryJob] = []
+        self.rpc_counts: Counter = Counter()
+        self._committed: Counter = Counter()
+        self._reserved: Counter = Counter()
+        self._assignments_by_reservation: Counter = Counter()
+        self._assignments_by_assignee: dict[str, dict[str, Assignment]] = {}
+        self._errors: dict[str, list[Exception]] = {}
+        self._ids = itertools.count(1)
+        # Could be wrapped e.g. by a `RateLimitedClient`
+        self.reservation_client: FakeReservationServiceClient | RateLimitedClient = (
+            FakeReservationServiceClient(self)
+        )
+        self.bq_client = FakeBigQueryClient(self)
+
+    def inject_error(self, method: str, error: Exception, times: int = 1) -> None:
+        """
+        Make the next calls of a method fail.
+
+        :param method: RPC name e.g. `create_reservation`
+        :param error: Exception raised
+        :param times: Number of calls failing
+        """
+        with self.lock:
+            self._errors.setdefault(method, []).extend([error] * times)
+
+    def rpc(self, method: str) -> None:
+        """Count an RPC, simulate its latency and raise the injected errors."""
+        with self.lock:
+            self.rpc_counts[method] += 1
+            errors = self._errors.get(method)
+            error = errors.pop(0) if errors else None
+        latency = self.latency() if callable(self.latency) else self.latency
+        if latency:
+            self.sleep(latency)
+        if error is not None:
+            raise error
+
+    def next_id(self) -> str:
+        """Generate a resource ID."""
+        return str(next(self._ids))
+
+    @staticmethod
+    def _match(pattern: re.Pattern, value: str) -> re.Match:
+        match = pattern.search(value)
+        assert match is not None, f"Unexpected {value}."
+        return match
+
+    @classmethod
+    def _parent_of(cls, name: str) -> str:
+        return cls._match(LOCATION_OF, name).group(0)
+
+    # State changes, indexed so the fake cost does not grow with its inventory
+    def add_commitment(self, commitment: CapacityCommitment) -> None:
+        """Store a commitment."""
+        with self.lock:
+            self.commitments[commitment.name] = commitment
+            self._committed[self._parent_of(commitment.name)] += commitment.slot_count
+
+    def remove_commitment(self, name: str) -> None:
+        """Remove a commitment."""
+        with self.lock:
+            commitment = self.commitments.pop(name)
+            self._committed[self._parent_of(name)] -= commitment.slot_count
+
+    def add_reservation(self, reservation: Reservation) -> None:
+        """Store a reservation."""
+        with self.lock:
+            self.reservations[reservation.name] = reservation
+            self._reserved[
+                self._parent_of(reservation.name)
+            ] += reservation.slot_capacity
+
+    def resize_reservation(self, name: str, slot_capacity: int) -> Reservation:
+        """Change the slot capacity of a reservation."""
+        with self.lock:
+            reservation = self.reservations[name]
+            self._reserved[self._parent_of(name)] += (
+                slot_capacity - reservation.slot_capacity
+            )
+            reservation.slot_capacity = slot_capacity
+            return reservation
+
+    def remove_reservation(self, name: str) -> None:
+        """Remove a reservation."""
+        with self.lock:
+            reservation = self.reservations.pop(name)
+            self._reserved[self._parent_of(name)] -= reservation.slot_capacity
+
+    def add_assignment(self, assignment: Assignment, created_at: float) -> None:
+        """Store an assignment created at a clock time."""
+        with self.lock:
+            self.assignments[assignment.name] = assignment
+            self.assignment_created_at[assignment.name] = created_at
+            self._assignments_by_reservation[
+                assignment.name.split("/assignments")[0]
+            ] += 1
+            self._assignments_by_assignee.setdefault(assignment.assignee, {})[
+                assignment.name
+            ] = assignment
+
+    def remove_assignment(self, name: str) -> None:
+        """Remove an assignment."""
+        with self.lock:
+            assignment = self.assignments.pop(name)
+            del self.assignment_created_at[name]
+            self._assignments_by_reservation[name.split("/assignments")[0]] -= 1
+            del self._assignments_by_assignee[assignment.assignee][name]
+
+    def assignments_of_assignee(self, assignee: str) -> list[Assignment]:
+        """Get the assignments of an assignee e.g. `projects/myproject`."""
+        with self.lock:
+            return list(self._assignments_by_assignee.get(assignee, {}).values())
+
+    def has_assignments(self, reservation_name: str) -> bool:
+        """Check if a reservation has assignments."""
+        with self.lock:
+            return self._assignments_by_reservation[reservation_name] > 0
+
+    def reset(self) -> None:
+        """Drop the resources and jobs, keeping the RPC counts and injected errors."""
+        with self.lock:
+            self.commitments.clear()
+            self.reservations.clear()
+            self.assignments.clear()
+            self.assignment_created_at.clear()
+            self.bi_reservations.clear()
+            self.jobs.clear()
+            self._committed.clear()
+            self._reserved.clear()
+            self._assignments_by_reservation.clear()
+            self._assignments_by_assignee.clear()
+
+    def committed_slots(self, parent: str) -> int:
+        """Count the slots committed in a parent."""
+        return self._committed[parent]
+
+    def reserved_slots(self, parent: str, excluded: str | None = None) -> int:
+        """Count the slots reserved in a parent, except by a reservation."""
+        reserved = self._reserved[parent]
+        if excluded in self.reservations:
+            reserved -= self.reservations[excluded].slot_capacity
+        return reserved
+
+    def check_capacity(self, parent: str, slots: int, excluded: str | None = None):
+        """Reject a reservation of slots exceeding the committed slots."""
+        if not self.enforce_capacity:
+            return
+        if self.reserved_slots(parent, excluded) + slots > self.committed_slots(parent):
+            raise FailedPrecondition(
+                f"Reservations of {parent} exceed the committed slots."
+            )
+
+    def reservation_id_of(self, project_id: str, location: str) -> str | None:
+        """Get the reservation used by the queries of a project, if attached."""
+        with self.lock:
+            for assignment in self.assignments_of_assignee(f"projects/{project_id}"):
+                name = assignment.name
+                if (
+                    assignment.job_type.name == "QUERY"
+                    and self._match(LOCATION_OF, name).group(1) == location
+                    and self.clock() - self.assignment_created_at[name]
+                    >= self.attachment_delay
+                ):
+                    return name.split("/assignments")[0]
+        return None
+
+    @contextlib.contextmanager
+    def patch(self) -> Iterator[FakeReservationApi]:
+        """Plug the fakes into `BigQueryReservationServiceHook` clients."""
+        with mock.patch.object(
+            BigQueryReservationServiceHook,
+            "get_client",
+            return_value=self.reservation_client,
+        ), mock.patch.object(
+            BigQueryReservationServiceHook,
+            "get_bq_client",
+            return_value=self.bq_client,
+        ):
+            yield self
+
+
+class FakeReservationServiceClient:
+    """Fake `ReservationServiceClient` backed by a `FakeReservationApi` state."""
+
+    def __init__(self, api: FakeReservationApi) -> None:
+        self.api = api
+
+    def _list(self, method: str, resources: dict, request: dict, predicate=None):
+        page_size = request.get("page_size") or self.api.page_size
+        parent = request["parent"]
+        # `reservations/-` lists the assignments of every reservation
+        prefix = parent[:-1] if parent.endswith("-") else f"{parent}/"
+
+        snapshot: list = []
+
+        def fetch_page(page: int) -> list:
+            self.api.rpc(method)
+            with self.api.lock:
+                # The listing is consistent across pages, as with page tokens.
+                if page == 0:
+                    snapshot.extend(
+                        resource
+                        for name, resource in sorted(resources.items())
+                        if name.startswith(prefix)
+                        and (predicate is None or predicate(resource))
+                    )
+                items = snapshot[page * page_size : (page + 1) * page_size]
+                return [_copy(resource) for resource in items]
+
+        return FakePager(fetch_page, page_size)
+
+    # Capacity commitments
+    def create_capacity_commitment(self, request: dict) -> CapacityCommitment:
+        """Create a capacity commitment, rejecting a duplicated ID."""
+        self.api.rpc("create_capacity_commitment")
+        parent = request["parent"]
+        commitment_id = request.get("capacity_commitment_id") or self.api.next_id()
+        commitment = _copy(request["capacity_commitment"])
+        commitment.name = f"{parent}/capacityCommitments/{commitment_id}"
+        commitment.state = CapacityCommitment.State.ACTIVE
+        with self.api.lock:
+            if commitment.name in self.api.commitments:
+                raise AlreadyExists(f"{commitment.name} already exists.")
+            self.api.add_commitment(commitment)
+        return _copy(commitment)
+
+    def get_capacity_commitment(self, name: str) -> CapacityCommitment:
+        """Get a capacity commitment."""
+        self.api.rpc("get_capacity_commitment")
+        with self.api.lock:
+            if name not in self.api.commitments:
+                raise NotFound(f"{name} not found.")
+            return _copy(self.api.commitments[name])
+
+    def list_capacity_commitments(self, request: dict) -> FakePager:
+        """List the capacity commitments of a parent."""
+        return self._list("list_capacity_commitments", self.api.commitments, request)
+
+    def delete_capacity_commitment(self, name: str, retry=None) -> None:
+        """Delete a capacity commitment not backing reservations."""
+        self.api.rpc("delete_capacity_commitment")
+        with self.api.lock:
+            if name not in self.api.commitments:
+                raise NotFound(f"{name} not found.")
+            parent = name.split("/capacityCommitments")[0]
+            slots = self.api.commitments[name].slot_count
+            if (
+                self.api.enforce_capacity
+                and self.api.reserved_slots(parent)
+                > self.api.committed_slots(parent) - slots
+            ):
+                raise FailedPrecondition(f"{name} backs reservations.")
+            self.api.remove_commitment(name)
+
+    def split_capacity_commitment(
+        self, name: str, slot_count: int
+    ) -> SplitCapacityCommitmentResponse:
+        """Split a capacity commitment in two."""
+        self.api.rpc("split_capacity_commitment")
+        with self.api.lock:
+            if name not in self.api.commitments:
+                raise NotFound(f"{name} not found.")
+            commitment = self.api.commitments[name]
+            if not 0 < slot_count < commitment.slot_count:
+                raise InvalidArgument(f"Cannot split {name} to {slot_count} slots.")
+            second = _copy(commitment)
+            second.name = f"{name.split('/capacityCommitments')[0]}/capacityCommitments/{self.api.next_id()}"
+            second.slot_count = commitment.slot_count - slot_count
+            self.api.remove_commitment(name)
+            commitment.slot_count = slot_count
+            self.api.add_commitment(commitment)
+            self.api.add_commitment(second)
+            return SplitCapacityCommitmentResponse(
+                first=_copy(commitment), second=_copy(second)
+            )
+
+    # Reservations
+    def create_reservation(
+        self, parent: str, reservation_id: str, reservation: Reservation
+    ) -> Reservation:
+        """Create a reservation within the committed slots."""
+        self.api.rpc("create_reservation")
+        reservation = _copy(reservation)
+        reservation.name = f"{parent}/reservations/{reservation_id}"
+        with self.api.lock:
+            if reservation.name in self.api.reservations:
+                raise FailedPrecondition(f"{reservation.name} already exists.")
+            self.api.check_capacity(parent, reservation.slot_capacity)
+            self.api.add_reservation(reservation)
+        return _copy(reservation)
+
+    def get_reservation(self, name: str) -> Reservation:
+        """Get a reservation."""
+        self.api.rpc("get_reservation")
+        with self.api.lock:
+            if name not in self.api.reservations:
+                raise NotFound(f"{name} not found.")
+            return _copy(self.api.reservations[name])
+
+    def list_reservations(self, request: dict) -> FakePager:
+        """List the reservations of a parent."""
+        return self._list("list_reservations", self.api.reservations, request)
+
+    def update_reservation(self, reservation: Reservation, update_mask=None):
+        """Update the slot capacity of a reservation."""
+        self.api.rpc("update_reservation")
+        with self.api.lock:
+            if reservation.name not in self.api.reservations:
+                raise NotFound(f"{reservation.name} not found.")
+            parent = reservation.name.split("/reservations")[0]
+            self.api.check_capacity(
+                parent, reservation.slot_capacity, excluded=reservation.name
+            )
+            return _copy(
+                self.api.resize_reservation(reservation.name, reservation.slot_capacity)
+            )
+
+    def delete_reservation(self, name: str) -> None:
+        """Delete a reservation without assignments."""
+        self.api.rpc("delete_reservation")
+        with self.api.lock:
+            if name not in self.api.reservations:
+                raise NotFound(f"{name} not found.")
+            if self.api.has_assignments(name):
+                raise FailedPrecondition(f"{name} has assignments.")
+            self.api.remove_reservation(name)
+
+    # Assignments
+    def create_assignment(self, parent: str, assignment: Assignment) -> Assignment:
+        """Create an assignment, one by assignee and job type."""
+        self.api.rpc("create_assignment")
+        assignment = _copy(assignment)
+        assignment.name = f"{parent}/assignments/{self.api.next_id()}"
+        assignment.state = Assignment.State(Assignment.State.ACTIVE)
+        with self.api.lock:
+            if parent not in self.api.reservations:
+                raise NotFound(f"{parent} not found.")
+            if any(
+                existing.job_type == assignment.job_type
+                for existing in self.api.assignments_of_assignee(assignment.assignee)
+            ):
+                raise FailedPrecondition(f"{assignment.assignee} already assigned.")
+            self.api.add_assignment(assignment, created_at=self.api.clock())
+        return _copy(assignment)
+
+    def list_assignments(self, request: dict) -> FakePager:
+        """List the assignments of a parent."""
+        return self._list("list_assignments", self.api.assignments, request)
+
+    def search_all_assignments(self, parent: str, query: str) -> FakePager:
+        """Search the assignments of an assignee."""
+        assignee = FakeReservationApi._match(ASSIGNEE_QUERY, query).group(1)
+        return self._list(
+            "search_all_assignments",
+            self.api.assignments,
+            {"parent": parent},
+            predicate=lambda assignment: assignment.assignee == assignee,
+        )
+
+    def delete_assignment(self, name: str) -> None:
+        """Delete an assignment."""
+        self.api.rpc("delete_assignment")
+        with self.api.lock:
+            if name not in self.api.assignments:
+                raise NotFound(f"{name} not found.")
+            self.api.remove_assignment(name)
+
+    # BI Engine reservations
+    def get_bi_reservation(self, name: str) -> BiReservation:
+        """Get a BI Engine reservation, empty if not created yet."""
+        self.api.rpc("get_bi_reservation")
+        with self.api.lock:
+            bi_reservation = self.api.bi_reservations.setdefault(
+                name, BiReservation(name=name, size=0)
+            )
+            return _copy(bi_reservation)
+
+    def update_bi_reservation(
+        self, bi_reservation: BiReservation, update_mask=None
+    ) -> BiReservation:
+        """Update the fields of a BI Engine reservation in the mask."""
+        self.api.rpc("update_bi_reservation")
+        with self.api.lock:
+            current = self.api.bi_reservations.setdefault(
+                bi_reservation.name, BiReservation(name=bi_reservation.name, size=0)
+            )
+            paths = update_mask.paths if update_mask else ["size", "preferred_tables"]
+            for path in paths:
+                setattr(current, path, getattr(bi_reservation, path))
+            return _copy(current)
+
+
+class FakeQueryJob:
+    """Fake BigQuery query job."""
+
+    def __init__(self, project: str, location: str, reservation_id: str | None):
+        self.project = project
+        self.location = location
+        self.created = datetime.datetime.now(tz=datetime.timezone.utc)
+        self._properties = {"statistics": {"reservation_id": reservation_id}}
+
+
+class FakeBigQueryClient:
+    """Fake BigQuery client running the attachment probe queries."""
+
+    def __init__(self, api: FakeReservationApi) -> None:
+        self.api = api
+
+    def query(self, query: str, project: str, location: str, **kwargs) -> FakeQueryJob:
+        """Run a query on the reservation the project is attached to, if any."""
+        self.api.rpc("query")
+        job = FakeQueryJob(
+            project, location, self.api.reservation_id_of(project, location)
+        )
+        with self.api.lock:
+            self.api.jobs.append(job)
+        return job
+
+    def list_jobs(
+        self,
+        project: str,
+        max_results: int | None = None,
+        min_creation_time: datetime.datetime | None = None,
+        **kwargs,
+    ) -> list[FakeQueryJob]:
+        """List the jobs of a project, most recent first."""
+        self.api.rpc("list_jobs")
+        with self.api.lock:
+            jobs = [
+                job
+                for job in reversed(self.api.jobs)
+                if job.project == project
+                and (min_creation_time is None or job.created >= min_creation_time)
+            ]
+        return jobs[:max_results]
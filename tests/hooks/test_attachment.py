@@ -0,0 +1,172 @@
+import datetime
+from unittest import mock
+
+import pytest
+from airflow.exceptions import AirflowException
+from airflow_provider_bigquery_reservation.hooks.attachment import (
+    AssignmentStateProbe,
+    AttachmentBackoff,
+    AttachmentTarget,
+    LastJobAttachmentProbe,
+    QueryAttachmentProbe,
+    attachment_probe_name,
+    get_attachment_probe,
+    wait_for_attachment,
+)
+
+
+PROJECT_ID = "test-project"
+RESERVATION_PROJECT_ID = "admin-project"
+LOCATION = "US"
+JOB_TYPE = "QUERY"
+SINCE = datetime.datetime(2023, 1, 1, tzinfo=datetime.timezone.utc)
+TARGET = AttachmentTarget(
+    project_id=PROJECT_ID,
+    location=LOCATION,
+    job_type=JOB_TYPE,
+    reservation_project_id=RESERVATION_PROJECT_ID,
+    since=SINCE,
+)
+
+
+def job(location, reservation_id=None):
+    return mock.MagicMock(
+        location=location,
+        _properties={"statistics": {"reservation_id": reservation_id}},
+    )
+
+
+class TestAttachmentProbes:
+    def test_query_probe(self):
+        hook = mock.MagicMock()
+
+        assert QueryAttachmentProbe().is_attached(hook, TARGET)
+        hook._is_assignment_attached_in_query.assert_called_once_with(
+            client=hook.get_bq_client.return_value,
+            project_id=PROJECT_ID,
+            location=LOCATION,
+        )
+
+    def test_assignment_state_probe(self):
+        hook = mock.MagicMock()
+        hook.search_assignment.return_value = None
+
+        assert not AssignmentStateProbe().is_attached(hook, TARGET)
+        hook.search_assignment.assert_called_once_with(
+            parent=f"projects/{RESERVATION_PROJECT_ID}/locations/{LOCATION}",
+            project_id=PROJECT_ID,
+            job_type=JOB_TYPE,
+        )
+
+    def test_last_job_probe_recent_job_attached(self):
+        hook = mock.MagicMock()
+        hook.get_bq_client.return_value.list_jobs.return_value = [
+            job("EU", "other"),
+            job(LOCATION, "reservation"),
+        ]
+        fallback = mock.MagicMock()
+
+        assert LastJobAttachmentProbe(fallback=fallback).is_attached(hook, TARGET)
+        hook.get_bq_client.return_value.list_jobs.assert_called_once_with(
+            project=PROJECT_ID,
+            all_users=False,
+            min_creation_time=SINCE,
+            max_results=10,
+        )
+        fallback.is_attached.assert_not_called()
+
+    def test_last_job_probe_recent_job_not_attached(self):
+        hook = mock.MagicMock()
+        hook.get_bq_client.return_value.list_jobs.return_value = [job(LOCATION)]
+
+        assert not LastJobAttachmentProbe().is_attached(hook, TARGET)
+
+    def test_last_job_probe_fallback(self):
+        hook = mock.MagicMock()
+        hook.get_bq_client.return_value.list_jobs.return_value = [job("EU", "other")]
+        fallback = mock.MagicMock()
+
+        probe = LastJobAttachmentProbe(fallback=fallback)
+
+        assert probe.is_attached(hook, TARGET) == fallback.is_attached.return_value
+        fallback.is_attached.assert_called_once_with(hook, TARGET)
+
+    def test_last_job_probe_skips_inspected_jobs(self):
+        hook = mock.MagicMock()
+        list_jobs = hook.get_bq_client.return_value.list_jobs
+        list_jobs.side_effect = [[], [job(LOCATION)], []]
+        fallback = mock.MagicMock()
+        fallback.is_attached.return_value = False
+        probe = LastJobAttachmentProbe(fallback=fallback)
+
+        assert not any(probe.is_attached(hook, TARGET) for _ in range(3))
+
+        windows = [call.kwargs["min_creation_time"] for call in list_jobs.mock_calls]
+        assert windows[0] == SINCE
+        assert SINCE < windows[1] < windows[2]
+        # The dummy query of the fallback is not inspected: it runs again
+        assert fallback.is_attached.call_count == 2
+
+    def test_get_attachment_probe(self):
+        probe = AssignmentStateProbe()
+
+        assert get_attachment_probe(probe) is probe
+        assert isinstance(get_attachment_probe("query"), QueryAttachmentProbe)
+        with pytest.raises(AirflowException):
+            get_attachment_probe("unknown")
+
+    def test_attachment_probe_name(self):
+        assert attachment_probe_name("last_job") == "last_job"
+        assert attachment_probe_name(AssignmentStateProbe()) == "assignment_state"
+        assert attachment_probe_name(mock.MagicMock(spec=QueryAttachmentProbe)) == (
+            "MagicMock"
+        )
+
+
+class TestWaitForAttachment:
+    def test_backoff_intervals(self):
+        backoff = AttachmentBackoff(
+            initial_interval=1, max_interval=5, multiplier=2, jitter=0
+        )
+        intervals = backoff.intervals()
+
+        assert [next(intervals) for _ in range(5)] == [1, 2, 4, 5, 5]
+
+    def test_backoff_jitter(self):
+        intervals = AttachmentBackoff(initial_interval=10, jitter=0.2).intervals()
+
+        assert 8 <= next(intervals) <= 12
+
+    def test_wait_for_attachment_success(self):
+        now = [0.0]
+        sleep = mock.MagicMock(
+            side_effect=lambda seconds: now.__setitem__(0, now[0] + seconds)
+        )
+        is_attached = mock.MagicMock(side_effect=[False, False, True])
+
+        duration = wait_for_attachment(
+            is_attached,
+            backoff=AttachmentBackoff(jitter=0),
+            sleep=sleep,
+            clock=lambda: now[0],
+        )
+
+        assert duration == 3
+        sleep.assert_has_calls([mock.call(1), mock.call(2)])
+
+    def test_wait_for_attachment_deadline(self):
+        now = [0.0]
+        sleep = mock.MagicMock(
+            side_effect=lambda seconds: now.__setitem__(0, now[0] + seconds)
+        )
+
+        with pytest.raises(AirflowException):
+            wait_for_attachment(
+                lambda: False,
+                backoff=AttachmentBackoff(jitter=0, deadline=10),
+                sleep=sleep,
+                clock=lambda: now[0],
+            )
+
+        assert now[0] == 10
+        sleep.assert_called_with(3)
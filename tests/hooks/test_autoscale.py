@@ -0,0 +1,56 @@
+import pytest
+from airflow.exceptions import AirflowException
+from airflow_provider_bigquery_reservation.hooks.autoscale import (
+    AutoscalePolicy,
+    ReservationUtilization,
+    jobs_reservation_id,
+)
+
+
+def utilization(average_slots=0.0, pending_jobs=0):
+    return ReservationUtilization(
+        average_slots=average_slots, peak_slots=average_slots, pending_jobs=pending_jobs
+    )
+
+
+class TestAutoscalePolicy:
+    def setup_method(self):
+        self.policy = AutoscalePolicy(min_slots=100, max_slots=500)
+
+    def test_scale_up_on_utilization(self):
+        assert self.policy.target_slots(200, utilization(average_slots=180)) == 300
+
+    def test_scale_up_on_pending_jobs(self):
+        assert self.policy.target_slots(200, utilization(pending_jobs=1)) == 300
+
+    def test_scale_down(self):
+        assert self.policy.target_slots(300, utilization(average_slots=50)) == 200
+
+    def test_keep(self):
+        assert self.policy.target_slots(200, utilization(average_slots=100)) == 200
+
+    def test_bounds(self):
+        assert self.policy.target_slots(500, utilization(pending_jobs=3)) == 500
+        assert self.policy.target_slots(100, utilization()) == 100
+        assert self.policy.target_slots(0, utilization(average_slots=1)) == 100
+        assert self.policy.target_slots(800, utilization(average_slots=700)) == 500
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"min_slots": 100, "max_slots": 500, "step": 50},
+            {"min_slots": 150, "max_slots": 500},
+            {"min_slots": 500, "max_slots": 100},
+            {"min_slots": 100, "max_slots": 500, "scale_down_utilization": 0.9},
+        ],
+    )
+    def test_invalid(self, kwargs):
+        with pytest.raises(AirflowException):
+            AutoscalePolicy(**kwargs)
+
+
+def test_jobs_reservation_id():
+    assert (
+        jobs_reservation_id("projects/admin/locations/EU/reservations/batch")
+        == "admin:EU.batch"
+    )
@@ -0,0 +1,103 @@
+import datetime
+
+import pytest
+from airflow.exceptions import AirflowException
+from airflow_provider_bigquery_reservation.hooks.bi_engine import (
+    GB,
+    BiEngineTableUsage,
+    format_table_reference,
+    merge_preferred_tables,
+    parse_table_reference,
+    recommend_bi_engine_size,
+)
+from google.cloud.bigquery_reservation_v1 import TableReference
+
+
+CURRENT = ["p.d.a", "p.d.b"]
+HOUR = datetime.datetime(2023, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def usage(hours, table, queries, gb, accelerated=0, reasons=()):
+    return BiEngineTableUsage(
+        hour=HOUR + datetime.timedelta(hours=hours),
+        table_id=table,
+        queries=queries,
+        accelerated_queries=accelerated,
+        bytes_processed=int(gb * GB),
+        reasons=list(reasons),
+    )
+
+
+USAGES = [
+    # 90 queries in hours with a 2GB working set, 10 in an hour of 10.5GB
+    usage(0, "p.d.a", 40, 1, accelerated=40),
+    usage(0, "p.d.b", 20, 1, accelerated=20),
+    usage(1, "p.d.a", 30, 1.5, accelerated=10, reasons=["INSUFFICIENT_RESERVATION"]),
+    usage(2, "p.d.c", 10, 10.5, reasons=["INSUFFICIENT_RESERVATION"] * 2),
+]
+
+
+def test_parse_table_reference():
+    table = parse_table_reference("p.d.t")
+
+    assert table == TableReference(project_id="p", dataset_id="d", table_id="t")
+    assert format_table_reference(table) == "p.d.t"
+
+
+@pytest.mark.parametrize("table", ["d.t", "p.d.t.x", "p..t"])
+def test_parse_table_reference_invalid(table):
+    with pytest.raises(AirflowException):
+        parse_table_reference(table)
+
+
+@pytest.mark.parametrize(
+    "mode,tables,expected",
+    [
+        ("add", ["p.d.c", "p.d.a"], ["p.d.a", "p.d.b", "p.d.c"]),
+        ("remove", ["p.d.a", "p.d.c"], ["p.d.b"]),
+        ("replace", ["p.d.c", "p.d.c"], ["p.d.c"]),
+        ("replace", [], []),
+    ],
+)
+def test_merge_preferred_tables(mode, tables, expected):
+    assert merge_preferred_tables(CURRENT, tables, mode) == expected
+
+
+def test_merge_preferred_tables_unknown_mode():
+    with pytest.raises(AirflowException):
+        merge_preferred_tables(CURRENT, ["p.d.c"], "append")
+
+
+def test_recommend_bi_engine_size():
+    sizing = recommend_bi_engine_size(USAGES, target_share=0.9)
+
+    assert sizing.size == 2
+    assert sizing.covered_share == 0.9
+    assert sizing.queries == 100
+    assert sizing.accelerated_share == 0.7
+    assert sizing.reasons == {"INSUFFICIENT_RESERVATION": 3}
+    assert sizing.hourly_working_sets == {
+        HOUR.isoformat(): 2 * GB,
+        (HOUR + datetime.timedelta(hours=1)).isoformat(): int(1.5 * GB),
+        (HOUR + datetime.timedelta(hours=2)).isoformat(): int(10.5 * GB),
+    }
+    assert list(sizing.tables) == ["p.d.c", "p.d.a", "p.d.b"]
+
+
+def test_recommend_bi_engine_size_all_queries():
+    assert recommend_bi_engine_size(USAGES, target_share=1).size == 11
+    assert recommend_bi_engine_size(USAGES, target_share=1, max_size=5).size == 5
+
+
+def test_recommend_bi_engine_size_no_query():
+    sizing = recommend_bi_engine_size([])
+
+    assert sizing.size == 0
+    assert sizing.covered_share == 1.0
+    assert sizing.to_dict()["hourly_working_sets"] == {}
+
+
+@pytest.mark.parametrize("target_share", [0, 1.5])
+def test_recommend_bi_engine_size_invalid_target_share(target_share):
+    with pytest.raises(AirflowException):
+        recommend_bi_engine_size(USAGES, target_share=target_share)
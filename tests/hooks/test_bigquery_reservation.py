@@ -1,23 +1,46 @@
 import datetime
 import logging
 import random
+import time
 import uuid
 from unittest import mock
 
-from tests.utils import QueryJob, mock_base_gcp_hook_no_default_project_id
+from tests.utils import (
+    AsyncPager,
+    QueryJob,
+    VariableState,
+    mock_base_gcp_hook_no_default_project_id,
+)
 
 import pytest
 from airflow.exceptions import AirflowException
+from airflow_provider_bigquery_reservation.hooks.attachment import (
+    AttachmentBackoff,
+    AttachmentProbe,
+    AttachmentTarget,
+)
+from airflow_provider_bigquery_reservation.hooks.autoscale import (
+    ReservationUtilization,
+)
+from airflow_provider_bigquery_reservation.hooks.bi_engine import BiEngineTableUsage
+from airflow_provider_bigquery_reservation.hooks.inventory import ReservationInventory
+from airflow_provider_bigquery_reservation.hooks.rate_limiter import (
+    AsyncRateLimitedClient,
+)
+from airflow_provider_bigquery_reservation.hooks.utilization import CommitmentTimeline
 from airflow.providers.google.common.consts import CLIENT_INFO
 from airflow_provider_bigquery_reservation.hooks.bigquery_reservation import (
+    BigQueryReservationServiceAsyncHook,
     BigQueryReservationServiceHook,
 )
+from google.api_core.exceptions import NotFound
 from google.cloud.bigquery_reservation_v1 import (
     Assignment,
     BiReservation,
     CapacityCommitment,
     Reservation,
     ReservationServiceClient,
+    TableReference,
 )
 from google.protobuf import field_mask_pb2
 
@@ -60,6 +83,8 @@ class TestBigQueryReservationHook:
             self.hook = BigQueryReservationServiceHook(location=LOCATION)
             self.hook.get_credentials = mock.MagicMock(return_value=CREDENTIALS)
             self.location = LOCATION
+        self.bi_ledger = VariableState({"reservations": {}})
+        self.hook._bi_reservation_ledger = self.bi_ledger.locked
 
     @mock.patch("google.cloud.bigquery_reservation_v1.ReservationServiceClient")
     def test_get_client_already_exist(self, reservation_client_mock):
@@ -93,6 +118,51 @@ class TestBigQueryReservationHook:
             == expected
         )
 
+    def test_format_resource_id_idempotency_key(self):
+        resource_id = self.hook.format_resource_id(
+            RESOURCE_ID, idempotency_key="dag/task/run/-1"
+        )
+
+        assert resource_id == self.hook.format_resource_id(
+            RESOURCE_ID, idempotency_key="dag/task/run/-1"
+        )
+        assert resource_id != self.hook.format_resource_id(
+            RESOURCE_ID, idempotency_key="dag/task/other_run/-1"
+        )
+        assert resource_id.startswith(f"{RESOURCE_ID}-")
+
+    # Get if exists
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.hooks.bigquery_reservation."
+        + "BigQueryReservationServiceHook.get_client"
+    )
+    def test_get_if_exists(self, client_mock):
+        result = self.hook._get_if_exists("get_reservation", RESOURCE_NAME)
+
+        client_mock.return_value.get_reservation.assert_called_once_with(
+            name=RESOURCE_NAME
+        )
+        assert result == client_mock.return_value.get_reservation.return_value
+
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.hooks.bigquery_reservation."
+        + "BigQueryReservationServiceHook.get_client"
+    )
+    def test_get_if_exists_not_found(self, client_mock):
+        client_mock.return_value.get_reservation.side_effect = NotFound("Test")
+
+        assert self.hook._get_if_exists("get_reservation", RESOURCE_NAME) is None
+
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.hooks.bigquery_reservation."
+        + "BigQueryReservationServiceHook.get_client"
+    )
+    def test_get_if_exists_failure(self, client_mock):
+        client_mock.return_value.get_reservation.side_effect = Exception("Test")
+
+        with pytest.raises(AirflowException):
+            self.hook._get_if_exists("get_reservation", RESOURCE_NAME)
+
     # Create Capacity Commitment
     @mock.patch(
         "airflow_provider_bigquery_reservation.hooks."
@@ -112,6 +182,32 @@ class TestBigQueryReservationHook:
             }
         )
 
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.hooks."
+        + "bigquery_reservation.emit_api_call"
+    )
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.hooks."
+        + "bigquery_reservation.BigQueryReservationServiceHook.get_client"
+    )
+    def test_api_call_instrumentation(self, client_mock, emit_api_call_mock):
+        client_mock.return_value.get_reservation.side_effect = [
+            Reservation(name=RESOURCE_NAME),
+            Exception("Test"),
+        ]
+
+        self.hook.get_reservation(RESOURCE_NAME)
+        with pytest.raises(AirflowException):
+            self.hook.get_reservation(RESOURCE_NAME)
+
+        assert [c.kwargs["outcome"] for c in emit_api_call_mock.call_args_list] == [
+            "success",
+            "failure",
+        ]
+        assert emit_api_call_mock.call_args.kwargs["method"] == "get_reservation"
+        assert emit_api_call_mock.call_args.kwargs["location"] == LOCATION
+        assert (self.hook.api_metrics.calls, self.hook.api_metrics.failures) == (2, 1)
+
     @mock.patch.object(
         ReservationServiceClient,
         "create_capacity_commitment",
@@ -131,7 +227,7 @@ class TestBigQueryReservationHook:
     def test_list_capacity_commitments_success(self, client_mock):
         self.hook.list_capacity_commitments(PARENT)
         client_mock.return_value.list_capacity_commitments.assert_called_once_with(
-            parent=PARENT
+            request={"parent": PARENT}
         )
 
     @mock.patch.object(
@@ -143,6 +239,82 @@ class TestBigQueryReservationHook:
         with pytest.raises(AirflowException):
             self.hook.list_capacity_commitments(PARENT)
 
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.hooks."
+        + "bigquery_reservation.BigQueryReservationServiceHook.get_client"
+    )
+    def test_iter_capacity_commitments_page_size_and_predicate(self, client_mock):
+        client_mock.return_value.list_capacity_commitments.return_value = [
+            CapacityCommitment(name="c1", slot_count=100),
+            CapacityCommitment(name="c2", slot_count=200),
+        ]
+
+        rslt = list(
+            self.hook.iter_capacity_commitments(
+                PARENT,
+                page_size=50,
+                predicate=lambda commitment: commitment.slot_count > 100,
+            )
+        )
+
+        assert rslt == [CapacityCommitment(name="c2", slot_count=200)]
+        client_mock.return_value.list_capacity_commitments.assert_called_once_with(
+            request={"parent": PARENT, "page_size": 50}
+        )
+
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.hooks."
+        + "bigquery_reservation.BigQueryReservationServiceHook.get_client"
+    )
+    def test_iter_capacity_commitments_early_termination(self, client_mock):
+        def pages():
+            yield CapacityCommitment(name="c1")
+            raise AssertionError("Next page should not be fetched")
+
+        client_mock.return_value.list_capacity_commitments.return_value = pages()
+
+        commitments = self.hook.iter_capacity_commitments(PARENT)
+
+        assert next(commitments) == CapacityCommitment(name="c1")
+        commitments.close()
+
+        assert self.hook.api_metrics.calls == 1
+        assert self.hook.api_metrics.failures == 0
+
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.hooks."
+        + "bigquery_reservation.BigQueryReservationServiceHook.get_client"
+    )
+    def test_iter_reservations_excludes_consumer_time(self, client_mock):
+        client_mock.return_value.list_reservations.return_value = [
+            Reservation(name="r1"),
+            Reservation(name="r2"),
+        ]
+
+        for _ in self.hook.iter_reservations(PARENT):
+            time.sleep(0.05)
+
+        assert self.hook.api_metrics.calls == 1
+        assert self.hook.api_metrics.api_time < 0.05
+
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.hooks."
+        + "bigquery_reservation.BigQueryReservationServiceHook.get_client"
+    )
+    def test_iter_capacity_commitments_next_page_failure(self, client_mock):
+        def pages():
+            yield CapacityCommitment(name="c1")
+            raise Exception("Test")
+
+        client_mock.return_value.list_capacity_commitments.return_value = pages()
+
+        commitments = self.hook.iter_capacity_commitments(PARENT)
+
+        assert next(commitments) == CapacityCommitment(name="c1")
+        with pytest.raises(AirflowException):
+            next(commitments)
+        assert self.hook.api_metrics.failures == 1
+
     # Delete Capacity Commitment
     @mock.patch(
         "airflow_provider_bigquery_reservation.hooks.bigquery_reservation."
@@ -167,6 +339,52 @@ class TestBigQueryReservationHook:
         with pytest.raises(AirflowException):
             self.hook.delete_capacity_commitment(RESOURCE_NAME)
 
+    # Get Capacity Commitment
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.hooks.bigquery_reservation."
+        + "BigQueryReservationServiceHook.get_client"
+    )
+    def test_get_capacity_commitment_success(self, client_mock):
+        result = self.hook.get_capacity_commitment(RESOURCE_NAME)
+
+        client_mock.return_value.get_capacity_commitment.assert_called_once_with(
+            name=RESOURCE_NAME
+        )
+        assert result == client_mock.return_value.get_capacity_commitment.return_value
+
+    @mock.patch.object(
+        ReservationServiceClient,
+        "get_capacity_commitment",
+        side_effect=Exception("Test"),
+    )
+    def test_get_capacity_commitment_failure(self, call_failure):
+        with pytest.raises(AirflowException):
+            self.hook.get_capacity_commitment(RESOURCE_NAME)
+
+    # Split Capacity Commitment
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.hooks.bigquery_reservation."
+        + "BigQueryReservationServiceHook.get_client"
+    )
+    def test_split_capacity_commitment_success(self, client_mock):
+        response = client_mock.return_value.split_capacity_commitment.return_value
+
+        result = self.hook.split_capacity_commitment(RESOURCE_NAME, SLOTS)
+
+        client_mock.return_value.split_capacity_commitment.assert_called_once_with(
+            name=RESOURCE_NAME, slot_count=SLOTS
+        )
+        assert result == (response.first, response.second)
+
+    @mock.patch.object(
+        ReservationServiceClient,
+        "split_capacity_commitment",
+        side_effect=Exception("Test"),
+    )
+    def test_split_capacity_commitment_failure(self, call_failure):
+        with pytest.raises(AirflowException):
+            self.hook.split_capacity_commitment(RESOURCE_NAME, SLOTS)
+
     # Create Reservation
     @mock.patch(
         "airflow_provider_bigquery_reservation.hooks."
@@ -233,7 +451,7 @@ class TestBigQueryReservationHook:
     def test_list_reservations_success(self, client_mock):
         self.hook.list_reservations(PARENT)
         client_mock.return_value.list_reservations.assert_called_once_with(
-            parent=PARENT
+            request={"parent": PARENT}
         )
 
     @mock.patch.object(
@@ -319,7 +537,7 @@ class TestBigQueryReservationHook:
     def test_list_assignments_success(self, client_mock):
         self.hook.list_assignments(PARENT)
         client_mock.return_value.list_assignments.assert_called_once_with(
-            parent=PARENT,
+            request={"parent": PARENT},
         )
 
     @mock.patch.object(
@@ -402,6 +620,26 @@ class TestBigQueryReservationHook:
         with pytest.raises(AirflowException):
             self.hook.search_assignment(PARENT, PROJECT_ID, JOB_TYPE)
 
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.hooks."
+        + "bigquery_reservation.BigQueryReservationServiceHook.get_client"
+    )
+    def test_search_assignment_in_inventory(self, client_mock):
+        assignment = Assignment(
+            name=RESOURCE_NAME,
+            assignee=f"projects/{PROJECT_ID}",
+            job_type=JOB_TYPE,
+            state=STATE,
+        )
+        inventory = ReservationInventory(PARENT, assignments=[assignment])
+
+        result = self.hook.search_assignment(
+            PARENT, PROJECT_ID, JOB_TYPE, inventory=inventory
+        )
+
+        assert result == assignment
+        client_mock.return_value.search_all_assignments.assert_not_called()
+
     # Delete Assignment
     @mock.patch(
         "airflow_provider_bigquery_reservation.hooks."
@@ -429,6 +667,35 @@ class TestBigQueryReservationHook:
             credentials=self.hook.get_credentials(), client_info=CLIENT_INFO
         )
 
+    @mock.patch("google.cloud.bigquery.Client")
+    def test_get_bq_client_pooled(self, bq_client_mock):
+        first = self.hook.get_bq_client()
+
+        assert self.hook.get_bq_client() is first
+        bq_client_mock.assert_called_once_with(
+            credentials=CREDENTIALS, client_info=CLIENT_INFO
+        )
+
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.hooks."
+        + "bigquery_reservation.ReservationServiceClient"
+    )
+    def test_get_client_shared_between_hooks(self, reservation_client_mock):
+        with mock.patch(
+            "airflow_provider_bigquery_reservation.hooks."
+            + "bigquery_reservation.GoogleBaseHook.__init__",
+            new=mock_base_gcp_hook_no_default_project_id,
+        ):
+            other_hook = BigQueryReservationServiceHook(location=LOCATION)
+        other_hook.get_credentials = mock.MagicMock(return_value=CREDENTIALS)
+
+        assert self.hook.get_client() is other_hook.get_client()
+        reservation_client_mock.assert_called_once_with(
+            credentials=CREDENTIALS, client_info=CLIENT_INFO
+        )
+        self.hook.get_credentials.assert_called_once()
+        other_hook.get_credentials.assert_not_called()
+
     # Is Assignment attached
     @mock.patch("google.cloud.bigquery.QueryJobConfig")
     def test_is_assignment_attached_true(self, query_job_config_mock):
@@ -478,6 +745,36 @@ class TestBigQueryReservationHook:
 
         assert rslt is False
 
+    def test_wait_assignment_attachment(self):
+        probe = mock.MagicMock(spec=AttachmentProbe)
+        probe.is_attached.side_effect = [False, True]
+        target = AttachmentTarget(PROJECT_ID, LOCATION)
+
+        rslt = self.hook.wait_assignment_attachment(
+            target=target,
+            probe=probe,
+            backoff=AttachmentBackoff(initial_interval=0.01),
+        )
+
+        probe.is_attached.assert_called_with(self.hook, target)
+        assert probe.is_attached.call_count == 2
+        assert rslt == self.hook.attachment_duration
+        assert rslt > 0
+
+    def test_wait_assignment_attachment_deadline_exceeded(self):
+        probe = mock.MagicMock(spec=AttachmentProbe)
+        probe.is_attached.return_value = False
+
+        with pytest.raises(AirflowException):
+            self.hook.wait_assignment_attachment(
+                target=AttachmentTarget(PROJECT_ID, LOCATION),
+                probe=probe,
+                backoff=AttachmentBackoff(initial_interval=0.01, deadline=0.05),
+            )
+
+    def assert_bi_ledger_unlocked(self):
+        assert not self.bi_ledger.lock.locked(), "Ledger locked during the backoff"
+
     # Create BI Reservation
     @mock.patch(
         "airflow_provider_bigquery_reservation.hooks.bigquery_reservation.BigQueryReservationServiceHook.get_client"
@@ -487,15 +784,19 @@ class TestBigQueryReservationHook:
         initial_size = SIZE_KO
         expected_size = initial_size + requested_size_gb * CONSTANT_GO_TO_KO
 
-        client_mock.return_value.get_bi_reservation.return_value = BiReservation(
-            name=PARENT_BI_RESERVATION, size=initial_size
-        )
+        client_mock.return_value.get_bi_reservation.side_effect = [
+            BiReservation(name=PARENT_BI_RESERVATION, size=initial_size),
+            BiReservation(name=PARENT_BI_RESERVATION, size=expected_size),
+        ]
         self.hook.create_bi_reservation(project_id=PROJECT_ID, size=requested_size_gb)
-        client_mock.return_value.get_bi_reservation.assert_called_once_with(
-            name=PARENT_BI_RESERVATION
+        client_mock.return_value.get_bi_reservation.assert_has_calls(
+            [mock.call(name=PARENT_BI_RESERVATION)] * 2
         )
         client_mock.return_value.update_bi_reservation.assert_called_once_with(
-            bi_reservation=BiReservation(name=PARENT_BI_RESERVATION, size=expected_size)
+            bi_reservation=BiReservation(
+                name=PARENT_BI_RESERVATION, size=expected_size
+            ),
+            update_mask=field_mask_pb2.FieldMask(paths=["size"]),
         )
 
     @mock.patch(
@@ -506,18 +807,167 @@ class TestBigQueryReservationHook:
         initial_size = 0
         expected_size = initial_size + requested_size_gb * CONSTANT_GO_TO_KO
 
-        client_mock.return_value.get_bi_reservation.return_value = BiReservation(
-            name=PARENT_BI_RESERVATION, size=initial_size
-        )
+        client_mock.return_value.get_bi_reservation.side_effect = [
+            BiReservation(name=PARENT_BI_RESERVATION, size=initial_size),
+            BiReservation(name=PARENT_BI_RESERVATION, size=expected_size),
+        ]
         self.hook.create_bi_reservation(project_id=PROJECT_ID, size=requested_size_gb)
-        client_mock.return_value.get_bi_reservation.assert_called_once_with(
-            name=PARENT_BI_RESERVATION
+        client_mock.return_value.get_bi_reservation.assert_has_calls(
+            [mock.call(name=PARENT_BI_RESERVATION)] * 2
         )
 
         client_mock.return_value.update_bi_reservation.assert_called_once_with(
-            bi_reservation=BiReservation(name=PARENT_BI_RESERVATION, size=expected_size)
+            bi_reservation=BiReservation(
+                name=PARENT_BI_RESERVATION, size=expected_size
+            ),
+            update_mask=field_mask_pb2.FieldMask(paths=["size"]),
+        )
+
+    @mock.patch("time.sleep")
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.hooks.bigquery_reservation.BigQueryReservationServiceHook.get_client"
+    )
+    def test_create_bi_reservation_overwritten_retried(self, client_mock, sleep_mock):
+        client_mock.return_value.get_bi_reservation.side_effect = [
+            BiReservation(name=PARENT_BI_RESERVATION, size=SIZE_KO),
+            # Another writer overwrote the update with the size before it
+            BiReservation(name=PARENT_BI_RESERVATION, size=SIZE_KO),
+            BiReservation(name=PARENT_BI_RESERVATION, size=3 * SIZE_KO),
+            BiReservation(name=PARENT_BI_RESERVATION, size=4 * SIZE_KO),
+        ]
+        sleep_mock.side_effect = lambda _: self.assert_bi_ledger_unlocked()
+
+        self.hook.create_bi_reservation(project_id=PROJECT_ID, size=SIZE)
+
+        assert client_mock.return_value.update_bi_reservation.call_args_list == [
+            mock.call(
+                bi_reservation=BiReservation(name=PARENT_BI_RESERVATION, size=size),
+                update_mask=field_mask_pb2.FieldMask(paths=["size"]),
+            )
+            for size in (2 * SIZE_KO, 4 * SIZE_KO)
+        ]
+        sleep_mock.assert_called_once_with(1.0)
+        (entry,) = self.bi_ledger.state["reservations"].values()
+        assert entry["size"] == 4 * SIZE_KO
+        assert [(u["from"], u["to"]) for u in entry["updates"]] == [
+            (3 * SIZE_KO, 4 * SIZE_KO)
+        ]
+
+    @mock.patch("time.sleep")
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.hooks.bigquery_reservation.BigQueryReservationServiceHook.get_client"
+    )
+    def test_create_bi_reservation_changed_after_update(self, client_mock, sleep_mock):
+        client_mock.return_value.get_bi_reservation.side_effect = [
+            BiReservation(name=PARENT_BI_RESERVATION, size=SIZE_KO),
+            # Another writer resized the reservation on top of the update
+            BiReservation(name=PARENT_BI_RESERVATION, size=3 * SIZE_KO),
+        ]
+
+        self.hook.create_bi_reservation(project_id=PROJECT_ID, size=SIZE)
+
+        client_mock.return_value.update_bi_reservation.assert_called_once()
+        sleep_mock.assert_not_called()
+        (entry,) = self.bi_ledger.state["reservations"].values()
+        assert entry["size"] == 3 * SIZE_KO
+        assert self.hook.api_metrics.calls == 3
+        assert set(self.hook.api_metrics.time_by_method) == {
+            "get_bi_reservation",
+            "update_bi_reservation",
+        }
+
+    @mock.patch("time.sleep")
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.hooks.bigquery_reservation.BigQueryReservationServiceHook.get_client"
+    )
+    def test_create_bi_reservation_overwritten_exhausted(self, client_mock, sleep_mock):
+        client_mock.return_value.get_bi_reservation.return_value = BiReservation(
+            name=PARENT_BI_RESERVATION, size=SIZE_KO
+        )
+
+        with pytest.raises(AirflowException):
+            self.hook.create_bi_reservation(project_id=PROJECT_ID, size=SIZE)
+
+        assert client_mock.return_value.update_bi_reservation.call_count == 5
+        assert [c.args[0] for c in sleep_mock.call_args_list] == [1, 2, 4, 8, 10]
+        assert not self.bi_ledger.state["reservations"]
+
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.hooks.bigquery_reservation.BigQueryReservationServiceHook.get_client"
+    )
+    def test_create_bi_reservation_ledger_unlocked_during_calls(self, client_mock):
+        sizes = iter([SIZE_KO, 2 * SIZE_KO])
+
+        def get_bi_reservation(name):
+            self.assert_bi_ledger_unlocked()
+            claim = self.bi_ledger.state["reservations"][name]["writer"]
+            assert claim is not None
+            return BiReservation(name=name, size=next(sizes))
+
+        client_mock.return_value.get_bi_reservation.side_effect = get_bi_reservation
+        client_mock.return_value.update_bi_reservation.side_effect = (
+            lambda **_: self.assert_bi_ledger_unlocked()
         )
 
+        self.hook.create_bi_reservation(project_id=PROJECT_ID, size=SIZE)
+
+        (entry,) = self.bi_ledger.state["reservations"].values()
+        assert entry["writer"] is None
+        assert entry["size"] == 2 * SIZE_KO
+
+    @mock.patch("time.sleep")
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.hooks.bigquery_reservation.BigQueryReservationServiceHook.get_client"
+    )
+    def test_create_bi_reservation_waits_for_claim(self, client_mock, sleep_mock):
+        since = datetime.datetime.now(tz=datetime.timezone.utc).isoformat()
+        with self.bi_ledger.locked() as state:
+            state["reservations"][PARENT_BI_RESERVATION] = {
+                "size": SIZE_KO,
+                "updates": [],
+                "writer": {"id": "other", "since": since},
+            }
+
+        def release(_):
+            with self.bi_ledger.locked() as state:
+                state["reservations"][PARENT_BI_RESERVATION]["writer"] = None
+
+        sleep_mock.side_effect = release
+        client_mock.return_value.get_bi_reservation.side_effect = [
+            BiReservation(name=PARENT_BI_RESERVATION, size=SIZE_KO),
+            BiReservation(name=PARENT_BI_RESERVATION, size=2 * SIZE_KO),
+        ]
+
+        self.hook.create_bi_reservation(project_id=PROJECT_ID, size=SIZE)
+
+        sleep_mock.assert_called_once_with(1.0)
+        client_mock.return_value.update_bi_reservation.assert_called_once()
+
+    @mock.patch("time.sleep")
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.hooks.bigquery_reservation.BigQueryReservationServiceHook.get_client"
+    )
+    def test_create_bi_reservation_takes_over_stale_claim(
+        self, client_mock, sleep_mock
+    ):
+        since = datetime.datetime(2023, 1, 1, tzinfo=datetime.timezone.utc)
+        with self.bi_ledger.locked() as state:
+            state["reservations"][PARENT_BI_RESERVATION] = {
+                "size": SIZE_KO,
+                "updates": [],
+                "writer": {"id": "killed", "since": since.isoformat()},
+            }
+        client_mock.return_value.get_bi_reservation.side_effect = [
+            BiReservation(name=PARENT_BI_RESERVATION, size=SIZE_KO),
+            BiReservation(name=PARENT_BI_RESERVATION, size=2 * SIZE_KO),
+        ]
+
+        self.hook.create_bi_reservation(project_id=PROJECT_ID, size=SIZE)
+
+        sleep_mock.assert_not_called()
+        (entry,) = self.bi_ledger.state["reservations"].values()
+        assert entry["writer"] is None
+
     @mock.patch.object(
         ReservationServiceClient, "get_bi_reservation", side_effect=Exception("Test")
     )
@@ -535,81 +985,283 @@ class TestBigQueryReservationHook:
         with pytest.raises(AirflowException):
             self.hook.create_bi_reservation(project_id=PROJECT_ID, size=SIZE)
 
-    # Delete BI Reservation
     @mock.patch(
         "airflow_provider_bigquery_reservation.hooks.bigquery_reservation.BigQueryReservationServiceHook.get_client"
     )
-    def test_delete_bi_reservation_size_none_success(self, client_mock):
-        initial_size = SIZE_KO
-        expected_size = 0
-        client_mock.return_value.get_bi_reservation.return_value = BiReservation(
-            name=PARENT_BI_RESERVATION, size=initial_size
-        )
-        self.hook.delete_bi_reservation(project_id=PROJECT_ID)
-        client_mock.return_value.get_bi_reservation.assert_called_once_with(
-            name=PARENT_BI_RESERVATION
+    def test_create_bi_reservation_preferred_tables(self, client_mock):
+        tables = [
+            TableReference(project_id=PROJECT_ID, dataset_id="dataset", table_id=t)
+            for t in ("a", "b")
+        ]
+        client_mock.return_value.get_bi_reservation.side_effect = [
+            BiReservation(
+                name=PARENT_BI_RESERVATION, size=SIZE_KO, preferred_tables=tables[:1]
+            ),
+            BiReservation(
+                name=PARENT_BI_RESERVATION, size=2 * SIZE_KO, preferred_tables=tables
+            ),
+        ]
+
+        self.hook.create_bi_reservation(
+            project_id=PROJECT_ID,
+            size=SIZE,
+            preferred_tables=[f"{PROJECT_ID}.dataset.b", f"{PROJECT_ID}.dataset.a"],
         )
+
         client_mock.return_value.update_bi_reservation.assert_called_once_with(
-            bi_reservation=BiReservation(name=PARENT_BI_RESERVATION, size=expected_size)
+            bi_reservation=BiReservation(
+                name=PARENT_BI_RESERVATION, size=2 * SIZE_KO, preferred_tables=tables
+            ),
+            update_mask=field_mask_pb2.FieldMask(paths=["size", "preferred_tables"]),
         )
+        (entry,) = self.bi_ledger.state["reservations"].values()
+        assert entry["updates"][-1]["preferred_tables"] == [
+            f"{PROJECT_ID}.dataset.a",
+            f"{PROJECT_ID}.dataset.b",
+        ]
 
     @mock.patch(
         "airflow_provider_bigquery_reservation.hooks.bigquery_reservation.BigQueryReservationServiceHook.get_client"
     )
-    def test_delete_bi_reservation_size_filled_update_non_negative_success(
-        self, client_mock
-    ):
-        initial_size = 100 * CONSTANT_GO_TO_KO
-        requeted_deleted_size_gb = 50
-        expected_size = initial_size - requeted_deleted_size_gb * CONSTANT_GO_TO_KO
+    def test_create_bi_reservation_invalid_preferred_table(self, client_mock):
         client_mock.return_value.get_bi_reservation.return_value = BiReservation(
-            name=PARENT_BI_RESERVATION, size=initial_size
-        )
-        self.hook.delete_bi_reservation(
-            project_id=PROJECT_ID, size=requeted_deleted_size_gb
-        )
-        client_mock.return_value.get_bi_reservation.assert_called_once_with(
-            name=PARENT_BI_RESERVATION
-        )
-        client_mock.return_value.update_bi_reservation.assert_called_once_with(
-            bi_reservation=BiReservation(name=PARENT_BI_RESERVATION, size=expected_size)
+            name=PARENT_BI_RESERVATION, size=SIZE_KO
         )
 
+        with pytest.raises(AirflowException):
+            self.hook.create_bi_reservation(
+                project_id=PROJECT_ID, size=SIZE, preferred_tables=["dataset.table"]
+            )
+
+        client_mock.return_value.update_bi_reservation.assert_not_called()
+
+    # Update BI Reservation Preferred Tables
+    @mock.patch("time.sleep")
     @mock.patch(
         "airflow_provider_bigquery_reservation.hooks.bigquery_reservation.BigQueryReservationServiceHook.get_client"
     )
-    def test_delete_bi_reservation_size_filled_update_negative_success(
-        self, client_mock
+    def test_update_bi_reservation_preferred_tables_overwritten_retried(
+        self, client_mock, sleep_mock
     ):
-        initial_size = 100 * CONSTANT_GO_TO_KO
-        requeted_deleted_size_gb = 200
-        expected_size = 0
-        client_mock.return_value.get_bi_reservation.return_value = BiReservation(
-            name=PARENT_BI_RESERVATION, size=initial_size
+        table = TableReference(
+            project_id=PROJECT_ID, dataset_id="dataset", table_id="table"
         )
-        self.hook.delete_bi_reservation(
-            project_id=PROJECT_ID, size=requeted_deleted_size_gb
+        other = TableReference(
+            project_id=PROJECT_ID, dataset_id="dataset", table_id="other"
         )
-        client_mock.return_value.get_bi_reservation.assert_called_once_with(
-            name=PARENT_BI_RESERVATION
+        client_mock.return_value.get_bi_reservation.side_effect = [
+            BiReservation(name=PARENT_BI_RESERVATION, size=SIZE_KO),
+            # Another writer overwrote the update
+            BiReservation(
+                name=PARENT_BI_RESERVATION, size=SIZE_KO, preferred_tables=[other]
+            ),
+            BiReservation(
+                name=PARENT_BI_RESERVATION, size=SIZE_KO, preferred_tables=[other]
+            ),
+            BiReservation(
+                name=PARENT_BI_RESERVATION, size=SIZE_KO, preferred_tables=[table]
+            ),
+        ]
+
+        tables = self.hook.update_bi_reservation_preferred_tables(
+            project_id=PROJECT_ID, preferred_tables=[f"{PROJECT_ID}.dataset.table"]
         )
-        client_mock.return_value.update_bi_reservation.assert_called_once_with(
-            bi_reservation=BiReservation(name=PARENT_BI_RESERVATION, size=expected_size)
+
+        assert tables == [f"{PROJECT_ID}.dataset.table"]
+        assert (
+            client_mock.return_value.update_bi_reservation.call_args_list
+            == [
+                mock.call(
+                    bi_reservation=BiReservation(
+                        name=PARENT_BI_RESERVATION, preferred_tables=[table]
+                    ),
+                    update_mask=field_mask_pb2.FieldMask(paths=["preferred_tables"]),
+                )
+            ]
+            * 2
         )
+        sleep_mock.assert_called_once_with(1.0)
 
-    @mock.patch.object(
-        ReservationServiceClient, "get_bi_reservation", side_effect=Exception("Test")
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.hooks.bigquery_reservation.BigQueryReservationServiceHook.get_client"
     )
-    def test_delete_bi_reservation_get_failure(self, call_failure):
-        with pytest.raises(AirflowException):
-            self.hook.delete_bi_reservation(project_id=PROJECT_ID, size=SIZE)
+    def test_resize_bi_reservation(self, client_mock):
+        client_mock.return_value.get_bi_reservation.side_effect = [
+            BiReservation(name=PARENT_BI_RESERVATION, size=3 * SIZE_KO),
+            BiReservation(name=PARENT_BI_RESERVATION, size=SIZE_KO),
+        ]
 
-    @mock.patch.object(ReservationServiceClient, "get_bi_reservation")
-    @mock.patch.object(
-        ReservationServiceClient, "update_bi_reservation", side_effect=Exception("Test")
-    )
-    def test_delete_bi_reservation_update_failure(
-        self, call_failure, get_bi_reservation_mock
+        self.hook.resize_bi_reservation(project_id=PROJECT_ID, size=SIZE)
+
+        client_mock.return_value.update_bi_reservation.assert_called_once_with(
+            bi_reservation=BiReservation(name=PARENT_BI_RESERVATION, size=SIZE_KO),
+            update_mask=field_mask_pb2.FieldMask(paths=["size"]),
+        )
+
+    # BI Engine usage
+    @mock.patch.object(BigQueryReservationServiceHook, "get_bq_client")
+    def test_get_bi_engine_usage(self, get_bq_client_mock):
+        query_mock = get_bq_client_mock.return_value.query
+        query_mock.return_value.result.return_value = [
+            {
+                "hour": LOGICAL_DATE,
+                "table_id": f"{PROJECT_ID}.dataset.table",
+                "queries": 2.5,
+                "accelerated_queries": 1.0,
+                "bytes_processed": 1024,
+                "reasons": ["INSUFFICIENT_RESERVATION"],
+            }
+        ]
+
+        usages = self.hook.get_bi_engine_usage(project_id=PROJECT_ID, lookback_hours=24)
+
+        assert usages == [
+            BiEngineTableUsage(
+                hour=LOGICAL_DATE,
+                table_id=f"{PROJECT_ID}.dataset.table",
+                queries=2.5,
+                accelerated_queries=1.0,
+                bytes_processed=1024,
+                reasons=["INSUFFICIENT_RESERVATION"],
+            )
+        ]
+        query, kwargs = query_mock.call_args.args[0], query_mock.call_args.kwargs
+        assert f"`{PROJECT_ID}.region-us.INFORMATION_SCHEMA.JOBS`" in query
+        assert kwargs["project"] == PROJECT_ID
+        assert kwargs["location"] == LOCATION
+        assert {
+            parameter.name: parameter.value
+            for parameter in kwargs["job_config"].query_parameters
+        } == {"lookback_hours": 24}
+
+    @mock.patch.object(BigQueryReservationServiceHook, "get_bq_client")
+    def test_get_bi_engine_usage_failure(self, get_bq_client_mock):
+        get_bq_client_mock.return_value.query.side_effect = Exception("Test")
+
+        with pytest.raises(AirflowException):
+            self.hook.get_bi_engine_usage(project_id=PROJECT_ID)
+
+    # Delete BI Reservation
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.hooks.bigquery_reservation.BigQueryReservationServiceHook.get_client"
+    )
+    def test_delete_bi_reservation_size_none_success(self, client_mock):
+        initial_size = SIZE_KO
+        expected_size = 0
+        client_mock.return_value.get_bi_reservation.side_effect = [
+            BiReservation(name=PARENT_BI_RESERVATION, size=initial_size),
+            BiReservation(name=PARENT_BI_RESERVATION, size=expected_size),
+        ]
+        self.hook.delete_bi_reservation(project_id=PROJECT_ID)
+        client_mock.return_value.get_bi_reservation.assert_has_calls(
+            [mock.call(name=PARENT_BI_RESERVATION)] * 2
+        )
+        client_mock.return_value.update_bi_reservation.assert_called_once_with(
+            bi_reservation=BiReservation(
+                name=PARENT_BI_RESERVATION, size=expected_size
+            ),
+            update_mask=field_mask_pb2.FieldMask(paths=["size"]),
+        )
+
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.hooks.bigquery_reservation.BigQueryReservationServiceHook.get_client"
+    )
+    def test_delete_bi_reservation_size_filled_update_non_negative_success(
+        self, client_mock
+    ):
+        initial_size = 100 * CONSTANT_GO_TO_KO
+        requeted_deleted_size_gb = 50
+        expected_size = initial_size - requeted_deleted_size_gb * CONSTANT_GO_TO_KO
+        client_mock.return_value.get_bi_reservation.side_effect = [
+            BiReservation(name=PARENT_BI_RESERVATION, size=initial_size),
+            BiReservation(name=PARENT_BI_RESERVATION, size=expected_size),
+        ]
+        self.hook.delete_bi_reservation(
+            project_id=PROJECT_ID, size=requeted_deleted_size_gb
+        )
+        client_mock.return_value.get_bi_reservation.assert_has_calls(
+            [mock.call(name=PARENT_BI_RESERVATION)] * 2
+        )
+        client_mock.return_value.update_bi_reservation.assert_called_once_with(
+            bi_reservation=BiReservation(
+                name=PARENT_BI_RESERVATION, size=expected_size
+            ),
+            update_mask=field_mask_pb2.FieldMask(paths=["size"]),
+        )
+
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.hooks.bigquery_reservation.BigQueryReservationServiceHook.get_client"
+    )
+    def test_delete_bi_reservation_preferred_tables(self, client_mock):
+        tables = [
+            TableReference(project_id=PROJECT_ID, dataset_id="dataset", table_id=t)
+            for t in ("a", "b")
+        ]
+        client_mock.return_value.get_bi_reservation.side_effect = [
+            BiReservation(
+                name=PARENT_BI_RESERVATION, size=2 * SIZE_KO, preferred_tables=tables
+            ),
+            BiReservation(
+                name=PARENT_BI_RESERVATION, size=SIZE_KO, preferred_tables=tables[1:]
+            ),
+        ]
+
+        self.hook.delete_bi_reservation(
+            project_id=PROJECT_ID,
+            size=SIZE,
+            preferred_tables=[f"{PROJECT_ID}.dataset.a"],
+        )
+
+        client_mock.return_value.update_bi_reservation.assert_called_once_with(
+            bi_reservation=BiReservation(
+                name=PARENT_BI_RESERVATION, size=SIZE_KO, preferred_tables=tables[1:]
+            ),
+            update_mask=field_mask_pb2.FieldMask(paths=["size", "preferred_tables"]),
+        )
+
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.hooks.bigquery_reservation.BigQueryReservationServiceHook.get_client"
+    )
+    def test_delete_bi_reservation_size_filled_update_negative_success(
+        self, client_mock
+    ):
+        initial_size = 100 * CONSTANT_GO_TO_KO
+        requeted_deleted_size_gb = 200
+        expected_size = 0
+        client_mock.return_value.get_bi_reservation.side_effect = [
+            BiReservation(name=PARENT_BI_RESERVATION, size=initial_size),
+            BiReservation(name=PARENT_BI_RESERVATION, size=expected_size),
+        ]
+        self.hook.delete_bi_reservation(
+            project_id=PROJECT_ID, size=requeted_deleted_size_gb
+        )
+        client_mock.return_value.get_bi_reservation.assert_has_calls(
+            [mock.call(name=PARENT_BI_RESERVATION)] * 2
+        )
+        client_mock.return_value.update_bi_reservation.assert_called_once_with(
+            bi_reservation=BiReservation(
+                name=PARENT_BI_RESERVATION, size=expected_size
+            ),
+            update_mask=field_mask_pb2.FieldMask(paths=["size"]),
+        )
+
+    @mock.patch.object(
+        ReservationServiceClient, "get_bi_reservation", side_effect=Exception("Test")
+    )
+    def test_delete_bi_reservation_get_failure(self, call_failure):
+        with pytest.raises(AirflowException):
+            self.hook.delete_bi_reservation(project_id=PROJECT_ID, size=SIZE)
+
+    @mock.patch.object(
+        ReservationServiceClient,
+        "get_bi_reservation",
+        return_value=BiReservation(name=PARENT_BI_RESERVATION, size=SIZE_KO),
+    )
+    @mock.patch.object(
+        ReservationServiceClient, "update_bi_reservation", side_effect=Exception("Test")
+    )
+    def test_delete_bi_reservation_update_failure(
+        self, call_failure, get_bi_reservation_mock
     ):
         with pytest.raises(AirflowException):
             self.hook.delete_bi_reservation(project_id=PROJECT_ID, size=SIZE)
@@ -738,6 +1390,47 @@ class TestBigQueryReservationHook:
             job_type=JOB_TYPE,
         )
 
+    @mock.patch.object(
+        BigQueryReservationServiceHook,
+        "create_capacity_commitment",
+    )
+    @mock.patch.object(
+        BigQueryReservationServiceHook,
+        "search_assignment",
+        return_value=None,
+    )
+    @mock.patch.object(
+        BigQueryReservationServiceHook,
+        "create_reservation",
+        return_value=Reservation(name=RESOURCE_NAME),
+    )
+    @mock.patch.object(BigQueryReservationServiceHook, "create_assignment")
+    @mock.patch.object(BigQueryReservationServiceHook, "get_bq_client")
+    @mock.patch.object(
+        BigQueryReservationServiceHook,
+        "_is_assignment_attached_in_query",
+    )
+    def test_create_commitment_reservation_and_assignment_without_attachment_wait(
+        self,
+        _is_assignment_attached_in_query_mock,
+        bq_client_mock,
+        create_assignment_mock,
+        create_reservation_mock,
+        search_assignment_mock,
+        create_capacity_commitment_mock,
+    ):
+        self.hook.create_commitment_reservation_and_assignment(
+            slots=SLOTS,
+            assignment_job_type=JOB_TYPE,
+            commitments_duration=COMMITMENT_DURATION,
+            project_id=PROJECT_ID,
+            wait_assignment_attachment=False,
+        )
+
+        create_assignment_mock.assert_called_once()
+        bq_client_mock.assert_not_called()
+        _is_assignment_attached_in_query_mock.assert_not_called()
+
     @mock.patch.object(
         BigQueryReservationServiceHook,
         "create_capacity_commitment",
@@ -797,12 +1490,18 @@ class TestBigQueryReservationHook:
         "create_capacity_commitment",
         side_effect=Exception("Test"),
     )
+    @mock.patch.object(
+        BigQueryReservationServiceHook, "search_assignment", return_value=None
+    )
     @mock.patch.object(
         BigQueryReservationServiceHook,
         "delete_commitment_reservation_and_assignment",
     )
     def test_create_commitment_reservation_and_assignment_failure_none_create(
-        self, delete_commitment_reservation_and_assignment_mock, call_failure
+        self,
+        delete_commitment_reservation_and_assignment_mock,
+        search_assignment_mock,
+        call_failure,
     ):
         with pytest.raises(AirflowException):
             self.hook.create_commitment_reservation_and_assignment(
@@ -818,6 +1517,97 @@ class TestBigQueryReservationHook:
                 slots=SLOTS,
             )
 
+    @mock.patch.object(
+        BigQueryReservationServiceHook,
+        "create_capacity_commitment",
+    )
+    @mock.patch.object(
+        BigQueryReservationServiceHook,
+        "search_assignment",
+        side_effect=AirflowException("Test"),
+    )
+    @mock.patch.object(BigQueryReservationServiceHook, "create_reservation")
+    @mock.patch.object(
+        BigQueryReservationServiceHook,
+        "delete_commitment_reservation_and_assignment",
+    )
+    def test_create_commitment_reservation_and_assignment_failure_search_branch(
+        self,
+        delete_commitment_reservation_and_assignment_mock,
+        create_reservation_mock,
+        search_assignment_mock,
+        create_capacity_commitment_mock,
+    ):
+        def create_capacity_commitment(**kwargs):
+            self.hook.commitment = CapacityCommitment(name=RESOURCE_NAME)
+
+        create_capacity_commitment_mock.side_effect = create_capacity_commitment
+
+        with pytest.raises(AirflowException):
+            self.hook.create_commitment_reservation_and_assignment(
+                slots=SLOTS,
+                assignment_job_type=JOB_TYPE,
+                commitments_duration=COMMITMENT_DURATION,
+                project_id=PROJECT_ID,
+            )
+
+        create_capacity_commitment_mock.assert_called_once()
+        create_reservation_mock.assert_not_called()
+        delete_commitment_reservation_and_assignment_mock.assert_called_once_with(
+            commitment_name=RESOURCE_NAME,
+            reservation_name=None,
+            assignment_name=None,
+            slots=SLOTS,
+            idempotency_key=None,
+        )
+
+    @mock.patch.object(
+        BigQueryReservationServiceHook,
+        "create_capacity_commitment",
+        side_effect=AirflowException("Test"),
+    )
+    @mock.patch.object(
+        BigQueryReservationServiceHook,
+        "search_assignment",
+        return_value=Assignment(name=f"{RESOURCE_NAME}/assignments/test"),
+    )
+    @mock.patch.object(
+        BigQueryReservationServiceHook,
+        "get_reservation",
+        return_value=Reservation(name=RESOURCE_NAME, slot_capacity=SLOTS),
+    )
+    @mock.patch.object(BigQueryReservationServiceHook, "update_reservation")
+    @mock.patch.object(
+        BigQueryReservationServiceHook,
+        "delete_commitment_reservation_and_assignment",
+    )
+    def test_create_commitment_reservation_and_assignment_failure_commitment_branch(
+        self,
+        delete_commitment_reservation_and_assignment_mock,
+        update_reservation_mock,
+        get_reservation_mock,
+        search_assignment_mock,
+        create_capacity_commitment_mock,
+    ):
+        with pytest.raises(AirflowException):
+            self.hook.create_commitment_reservation_and_assignment(
+                slots=SLOTS,
+                assignment_job_type=JOB_TYPE,
+                commitments_duration=COMMITMENT_DURATION,
+                project_id=PROJECT_ID,
+            )
+
+        # The lookup branch completes before the failure is handled
+        get_reservation_mock.assert_called_once_with(name=RESOURCE_NAME)
+        update_reservation_mock.assert_not_called()
+        delete_commitment_reservation_and_assignment_mock.assert_called_once_with(
+            commitment_name=None,
+            reservation_name=None,
+            assignment_name=f"{RESOURCE_NAME}/assignments/test",
+            slots=SLOTS,
+            idempotency_key=None,
+        )
+
     # Delete Commitment Reservation And assignment
     def test_delete_commitment_reservation_and_assignment_none(self, caplog):
         self.hook.delete_commitment_reservation_and_assignment(slots=SLOTS)
@@ -967,7 +1757,8 @@ class TestBigQueryReservationHook:
                 mock.call(name="a2"),
                 mock.call(name="a3"),
                 mock.call(name="a4"),
-            ]
+            ],
+            any_order=True,
         )
 
         delete_reservation_mock.assert_has_calls(
@@ -975,69 +1766,178 @@ class TestBigQueryReservationHook:
                 mock.call(name="r1"),
                 mock.call(name="r2"),
                 mock.call(name="r3"),
-            ]
+            ],
+            any_order=True,
         )
 
         delete_capacity_commitment_mock.assert_has_calls(
             [
                 mock.call(name="c1"),
                 mock.call(name="c2"),
-            ]
+            ],
+            any_order=True,
         )
 
     @mock.patch.object(
-        ReservationServiceClient,
+        BigQueryReservationServiceHook,
         "list_capacity_commitments",
-        side_effect=Exception("Test"),
+        return_value=[
+            CapacityCommitment(name=f"{PARENT}/capacityCommitments/r1"),
+            CapacityCommitment(name=f"{PARENT}/capacityCommitments/r2"),
+            CapacityCommitment(name=f"{PARENT}/capacityCommitments/other"),
+        ],
     )
-    def test_delete_all_commitments_failure(self, call_failure):
-        with pytest.raises(AirflowException):
-            self.hook.delete_all_commitments(
-                project_id=PROJECT_ID,
-                location=LOCATION,
-            )
-
     @mock.patch.object(
         BigQueryReservationServiceHook,
-        "list_capacity_commitments",
+        "list_reservations",
         return_value=[
-            CapacityCommitment(name=f"airflow-{PROJECT_ID}-assignement"),
-            CapacityCommitment(name=f"airflow-nope-assignement"),
+            Reservation(name=f"{PARENT}/reservations/r1"),
+            Reservation(name=f"{PARENT}/reservations/r2"),
         ],
     )
     @mock.patch.object(
         BigQueryReservationServiceHook,
         "list_assignments",
         return_value=[
-            Assignment(name="r1/assignments/a1", assignee=f"projects/{PROJECT_ID}"),
-            Assignment(name="r4/assignments/a2", assignee="projects/noop"),
-            Assignment(name="r2/assignments/a3"),
-            Assignment(name="r3/assignments/a4"),
+            Assignment(name=f"{PARENT}/reservations/r1/assignments/a1"),
+            Assignment(name=f"{PARENT}/reservations/r2/assignments/a2"),
         ],
     )
+    @mock.patch.object(BigQueryReservationServiceHook, "delete_capacity_commitment")
+    @mock.patch.object(BigQueryReservationServiceHook, "delete_reservation")
+    @mock.patch.object(BigQueryReservationServiceHook, "delete_assignment")
+    def test_delete_all_commitments_dependency_chains(
+        self,
+        delete_assignment_mock,
+        delete_reservation_mock,
+        delete_capacity_commitment_mock,
+        list_assignments_mock,
+        list_reservations_mock,
+        list_capacity_commitments_mock,
+    ):
+        calls = []
+        delete_assignment_mock.side_effect = lambda name: calls.append(name)
+        delete_reservation_mock.side_effect = lambda name: calls.append(name)
+        delete_capacity_commitment_mock.side_effect = lambda name: calls.append(name)
+
+        self.hook.delete_all_commitments(project_id=PROJECT_ID, location=LOCATION)
+
+        for chain in ["r1", "r2"]:
+            assert (
+                calls.index(f"{PARENT}/reservations/{chain}/assignments/a{chain[-1]}")
+                < calls.index(f"{PARENT}/reservations/{chain}")
+                < calls.index(f"{PARENT}/capacityCommitments/{chain}")
+            )
+        assert calls[-1] == f"{PARENT}/capacityCommitments/other"
+
     @mock.patch.object(
         BigQueryReservationServiceHook,
-        "delete_capacity_commitment",
+        "list_capacity_commitments",
+        return_value=[
+            CapacityCommitment(name=f"{PARENT}/capacityCommitments/r1"),
+            CapacityCommitment(name=f"{PARENT}/capacityCommitments/r2"),
+        ],
     )
     @mock.patch.object(
         BigQueryReservationServiceHook,
-        "delete_reservation",
+        "list_reservations",
+        return_value=[
+            Reservation(name=f"{PARENT}/reservations/r1"),
+            Reservation(name=f"{PARENT}/reservations/r2"),
+        ],
     )
     @mock.patch.object(
         BigQueryReservationServiceHook,
-        "delete_assignment",
+        "list_assignments",
+        return_value=[
+            Assignment(name=f"{PARENT}/reservations/r1/assignments/a1"),
+            Assignment(name=f"{PARENT}/reservations/r2/assignments/a2"),
+        ],
     )
-    def test_delete_commitments_assignment_associated_success(
+    @mock.patch.object(BigQueryReservationServiceHook, "delete_capacity_commitment")
+    @mock.patch.object(BigQueryReservationServiceHook, "delete_reservation")
+    @mock.patch.object(BigQueryReservationServiceHook, "delete_assignment")
+    def test_delete_all_commitments_collect_failures(
         self,
         delete_assignment_mock,
         delete_reservation_mock,
         delete_capacity_commitment_mock,
         list_assignments_mock,
+        list_reservations_mock,
         list_capacity_commitments_mock,
     ):
-        self.hook.delete_commitments_assignment_associated(
-            project_id=PROJECT_ID,
-            location=LOCATION,
+        def delete_assignment(name):
+            if name.endswith("a1"):
+                raise AirflowException("Test")
+
+        delete_assignment_mock.side_effect = delete_assignment
+
+        with pytest.raises(AirflowException) as exc:
+            self.hook.delete_all_commitments(project_id=PROJECT_ID, location=LOCATION)
+
+        assert "3 resources not deleted" in str(exc.value)
+        delete_reservation_mock.assert_called_once_with(
+            name=f"{PARENT}/reservations/r2"
+        )
+        delete_capacity_commitment_mock.assert_called_once_with(
+            name=f"{PARENT}/capacityCommitments/r2"
+        )
+
+    @mock.patch.object(
+        ReservationServiceClient,
+        "list_capacity_commitments",
+        side_effect=Exception("Test"),
+    )
+    def test_delete_all_commitments_failure(self, call_failure):
+        with pytest.raises(AirflowException):
+            self.hook.delete_all_commitments(
+                project_id=PROJECT_ID,
+                location=LOCATION,
+            )
+
+    @mock.patch.object(
+        BigQueryReservationServiceHook,
+        "list_capacity_commitments",
+        return_value=[
+            CapacityCommitment(name=f"airflow-{PROJECT_ID}-assignement"),
+            CapacityCommitment(name=f"airflow-nope-assignement"),
+        ],
+    )
+    @mock.patch.object(BigQueryReservationServiceHook, "list_reservations")
+    @mock.patch.object(
+        BigQueryReservationServiceHook,
+        "list_assignments",
+        return_value=[
+            Assignment(name="r1/assignments/a1", assignee=f"projects/{PROJECT_ID}"),
+            Assignment(name="r4/assignments/a2", assignee="projects/noop"),
+            Assignment(name="r2/assignments/a3"),
+            Assignment(name="r3/assignments/a4"),
+        ],
+    )
+    @mock.patch.object(
+        BigQueryReservationServiceHook,
+        "delete_capacity_commitment",
+    )
+    @mock.patch.object(
+        BigQueryReservationServiceHook,
+        "delete_reservation",
+    )
+    @mock.patch.object(
+        BigQueryReservationServiceHook,
+        "delete_assignment",
+    )
+    def test_delete_commitments_assignment_associated_success(
+        self,
+        delete_assignment_mock,
+        delete_reservation_mock,
+        delete_capacity_commitment_mock,
+        list_assignments_mock,
+        list_reservations_mock,
+        list_capacity_commitments_mock,
+    ):
+        self.hook.delete_commitments_assignment_associated(
+            project_id=PROJECT_ID,
+            location=LOCATION,
             reservation_project_id=PROJECT_ID,
         )
 
@@ -1050,8 +1950,58 @@ class TestBigQueryReservationHook:
         )
 
     @mock.patch.object(
-        ReservationServiceClient,
+        BigQueryReservationServiceHook,
+        "list_capacity_commitments",
+        return_value=[
+            CapacityCommitment(name=f"{PARENT}/capacityCommitments/r1"),
+            CapacityCommitment(
+                name=f"{PARENT}/capacityCommitments/airflow-{PROJECT_ID}-assignement-0123456789"
+            ),
+        ],
+    )
+    @mock.patch.object(BigQueryReservationServiceHook, "list_reservations")
+    @mock.patch.object(
+        BigQueryReservationServiceHook,
         "list_assignments",
+        return_value=[
+            Assignment(
+                name=f"{PARENT}/reservations/r1/assignments/a1",
+                assignee=f"projects/{PROJECT_ID}",
+            ),
+            Assignment(
+                name=f"{PARENT}/reservations/r1/assignments/a2",
+                assignee="projects/noop",
+            ),
+        ],
+    )
+    @mock.patch.object(BigQueryReservationServiceHook, "delete_capacity_commitment")
+    @mock.patch.object(BigQueryReservationServiceHook, "delete_reservation")
+    @mock.patch.object(BigQueryReservationServiceHook, "delete_assignment")
+    def test_delete_commitments_assignment_associated_reservation_in_use(
+        self,
+        delete_assignment_mock,
+        delete_reservation_mock,
+        delete_capacity_commitment_mock,
+        list_assignments_mock,
+        list_reservations_mock,
+        list_capacity_commitments_mock,
+    ):
+        with pytest.raises(AirflowException):
+            self.hook.delete_commitments_assignment_associated(
+                project_id=PROJECT_ID,
+                location=LOCATION,
+                reservation_project_id=PROJECT_ID,
+            )
+
+        delete_assignment_mock.assert_called_once_with(
+            name=f"{PARENT}/reservations/r1/assignments/a1"
+        )
+        delete_reservation_mock.assert_not_called()
+        delete_capacity_commitment_mock.assert_not_called()
+
+    @mock.patch.object(
+        ReservationServiceClient,
+        "list_capacity_commitments",
         side_effect=Exception("Test"),
     )
     def test_delete_commitments_assignment_associated_failure(self, call_failure):
@@ -1061,3 +2011,516 @@ class TestBigQueryReservationHook:
                 location=LOCATION,
                 reservation_project_id=PROJECT_ID,
             )
+
+    # Autoscaling
+    @mock.patch.object(BigQueryReservationServiceHook, "get_bq_client")
+    def test_get_reservation_utilization(self, get_bq_client_mock):
+        query_mock = get_bq_client_mock.return_value.query
+        query_mock.return_value.result.return_value = [
+            {"average_slots": 50.0, "peak_slots": 120.0, "pending_jobs": 2}
+        ]
+
+        utilization = self.hook.get_reservation_utilization(
+            project_id=PROJECT_ID,
+            reservation_name=f"{PARENT}/reservations/{RESOURCE_ID}",
+            lookback_seconds=60,
+        )
+
+        assert utilization == ReservationUtilization(
+            average_slots=50.0, peak_slots=120.0, pending_jobs=2
+        )
+        query, kwargs = query_mock.call_args.args[0], query_mock.call_args.kwargs
+        assert f"`{PROJECT_ID}.region-us.INFORMATION_SCHEMA.JOBS_TIMELINE`" in query
+        assert kwargs["project"] == PROJECT_ID
+        assert kwargs["location"] == LOCATION
+        assert {
+            parameter.name: parameter.value
+            for parameter in kwargs["job_config"].query_parameters
+        } == {
+            "reservation_id": f"{PROJECT_ID}:US.{RESOURCE_ID}",
+            "lookback_seconds": 60,
+        }
+
+    @mock.patch.object(BigQueryReservationServiceHook, "get_bq_client")
+    def test_get_reservation_utilization_failure(self, get_bq_client_mock):
+        get_bq_client_mock.return_value.query.side_effect = Exception("Test")
+
+        with pytest.raises(AirflowException):
+            self.hook.get_reservation_utilization(
+                project_id=PROJECT_ID,
+                reservation_name=f"{PARENT}/reservations/{RESOURCE_ID}",
+            )
+
+    # Commitment utilization
+    @mock.patch.object(BigQueryReservationServiceHook, "get_bq_client")
+    def test_get_commitment_timeline(self, get_bq_client_mock):
+        query_mock = get_bq_client_mock.return_value.query
+        query_mock.return_value.result.return_value = [
+            {"second": 0, "slot_ms": 1000, "jobs": 1},
+            {"second": 5, "slot_ms": 3000, "jobs": 2},
+        ]
+        start = LOGICAL_DATE.replace(tzinfo=datetime.timezone.utc)
+        end = start + datetime.timedelta(minutes=1)
+
+        timeline = self.hook.get_commitment_timeline(
+            project_id=PROJECT_ID,
+            reservation_name=f"{PARENT}/reservations/{RESOURCE_ID}",
+            start=start,
+            end=end,
+        )
+
+        assert timeline == CommitmentTimeline(
+            seconds=[0, 5], slot_ms=[1000, 3000], jobs=[1, 2]
+        )
+        query, kwargs = query_mock.call_args.args[0], query_mock.call_args.kwargs
+        assert f"`{PROJECT_ID}.region-us.INFORMATION_SCHEMA.JOBS_TIMELINE`" in query
+        assert {
+            parameter.name: parameter.value
+            for parameter in kwargs["job_config"].query_parameters
+        } == {
+            "reservation_id": f"{PROJECT_ID}:US.{RESOURCE_ID}",
+            "start": start,
+            "end": end,
+        }
+
+    @mock.patch.object(BigQueryReservationServiceHook, "get_bq_client")
+    def test_get_commitment_timeline_failure(self, get_bq_client_mock):
+        get_bq_client_mock.return_value.query.side_effect = Exception("Test")
+
+        with pytest.raises(AirflowException):
+            self.hook.get_commitment_timeline(
+                project_id=PROJECT_ID,
+                reservation_name=f"{PARENT}/reservations/{RESOURCE_ID}",
+                start=LOGICAL_DATE,
+                end=LOGICAL_DATE,
+            )
+
+    # Drain
+    @mock.patch.object(BigQueryReservationServiceHook, "get_bq_client")
+    def test_count_reservation_running_jobs(self, get_bq_client_mock):
+        query_mock = get_bq_client_mock.return_value.query
+        query_mock.return_value.result.return_value = [{"running_jobs": 3}]
+
+        running_jobs = self.hook.count_reservation_running_jobs(
+            project_id=PROJECT_ID,
+            reservation_name=f"{PARENT}/reservations/{RESOURCE_ID}",
+        )
+
+        assert running_jobs == 3
+        query, kwargs = query_mock.call_args.args[0], query_mock.call_args.kwargs
+        assert f"`{PROJECT_ID}.region-us.INFORMATION_SCHEMA.JOBS`" in query
+        assert kwargs["job_id_prefix"] == "reservation_drain"
+        assert {
+            parameter.name: parameter.value
+            for parameter in kwargs["job_config"].query_parameters
+        } == {
+            "reservation_id": f"{PROJECT_ID}:US.{RESOURCE_ID}",
+            "job_id_prefix": "reservation_drain",
+        }
+
+    @mock.patch.object(BigQueryReservationServiceHook, "get_bq_client")
+    def test_count_reservation_running_jobs_failure(self, get_bq_client_mock):
+        get_bq_client_mock.return_value.query.side_effect = Exception("Test")
+
+        with pytest.raises(AirflowException):
+            self.hook.count_reservation_running_jobs(
+                project_id=PROJECT_ID,
+                reservation_name=f"{PARENT}/reservations/{RESOURCE_ID}",
+            )
+
+    @mock.patch.object(BigQueryReservationServiceHook, "delete_capacity_commitment")
+    @mock.patch.object(BigQueryReservationServiceHook, "update_reservation")
+    @mock.patch.object(
+        BigQueryReservationServiceHook,
+        "create_capacity_commitment",
+        return_value=CapacityCommitment(name="c2", slot_count=SLOTS),
+    )
+    @mock.patch.object(
+        BigQueryReservationServiceHook,
+        "get_reservation",
+        return_value=Reservation(name=RESOURCE_NAME, slot_capacity=SLOTS),
+    )
+    def test_scale_reservation_up(
+        self,
+        get_reservation_mock,
+        create_capacity_commitment_mock,
+        update_reservation_mock,
+        delete_capacity_commitment_mock,
+    ):
+        commitments = self.hook.scale_reservation(
+            reservation_name=f"{PARENT}/reservations/{RESOURCE_ID}",
+            slots=SLOTS_ALL,
+            commitments=[{"name": "c1", "slots": SLOTS}],
+        )
+
+        assert commitments == [
+            {"name": "c1", "slots": SLOTS},
+            {"name": "c2", "slots": SLOTS},
+        ]
+        assert create_capacity_commitment_mock.call_args.kwargs["parent"] == PARENT
+        assert create_capacity_commitment_mock.call_args.kwargs["slots"] == SLOTS
+        update_reservation_mock.assert_called_once_with(
+            name=f"{PARENT}/reservations/{RESOURCE_ID}", slots=SLOTS_ALL
+        )
+        delete_capacity_commitment_mock.assert_not_called()
+
+    @mock.patch.object(BigQueryReservationServiceHook, "delete_capacity_commitment")
+    @mock.patch.object(
+        BigQueryReservationServiceHook,
+        "update_reservation",
+        side_effect=AirflowException("Test"),
+    )
+    @mock.patch.object(
+        BigQueryReservationServiceHook,
+        "create_capacity_commitment",
+        return_value=CapacityCommitment(name="c1", slot_count=SLOTS),
+    )
+    @mock.patch.object(
+        BigQueryReservationServiceHook,
+        "get_reservation",
+        return_value=Reservation(name=RESOURCE_NAME, slot_capacity=SLOTS),
+    )
+    def test_scale_reservation_up_failure(
+        self,
+        get_reservation_mock,
+        create_capacity_commitment_mock,
+        update_reservation_mock,
+        delete_capacity_commitment_mock,
+    ):
+        with pytest.raises(AirflowException):
+            self.hook.scale_reservation(
+                reservation_name=f"{PARENT}/reservations/{RESOURCE_ID}",
+                slots=SLOTS_ALL,
+            )
+
+        delete_capacity_commitment_mock.assert_called_once_with(name="c1")
+
+    @mock.patch.object(BigQueryReservationServiceHook, "delete_capacity_commitment")
+    @mock.patch.object(BigQueryReservationServiceHook, "update_reservation")
+    @mock.patch.object(
+        BigQueryReservationServiceHook,
+        "get_reservation",
+        return_value=Reservation(name=RESOURCE_NAME, slot_capacity=SLOTS * 3),
+    )
+    def test_scale_reservation_down(
+        self,
+        get_reservation_mock,
+        update_reservation_mock,
+        delete_capacity_commitment_mock,
+    ):
+        commitments = self.hook.scale_reservation(
+            reservation_name=f"{PARENT}/reservations/{RESOURCE_ID}",
+            slots=SLOTS_ALL,
+            commitments=[
+                {"name": "c1", "slots": SLOTS},
+                {"name": "c2", "slots": SLOTS},
+            ],
+        )
+
+        assert commitments == [{"name": "c1", "slots": SLOTS}]
+        update_reservation_mock.assert_called_once_with(
+            name=f"{PARENT}/reservations/{RESOURCE_ID}", slots=SLOTS_ALL
+        )
+        delete_capacity_commitment_mock.assert_called_once_with(name="c2")
+
+    @mock.patch.object(BigQueryReservationServiceHook, "delete_capacity_commitment")
+    @mock.patch.object(BigQueryReservationServiceHook, "update_reservation")
+    @mock.patch.object(
+        BigQueryReservationServiceHook,
+        "get_reservation",
+        return_value=Reservation(name=RESOURCE_NAME, slot_capacity=SLOTS_ALL),
+    )
+    def test_scale_reservation_down_without_commitments(
+        self,
+        get_reservation_mock,
+        update_reservation_mock,
+        delete_capacity_commitment_mock,
+    ):
+        commitments = self.hook.scale_reservation(
+            reservation_name=f"{PARENT}/reservations/{RESOURCE_ID}", slots=SLOTS
+        )
+
+        assert commitments == []
+        update_reservation_mock.assert_not_called()
+        delete_capacity_commitment_mock.assert_not_called()
+
+
+class TestBigQueryReservationAsyncHook:
+    def setup_method(self):
+        self.hook = BigQueryReservationServiceAsyncHook(location=LOCATION)
+        self.bi_ledger = VariableState({"reservations": {}})
+        self.hook._bi_reservation_ledger = self.bi_ledger.locked
+
+    @pytest.mark.asyncio
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.hooks."
+        + "bigquery_reservation.ReservationServiceAsyncClient"
+    )
+    @mock.patch.object(BigQueryReservationServiceAsyncHook, "get_sync_hook")
+    async def test_get_client(self, get_sync_hook_mock, async_client_mock):
+        get_sync_hook_mock.return_value = mock.MagicMock(
+            _get_pooled_credentials=mock.MagicMock(return_value=CREDENTIALS),
+            _pool_key=lambda transport: ("conn", None, transport),
+        )
+
+        client = await self.hook.get_client()
+
+        assert isinstance(client, AsyncRateLimitedClient)
+        assert client._wrapped_client == async_client_mock.return_value
+        async_client_mock.assert_called_once_with(
+            credentials=CREDENTIALS, client_info=CLIENT_INFO
+        )
+        assert await self.hook.get_client() == client
+        other_hook = BigQueryReservationServiceAsyncHook(location=LOCATION)
+        assert await other_hook.get_client() is client
+        async_client_mock.assert_called_once()
+
+    @pytest.mark.asyncio
+    @mock.patch.object(BigQueryReservationServiceAsyncHook, "get_client")
+    async def test_create_capacity_commitment_success(self, client_mock):
+        client_mock.return_value.create_capacity_commitment = mock.AsyncMock(
+            return_value=CapacityCommitment(name=RESOURCE_NAME)
+        )
+
+        result = await self.hook.create_capacity_commitment(
+            PARENT, SLOTS, COMMITMENT_DURATION, RESOURCE_ID
+        )
+
+        assert result == CapacityCommitment(name=RESOURCE_NAME)
+        client_mock.return_value.create_capacity_commitment.assert_awaited_once_with(
+            request={
+                "parent": PARENT,
+                "capacity_commitment": CapacityCommitment(
+                    plan=COMMITMENT_DURATION, slot_count=SLOTS
+                ),
+                "capacity_commitment_id": RESOURCE_ID,
+            }
+        )
+
+    @pytest.mark.asyncio
+    @mock.patch.object(BigQueryReservationServiceAsyncHook, "get_client")
+    async def test_create_capacity_commitment_failure(self, client_mock):
+        client_mock.return_value.create_capacity_commitment = mock.AsyncMock(
+            side_effect=Exception("Test")
+        )
+
+        with pytest.raises(AirflowException):
+            await self.hook.create_capacity_commitment(
+                PARENT, SLOTS, COMMITMENT_DURATION, RESOURCE_ID
+            )
+
+    @pytest.mark.asyncio
+    @mock.patch.object(BigQueryReservationServiceAsyncHook, "get_client")
+    async def test_list_capacity_commitments_success(self, client_mock):
+        commitments = [CapacityCommitment(name="c1"), CapacityCommitment(name="c2")]
+        client_mock.return_value.list_capacity_commitments = mock.AsyncMock(
+            return_value=AsyncPager(commitments)
+        )
+
+        result = await self.hook.list_capacity_commitments(PARENT)
+
+        assert result == commitments
+        client_mock.return_value.list_capacity_commitments.assert_awaited_once_with(
+            parent=PARENT
+        )
+
+    @pytest.mark.asyncio
+    @mock.patch.object(BigQueryReservationServiceAsyncHook, "get_sync_hook")
+    async def test_count_reservation_running_jobs(self, get_sync_hook_mock):
+        sync_hook = get_sync_hook_mock.return_value = mock.MagicMock()
+        sync_hook.count_reservation_running_jobs.return_value = 2
+
+        result = await self.hook.count_reservation_running_jobs(
+            PROJECT_ID, RESOURCE_NAME
+        )
+
+        assert result == 2
+        sync_hook.count_reservation_running_jobs.assert_called_once_with(
+            project_id=PROJECT_ID, reservation_name=RESOURCE_NAME
+        )
+
+    @pytest.mark.asyncio
+    @mock.patch.object(BigQueryReservationServiceAsyncHook, "get_client")
+    async def test_delete_capacity_commitment_failure(self, client_mock):
+        client_mock.return_value.delete_capacity_commitment = mock.AsyncMock(
+            side_effect=Exception("Test")
+        )
+
+        with pytest.raises(AirflowException):
+            await self.hook.delete_capacity_commitment(RESOURCE_NAME)
+
+    @pytest.mark.asyncio
+    @mock.patch.object(BigQueryReservationServiceAsyncHook, "get_client")
+    async def test_create_reservation_success(self, client_mock):
+        client_mock.return_value.create_reservation = mock.AsyncMock()
+
+        await self.hook.create_reservation(PARENT, RESOURCE_ID, SLOTS)
+
+        client_mock.return_value.create_reservation.assert_awaited_once_with(
+            parent=PARENT,
+            reservation_id=RESOURCE_ID,
+            reservation=Reservation(slot_capacity=SLOTS, ignore_idle_slots=True),
+        )
+
+    @pytest.mark.asyncio
+    @mock.patch.object(BigQueryReservationServiceAsyncHook, "get_client")
+    async def test_get_reservation_failure(self, client_mock):
+        client_mock.return_value.get_reservation = mock.AsyncMock(
+            side_effect=Exception("Test")
+        )
+
+        with pytest.raises(AirflowException):
+            await self.hook.get_reservation(RESOURCE_NAME)
+
+    @pytest.mark.asyncio
+    @mock.patch.object(BigQueryReservationServiceAsyncHook, "get_client")
+    async def test_update_reservation_success(self, client_mock):
+        client_mock.return_value.update_reservation = mock.AsyncMock()
+
+        await self.hook.update_reservation(RESOURCE_NAME, SLOTS)
+
+        client_mock.return_value.update_reservation.assert_awaited_once_with(
+            reservation=Reservation(name=RESOURCE_NAME, slot_capacity=SLOTS),
+            update_mask=field_mask_pb2.FieldMask(paths=["slot_capacity"]),
+        )
+
+    @pytest.mark.asyncio
+    @mock.patch.object(BigQueryReservationServiceAsyncHook, "get_client")
+    async def test_search_assignment_success(self, client_mock):
+        expected = Assignment(
+            name=RESOURCE_NAME, assignee=PROJECT_ID, job_type=JOB_TYPE, state=STATE
+        )
+        client_mock.return_value.search_all_assignments = mock.AsyncMock(
+            return_value=AsyncPager(
+                [
+                    Assignment(
+                        name=RESOURCE_NAME,
+                        assignee=PROJECT_ID,
+                        job_type=JOB_TYPE,
+                        state="PENDING",
+                    ),
+                    expected,
+                ]
+            )
+        )
+
+        result = await self.hook.search_assignment(PARENT, PROJECT_ID, JOB_TYPE)
+
+        assert result == expected
+        client_mock.return_value.search_all_assignments.assert_awaited_once_with(
+            parent=PARENT, query=f"assignee=projects/{PROJECT_ID}"
+        )
+
+    @pytest.mark.asyncio
+    @mock.patch.object(BigQueryReservationServiceAsyncHook, "get_client")
+    async def test_list_assignments_failure(self, client_mock):
+        client_mock.return_value.list_assignments = mock.AsyncMock(
+            side_effect=Exception("Test")
+        )
+
+        with pytest.raises(AirflowException):
+            await self.hook.list_assignments(PARENT)
+
+    @pytest.mark.asyncio
+    @mock.patch.object(BigQueryReservationServiceAsyncHook, "get_client")
+    async def test_create_bi_reservation_success(self, client_mock):
+        client_mock.return_value.get_bi_reservation = mock.AsyncMock(
+            side_effect=[
+                BiReservation(name=PARENT_BI_RESERVATION, size=SIZE_KO),
+                BiReservation(name=PARENT_BI_RESERVATION, size=2 * SIZE_KO),
+            ]
+        )
+        client_mock.return_value.update_bi_reservation = mock.AsyncMock()
+
+        await self.hook.create_bi_reservation(project_id=PROJECT_ID, size=SIZE)
+
+        client_mock.return_value.update_bi_reservation.assert_awaited_once_with(
+            bi_reservation=BiReservation(name=PARENT_BI_RESERVATION, size=2 * SIZE_KO),
+            update_mask=field_mask_pb2.FieldMask(paths=["size"]),
+        )
+
+    @pytest.mark.asyncio
+    @mock.patch.object(BigQueryReservationServiceAsyncHook, "get_client")
+    async def test_delete_bi_reservation_size_none_success(self, client_mock):
+        client_mock.return_value.get_bi_reservation = mock.AsyncMock(
+            side_effect=[
+                BiReservation(name=PARENT_BI_RESERVATION, size=SIZE_KO),
+                BiReservation(name=PARENT_BI_RESERVATION, size=0),
+            ]
+        )
+        client_mock.return_value.update_bi_reservation = mock.AsyncMock()
+
+        await self.hook.delete_bi_reservation(project_id=PROJECT_ID)
+
+        client_mock.return_value.update_bi_reservation.assert_awaited_once_with(
+            bi_reservation=BiReservation(name=PARENT_BI_RESERVATION, size=0),
+            update_mask=field_mask_pb2.FieldMask(paths=["size"]),
+        )
+
+    @pytest.mark.asyncio
+    @mock.patch("asyncio.sleep")
+    @mock.patch.object(BigQueryReservationServiceAsyncHook, "get_client")
+    async def test_create_bi_reservation_overwritten_retried(
+        self, client_mock, sleep_mock
+    ):
+        client_mock.return_value.get_bi_reservation = mock.AsyncMock(
+            side_effect=[
+                BiReservation(name=PARENT_BI_RESERVATION, size=SIZE_KO),
+                # Another writer overwrote the update with the size before it
+                BiReservation(name=PARENT_BI_RESERVATION, size=SIZE_KO),
+                BiReservation(name=PARENT_BI_RESERVATION, size=3 * SIZE_KO),
+                BiReservation(name=PARENT_BI_RESERVATION, size=4 * SIZE_KO),
+            ]
+        )
+        client_mock.return_value.update_bi_reservation = mock.AsyncMock()
+
+        await self.hook.create_bi_reservation(project_id=PROJECT_ID, size=SIZE)
+
+        assert client_mock.return_value.update_bi_reservation.await_args_list == [
+            mock.call(
+                bi_reservation=BiReservation(name=PARENT_BI_RESERVATION, size=size),
+                update_mask=field_mask_pb2.FieldMask(paths=["size"]),
+            )
+            for size in (2 * SIZE_KO, 4 * SIZE_KO)
+        ]
+        sleep_mock.assert_awaited_once_with(1.0)
+        (entry,) = self.bi_ledger.state["reservations"].values()
+        assert entry["writer"] is None
+        assert [(u["from"], u["to"]) for u in entry["updates"]] == [
+            (3 * SIZE_KO, 4 * SIZE_KO)
+        ]
+        assert self.hook.api_metrics.calls == 6
+
+    @pytest.mark.asyncio
+    @mock.patch.object(BigQueryReservationServiceAsyncHook, "get_client")
+    async def test_create_bi_reservation_changed_after_update(self, client_mock):
+        client_mock.return_value.get_bi_reservation = mock.AsyncMock(
+            side_effect=[
+                BiReservation(name=PARENT_BI_RESERVATION, size=SIZE_KO),
+                # Another writer resized the reservation on top of the update
+                BiReservation(name=PARENT_BI_RESERVATION, size=3 * SIZE_KO),
+            ]
+        )
+        client_mock.return_value.update_bi_reservation = mock.AsyncMock()
+
+        await self.hook.create_bi_reservation(project_id=PROJECT_ID, size=SIZE)
+
+        client_mock.return_value.update_bi_reservation.assert_awaited_once()
+        (entry,) = self.bi_ledger.state["reservations"].values()
+        assert entry["size"] == 3 * SIZE_KO
+
+    @pytest.mark.asyncio
+    @mock.patch.object(BigQueryReservationServiceAsyncHook, "get_client")
+    async def test_create_bi_reservation_update_failure(self, client_mock):
+        client_mock.return_value.get_bi_reservation = mock.AsyncMock(
+            return_value=BiReservation(name=PARENT_BI_RESERVATION, size=SIZE_KO)
+        )
+        client_mock.return_value.update_bi_reservation = mock.AsyncMock(
+            side_effect=Exception("Test")
+        )
+
+        with pytest.raises(AirflowException):
+            await self.hook.create_bi_reservation(project_id=PROJECT_ID, size=SIZE)
+
+        assert not self.bi_ledger.state["reservations"]
+        assert self.hook.api_metrics.failures == 1
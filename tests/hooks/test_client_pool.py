@@ -0,0 +1,145 @@
+import asyncio
+import threading
+from unittest import mock
+
+import pytest
+
+from airflow_provider_bigquery_reservation.hooks.client_pool import (
+    ClientPool,
+    close_entry,
+    pool_key,
+)
+
+
+GCP_CONN_ID = "google_cloud_default"
+
+
+class TestPoolKey:
+    def test_pool_key_sequence_impersonation_chain(self):
+        assert pool_key(GCP_CONN_ID, ["sa1", "sa2"], "grpc") == (
+            GCP_CONN_ID,
+            ("sa1", "sa2"),
+            "grpc",
+        )
+
+    def test_pool_key_string_impersonation_chain(self):
+        assert pool_key(GCP_CONN_ID, "sa1", "http") == (GCP_CONN_ID, "sa1", "http")
+
+
+class TestClientPool:
+    def test_get_reuses_entry(self):
+        pool = ClientPool()
+        factory = mock.MagicMock()
+
+        first = pool.get("key", factory)
+        second = pool.get("key", factory)
+
+        assert first is second
+        factory.assert_called_once()
+
+    def test_get_evicts_stale_entries(self):
+        pool = ClientPool(max_age=10)
+        factory = mock.MagicMock(side_effect=["old", "new"])
+
+        with mock.patch(
+            "airflow_provider_bigquery_reservation.hooks.client_pool.time.monotonic",
+            side_effect=[0, 0, 11, 11],
+        ):
+            assert pool.get("key", factory) == "old"
+            assert pool.get("key", factory) == "new"
+
+    def test_get_evicts_least_recently_used(self):
+        pool = ClientPool(max_size=2)
+
+        pool.get("a", lambda: "a")
+        pool.get("b", lambda: "b")
+        pool.get("a", lambda: "a")
+        pool.get("c", lambda: "c")
+
+        assert len(pool) == 2
+        assert pool.get("b", lambda: "b-new") == "b-new"
+
+    def test_get_concurrent_creation_keeps_first(self):
+        pool = ClientPool()
+        barrier = threading.Barrier(4)
+        results = []
+
+        def create():
+            barrier.wait()
+            return object()
+
+        threads = [
+            threading.Thread(target=lambda: results.append(pool.get("key", create)))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len({id(result) for result in results}) == 1
+
+    def test_evict_and_clear(self):
+        pool = ClientPool()
+        pool.get("a", lambda: "a")
+        pool.get("b", lambda: "b")
+
+        pool.evict("a")
+        assert len(pool) == 1
+
+        pool.clear()
+        assert len(pool) == 0
+
+    def test_evicted_entries_closed(self):
+        pool = ClientPool(max_size=1)
+        grpc_client, http_client = mock.MagicMock(), mock.MagicMock(spec=["close"])
+
+        pool.get("grpc", lambda: grpc_client)
+        pool.get("http", lambda: http_client)
+        grpc_client.transport.close.assert_called_once()
+        http_client.close.assert_not_called()
+
+        pool.clear()
+        http_client.close.assert_called_once()
+
+    def test_stale_entries_closed(self):
+        pool = ClientPool(max_age=10)
+        client = mock.MagicMock(spec=["close"])
+
+        with mock.patch(
+            "airflow_provider_bigquery_reservation.hooks.client_pool.time.monotonic",
+            side_effect=[0, 0, 11, 11],
+        ):
+            pool.get("key", lambda: client)
+            pool.get("key", mock.MagicMock())
+
+        client.close.assert_called_once()
+
+    def test_close_entry_without_transport(self):
+        close_entry("credentials")
+        client = mock.MagicMock(spec=["close"])
+        client.close.side_effect = Exception("Test")
+
+        close_entry(client)
+
+        client.close.assert_called_once()
+
+    def test_close_entry_async_transport_without_loop(self):
+        closing = mock.MagicMock()
+        client = mock.MagicMock()
+        client.transport.close.return_value = closing
+
+        with mock.patch("inspect.iscoroutine", return_value=True):
+            close_entry(client)
+
+        closing.close.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_close_entry_async_transport_in_loop(self):
+        client = mock.MagicMock()
+        client.transport.close = mock.AsyncMock()
+
+        close_entry(client)
+        await asyncio.sleep(0)
+
+        client.transport.close.assert_awaited_once()
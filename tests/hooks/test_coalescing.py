@@ -0,0 +1,279 @@
+import datetime
+import threading
+from unittest import mock
+
+import pytest
+from airflow.exceptions import AirflowException
+from airflow_provider_bigquery_reservation.hooks.bigquery_reservation import (
+    BigQueryReservationServiceHook,
+)
+from airflow_provider_bigquery_reservation.hooks.coalescing import PurchaseCoalescer
+from google.api_core.exceptions import InternalServerError
+
+from tests.fake_reservation import FakeReservationApi
+from tests.utils import VariableState, mock_base_gcp_hook_no_default_project_id
+
+
+PROJECT_ID = "test-project"
+LOCATION = "US"
+PARENT = f"projects/{PROJECT_ID}/locations/{LOCATION}"
+NOW = datetime.datetime(2023, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class TestPurchaseCoalescer:
+    def setup_method(self):
+        self.api = FakeReservationApi()
+        self.variable = VariableState({"open": {}, "batches": {}})
+        self.now = NOW
+
+    def coalescer(self, **kwargs):
+        with mock.patch(
+            "airflow_provider_bigquery_reservation.hooks."
+            + "bigquery_reservation.GoogleBaseHook.__init__",
+            new=mock_base_gcp_hook_no_default_project_id,
+        ):
+            hook = BigQueryReservationServiceHook(location=LOCATION)
+        coalescer = PurchaseCoalescer(hook, poll_interval=0.01, **kwargs)
+        coalescer._locked_state = self.variable.locked
+        return coalescer
+
+    def test_key(self):
+        assert self.coalescer().key == "bigquery_reservation_coalescing-US"
+
+    def purchase_concurrently(self, *slots):
+        """Purchase slots from threads, return the coalescers and the purchases."""
+        coalescers = [self.coalescer(window=0.5) for _ in slots]
+        purchases = [None] * len(slots)
+
+        def purchase(index):
+            purchases[index] = coalescers[index].purchase(
+                project_id=PROJECT_ID, slots=slots[index]
+            )
+
+        threads = [
+            threading.Thread(target=purchase, args=(i,)) for i in range(len(slots))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return coalescers, purchases
+
+    def test_concurrent_purchases_coalesced(self):
+        with self.api.patch():
+            _, purchases = self.purchase_concurrently(100, 200, 100)
+
+        assert [p["slots"] for p in purchases] == [100, 200, 100]
+        assert {p["total_slots"] for p in purchases} == {400}
+        assert len({p["handle"] for p in purchases}) == 3
+        assert len({p["commitment_name"] for p in purchases}) == 1
+        assert len({p["reservation_name"] for p in purchases}) == 1
+        assert self.api.rpc_counts["create_capacity_commitment"] == 1
+        assert self.api.committed_slots(PARENT) == 400
+        assert self.api.reserved_slots(PARENT) == 400
+
+    def test_release_frees_only_the_share(self):
+        with self.api.patch():
+            coalescers, purchases = self.purchase_concurrently(100, 200)
+
+            coalescers[1].release(purchases[1]["handle"])
+            assert self.api.committed_slots(PARENT) == 100
+            assert self.api.reserved_slots(PARENT) == 100
+            assert len(self.api.commitments) == 1
+            assert self.api.reservations
+
+            coalescers[0].release(purchases[0]["handle"])
+
+        assert not self.api.commitments
+        assert not self.api.reservations
+        assert not self.api.assignments
+        assert not self.variable.state["batches"]
+
+    def test_wait_for_the_batch_leader(self):
+        coalescer = self.coalescer(clock=lambda: self.now, timeout=0.05)
+        with self.variable.locked() as state:
+            state["open"][f"{PROJECT_ID}/QUERY/{PROJECT_ID}/FLEX"] = "batch"
+            state["batches"]["batch"] = {
+                "status": "open",
+                "closes_at": (NOW + datetime.timedelta(seconds=5)).isoformat(),
+                "requests": {"other": 300},
+            }
+
+        with self.api.patch(), pytest.raises(AirflowException, match="still open"):
+            coalescer.purchase(project_id=PROJECT_ID, slots=100)
+
+        assert not self.api.rpc_counts["create_capacity_commitment"]
+        assert len(self.variable.state["batches"]["batch"]["requests"]) == 2
+
+    def test_purchases_after_the_window_not_coalesced(self):
+        coalescer = self.coalescer(clock=lambda: self.now, sleep=lambda _: None)
+        with self.api.patch():
+            first = coalescer.purchase(project_id=PROJECT_ID, slots=100)
+            self.now += datetime.timedelta(seconds=coalescer.window)
+            second = coalescer.purchase(project_id=PROJECT_ID, slots=100)
+
+        assert first["handle"].split("/")[0] != second["handle"].split("/")[0]
+        assert first["total_slots"] == second["total_slots"] == 100
+        assert self.api.rpc_counts["create_capacity_commitment"] == 2
+        assert self.api.reserved_slots(PARENT) == 200
+
+    def test_purchase_failure(self):
+        coalescer = self.coalescer(clock=lambda: self.now, sleep=lambda _: None)
+        self.api.inject_error("create_assignment", InternalServerError("Test"))
+
+        with self.api.patch(), pytest.raises(AirflowException):
+            coalescer.purchase(project_id=PROJECT_ID, slots=100)
+
+        assert not self.variable.state["batches"]
+        assert not self.variable.state["open"]
+
+    def test_purchase_failure_seen_by_the_waiters(self):
+        coalescer = self.coalescer(clock=lambda: self.now)
+        with self.variable.locked() as state:
+            state["batches"]["batch"] = {
+                "status": "failed",
+                "closes_at": NOW.isoformat(),
+                "failed_at": NOW.isoformat(),
+                "error": "Test",
+                "requests": {"waiter": 100, "other": 100},
+            }
+
+        with pytest.raises(AirflowException, match="purchase failed: Test"):
+            coalescer._wait("batch", "waiter")
+        assert list(self.variable.state["batches"]["batch"]["requests"]) == ["other"]
+
+        with pytest.raises(AirflowException, match="purchase failed: Test"):
+            coalescer._wait("batch", "other")
+        assert not self.variable.state["batches"]
+
+    def test_purchase_expires_the_orphaned_batches(self):
+        coalescer = self.coalescer(
+            clock=lambda: self.now, sleep=lambda _: None, timeout=60
+        )
+        with self.variable.locked() as state:
+            state["open"]["other/QUERY/other/FLEX"] = "open"
+            state["batches"]["open"] = {
+                "status": "open",
+                "closes_at": NOW.isoformat(),
+                "requests": {"killed": 100},
+            }
+            state["batches"]["failed"] = {
+                "status": "failed",
+                "closes_at": NOW.isoformat(),
+                "failed_at": NOW.isoformat(),
+                "error": "Test",
+                "requests": {"killed": 100},
+            }
+        self.now += datetime.timedelta(seconds=60)
+
+        with self.api.patch():
+            purchase = coalescer.purchase(project_id=PROJECT_ID, slots=100)
+
+        assert list(self.variable.state["batches"]) == [
+            purchase["handle"].split("/")[0]
+        ]
+        assert not self.variable.state["open"]
+
+    def test_purchase_releases_the_unclaimed_shares(self):
+        self.now = datetime.datetime.now(datetime.timezone.utc)
+        with self.api.patch():
+            _, purchases = self.purchase_concurrently(100, 200)
+            batch_id, killed = purchases[1]["handle"].split("/")
+            # The second requester is killed before claiming its share.
+            with self.variable.locked() as state:
+                state["batches"][batch_id]["claimed"].remove(killed)
+
+            coalescer = self.coalescer(
+                clock=lambda: self.now, sleep=lambda _: None, timeout=60
+            )
+            coalescer.purchase(project_id="other", slots=100)
+            assert killed in self.variable.state["batches"][batch_id]["shares"]
+            self.now += datetime.timedelta(seconds=61)
+            coalescer.purchase(project_id="other", slots=100)
+
+        assert list(self.variable.state["batches"][batch_id]["shares"]) == [
+            purchases[0]["handle"].split("/")[1]
+        ]
+        assert self.api.reserved_slots(PARENT) == 100
+
+    def test_release_failure_resumed(self):
+        with self.api.patch():
+            coalescers, purchases = self.purchase_concurrently(100, 200)
+            self.api.inject_error(
+                "delete_capacity_commitment", InternalServerError("Test")
+            )
+
+            with pytest.raises(AirflowException):
+                coalescers[1].release(purchases[1]["handle"])
+            (batch,) = self.variable.state["batches"].values()
+            (release,) = batch["releases"].values()
+            assert release["step"] == "delete"
+            assert self.api.reserved_slots(PARENT) == 100
+
+            coalescers[1].release(purchases[1]["handle"])
+
+        (batch,) = self.variable.state["batches"].values()
+        assert list(batch["shares"].values()) == [100]
+        assert batch["committed_slots"] == 100
+        assert not batch["releases"]
+        assert self.api.committed_slots(PARENT) == 100
+        assert self.api.rpc_counts["split_capacity_commitment"] == 1
+
+    def test_release_calls_outside_the_lock(self):
+        with self.api.patch():
+            coalescers, purchases = self.purchase_concurrently(100, 200)
+            hook = coalescers[1].hook
+            calls = []
+
+            def unlocked(method):
+                def call(**kwargs):
+                    assert not self.variable.lock.locked(), f"{method} under the lock"
+                    (batch,) = self.variable.state["batches"].values()
+                    assert batch["releasing"] is not None
+                    calls.append(method)
+                    return getattr(BigQueryReservationServiceHook, method)(
+                        hook, **kwargs
+                    )
+
+                return call
+
+            methods = (
+                "get_reservation",
+                "update_reservation",
+                "split_capacity_commitment",
+                "delete_capacity_commitment",
+            )
+            with mock.patch.multiple(
+                hook, **{method: unlocked(method) for method in methods}
+            ):
+                coalescers[1].release(purchases[1]["handle"])
+
+        assert calls == list(methods)
+        (batch,) = self.variable.state["batches"].values()
+        assert batch["releasing"] is None
+        assert self.api.committed_slots(PARENT) == 100
+
+    def test_release_waits_for_the_batch_release_claim(self):
+        with self.api.patch():
+            coalescers, purchases = self.purchase_concurrently(100, 200)
+            batch_id = purchases[1]["handle"].split("/")[0]
+            with self.variable.locked() as state:
+                state["batches"][batch_id]["releasing"] = {
+                    "releaser": "other",
+                    "since": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                }
+
+            def release_claim(_):
+                with self.variable.locked() as state:
+                    state["batches"][batch_id]["releasing"] = None
+
+            coalescers[1].sleep = mock.MagicMock(side_effect=release_claim)
+            coalescers[1].release(purchases[1]["handle"])
+
+        coalescers[1].sleep.assert_called_once()
+        assert self.api.committed_slots(PARENT) == 100
+
+    def test_release_unknown_handle(self):
+        self.coalescer().release("unknown/unknown")
+
+        assert not self.variable.state["batches"]
@@ -0,0 +1,366 @@
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import pytest
+from airflow.exceptions import AirflowException
+from airflow_provider_bigquery_reservation.hooks.bigquery_reservation import (
+    BigQueryReservationServiceHook,
+)
+from google.api_core.exceptions import InternalServerError
+from google.cloud.bigquery_reservation_v1 import BiReservation, CapacityCommitment
+
+from tests.fake_reservation import FakeReservationApi
+from tests.utils import VariableState, mock_base_gcp_hook_no_default_project_id
+
+
+PROJECT_ID = "test-project"
+LOCATION = "US"
+PARENT = f"projects/{PROJECT_ID}/locations/{LOCATION}"
+SLOTS = 100
+KEY = "dag/task/run/-1"
+
+
+class TestHookWithFakeReservationApi:
+    def setup_method(self):
+        self.hook = self.new_hook()
+        self.api = FakeReservationApi()
+
+    @staticmethod
+    def new_hook():
+        with mock.patch(
+            "airflow_provider_bigquery_reservation.hooks."
+            + "bigquery_reservation.GoogleBaseHook.__init__",
+            new=mock_base_gcp_hook_no_default_project_id,
+        ):
+            return BigQueryReservationServiceHook(location=LOCATION)
+
+    def create(self, hook=None, **kwargs):
+        (hook or self.hook).create_commitment_reservation_and_assignment(
+            slots=SLOTS,
+            assignment_job_type="QUERY",
+            commitments_duration="FLEX",
+            project_id=PROJECT_ID,
+            **kwargs,
+        )
+
+    def test_create_then_update_existing_assignment(self):
+        with self.api.patch():
+            self.create()
+            self.create(hook=self.new_hook())
+
+        assert len(self.api.commitments) == 2
+        assert len(self.api.assignments) == 1
+        (reservation,) = self.api.reservations.values()
+        assert reservation.slot_capacity == 2 * SLOTS
+        assert self.api.rpc_counts["query"] == 2
+
+    def test_create_provisioning_timeline(self):
+        second = self.new_hook()
+        with self.api.patch():
+            self.create()
+            self.create(hook=second, wait_assignment_attachment=False)
+
+        timeline = self.hook.provisioning_timeline
+        assert timeline.new_reservation
+        assert (
+            timeline.started_at
+            <= timeline.commitment_created_at
+            <= timeline.assignment_created_at
+            <= timeline.attached_at
+        )
+        assert set(timeline.durations()) == {
+            "commitment",
+            "assignment",
+            "attachment",
+            "total",
+        }
+        assert not second.provisioning_timeline.new_reservation
+        assert second.provisioning_timeline.attached_at is None
+
+    def test_create_delayed_attachment(self):
+        self.api.attachment_delay = 0.05
+
+        with self.api.patch():
+            self.create(attachment_probe="assignment_state")
+            self.create(hook=self.new_hook())
+
+        assert self.api.rpc_counts["search_all_assignments"] >= 2
+        assert self.api.rpc_counts["query"] >= 1
+
+    def test_create_delayed_attachment_last_job(self):
+        self.api.attachment_delay = 0.3
+
+        with self.api.patch():
+            self.create(attachment_probe="last_job", attachment_deadline=6)
+
+        assert self.api.rpc_counts["query"] >= 2
+        assert self.hook.provisioning_timeline.attached_at is not None
+
+    def test_create_attachment_deadline_cleanup(self):
+        self.api.attachment_delay = 60
+
+        with self.api.patch(), pytest.raises(AirflowException):
+            self.create(attachment_deadline=0.05)
+
+        assert not self.api.commitments
+        assert not self.api.reservations
+        assert not self.api.assignments
+
+    def test_create_error_injection_cleanup(self):
+        self.api.inject_error("create_assignment", InternalServerError("Test"))
+
+        with self.api.patch(), pytest.raises(AirflowException):
+            self.create()
+
+        assert not self.api.commitments
+        assert not self.api.reservations
+
+    def test_create_idempotent_retry_adopts_resources(self):
+        with self.api.patch():
+            # First try killed after its purchase, before its attachment and cleanup
+            self.create(idempotency_key=KEY, wait_assignment_attachment=False)
+            retry = self.new_hook()
+            self.create(hook=retry, idempotency_key=KEY)
+
+        (commitment,) = self.api.commitments.values()
+        (reservation,) = self.api.reservations.values()
+        (assignment,) = self.api.assignments.values()
+        assert reservation.slot_capacity == SLOTS
+        assert retry.commitment.name == commitment.name
+        assert retry.reservation.name == reservation.name
+        assert retry.assignment.name == assignment.name
+        assert retry.provisioning_timeline.new_reservation
+        assert self.api.rpc_counts["create_capacity_commitment"] == 1
+        assert self.api.rpc_counts["create_reservation"] == 1
+        assert self.api.rpc_counts["create_assignment"] == 1
+
+    def test_create_idempotent_retry_existing_assignment(self):
+        ledger = VariableState({"updates": {}})
+        with self.api.patch():
+            self.create()
+            for _ in range(2):
+                hook = self.new_hook()
+                hook._idempotency_ledger = ledger.locked
+                self.create(hook=hook, idempotency_key=KEY)
+
+        (reservation,) = self.api.reservations.values()
+        assert reservation.slot_capacity == 2 * SLOTS
+        assert len(self.api.commitments) == 2
+        assert ledger.state["updates"] == {
+            KEY: {"reservation": reservation.name, "commitment": hook.commitment.name}
+        }
+        assert ledger.state["claims"] == {}
+
+    def test_create_idempotent_rerun_after_delete_grows_again(self):
+        ledger = VariableState({"updates": {}})
+        with self.api.patch():
+            self.create()
+            hook = self.new_hook()
+            hook._idempotency_ledger = ledger.locked
+            self.create(hook=hook, idempotency_key=KEY)
+            # Deleted without its idempotency key: the ledger still has the update
+            hook.delete_commitment_reservation_and_assignment(
+                slots=SLOTS,
+                commitment_name=hook.commitment.name,
+                reservation_name=hook.reservation.name,
+            )
+            rerun = self.new_hook()
+            rerun._idempotency_ledger = ledger.locked
+            self.create(hook=rerun, idempotency_key=KEY)
+
+        (reservation,) = self.api.reservations.values()
+        assert reservation.slot_capacity == 2 * SLOTS
+        assert len(self.api.commitments) == 2
+
+    def test_create_idempotent_grows_outside_ledger_lock(self):
+        ledger = VariableState({"updates": {}})
+        with self.api.patch():
+            self.create()
+            hook = self.new_hook()
+            hook._idempotency_ledger = ledger.locked
+            update_reservation = hook.update_reservation
+
+            def unlocked_update(**kwargs):
+                assert not ledger.lock.locked(), "Ledger locked during the update"
+                (claim,) = ledger.state["claims"].values()
+                assert claim["key"] == KEY
+                return update_reservation(**kwargs)
+
+            with mock.patch.object(hook, "update_reservation", new=unlocked_update):
+                self.create(hook=hook, idempotency_key=KEY)
+
+        (reservation,) = self.api.reservations.values()
+        assert reservation.slot_capacity == 2 * SLOTS
+
+    @mock.patch("time.sleep")
+    def test_create_idempotent_waits_for_claim(self, sleep_mock):
+        ledger = VariableState({"updates": {}})
+        with self.api.patch():
+            self.create()
+            since = datetime.datetime.now(tz=datetime.timezone.utc).isoformat()
+            with ledger.locked() as state:
+                state["claims"] = {
+                    self.hook.reservation.name: {"key": "other", "since": since}
+                }
+
+            def release(_):
+                with ledger.locked() as state:
+                    state["claims"].clear()
+
+            sleep_mock.side_effect = release
+            hook = self.new_hook()
+            hook._idempotency_ledger = ledger.locked
+            self.create(hook=hook, idempotency_key=KEY)
+
+        sleep_mock.assert_called_once_with(1.0)
+        (reservation,) = self.api.reservations.values()
+        assert reservation.slot_capacity == 2 * SLOTS
+
+    def test_create_idempotent_grows_current_capacity(self):
+        ledger = VariableState({"updates": {}})
+        with self.api.patch():
+            self.create()
+            hook = self.new_hook()
+            hook._idempotency_ledger = ledger.locked
+            lookup = hook._get_existing_assignment_and_reservation
+
+            def stale_lookup(**kwargs):
+                found = lookup(**kwargs)
+                # Another task grows the reservation after the lookup
+                self.create(hook=self.new_hook())
+                return found
+
+            with mock.patch.object(
+                hook, "_get_existing_assignment_and_reservation", new=stale_lookup
+            ):
+                self.create(hook=hook, idempotency_key=KEY)
+
+        (reservation,) = self.api.reservations.values()
+        assert reservation.slot_capacity == 3 * SLOTS
+
+    def test_delete_forgets_idempotent_update(self):
+        ledger = VariableState({"updates": {}})
+        with self.api.patch():
+            self.create()
+            hook = self.new_hook()
+            hook._idempotency_ledger = ledger.locked
+            self.create(hook=hook, idempotency_key=KEY)
+            hook.delete_commitment_reservation_and_assignment(
+                slots=SLOTS,
+                commitment_name=hook.commitment.name,
+                reservation_name=hook.reservation.name,
+                idempotency_key=KEY,
+            )
+
+        (reservation,) = self.api.reservations.values()
+        assert reservation.slot_capacity == SLOTS
+        assert ledger.state["updates"] == {}
+
+    def test_create_idempotent_cleanup_forgets_update(self):
+        ledger = VariableState({"updates": {}})
+        with self.api.patch():
+            self.create()
+            self.api.attachment_delay = 60
+            self.hook = self.new_hook()
+            self.hook._idempotency_ledger = ledger.locked
+            with pytest.raises(AirflowException):
+                self.create(idempotency_key=KEY, attachment_deadline=0.05)
+
+        (reservation,) = self.api.reservations.values()
+        assert reservation.slot_capacity == SLOTS
+        assert len(self.api.commitments) == 1
+        assert ledger.state["updates"] == {}
+
+    def test_delete_all_commitments(self):
+        self.api.page_size = 1
+        with self.api.patch():
+            self.create()
+            self.create(hook=self.new_hook())
+            self.hook.delete_all_commitments(project_id=PROJECT_ID, location=LOCATION)
+
+        assert not self.api.commitments
+        assert not self.api.reservations
+        assert not self.api.assignments
+        # One page per commitment plus the last (empty) page
+        assert self.api.rpc_counts["list_capacity_commitments"] == 3
+
+    def test_delete_commitments_assignment_associated(self):
+        with self.api.patch():
+            self.create()
+            self.hook.delete_commitments_assignment_associated(
+                project_id=PROJECT_ID,
+                location=LOCATION,
+                reservation_project_id=PROJECT_ID,
+            )
+
+        assert not self.api.commitments
+        assert not self.api.reservations
+        assert not self.api.assignments
+
+    def test_iter_early_termination(self):
+        self.api.page_size = 2
+        self.api.enforce_capacity = False
+        client = self.api.reservation_client
+        for _ in range(10):
+            client.create_capacity_commitment(
+                request={
+                    "parent": PARENT,
+                    "capacity_commitment": CapacityCommitment(slot_count=SLOTS),
+                }
+            )
+
+        with self.api.patch():
+            commitments = self.hook.iter_capacity_commitments(PARENT)
+            first = [next(commitments) for _ in range(3)]
+            commitments.close()
+
+        assert len(first) == 3
+        assert self.api.rpc_counts["list_capacity_commitments"] == 2
+
+    def test_bi_reservation(self):
+        self.hook._bi_reservation_ledger = VariableState({"reservations": {}}).locked
+        with self.api.patch():
+            self.hook.create_bi_reservation(project_id=PROJECT_ID, size=2)
+            self.hook.delete_bi_reservation(project_id=PROJECT_ID, size=1)
+
+        (bi_reservation,) = self.api.bi_reservations.values()
+        assert bi_reservation.size == 1073741824
+
+    def test_bi_reservation_concurrent_updates(self):
+        self.api.latency = lambda: 0.005
+        ledger = VariableState({"reservations": {}})
+        # Deletions never floor the size at 0, whatever their order
+        self.api.bi_reservations[f"{PARENT}/biReservation"] = BiReservation(
+            name=f"{PARENT}/biReservation", size=8 * 1073741824
+        )
+
+        def resize(index):
+            hook = self.new_hook()
+            hook._bi_reservation_ledger = ledger.locked
+            if index % 2:
+                hook.delete_bi_reservation(project_id=PROJECT_ID, size=1)
+            else:
+                hook.create_bi_reservation(project_id=PROJECT_ID, size=2)
+
+        with self.api.patch(), ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(resize, range(16)))
+
+        (bi_reservation,) = self.api.bi_reservations.values()
+        assert bi_reservation.size == 16 * 1073741824
+        (entry,) = ledger.state["reservations"].values()
+        assert entry["size"] == bi_reservation.size
+        assert len(entry["updates"]) == 16
+
+    def test_scale_reservation(self):
+        with self.api.patch():
+            self.create()
+            (reservation_name,) = self.api.reservations
+            commitments = self.hook.scale_reservation(reservation_name, SLOTS * 3)
+            commitments = self.hook.scale_reservation(
+                reservation_name, SLOTS, commitments=commitments
+            )
+
+        assert commitments == []
+        assert self.api.reservations[reservation_name].slot_capacity == SLOTS
+        assert self.api.committed_slots(PARENT) == SLOTS
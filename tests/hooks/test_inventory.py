@@ -0,0 +1,94 @@
+from unittest import mock
+
+from airflow_provider_bigquery_reservation.hooks.inventory import (
+    ReservationInventory,
+    resource_label,
+)
+from google.cloud.bigquery_reservation_v1 import (
+    Assignment,
+    CapacityCommitment,
+    Reservation,
+)
+
+
+PROJECT_ID = "test-project"
+LOCATION = "US"
+PARENT = f"projects/{PROJECT_ID}/locations/{LOCATION}"
+LABEL = f"airflow-{PROJECT_ID}-assignement"
+COMMITMENTS = [
+    CapacityCommitment(name=f"{PARENT}/capacityCommitments/{LABEL}-0123456789"),
+    CapacityCommitment(name=f"{PARENT}/capacityCommitments/{LABEL}-abcdef0123"),
+    CapacityCommitment(name=f"{PARENT}/capacityCommitments/other"),
+]
+RESERVATIONS = [
+    Reservation(name=f"{PARENT}/reservations/{LABEL}-0123456789"),
+    Reservation(name=f"{PARENT}/reservations/shared"),
+]
+ASSIGNMENTS = [
+    Assignment(
+        name=f"{PARENT}/reservations/{LABEL}-0123456789/assignments/a1",
+        assignee=f"projects/{PROJECT_ID}",
+        job_type="PIPELINE",
+        state="ACTIVE",
+    ),
+    Assignment(
+        name=f"{PARENT}/reservations/shared/assignments/a2",
+        assignee=f"projects/{PROJECT_ID}",
+        job_type="QUERY",
+        state="ACTIVE",
+    ),
+    Assignment(
+        name=f"{PARENT}/reservations/shared/assignments/a3",
+        assignee="projects/other",
+        job_type="QUERY",
+        state="PENDING",
+    ),
+]
+
+
+class TestReservationInventory:
+    def setup_method(self):
+        self.inventory = ReservationInventory(
+            PARENT, COMMITMENTS, RESERVATIONS, ASSIGNMENTS
+        )
+
+    def test_resource_label(self):
+        assert resource_label(COMMITMENTS[0].name) == LABEL
+        assert resource_label(COMMITMENTS[2].name) == "other"
+
+    def test_load(self):
+        hook = mock.MagicMock()
+        hook.list_capacity_commitments.return_value = COMMITMENTS
+        hook.list_reservations.return_value = RESERVATIONS
+        hook.list_assignments.return_value = ASSIGNMENTS
+
+        inventory = ReservationInventory.load(hook, PARENT)
+
+        hook.list_capacity_commitments.assert_called_once_with(PARENT)
+        hook.list_reservations.assert_called_once_with(PARENT)
+        hook.list_assignments.assert_called_once_with(f"{PARENT}/reservations/-")
+        assert list(inventory.assignments.values()) == ASSIGNMENTS
+
+    def test_indexes(self):
+        assert self.inventory.assignments_of_assignee(PROJECT_ID) == ASSIGNMENTS[:2]
+        assert self.inventory.assignments_of_assignee("unknown") == []
+        assert (
+            self.inventory.assignments_of_reservation(RESERVATIONS[1].name)
+            == ASSIGNMENTS[1:]
+        )
+        assert self.inventory.commitment_by_id(f"{LABEL}-0123456789") == COMMITMENTS[0]
+        assert self.inventory.commitment_by_id("unknown") is None
+        assert self.inventory.commitments_with_label(LABEL) == COMMITMENTS[:2]
+
+    def test_search_assignment(self):
+        assert self.inventory.search_assignment(PROJECT_ID, "QUERY") == ASSIGNMENTS[1]
+        assert self.inventory.search_assignment("other", "QUERY") is None
+
+    def test_remove_assignment(self):
+        self.inventory.remove_assignment(ASSIGNMENTS[1])
+
+        assert ASSIGNMENTS[1].name not in self.inventory.assignments
+        assert self.inventory.assignments_of_assignee(PROJECT_ID) == ASSIGNMENTS[:1]
+        assert self.inventory.assignments_of_reservation(RESERVATIONS[1].name) == [
+            ASSIGNMENTS[2]
+        ]
@@ -0,0 +1,179 @@
+import datetime
+import json
+from unittest import mock
+
+import pytest
+from airflow.exceptions import AirflowException
+from airflow_provider_bigquery_reservation.hooks.latency import (
+    ProvisioningHistory,
+    ProvisioningTimeline,
+    main,
+    percentile,
+    provisioning_lead_time,
+    record_provisioning,
+)
+
+from tests.utils import VariableState
+
+
+LOCATION = "US"
+PROJECT_ID = "test-project"
+JOB_TYPE = "QUERY"
+NOW = datetime.datetime(2023, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def test_percentile():
+    values = [float(value) for value in range(100, 0, -1)]
+
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile(values, 100) == 100.0
+    assert percentile([3.0], 95) == 3.0
+
+
+def test_percentile_no_value():
+    with pytest.raises(ValueError):
+        percentile([], 95)
+
+
+def test_provisioning_lead_time():
+    assert provisioning_lead_time([30.0, 90.0, 60.0], 95, default=600.0) == 90.0
+    assert provisioning_lead_time([], 95, default=600.0) == 600.0
+
+
+class TestProvisioningTimeline:
+    def test_durations(self):
+        timeline = ProvisioningTimeline(
+            location=LOCATION,
+            project_id=PROJECT_ID,
+            job_type=JOB_TYPE,
+            started_at=NOW,
+            commitment_created_at=NOW + datetime.timedelta(seconds=2),
+            assignment_created_at=NOW + datetime.timedelta(seconds=5),
+        )
+
+        assert timeline.durations() == {"commitment": 2.0, "assignment": 5.0}
+
+        timeline.attached_at = NOW + datetime.timedelta(seconds=65)
+
+        assert timeline.durations()["attachment"] == 60.0
+        assert timeline.durations()["total"] == 65.0
+
+    def test_serialization(self):
+        timeline = ProvisioningTimeline(
+            location=LOCATION,
+            project_id=PROJECT_ID,
+            job_type=JOB_TYPE,
+            started_at=NOW,
+            new_reservation=True,
+        )
+        timeline.mark("attached")
+
+        assert ProvisioningTimeline.from_dict(timeline.to_dict()) == timeline
+        assert (
+            json.loads(json.dumps(timeline.to_dict()))["commitment_created_at"] is None
+        )
+
+
+class TestProvisioningHistory:
+    def setup_method(self):
+        self.variable = VariableState({"records": []})
+        self.history = ProvisioningHistory(LOCATION, max_records=3)
+        self.history._locked_state = self.variable.locked
+        self.history._load_state = lambda: self.variable.state
+
+    @staticmethod
+    def timeline(attachment, job_type=JOB_TYPE, new_reservation=True, probe="query"):
+        return ProvisioningTimeline(
+            location=LOCATION,
+            project_id=PROJECT_ID,
+            job_type=job_type,
+            started_at=NOW,
+            new_reservation=new_reservation,
+            probe=probe,
+            commitment_created_at=NOW,
+            assignment_created_at=NOW,
+            attached_at=NOW + datetime.timedelta(seconds=attachment),
+        )
+
+    def test_key(self):
+        assert self.history.key == "bigquery_reservation_provisioning_history-US"
+
+    def test_record_keeps_last_records(self):
+        for attachment in (10, 20, 30, 40):
+            self.history.record(self.timeline(attachment))
+
+        assert [t.durations()["attachment"] for t in self.history.timelines()] == [
+            20.0,
+            30.0,
+            40.0,
+        ]
+
+    def test_percentiles(self):
+        self.history.max_records = 1000
+        for attachment in range(1, 101):
+            self.history.record(self.timeline(attachment))
+        self.history.record(self.timeline(1000, new_reservation=False))
+        self.history.record(self.timeline(2000, job_type="PIPELINE"))
+
+        assert self.history.percentiles(job_type=JOB_TYPE, new_reservation=True) == {
+            50: 50.0,
+            95: 95.0,
+            99: 99.0,
+        }
+        assert self.history.percentiles(
+            "total", percents=[50], job_type="PIPELINE"
+        ) == {50: 2000.0}
+        assert self.history.percentiles(job_type="BACKGROUND") == {}
+
+    def test_percentiles_by_probe(self):
+        self.history.max_records = 1000
+        for attachment in (60, 120):
+            self.history.record(self.timeline(attachment))
+        self.history.record(self.timeline(1, probe="assignment_state"))
+        # Recorded before the probes were: attached with the default probe
+        self.history.record(self.timeline(90, probe=None))
+
+        assert self.history.percentiles(percents=[0, 100]) == {0: 60.0, 100: 120.0}
+        assert self.history.percentiles(percents=[100], probe="assignment_state") == {
+            100: 1.0
+        }
+        assert self.history.percentiles(percents=[0], probe=None) == {0: 1.0}
+
+    def test_percentiles_unknown_stage(self):
+        with pytest.raises(AirflowException):
+            self.history.percentiles("unknown")
+
+    @mock.patch.object(ProvisioningHistory, "record")
+    def test_record_provisioning(self, record_mock):
+        timeline = self.timeline(10)
+
+        record_provisioning(timeline)
+        record_provisioning(None)
+        timeline.attached_at = None
+        record_provisioning(timeline)
+
+        record_mock.assert_called_once()
+
+    @mock.patch.object(ProvisioningHistory, "record", side_effect=Exception("Test"))
+    def test_record_provisioning_failure(self, record_mock):
+        record_provisioning(self.timeline(10))
+
+        record_mock.assert_called_once()
+
+    @mock.patch.object(ProvisioningHistory, "_load_state")
+    def test_main(self, load_state_mock, capsys):
+        load_state_mock.return_value = {
+            "records": [
+                self.timeline(10).to_dict(),
+                self.timeline(30, new_reservation=False).to_dict(),
+            ]
+        }
+
+        assert main(["--location", LOCATION, "--percentiles", "50", "99"]) == 0
+
+        output = capsys.readouterr().out
+        assert (
+            "US QUERY new reservation attachment: 1 provisionings, p50 10.0s" in output
+        )
+        assert "US QUERY updated reservation total: 1 provisionings" in output
@@ -0,0 +1,95 @@
+import datetime
+from unittest import mock
+
+from airflow_provider_bigquery_reservation.hooks.metrics import (
+    ApiMetrics,
+    emit_api_call,
+    emit_commitment_utilization,
+    emit_wait,
+)
+
+
+LOCATION = "US"
+
+
+class TestMetrics:
+    @mock.patch("airflow_provider_bigquery_reservation.hooks.metrics.Stats")
+    def test_emit_api_call(self, stats_mock):
+        emit_api_call("create_reservation", LOCATION, "success", 1.5)
+
+        tags = {
+            "method": "create_reservation",
+            "location": LOCATION,
+            "outcome": "success",
+        }
+        stats_mock.timing.assert_called_once_with(
+            "bigquery_reservation.api.create_reservation.duration",
+            datetime.timedelta(seconds=1.5),
+            tags=tags,
+        )
+        stats_mock.incr.assert_called_once_with(
+            "bigquery_reservation.api.create_reservation.success", 1, tags=tags
+        )
+
+    @mock.patch("airflow_provider_bigquery_reservation.hooks.metrics.Stats")
+    def test_emit_api_call_without_tags_support(self, stats_mock):
+        # Airflow before 2.6 loggers reject the tags
+        def incr(stat, count=1, rate=1):
+            pass
+
+        stats_mock.incr.side_effect = incr
+
+        emit_api_call("create_reservation", LOCATION, "failure", 1.5)
+
+        assert stats_mock.incr.call_args_list[-1] == mock.call(
+            "bigquery_reservation.api.create_reservation.failure", 1
+        )
+
+    @mock.patch("airflow_provider_bigquery_reservation.hooks.metrics.Stats")
+    def test_emit_wait(self, stats_mock):
+        emit_wait("attachment", LOCATION, 30)
+
+        stats_mock.timing.assert_called_once_with(
+            "bigquery_reservation.wait.attachment.duration",
+            datetime.timedelta(seconds=30),
+            tags={"wait": "attachment", "location": LOCATION},
+        )
+
+    @mock.patch("airflow_provider_bigquery_reservation.hooks.metrics.Stats")
+    def test_emit_commitment_utilization(self, stats_mock):
+        emit_commitment_utilization(LOCATION, utilization=0.5, peak_jobs=3)
+
+        assert stats_mock.gauge.call_args_list == [
+            mock.call(
+                "bigquery_reservation.commitment.utilization",
+                0.5,
+                tags={"location": LOCATION},
+            ),
+            mock.call(
+                "bigquery_reservation.commitment.peak_jobs",
+                3,
+                tags={"location": LOCATION},
+            ),
+        ]
+
+    def test_api_metrics(self):
+        metrics = ApiMetrics()
+        metrics.record_call("create_reservation", 1.0, True)
+        metrics.record_call("create_reservation", 0.5, False)
+        metrics.record_call("create_assignment", 2.0, True)
+        metrics.record_wait(30.0)
+        other = ApiMetrics()
+        other.record_call("create_assignment", 1.0, True)
+
+        merged = ApiMetrics.merge([metrics, other])
+
+        assert (metrics.calls, metrics.failures) == (3, 1)
+        assert metrics.time_by_method == {
+            "create_reservation": 1.5,
+            "create_assignment": 2.0,
+        }
+        assert (merged.calls, merged.api_time, merged.wait_time) == (4, 4.5, 30.0)
+        assert merged.summary() == (
+            "4 Reservation API calls (1 failed) in 4.50s"
+            " [create_assignment: 3.00s, create_reservation: 1.50s], wait time 30.00s."
+        )
@@ -0,0 +1,253 @@
+import datetime
+from unittest import mock
+
+import pytest
+from airflow.exceptions import AirflowException
+from airflow_provider_bigquery_reservation.hooks.bigquery_reservation import (
+    BigQueryReservationServiceHook,
+)
+from airflow_provider_bigquery_reservation.hooks.pool import (
+    PROVISIONING_TIMEOUT,
+    SlotPool,
+)
+from google.api_core.exceptions import InternalServerError
+
+from tests.fake_reservation import FakeReservationApi
+from tests.utils import VariableState, mock_base_gcp_hook_no_default_project_id
+
+
+PROJECT_ID = "test-project"
+LOCATION = "US"
+PARENT = f"projects/{PROJECT_ID}/locations/{LOCATION}"
+SLOTS = 100
+TTL = 600
+NOW = datetime.datetime(2023, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class TestSlotPool:
+    def setup_method(self):
+        self.api = FakeReservationApi()
+        self.variable = VariableState({"entries": {}})
+        self.now = NOW
+        with mock.patch(
+            "airflow_provider_bigquery_reservation.hooks."
+            + "bigquery_reservation.GoogleBaseHook.__init__",
+            new=mock_base_gcp_hook_no_default_project_id,
+        ):
+            hook = BigQueryReservationServiceHook(location=LOCATION)
+        self.pool = SlotPool(hook, ttl=TTL, poll_interval=0.01, clock=lambda: self.now)
+        self.pool._locked_state = self.variable.locked
+
+    def lease(self, slots=SLOTS, **kwargs):
+        return self.pool.lease(project_id=PROJECT_ID, slots=slots, **kwargs)
+
+    @staticmethod
+    def leased_slots(entry):
+        return {lease_id: lease["slots"] for lease_id, lease in entry["leases"].items()}
+
+    def test_key(self):
+        assert self.pool.key == "bigquery_reservation_pool-default-US"
+
+    def test_lease_release_then_warm_lease(self):
+        with self.api.patch():
+            first = self.lease()
+            self.pool.release(first["lease_id"])
+            self.now += datetime.timedelta(seconds=TTL - 1)
+            second = self.lease()
+
+        assert not first["warm"]
+        assert second["warm"]
+        assert second["reservation_name"] == first["reservation_name"]
+        assert second["assignment_name"] == first["assignment_name"]
+        # The warm lease neither buys slots nor waits for the attachment
+        assert self.api.rpc_counts["create_capacity_commitment"] == 1
+        assert self.api.rpc_counts["query"] == 1
+        (entry,) = self.variable.state["entries"].values()
+        assert self.leased_slots(entry) == {second["lease_id"]: SLOTS}
+
+    def test_concurrent_leases_grow_warm_reservation(self):
+        with self.api.patch():
+            first = self.lease()
+            second = self.lease(slots=2 * SLOTS)
+
+        assert second["warm"]
+        (reservation,) = self.api.reservations.values()
+        assert reservation.slot_capacity == 3 * SLOTS
+        assert self.api.committed_slots(PARENT) == 3 * SLOTS
+        (entry,) = self.variable.state["entries"].values()
+        assert self.leased_slots(entry) == {
+            first["lease_id"]: SLOTS,
+            second["lease_id"]: 2 * SLOTS,
+        }
+
+    def test_reap_expired(self):
+        with self.api.patch():
+            lease = self.lease(slots=2 * SLOTS)
+            self.pool.release(lease["lease_id"])
+            assert self.pool.reap() == []
+            self.now += datetime.timedelta(seconds=TTL)
+            assert self.pool.reap() == [f"{PROJECT_ID}/QUERY"]
+
+        assert not self.variable.state["entries"]
+        assert not self.api.commitments
+        assert not self.api.reservations
+        assert not self.api.assignments
+
+    def test_reap_failure_retried(self):
+        with self.api.patch():
+            lease = self.lease()
+            self.pool.release(lease["lease_id"])
+            self.now += datetime.timedelta(seconds=TTL)
+            self.api.inject_error(
+                "delete_capacity_commitment", InternalServerError("Test")
+            )
+
+            assert self.pool.reap() == []
+            (entry,) = self.variable.state["entries"].values()
+            assert entry["status"] == "deleting"
+            assert entry["reservation_name"] is None
+            assert len(entry["commitments"]) == 1
+
+            assert self.pool.reap() == [f"{PROJECT_ID}/QUERY"]
+
+        assert not self.api.commitments
+
+    def test_lease_provisioning_failure(self):
+        self.api.inject_error("create_assignment", InternalServerError("Test"))
+
+        with self.api.patch(), pytest.raises(AirflowException):
+            self.lease()
+
+        assert not self.variable.state["entries"]
+
+    def provisioning_entry(self, owner="other"):
+        with self.variable.locked() as state:
+            state["entries"][f"{PROJECT_ID}/QUERY"] = {
+                "status": "provisioning",
+                "owner": owner,
+                "since": self.now.isoformat(),
+                "reservation_name": None,
+                "assignment_name": None,
+                "commitments": [],
+                "commitments_duration": "FLEX",
+                "leases": {},
+            }
+
+    def test_lease_provisioned_by_another_task(self):
+        self.provisioning_entry()
+
+        with self.api.patch(), pytest.raises(AirflowException, match="provisioning"):
+            self.lease(attachment_deadline=0.05)
+
+        assert not self.api.rpc_counts["create_capacity_commitment"]
+
+    def test_lease_reclaims_stale_provisioning(self):
+        self.provisioning_entry()
+        self.now += datetime.timedelta(seconds=PROVISIONING_TIMEOUT)
+
+        with self.api.patch():
+            lease = self.lease()
+
+        assert not lease["warm"]
+        (entry,) = self.variable.state["entries"].values()
+        assert entry["status"] == "ready"
+        assert entry["owner"] != "other"
+
+    def test_reclaimed_provisioning_deletes_its_resources(self):
+        get_commitment = self.pool.hook._get_commitment
+
+        def reclaimed_commitment():
+            # The entry is reclaimed then provisioned by another task meanwhile.
+            self.provisioning_entry()
+            return get_commitment()
+
+        with self.api.patch(), mock.patch.object(
+            self.pool.hook, "_get_commitment", side_effect=reclaimed_commitment
+        ), pytest.raises(AirflowException, match="reclaimed"):
+            self.lease()
+
+        assert not self.api.commitments
+        assert not self.api.reservations
+        assert self.variable.state["entries"][f"{PROJECT_ID}/QUERY"]["owner"] == "other"
+
+    def test_warm_lease_grows_current_capacity(self):
+        with self.api.patch():
+            self.lease()
+            # The reservation is shared: another writer grows it meanwhile.
+            (reservation,) = self.api.reservations.values()
+            reservation.slot_capacity += SLOTS
+            self.lease()
+
+        assert reservation.slot_capacity == 3 * SLOTS
+        (entry,) = self.variable.state["entries"].values()
+        assert entry["status"] == "ready"
+        assert entry["slots"] == 2 * SLOTS
+
+    def test_warm_lease_growth_failure(self):
+        with self.api.patch():
+            first = self.lease()
+            self.api.inject_error(
+                "create_capacity_commitment", InternalServerError("Test")
+            )
+            with pytest.raises(AirflowException):
+                self.lease()
+
+        (entry,) = self.variable.state["entries"].values()
+        assert entry["status"] == "ready"
+        assert self.leased_slots(entry) == {first["lease_id"]: SLOTS}
+
+    def test_reap_reclaims_stale_growth(self):
+        with self.api.patch():
+            self.lease()
+        with self.variable.locked() as state:
+            (entry,) = state["entries"].values()
+            entry.update(status="scaling", since=self.now.isoformat())
+        self.now += datetime.timedelta(seconds=PROVISIONING_TIMEOUT)
+
+        assert self.pool.reap() == []
+        (entry,) = self.variable.state["entries"].values()
+        assert entry["status"] == "ready"
+
+    def test_reap_reclaims_expired_lease(self):
+        self.pool.lease_ttl = 3600
+        with self.api.patch():
+            # The holder is killed before releasing its lease
+            lease = self.lease(holder="dag/task/run/-1")
+            (entry,) = self.variable.state["entries"].values()
+            assert entry["leases"][lease["lease_id"]] == {
+                "slots": SLOTS,
+                "holder": "dag/task/run/-1",
+                "leased_at": NOW.isoformat(),
+                "ttl": 3600,
+            }
+            self.now += datetime.timedelta(seconds=3599)
+            assert self.pool.reap() == []
+            self.now += datetime.timedelta(seconds=1)
+            assert self.pool.reap() == []
+            (entry,) = self.variable.state["entries"].values()
+            assert not entry["leases"]
+            assert entry["idle_since"] == self.now.isoformat()
+            self.now += datetime.timedelta(seconds=TTL)
+            assert self.pool.reap() == [f"{PROJECT_ID}/QUERY"]
+
+        assert not self.api.reservations
+
+    def test_reap_reclaims_leases_without_ttl(self):
+        with self.api.patch():
+            lease = self.lease()
+        with self.variable.locked() as state:
+            (entry,) = state["entries"].values()
+            entry["leases"] = {lease["lease_id"]: SLOTS}
+
+        self.pool.reap()
+        (entry,) = self.variable.state["entries"].values()
+        assert entry["leases"][lease["lease_id"]]["leased_at"] == NOW.isoformat()
+        self.now += datetime.timedelta(seconds=self.pool.lease_ttl)
+        self.pool.reap()
+        (entry,) = self.variable.state["entries"].values()
+        assert not entry["leases"]
+
+    def test_release_unknown_lease(self):
+        self.pool.release("unknown")
+
+        assert not self.variable.state["entries"]
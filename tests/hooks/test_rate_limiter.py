@@ -0,0 +1,227 @@
+from unittest import mock
+
+import pytest
+from airflow_provider_bigquery_reservation.hooks.rate_limiter import (
+    AsyncRateLimitedClient,
+    FileTokenBucket,
+    RateLimitedClient,
+    RateLimiter,
+    TokenBucket,
+)
+from google.api_core.exceptions import ResourceExhausted
+from google.cloud.bigquery_reservation_v1 import (
+    ListReservationsResponse,
+    Reservation,
+)
+from google.cloud.bigquery_reservation_v1.services.reservation_service.pagers import (
+    ListReservationsPager,
+)
+
+
+PROJECT_ID = "test-project"
+LOCATION = "US"
+PARENT = f"projects/{PROJECT_ID}/locations/{LOCATION}"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestTokenBucket:
+    def test_acquire_burst_then_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, capacity=3, sleep=clock.sleep, clock=clock)
+
+        waits = [bucket.acquire() for _ in range(5)]
+
+        assert waits == [0, 0, 0, 0.5, 0.5]
+        assert clock.now == 1
+
+    def test_refill_is_capped(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1, capacity=2, sleep=clock.sleep, clock=clock)
+        bucket.acquire()
+        bucket.acquire()
+
+        clock.now += 100
+
+        assert [bucket.acquire() for _ in range(3)] == [0, 0, 1]
+
+    def test_file_bucket_shared_state(self, tmp_path):
+        sleep = mock.MagicMock()
+        path = str(tmp_path / "bucket.json")
+        first = FileTokenBucket(path, rate=0.001, capacity=2, sleep=sleep)
+        second = FileTokenBucket(path, rate=0.001, capacity=2, sleep=sleep)
+
+        first.acquire()
+        second.acquire()
+        sleep.assert_not_called()
+
+        sleep.side_effect = StopIteration
+        with pytest.raises(StopIteration):
+            first.acquire()
+
+
+class TestRateLimiter:
+    def test_buckets_by_project_and_location(self):
+        rate_limiter = RateLimiter(
+            rate=1, capacity=1, limits={(PROJECT_ID, "EU"): {"rate": None}}
+        )
+
+        bucket = rate_limiter.get_bucket(PROJECT_ID, LOCATION)
+
+        assert rate_limiter.get_bucket(PROJECT_ID, LOCATION) is bucket
+        assert rate_limiter.get_bucket("other", LOCATION) is not bucket
+        assert rate_limiter.get_bucket(PROJECT_ID, "EU") is None
+
+    def test_configure(self):
+        rate_limiter = RateLimiter(rate=1, capacity=1)
+        rate_limiter.configure(10, 20, project_id=PROJECT_ID, location=LOCATION)
+
+        bucket = rate_limiter.get_bucket(PROJECT_ID, LOCATION)
+
+        assert (bucket.rate, bucket.capacity) == (10, 20)
+        assert rate_limiter.get_bucket("other", LOCATION).rate == 1
+
+    def test_file_lock(self, tmp_path):
+        rate_limiter = RateLimiter(lock_dir=str(tmp_path))
+
+        bucket = rate_limiter.get_bucket(PROJECT_ID, LOCATION)
+
+        assert isinstance(bucket, FileTokenBucket)
+        assert bucket.path == str(tmp_path / f"{PROJECT_ID}-{LOCATION}.json")
+
+    def test_call_retries_quota_errors(self):
+        rate_limiter = RateLimiter(rate=None)
+        rate_limiter.sleep = mock.MagicMock()
+        func = mock.MagicMock(side_effect=[ResourceExhausted("Quota"), "result"])
+
+        assert rate_limiter.call(PARENT, func, parent=PARENT) == "result"
+        assert func.call_count == 2
+        rate_limiter.sleep.assert_called_once()
+
+    def test_call_gives_up_after_max_retries(self):
+        rate_limiter = RateLimiter(rate=None, max_retries=2)
+        rate_limiter.sleep = mock.MagicMock()
+        func = mock.MagicMock(side_effect=ResourceExhausted("Quota"))
+
+        with pytest.raises(ResourceExhausted):
+            rate_limiter.call(PARENT, func)
+        assert func.call_count == 3
+
+    def test_call_does_not_retry_other_errors(self):
+        rate_limiter = RateLimiter(rate=None)
+        func = mock.MagicMock(side_effect=ValueError("Test"))
+
+        with pytest.raises(ValueError):
+            rate_limiter.call(PARENT, func)
+        func.assert_called_once()
+
+    @pytest.mark.asyncio
+    @mock.patch("asyncio.sleep")
+    async def test_call_async_retries_quota_errors(self, sleep_mock):
+        rate_limiter = RateLimiter(rate=None)
+        func = mock.AsyncMock(side_effect=[ResourceExhausted("Quota"), "result"])
+
+        assert await rate_limiter.call_async(PARENT, func, parent=PARENT) == "result"
+        assert func.await_count == 2
+        sleep_mock.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    @mock.patch("asyncio.sleep")
+    async def test_acquire_async_waits_in_event_loop(self, sleep_mock):
+        rate_limiter = RateLimiter(rate=1, capacity=1)
+        rate_limiter.sleep = mock.MagicMock()
+
+        assert await rate_limiter.acquire_async(PARENT) == 0.0
+        assert await rate_limiter.acquire_async(PARENT) > 0.0
+        sleep_mock.assert_awaited()
+        rate_limiter.sleep.assert_not_called()
+
+
+class TestRateLimitedClient:
+    def test_calls_are_rate_limited_by_resource(self):
+        client = mock.MagicMock()
+        rate_limiter = mock.MagicMock()
+        rate_limited_client = RateLimitedClient(client, rate_limiter)
+
+        rate_limited_client.list_reservations(request={"parent": PARENT})
+        rate_limited_client.update_reservation(
+            reservation=Reservation(name=f"{PARENT}/reservations/test")
+        )
+
+        rate_limiter.call.assert_has_calls(
+            [
+                mock.call(
+                    PARENT,
+                    client.list_reservations,
+                    request={"parent": PARENT},
+                ),
+                mock.call(
+                    f"{PARENT}/reservations/test",
+                    client.update_reservation,
+                    reservation=Reservation(name=f"{PARENT}/reservations/test"),
+                ),
+            ]
+        )
+
+    def test_pager_next_pages_are_rate_limited(self):
+        responses = [
+            ListReservationsResponse(
+                reservations=[Reservation(name="r2")], next_page_token="3"
+            ),
+            ListReservationsResponse(reservations=[Reservation(name="r3")]),
+        ]
+        method = mock.MagicMock(side_effect=responses)
+        client = mock.MagicMock()
+        client.list_reservations.side_effect = lambda request: ListReservationsPager(
+            method,
+            request,
+            ListReservationsResponse(
+                reservations=[Reservation(name="r1")], next_page_token="2"
+            ),
+        )
+        rate_limiter = RateLimiter(rate=None)
+        rate_limiter.acquire = mock.MagicMock(return_value=0.0)
+
+        pager = RateLimitedClient(client, rate_limiter).list_reservations(
+            request={"parent": PARENT}
+        )
+
+        assert [reservation.name for reservation in pager] == ["r1", "r2", "r3"]
+        assert rate_limiter.acquire.mock_calls == [mock.call(PARENT)] * 3
+
+    def test_path_helpers_are_not_rate_limited(self):
+        client = mock.MagicMock()
+        rate_limiter = mock.MagicMock()
+
+        RateLimitedClient(client, rate_limiter).reservation_path("p", "l", "r")
+
+        client.reservation_path.assert_called_once_with("p", "l", "r")
+        rate_limiter.call.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_async_calls_are_rate_limited_by_resource(self):
+        client = mock.MagicMock()
+        client.get_reservation = mock.AsyncMock(return_value="reservation")
+        rate_limiter = RateLimiter(rate=None)
+        rate_limiter.acquire_async = mock.AsyncMock(return_value=0.0)
+
+        result = await AsyncRateLimitedClient(client, rate_limiter).get_reservation(
+            name=f"{PARENT}/reservations/test"
+        )
+
+        assert result == "reservation"
+        client.get_reservation.assert_awaited_once_with(
+            name=f"{PARENT}/reservations/test"
+        )
+        rate_limiter.acquire_async.assert_awaited_once_with(
+            f"{PARENT}/reservations/test"
+        )
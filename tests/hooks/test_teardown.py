@@ -0,0 +1,45 @@
+import threading
+from unittest import mock
+
+from airflow_provider_bigquery_reservation.hooks.teardown import run_teardown
+
+
+class TestRunTeardown:
+    def test_run_teardown_chain_order(self):
+        calls = []
+        lock = threading.Lock()
+
+        def deletion(name):
+            def delete():
+                with lock:
+                    calls.append(name)
+
+            return name, delete
+
+        chains = [
+            [[deletion(f"a{i}")], [deletion(f"r{i}")], [deletion(f"c{i}")]]
+            for i in range(10)
+        ]
+        failures = run_teardown([chains, [[[deletion("last")]]]], max_workers=4)
+
+        assert failures == {}
+        assert len(calls) == 31
+        for i in range(10):
+            assert calls.index(f"a{i}") < calls.index(f"r{i}") < calls.index(f"c{i}")
+        assert calls[-1] == "last"
+
+    def test_run_teardown_collect_failures(self):
+        failing = mock.MagicMock(side_effect=Exception("Test"))
+        deleted = mock.MagicMock()
+
+        failures = run_teardown(
+            [
+                [
+                    [[("a1", failing), ("a2", deleted)], [("r1", deleted)]],
+                    [[("r2", deleted)]],
+                ]
+            ]
+        )
+
+        assert failures == {"a1": "Test", "r1": "Skipped: depends on a1."}
+        assert deleted.call_count == 2
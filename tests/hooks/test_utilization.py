@@ -0,0 +1,67 @@
+from unittest import mock
+
+import pytest
+from airflow.exceptions import AirflowException
+from airflow_provider_bigquery_reservation.hooks.utilization import (
+    CommitmentTimeline,
+    summarize_utilization,
+)
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None  # type: ignore[assignment]
+
+
+# 100 slots bought for 10 seconds: 3 seconds used, 150 slots and 4 jobs at the peak
+TIMELINE = CommitmentTimeline(
+    seconds=[0, 4, 4, 9],
+    slot_ms=[50_000, 100_000, 50_000, 100_000],
+    jobs=[1, 3, 1, 2],
+)
+
+
+@pytest.mark.parametrize(
+    "np",
+    [
+        pytest.param(
+            numpy,
+            id="numpy",
+            marks=pytest.mark.skipif(numpy is None, reason="numpy not installed"),
+        ),
+        pytest.param(None, id="python"),
+    ],
+)
+def test_summarize_utilization(np):
+    with mock.patch(
+        "airflow_provider_bigquery_reservation.hooks.utilization.np", new=np
+    ):
+        utilization = summarize_utilization(TIMELINE, window_seconds=10, slots=100)
+
+    assert utilization.to_dict() == {
+        "window_seconds": 10,
+        "slots": 100,
+        "slot_ms_bought": 1_000_000,
+        "slot_ms_used": 300_000,
+        # The 50 slots used over the 100 bought are not counted
+        "utilization": 0.25,
+        "peak_slots": 150.0,
+        "peak_jobs": 4,
+        "idle_share": 0.7,
+    }
+
+
+def test_summarize_utilization_no_job():
+    utilization = summarize_utilization(
+        CommitmentTimeline([], [], []), window_seconds=60, slots=100
+    )
+
+    assert utilization.slot_ms_used == 0
+    assert utilization.peak_slots == 0
+    assert utilization.idle_share == 1.0
+
+
+@pytest.mark.parametrize("window_seconds", [0, 9])
+def test_summarize_utilization_invalid_window(window_seconds):
+    with pytest.raises(AirflowException):
+        summarize_utilization(TIMELINE, window_seconds=window_seconds, slots=100)
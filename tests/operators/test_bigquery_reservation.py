@@ -1,12 +1,36 @@
 import datetime
+import time
 from unittest import mock
 
+import pytest
+from airflow.exceptions import AirflowException, TaskDeferred
+from airflow.triggers.temporal import DateTimeTrigger, TimeDeltaTrigger
+from airflow.utils import timezone
+from airflow_provider_bigquery_reservation.hooks.autoscale import (
+    ReservationUtilization,
+)
+from airflow_provider_bigquery_reservation.hooks.coalescing import PurchaseCoalescer
+from airflow_provider_bigquery_reservation.hooks.latency import ProvisioningTimeline
+from airflow_provider_bigquery_reservation.hooks.metrics import ApiMetrics
+from airflow_provider_bigquery_reservation.hooks.utilization import CommitmentTimeline
+from airflow_provider_bigquery_reservation.hooks.bi_engine import BiEngineTableUsage
 from airflow_provider_bigquery_reservation.operators.bigquery_reservation import (
+    BigQueryBiEngineReservationAdvisorOperator,
     BigQueryBiEngineReservationCreateOperator,
     BigQueryBiEngineReservationDeleteOperator,
+    BigQueryReservationAutoscaleOperator,
+    BigQueryReservationBatchCreateOperator,
     BigQueryReservationCreateOperator,
     BigQueryReservationDeleteOperator,
+    BigQueryReservationPoolLeaseOperator,
+    BigQueryReservationPoolReleaseOperator,
+    BigQueryReservationPreProvisionOperator,
     BigQueryReservationServiceHook,
+    BigQueryReservationUtilizationReportOperator,
+)
+from airflow_provider_bigquery_reservation.triggers.bigquery_reservation import (
+    BigQueryReservationAssignmentAttachedTrigger,
+    BigQueryReservationDrainedTrigger,
 )
 from google.cloud.bigquery_reservation_v1 import (
     Assignment,
@@ -29,6 +53,12 @@ RESERVATION = Reservation(name="reservation_test")
 ASSIGNMENT = Assignment(name="assignment_test")
 RESOURCE_ID = "resource_test"
 LOGICAL_DATE = datetime.datetime(2023, 1, 1)
+RUN_ID = "manual__2023-01-01T00:00:00+00:00"
+IDEMPOTENCY_KEY = f"{DAG}/{TASK_ID}/{RUN_ID}/-1"
+
+
+def task_instance_mock():
+    return mock.MagicMock(dag_id=DAG, task_id=TASK_ID, run_id=RUN_ID, map_index=-1)
 
 
 class TestBigQueryReservationCreateOperator:
@@ -73,7 +103,7 @@ class TestBigQueryReservationCreateOperator:
         create_commitment_reservation_and_assignment_mock,
         get_conn_mock,
     ):
-        ti = mock.MagicMock()
+        ti = task_instance_mock()
         self.operator.execute({"ti": ti, "logical_date": LOGICAL_DATE})
 
         create_commitment_reservation_and_assignment_mock.assert_called_once_with(
@@ -82,6 +112,10 @@ class TestBigQueryReservationCreateOperator:
             commitments_duration=COMMITMENTS_DURATION,
             project_id=PROJECT_ID,
             reservation_project_id=None,
+            wait_assignment_attachment=True,
+            attachment_probe="query",
+            attachment_deadline=None,
+            idempotency_key=IDEMPOTENCY_KEY,
         )
 
         ti.xcom_push.assert_has_calls(
@@ -89,9 +123,209 @@ class TestBigQueryReservationCreateOperator:
                 mock.call(key="commitment_name", value=COMMITMENT.name),
                 mock.call(key="reservation_name", value=RESERVATION.name),
                 mock.call(key="assignment_name", value=ASSIGNMENT.name),
+                mock.call(key="idempotency_key", value=IDEMPOTENCY_KEY),
             ]
         )
 
+    @mock.patch("airflow.models.connection.Connection.get_connection_from_secrets")
+    @mock.patch.object(
+        BigQueryReservationServiceHook,
+        "create_commitment_reservation_and_assignment",
+    )
+    @mock.patch.object(
+        BigQueryReservationServiceHook,
+        "_get_commitment",
+        return_value=COMMITMENT,
+    )
+    @mock.patch.object(
+        BigQueryReservationServiceHook,
+        "_get_reservation",
+        return_value=RESERVATION,
+    )
+    @mock.patch.object(
+        BigQueryReservationServiceHook,
+        "_get_assignment",
+        return_value=ASSIGNMENT,
+    )
+    def test_execute_deferrable(
+        self,
+        assignment_mock,
+        reservation_mock,
+        commitment_mock,
+        create_commitment_reservation_and_assignment_mock,
+        get_conn_mock,
+    ):
+        operator = BigQueryReservationCreateOperator(
+            task_id=TASK_ID,
+            project_id=PROJECT_ID,
+            location=LOCATION,
+            slots_provisioning=SLOTS,
+            deferrable=True,
+        )
+        ti = task_instance_mock()
+
+        with pytest.raises(TaskDeferred) as exc:
+            operator.execute({"ti": ti, "logical_date": LOGICAL_DATE})
+
+        create_commitment_reservation_and_assignment_mock.assert_called_once_with(
+            slots=SLOTS,
+            assignment_job_type=JOB_TYPE,
+            commitments_duration=COMMITMENTS_DURATION,
+            project_id=PROJECT_ID,
+            reservation_project_id=None,
+            wait_assignment_attachment=False,
+            attachment_probe="query",
+            attachment_deadline=None,
+            idempotency_key=IDEMPOTENCY_KEY,
+        )
+        assert isinstance(
+            exc.value.trigger, BigQueryReservationAssignmentAttachedTrigger
+        )
+        assert exc.value.method_name == "execute_complete"
+        assert exc.value.kwargs == {
+            "commitment_name": COMMITMENT.name,
+            "reservation_name": RESERVATION.name,
+            "assignment_name": ASSIGNMENT.name,
+            "coalescing_handle": None,
+            "idempotency_key": IDEMPOTENCY_KEY,
+            "provisioning_timeline": None,
+        }
+
+    @mock.patch("airflow.models.connection.Connection.get_connection_from_secrets")
+    @mock.patch.object(
+        PurchaseCoalescer,
+        "purchase",
+        return_value={
+            "handle": "batch/request",
+            "slots": SLOTS,
+            "total_slots": 3 * SLOTS,
+            "commitment_name": COMMITMENT.name,
+            "reservation_name": RESERVATION.name,
+            "assignment_name": ASSIGNMENT.name,
+        },
+    )
+    @mock.patch.object(
+        BigQueryReservationServiceHook,
+        "create_commitment_reservation_and_assignment",
+    )
+    def test_execute_coalesced(
+        self,
+        create_commitment_reservation_and_assignment_mock,
+        purchase_mock,
+        get_conn_mock,
+    ):
+        operator = BigQueryReservationCreateOperator(
+            task_id=TASK_ID,
+            project_id=PROJECT_ID,
+            location=LOCATION,
+            slots_provisioning=SLOTS,
+            coalesce_window=5.0,
+        )
+        ti = mock.MagicMock()
+
+        operator.execute({"ti": ti, "logical_date": LOGICAL_DATE})
+
+        create_commitment_reservation_and_assignment_mock.assert_not_called()
+        purchase_mock.assert_called_once_with(
+            project_id=PROJECT_ID,
+            slots=SLOTS,
+            job_type=JOB_TYPE,
+            reservation_project_id=None,
+            commitments_duration=COMMITMENTS_DURATION,
+            wait_assignment_attachment=True,
+            attachment_probe="query",
+            attachment_deadline=None,
+        )
+        ti.xcom_push.assert_has_calls(
+            [
+                mock.call(key="commitment_name", value=COMMITMENT.name),
+                mock.call(key="reservation_name", value=RESERVATION.name),
+                mock.call(key="assignment_name", value=ASSIGNMENT.name),
+                mock.call(key="coalescing_handle", value="batch/request"),
+            ]
+        )
+
+    @mock.patch.object(PurchaseCoalescer, "release")
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.operators.bigquery_reservation.BigQueryReservationServiceHook"
+    )
+    def test_execute_complete_error_coalesced(self, hook_mock, release_mock):
+        with pytest.raises(AirflowException):
+            self.operator.execute_complete(
+                context=None,
+                event={"status": "error", "message": "failure"},
+                commitment_name=COMMITMENT.name,
+                reservation_name=RESERVATION.name,
+                assignment_name=ASSIGNMENT.name,
+                coalescing_handle="batch/request",
+            )
+
+        release_mock.assert_called_once_with("batch/request")
+        hook_mock.return_value.delete_commitment_reservation_and_assignment.assert_not_called()
+
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.operators.bigquery_reservation.record_provisioning"
+    )
+    def test_execute_complete_records_provisioning(self, record_mock):
+        started_at = timezone.utcnow()
+        attached_at = started_at + datetime.timedelta(seconds=30)
+        timeline = ProvisioningTimeline(
+            location=LOCATION,
+            project_id=PROJECT_ID,
+            job_type=JOB_TYPE,
+            started_at=started_at,
+        )
+
+        self.operator.execute_complete(
+            context=None,
+            event={
+                "status": "success",
+                "message": "attached",
+                "attached_at": attached_at.isoformat(),
+            },
+            provisioning_timeline=timeline.to_dict(),
+        )
+
+        (recorded,), _ = record_mock.call_args
+        assert recorded.attached_at == attached_at
+        assert recorded.durations()["total"] == 30.0
+
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.operators.bigquery_reservation.BigQueryReservationServiceHook"
+    )
+    def test_execute_complete_success(self, hook_mock):
+        self.operator.execute_complete(
+            context=None,
+            event={"status": "success", "message": "attached"},
+            commitment_name=COMMITMENT.name,
+            reservation_name=RESERVATION.name,
+            assignment_name=ASSIGNMENT.name,
+        )
+
+        hook_mock.return_value.delete_commitment_reservation_and_assignment.assert_not_called()
+
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.operators.bigquery_reservation.BigQueryReservationServiceHook"
+    )
+    def test_execute_complete_error(self, hook_mock):
+        with pytest.raises(AirflowException):
+            self.operator.execute_complete(
+                context=None,
+                event={"status": "error", "message": "failure"},
+                commitment_name=COMMITMENT.name,
+                reservation_name=RESERVATION.name,
+                assignment_name=ASSIGNMENT.name,
+                idempotency_key=IDEMPOTENCY_KEY,
+            )
+
+        hook_mock.return_value.delete_commitment_reservation_and_assignment.assert_called_once_with(
+            commitment_name=COMMITMENT.name,
+            reservation_name=RESERVATION.name,
+            assignment_name=ASSIGNMENT.name,
+            slots=SLOTS,
+            idempotency_key=IDEMPOTENCY_KEY,
+        )
+
     @mock.patch("airflow.models.baseoperator.BaseOperator.on_kill")
     def test_on_kill_hook_none(self, on_kill_mock):
         assert self.operator.on_kill() is None
@@ -125,10 +359,181 @@ class TestBigQueryReservationCreateOperator:
             reservation_name=RESERVATION.name,
             assignment_name=ASSIGNMENT.name,
             slots=SLOTS,
+            idempotency_key=None,
+        )
+
+
+class TestBigQueryReservationBatchCreateOperator:
+    def setup_method(self):
+        self.operator = BigQueryReservationBatchCreateOperator(
+            task_id=TASK_ID,
+            projects={
+                PROJECT_ID: SLOTS,
+                "other": {"slots": SLOTS * 2, "job_type": "PIPELINE"},
+            },
+            location=LOCATION,
+            poll_interval=0.01,
+        )
+
+    def hook(self, attached=True, create_side_effect=None):
+        hook = mock.MagicMock()
+        hook.api_metrics = ApiMetrics()
+        hook._get_commitment.return_value = COMMITMENT
+        hook._get_reservation.return_value = RESERVATION
+        hook._get_assignment.return_value = ASSIGNMENT
+        hook.commitment = COMMITMENT
+        hook.reservation = RESERVATION
+        hook.assignment = ASSIGNMENT
+        hook._is_assignment_attached_in_query.return_value = attached
+        hook.search_assignment.return_value = None
+        hook.create_commitment_reservation_and_assignment.side_effect = (
+            create_side_effect
+        )
+        return hook
+
+    @mock.patch.object(BigQueryReservationBatchCreateOperator, "_get_hook")
+    def test_execute(self, get_hook_mock):
+        hooks = [self.hook(), self.hook()]
+        get_hook_mock.side_effect = hooks
+        ti = mock.MagicMock()
+
+        self.operator.execute({"ti": ti, "logical_date": LOGICAL_DATE})
+
+        hooks[0].create_commitment_reservation_and_assignment.assert_called_once_with(
+            slots=SLOTS,
+            assignment_job_type=JOB_TYPE,
+            commitments_duration=COMMITMENTS_DURATION,
+            project_id=PROJECT_ID,
+            reservation_project_id=None,
+            wait_assignment_attachment=False,
+        )
+        hooks[1].create_commitment_reservation_and_assignment.assert_called_once_with(
+            slots=SLOTS * 2,
+            assignment_job_type="PIPELINE",
+            commitments_duration=COMMITMENTS_DURATION,
+            project_id="other",
+            reservation_project_id=None,
+            wait_assignment_attachment=False,
         )
+        results = {
+            call.kwargs["key"]: call.kwargs["value"]
+            for call in ti.xcom_push.call_args_list
+        }
+        assert set(results) == {PROJECT_ID, "other"}
+        assert results["other"]["commitment_name"] == COMMITMENT.name
+        assert results["other"]["reservation_name"] == RESERVATION.name
+        assert results["other"]["assignment_name"] == ASSIGNMENT.name
+        assert results["other"]["slots"] == SLOTS * 2
+        assert results["other"]["job_type"] == "PIPELINE"
+        assert results["other"]["attachment_duration"] >= 0
+        for hook in hooks:
+            hook.delete_commitment_reservation_and_assignment.assert_not_called()
+
+    @mock.patch.object(BigQueryReservationBatchCreateOperator, "_get_hook")
+    def test_execute_same_reservation_sequentially(self, get_hook_mock):
+        provisioning = []
+        overlaps = []
+
+        def create(**kwargs):
+            overlaps.append(bool(provisioning))
+            provisioning.append(kwargs["project_id"])
+            time.sleep(0.05)
+            provisioning.remove(kwargs["project_id"])
+
+        hooks = [self.hook(create_side_effect=create) for _ in range(2)]
+        for hook in hooks:
+            hook.search_assignment.return_value = Assignment(
+                name=f"{RESERVATION.name}/assignments/1"
+            )
+        get_hook_mock.side_effect = hooks
+
+        self.operator.execute({"ti": mock.MagicMock()})
+
+        hooks[0].search_assignment.assert_called_once_with(
+            parent=f"projects/{PROJECT_ID}/locations/{LOCATION}",
+            project_id=PROJECT_ID,
+            job_type=JOB_TYPE,
+        )
+        assert overlaps == [False, False]
+
+    @mock.patch.object(BigQueryReservationBatchCreateOperator, "_get_hook")
+    def test_execute_same_reservation_failure(self, get_hook_mock):
+        hooks = [self.hook(create_side_effect=AirflowException("Test")), self.hook()]
+        for hook in hooks:
+            hook.search_assignment.return_value = Assignment(
+                name=f"{RESERVATION.name}/assignments/1"
+            )
+        get_hook_mock.side_effect = hooks
+
+        with pytest.raises(AirflowException):
+            self.operator.execute({"ti": mock.MagicMock()})
+
+        # The next projects of the group are not provisioned
+        hooks[1].create_commitment_reservation_and_assignment.assert_not_called()
+        for hook in hooks:
+            hook.delete_commitment_reservation_and_assignment.assert_not_called()
+
+    @mock.patch.object(BigQueryReservationBatchCreateOperator, "_get_hook")
+    def test_execute_provisioning_failure(self, get_hook_mock):
+        hooks = [self.hook(), self.hook(create_side_effect=AirflowException("Test"))]
+        get_hook_mock.side_effect = hooks
+
+        with pytest.raises(AirflowException):
+            self.operator.execute({"ti": mock.MagicMock()})
+
+        hooks[0].delete_commitment_reservation_and_assignment.assert_called_once_with(
+            commitment_name=COMMITMENT.name,
+            reservation_name=RESERVATION.name,
+            assignment_name=ASSIGNMENT.name,
+            slots=SLOTS,
+        )
+        hooks[1].delete_commitment_reservation_and_assignment.assert_not_called()
+        hooks[0]._is_assignment_attached_in_query.assert_not_called()
+
+    @mock.patch.object(BigQueryReservationBatchCreateOperator, "_get_hook")
+    def test_execute_attachment_deadline(self, get_hook_mock):
+        hooks = [self.hook(), self.hook(attached=False)]
+        get_hook_mock.side_effect = hooks
+        self.operator.attachment_deadline = 0.5
+        ti = mock.MagicMock()
+
+        with pytest.raises(AirflowException):
+            self.operator.execute({"ti": ti})
+
+        # Attached projects are not checked again
+        hooks[0]._is_assignment_attached_in_query.assert_called_once()
+        assert hooks[1]._is_assignment_attached_in_query.call_count > 1
+        for hook in hooks:
+            hook.delete_commitment_reservation_and_assignment.assert_called_once()
+        ti.xcom_push.assert_not_called()
 
 
 class TestBigQueryReservationDeleteOperator:
+    @mock.patch("airflow.models.connection.Connection.get_connection_from_secrets")
+    @mock.patch.object(PurchaseCoalescer, "release")
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.hooks."
+        + "bigquery_reservation.BigQueryReservationServiceHook.delete_commitment_reservation_and_assignment"
+    )
+    def test_execute_with_coalescing_handle(
+        self,
+        delete_commitment_reservation_and_assignment_mock,
+        release_mock,
+        get_conn_mock,
+    ):
+        operator = BigQueryReservationDeleteOperator(
+            task_id=TASK_ID,
+            location=LOCATION,
+            slots_provisioning=SLOTS,
+            commitment_name=COMMITMENT.name,
+            coalescing_handle="batch/request",
+        )
+
+        operator.execute(None)
+
+        release_mock.assert_called_once_with("batch/request")
+        delete_commitment_reservation_and_assignment_mock.assert_not_called()
+
     @mock.patch("airflow.models.connection.Connection.get_connection_from_secrets")
     @mock.patch(
         "airflow_provider_bigquery_reservation.hooks."
@@ -160,6 +565,7 @@ class TestBigQueryReservationDeleteOperator:
             reservation_name=RESERVATION.name,
             assignment_name=ASSIGNMENT.name,
             slots=SLOTS,
+            idempotency_key=None,
         )
 
     @mock.patch("airflow.models.connection.Connection.get_connection_from_secrets")
@@ -191,6 +597,462 @@ class TestBigQueryReservationDeleteOperator:
             reservation_project_id=PROJECT_ID,
         )
 
+    def drain_operator(self, **kwargs):
+        return BigQueryReservationDeleteOperator(
+            task_id=TASK_ID,
+            location=LOCATION,
+            project_id=PROJECT_ID,
+            slots_provisioning=SLOTS,
+            commitment_name=COMMITMENT.name,
+            reservation_name=RESERVATION.name,
+            assignment_name=ASSIGNMENT.name,
+            drain=True,
+            drain_timeout=600,
+            **kwargs,
+        )
+
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.operators.bigquery_reservation.BigQueryReservationServiceHook"
+    )
+    def test_execute_drain_deferred(self, hook_mock):
+        operator = self.drain_operator()
+
+        with pytest.raises(TaskDeferred) as deferred:
+            operator.execute(None)
+
+        hook_mock.return_value.delete_commitment_reservation_and_assignment.assert_not_called()
+        trigger = deferred.value.trigger
+        assert isinstance(trigger, BigQueryReservationDrainedTrigger)
+        assert trigger.reservation_name == RESERVATION.name
+        assert trigger.project_id == PROJECT_ID
+        assert trigger.end > timezone.utcnow() + datetime.timedelta(seconds=590)
+        assert deferred.value.method_name == "execute_complete"
+
+    def test_execute_drain_without_reservation(self):
+        operator = BigQueryReservationDeleteOperator(
+            task_id=TASK_ID,
+            location=LOCATION,
+            project_id=PROJECT_ID,
+            drain=True,
+        )
+
+        with pytest.raises(AirflowException):
+            operator.execute(None)
+
+    @pytest.mark.parametrize(
+        "event",
+        [
+            {"status": "success", "message": "drained", "drained": True},
+            {"status": "success", "message": "timeout", "drained": False},
+            {"status": "error", "message": "Test"},
+        ],
+    )
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.operators.bigquery_reservation.BigQueryReservationServiceHook"
+    )
+    def test_execute_complete_drain(self, hook_mock, event):
+        operator = self.drain_operator()
+
+        operator.execute_complete(None, event=event)
+
+        hook_mock.return_value.delete_commitment_reservation_and_assignment.assert_called_once_with(
+            commitment_name=COMMITMENT.name,
+            reservation_name=RESERVATION.name,
+            assignment_name=ASSIGNMENT.name,
+            slots=SLOTS,
+            idempotency_key=None,
+        )
+
+
+class TestBigQueryReservationAutoscaleOperator:
+    def setup_method(self):
+        self.operator = BigQueryReservationAutoscaleOperator(
+            task_id=TASK_ID,
+            project_id=PROJECT_ID,
+            reservation_name=RESERVATION.name,
+            location=LOCATION,
+            min_slots=SLOTS,
+            max_slots=SLOTS * 5,
+            interval=30,
+        )
+
+    def hook(self, slots=SLOTS, utilization=None, commitments=()):
+        hook = mock.MagicMock()
+        hook.get_reservation.return_value = Reservation(
+            name=RESERVATION.name, slot_capacity=slots
+        )
+        hook.get_reservation_utilization.return_value = (
+            utilization or ReservationUtilization(0.0, 0.0, pending_jobs=1)
+        )
+        hook.scale_reservation.return_value = list(commitments)
+        return hook
+
+    @mock.patch.object(BigQueryReservationAutoscaleOperator, "_get_hook")
+    def test_execute(self, get_hook_mock):
+        commitments = [{"name": "c1", "slots": SLOTS}]
+        hook = get_hook_mock.return_value = self.hook(commitments=commitments)
+
+        ti = mock.MagicMock()
+
+        with pytest.raises(TaskDeferred) as deferred:
+            self.operator.execute({"ti": ti})
+
+        hook.scale_reservation.assert_called_once_with(
+            reservation_name=RESERVATION.name,
+            slots=SLOTS * 2,
+            commitments=[],
+            commitments_duration=COMMITMENTS_DURATION,
+        )
+        assert isinstance(deferred.value.trigger, TimeDeltaTrigger)
+        assert deferred.value.method_name == "evaluate"
+        assert deferred.value.kwargs["commitments"] == commitments
+        assert deferred.value.kwargs["end"] > timezone.utcnow()
+        ti.xcom_push.assert_called_once_with(key="commitments", value=commitments)
+
+    @mock.patch.object(BigQueryReservationAutoscaleOperator, "_get_hook")
+    def test_evaluate_completion_releases_slots(self, get_hook_mock):
+        commitments = [{"name": "c1", "slots": SLOTS}, {"name": "c2", "slots": SLOTS}]
+        hook = get_hook_mock.return_value = self.hook(
+            slots=SLOTS * 3,
+            utilization=ReservationUtilization(150.0, 200.0, pending_jobs=0),
+            commitments=commitments,
+        )
+
+        self.operator.evaluate(
+            {"ti": mock.MagicMock()},
+            event=None,
+            commitments=commitments,
+            end=timezone.utcnow() - datetime.timedelta(seconds=1),
+        )
+
+        assert hook.scale_reservation.call_args_list == [
+            mock.call(
+                reservation_name=RESERVATION.name,
+                slots=SLOTS * 3,
+                commitments=commitments,
+                commitments_duration=COMMITMENTS_DURATION,
+            ),
+            mock.call(
+                reservation_name=RESERVATION.name,
+                slots=SLOTS,
+                commitments=commitments,
+            ),
+        ]
+
+    @mock.patch.object(BigQueryReservationAutoscaleOperator, "_get_hook")
+    def test_evaluate_failure_releases_slots(self, get_hook_mock):
+        commitments = [{"name": "c1", "slots": SLOTS}]
+        hook = get_hook_mock.return_value = self.hook(slots=SLOTS * 2)
+        hook.get_reservation_utilization.side_effect = AirflowException("error")
+
+        with pytest.raises(AirflowException):
+            self.operator.evaluate(
+                {"ti": mock.MagicMock()}, event=None, commitments=commitments
+            )
+
+        hook.scale_reservation.assert_called_once_with(
+            reservation_name=RESERVATION.name,
+            slots=SLOTS,
+            commitments=commitments,
+        )
+
+    @mock.patch.object(BigQueryReservationAutoscaleOperator, "_get_hook")
+    def test_on_kill_releases_slots(self, get_hook_mock):
+        commitments = [{"name": "c1", "slots": SLOTS}]
+        hook = get_hook_mock.return_value = self.hook(
+            slots=SLOTS * 2, commitments=commitments
+        )
+        with pytest.raises(TaskDeferred):
+            self.operator.execute({"ti": mock.MagicMock()})
+        hook.scale_reservation.reset_mock()
+
+        self.operator.on_kill()
+
+        hook.scale_reservation.assert_called_once_with(
+            reservation_name=RESERVATION.name,
+            slots=SLOTS,
+            commitments=commitments,
+        )
+
+    def test_on_kill_hook_none(self):
+        self.operator.on_kill()
+
+    def test_execute_invalid_bounds(self):
+        self.operator.min_slots = SLOTS * 10
+
+        with pytest.raises(AirflowException):
+            self.operator.execute({})
+
+
+class TestBigQueryReservationPoolOperators:
+    LEASE = {
+        "lease_id": "lease",
+        "project_id": PROJECT_ID,
+        "slots": SLOTS,
+        "reservation_name": RESERVATION.name,
+        "assignment_name": ASSIGNMENT.name,
+        "warm": True,
+    }
+
+    @mock.patch.object(BigQueryReservationPoolLeaseOperator, "_get_pool")
+    def test_lease_execute(self, get_pool_mock):
+        get_pool_mock.return_value.lease.return_value = self.LEASE
+        operator = BigQueryReservationPoolLeaseOperator(
+            task_id=TASK_ID,
+            project_id=PROJECT_ID,
+            location=LOCATION,
+            slots_provisioning=SLOTS,
+        )
+        ti = mock.MagicMock(dag_id="dag", task_id=TASK_ID, run_id="run", map_index=-1)
+
+        assert operator.execute({"ti": ti}) == self.LEASE
+
+        get_pool_mock.return_value.lease.assert_called_once_with(
+            project_id=PROJECT_ID,
+            slots=SLOTS,
+            job_type=JOB_TYPE,
+            reservation_project_id=None,
+            commitments_duration=COMMITMENTS_DURATION,
+            attachment_probe="query",
+            attachment_deadline=None,
+            holder=f"dag/{TASK_ID}/run/-1",
+        )
+        ti.xcom_push.assert_any_call(key="lease_id", value="lease")
+        get_pool_mock.return_value.hook.log_api_summary.assert_called_once()
+
+    @mock.patch.object(BigQueryReservationPoolReleaseOperator, "_get_pool")
+    def test_release_execute(self, get_pool_mock):
+        operator = BigQueryReservationPoolReleaseOperator(
+            task_id=TASK_ID, location=LOCATION, lease_id="lease"
+        )
+
+        operator.execute({})
+
+        get_pool_mock.return_value.release.assert_called_once_with("lease")
+
+    @mock.patch.object(BigQueryReservationPoolReleaseOperator, "_get_pool")
+    def test_release_execute_without_lease(self, get_pool_mock):
+        operator = BigQueryReservationPoolReleaseOperator(
+            task_id=TASK_ID, location=LOCATION
+        )
+
+        operator.execute({})
+
+        get_pool_mock.return_value.release.assert_not_called()
+        get_pool_mock.return_value.reap.assert_called_once_with()
+
+
+class TestBigQueryReservationPreProvisionOperator:
+    def setup_method(self):
+        self.operator = BigQueryReservationPreProvisionOperator(
+            task_id=TASK_ID,
+            target_dag_id=DAG,
+            project_id=PROJECT_ID,
+            location=LOCATION,
+            slots_provisioning=SLOTS,
+            default_lead_time=600.0,
+            safety_margin=60.0,
+        )
+
+    @mock.patch.object(BigQueryReservationPreProvisionOperator, "_get_hook")
+    @mock.patch.object(
+        BigQueryReservationPreProvisionOperator,
+        "_get_provisioning_history",
+        return_value=[100.0, 300.0, 200.0],
+    )
+    @mock.patch.object(BigQueryReservationPreProvisionOperator, "_get_next_run")
+    def test_execute_defers_until_lead_time(
+        self, next_run_mock, history_mock, get_hook_mock
+    ):
+        next_run = next_run_mock.return_value = timezone.utcnow() + datetime.timedelta(
+            hours=1
+        )
+
+        with pytest.raises(TaskDeferred) as deferred:
+            self.operator.execute({})
+
+        assert isinstance(deferred.value.trigger, DateTimeTrigger)
+        assert deferred.value.trigger.moment == next_run - datetime.timedelta(
+            seconds=300.0 + 60.0
+        )
+        assert deferred.value.method_name == "provision"
+        get_hook_mock.assert_not_called()
+
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.operators.bigquery_reservation.record_provisioning"
+    )
+    @mock.patch.object(BigQueryReservationPreProvisionOperator, "_get_hook")
+    @mock.patch.object(
+        BigQueryReservationPreProvisionOperator,
+        "_get_provisioning_history",
+        return_value=[],
+    )
+    @mock.patch.object(BigQueryReservationPreProvisionOperator, "_get_next_run")
+    def test_provision_within_lead_time(
+        self, next_run_mock, history_mock, get_hook_mock, record_mock
+    ):
+        next_run_mock.return_value = timezone.utcnow() + datetime.timedelta(minutes=5)
+        hook = get_hook_mock.return_value
+        hook._get_commitment.return_value = COMMITMENT
+        hook._get_reservation.return_value = RESERVATION
+        hook._get_assignment.return_value = ASSIGNMENT
+        ti = mock.MagicMock()
+
+        self.operator.provision({"ti": ti}, event=None)
+
+        hook.create_commitment_reservation_and_assignment.assert_called_once_with(
+            slots=SLOTS,
+            assignment_job_type=JOB_TYPE,
+            commitments_duration=COMMITMENTS_DURATION,
+            project_id=PROJECT_ID,
+            reservation_project_id=None,
+            attachment_probe="query",
+            attachment_deadline=None,
+        )
+        ti.xcom_push.assert_has_calls(
+            [
+                mock.call(key="commitment_name", value=COMMITMENT.name),
+                mock.call(key="reservation_name", value=RESERVATION.name),
+                mock.call(key="assignment_name", value=ASSIGNMENT.name),
+                mock.call(key="provisioning_duration", value=mock.ANY),
+            ]
+        )
+        record_mock.assert_called_once_with(hook.provisioning_timeline)
+
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.operators.bigquery_reservation.DagModel.get_dagmodel"
+    )
+    def test_next_run_not_scheduled(self, get_dagmodel_mock):
+        get_dagmodel_mock.return_value.next_dagrun_create_after = None
+
+        with pytest.raises(AirflowException):
+            self.operator.execute({})
+
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.operators.bigquery_reservation.ProvisioningHistory"
+    )
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.operators.bigquery_reservation.XCom"
+    )
+    def test_get_provisioning_history_of_the_location(self, xcom_mock, history_mock):
+        xcom_mock.get_many.return_value = []
+        started_at = timezone.utcnow()
+        history_mock.return_value.timelines.return_value = [
+            ProvisioningTimeline(
+                location=LOCATION,
+                project_id=PROJECT_ID,
+                job_type=JOB_TYPE,
+                started_at=started_at,
+                attached_at=started_at + datetime.timedelta(seconds=42),
+            ),
+            ProvisioningTimeline(
+                location=LOCATION,
+                project_id=PROJECT_ID,
+                job_type=JOB_TYPE,
+                started_at=started_at,
+            ),
+        ]
+
+        history = self.operator._get_provisioning_history({"run_id": "run"})
+
+        assert history == [42.0]
+        history_mock.assert_called_once_with(LOCATION)
+        history_mock.return_value.timelines.assert_called_once_with(
+            job_type=JOB_TYPE, probe="query"
+        )
+
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.operators.bigquery_reservation.XCom"
+    )
+    def test_get_provisioning_history(self, xcom_mock):
+        xcom_mock.get_many.return_value = ["first", "second"]
+        xcom_mock.deserialize_value.side_effect = [120.5, 90]
+
+        history = self.operator._get_provisioning_history({"run_id": "run"})
+
+        assert history == [120.5, 90.0]
+        xcom_mock.get_many.assert_called_once_with(
+            key="provisioning_duration",
+            dag_ids=self.operator.dag_id,
+            task_ids=TASK_ID,
+            include_prior_dates=True,
+            limit=20,
+            run_id="run",
+        )
+
+
+class TestBigQueryReservationUtilizationReportOperator:
+    START = datetime.datetime(2023, 1, 1, tzinfo=datetime.timezone.utc)
+
+    def operator(self, **kwargs):
+        return BigQueryReservationUtilizationReportOperator(
+            task_id=TASK_ID,
+            project_id=PROJECT_ID,
+            location=LOCATION,
+            commitment_name=COMMITMENT.name,
+            reservation_name=RESERVATION.name,
+            end=(self.START + datetime.timedelta(seconds=10)).isoformat(),
+            **kwargs,
+        )
+
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.operators.bigquery_reservation.emit_commitment_utilization"
+    )
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.operators.bigquery_reservation.BigQueryReservationServiceHook"
+    )
+    def test_execute(self, hook_mock, emit_mock):
+        hook = hook_mock.return_value
+        hook.get_capacity_commitment.return_value = CapacityCommitment(
+            name=COMMITMENT.name,
+            slot_count=SLOTS,
+            commitment_start_time=self.START + datetime.timedelta(microseconds=10),
+        )
+        hook.get_commitment_timeline.return_value = CommitmentTimeline(
+            seconds=[0, 1], slot_ms=[100_000, 50_000], jobs=[2, 1]
+        )
+        ti = mock.MagicMock()
+
+        self.operator().execute({"ti": ti})
+
+        hook.get_commitment_timeline.assert_called_once_with(
+            project_id=PROJECT_ID,
+            reservation_name=RESERVATION.name,
+            start=self.START,
+            end=self.START + datetime.timedelta(seconds=10),
+        )
+        emit_mock.assert_called_once_with(
+            LOCATION, utilization=0.15, idle_share=0.8, peak_slots=100.0, peak_jobs=2
+        )
+        ti.xcom_push.assert_called_once()
+        report = ti.xcom_push.call_args.kwargs["value"]
+        assert ti.xcom_push.call_args.kwargs["key"] == "commitment_utilization"
+        assert report["commitment_name"] == COMMITMENT.name
+        assert report["start"] == self.START.isoformat()
+        assert report["slot_ms_bought"] == SLOTS * 10 * 1000
+        assert report["slot_ms_used"] == 150_000
+
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.operators.bigquery_reservation.emit_commitment_utilization"
+    )
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.operators.bigquery_reservation.BigQueryReservationServiceHook"
+    )
+    def test_execute_deleted_commitment(self, hook_mock, emit_mock):
+        hook = hook_mock.return_value
+        hook.get_commitment_timeline.return_value = CommitmentTimeline([], [], [])
+        ti = mock.MagicMock()
+
+        self.operator(slots=SLOTS, start=self.START.isoformat(), max_window=5).execute(
+            {"ti": ti}
+        )
+
+        hook.get_capacity_commitment.assert_not_called()
+        assert hook.get_commitment_timeline.call_args.kwargs[
+            "start"
+        ] == self.START + datetime.timedelta(seconds=5)
+        assert ti.xcom_push.call_args.kwargs["value"]["idle_share"] == 1.0
+
 
 class TestBigQueryBiEngineReservationCreateOperator:
     @mock.patch(
@@ -209,6 +1071,30 @@ class TestBigQueryBiEngineReservationCreateOperator:
         hook_mock.return_value.create_bi_reservation.assert_called_once_with(
             project_id=PROJECT_ID,
             size=SIZE,
+            preferred_tables=None,
+            preferred_tables_mode="add",
+        )
+
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.operators.bigquery_reservation.BigQueryReservationServiceHook"
+    )
+    def test_execute_preferred_tables(self, hook_mock):
+        operator = BigQueryBiEngineReservationCreateOperator(
+            project_id=PROJECT_ID,
+            task_id=TASK_ID,
+            location=LOCATION,
+            size=SIZE,
+            preferred_tables=[f"{PROJECT_ID}.dataset.table"],
+            preferred_tables_mode="replace",
+        )
+
+        operator.execute(None)
+
+        hook_mock.return_value.create_bi_reservation.assert_called_once_with(
+            project_id=PROJECT_ID,
+            size=SIZE,
+            preferred_tables=[f"{PROJECT_ID}.dataset.table"],
+            preferred_tables_mode="replace",
         )
 
 
@@ -222,6 +1108,7 @@ class TestBigQueryBiEngineReservationDeleteOperator:
             task_id=TASK_ID,
             location=LOCATION,
             size=SIZE,
+            preferred_tables=[f"{PROJECT_ID}.dataset.table"],
         )
 
         operator.execute(None)
@@ -229,4 +1116,48 @@ class TestBigQueryBiEngineReservationDeleteOperator:
         hook_mock.return_value.delete_bi_reservation.assert_called_once_with(
             project_id=PROJECT_ID,
             size=SIZE,
+            preferred_tables=[f"{PROJECT_ID}.dataset.table"],
+        )
+
+
+class TestBigQueryBiEngineReservationAdvisorOperator:
+    def usage(self, gb):
+        return BiEngineTableUsage(
+            hour=datetime.datetime(2023, 1, 1, tzinfo=datetime.timezone.utc),
+            table_id=f"{PROJECT_ID}.dataset.table",
+            queries=10,
+            accelerated_queries=5,
+            bytes_processed=gb * 1073741824,
+            reasons=[],
+        )
+
+    @pytest.mark.parametrize("apply", [False, True])
+    @mock.patch(
+        "airflow_provider_bigquery_reservation.operators.bigquery_reservation.BigQueryReservationServiceHook"
+    )
+    def test_execute(self, hook_mock, apply):
+        hook_mock.return_value.get_bi_engine_usage.return_value = [self.usage(3)]
+        operator = BigQueryBiEngineReservationAdvisorOperator(
+            project_id=PROJECT_ID,
+            task_id=TASK_ID,
+            location=LOCATION,
+            lookback_hours=24,
+            apply=apply,
+        )
+        ti = mock.MagicMock()
+
+        operator.execute({"ti": ti})
+
+        hook_mock.return_value.get_bi_engine_usage.assert_called_once_with(
+            project_id=PROJECT_ID, lookback_hours=24
         )
+        (call,) = ti.xcom_push.call_args_list
+        assert call.kwargs["key"] == "bi_engine_sizing"
+        assert call.kwargs["value"]["size"] == 3
+        assert call.kwargs["value"]["accelerated_share"] == 0.5
+        if apply:
+            hook_mock.return_value.resize_bi_reservation.assert_called_once_with(
+                project_id=PROJECT_ID, size=3
+            )
+        else:
+            hook_mock.return_value.resize_bi_reservation.assert_not_called()
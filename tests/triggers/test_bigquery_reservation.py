@@ -0,0 +1,191 @@
+import datetime
+from unittest import mock
+
+import pytest
+from airflow.triggers.base import TriggerEvent
+from airflow_provider_bigquery_reservation.triggers.bigquery_reservation import (
+    BigQueryReservationAssignmentAttachedTrigger,
+    BigQueryReservationDrainedTrigger,
+)
+
+
+PROJECT_ID = "test-project"
+LOCATION = "US"
+GCP_CONN_ID = "google_cloud_default"
+POLL_INTERVAL = 0
+RESERVATION_NAME = f"projects/{PROJECT_ID}/locations/{LOCATION}/reservations/test"
+
+
+def async_hook_mock():
+    """Async hook whose sync hook (BigQuery jobs API) is a mock."""
+    hook = mock.MagicMock()
+    hook.get_sync_hook = mock.AsyncMock(return_value=mock.MagicMock())
+    return hook
+
+
+@pytest.fixture()
+def trigger():
+    return BigQueryReservationAssignmentAttachedTrigger(
+        project_id=PROJECT_ID,
+        location=LOCATION,
+        gcp_conn_id=GCP_CONN_ID,
+        poll_interval=POLL_INTERVAL,
+    )
+
+
+class TestBigQueryReservationAssignmentAttachedTrigger:
+    def test_serialize(self, trigger):
+        classpath, kwargs = trigger.serialize()
+
+        assert classpath == (
+            "airflow_provider_bigquery_reservation.triggers.bigquery_reservation."
+            "BigQueryReservationAssignmentAttachedTrigger"
+        )
+        assert kwargs == {
+            "project_id": PROJECT_ID,
+            "location": LOCATION,
+            "gcp_conn_id": GCP_CONN_ID,
+            "impersonation_chain": None,
+            "poll_interval": POLL_INTERVAL,
+            "job_type": "QUERY",
+            "reservation_project_id": None,
+            "attachment_probe": "query",
+            "deadline": None,
+            "since": None,
+        }
+
+    @pytest.mark.asyncio
+    @mock.patch.object(BigQueryReservationAssignmentAttachedTrigger, "_get_hook")
+    async def test_run_success(self, get_hook_mock, trigger):
+        get_hook_mock.return_value = async_hook_mock()
+        hook = await get_hook_mock.return_value.get_sync_hook()
+        hook._is_assignment_attached_in_query.side_effect = [False, False, True]
+
+        event = await trigger.run().asend(None)
+
+        assert event.payload["status"] == "success"
+        assert event.payload["attachment_duration"] >= 0
+        assert event.payload["attached_at"]
+        assert hook._is_assignment_attached_in_query.call_count == 3
+        hook._is_assignment_attached_in_query.assert_called_with(
+            client=hook.get_bq_client.return_value,
+            project_id=PROJECT_ID,
+            location=LOCATION,
+        )
+
+    @pytest.mark.asyncio
+    @mock.patch.object(BigQueryReservationAssignmentAttachedTrigger, "_get_hook")
+    async def test_run_failure(self, get_hook_mock, trigger):
+        get_hook_mock.return_value = async_hook_mock()
+        hook = await get_hook_mock.return_value.get_sync_hook()
+        hook._is_assignment_attached_in_query.side_effect = Exception("Test")
+
+        event = await trigger.run().asend(None)
+
+        assert event == TriggerEvent({"status": "error", "message": "Test"})
+
+    @pytest.mark.asyncio
+    @mock.patch.object(BigQueryReservationAssignmentAttachedTrigger, "_get_hook")
+    async def test_run_deadline_exceeded(self, get_hook_mock):
+        get_hook_mock.return_value = async_hook_mock()
+        hook = await get_hook_mock.return_value.get_sync_hook()
+        hook._is_assignment_attached_in_query.return_value = False
+        trigger = BigQueryReservationAssignmentAttachedTrigger(
+            project_id=PROJECT_ID,
+            location=LOCATION,
+            poll_interval=0.01,
+            deadline=0.05,
+        )
+
+        event = await trigger.run().asend(None)
+
+        assert event.payload["status"] == "error"
+        assert "Assignment not attached" in event.payload["message"]
+
+    @pytest.mark.asyncio
+    @mock.patch.object(BigQueryReservationAssignmentAttachedTrigger, "_get_hook")
+    async def test_run_assignment_state_async(self, get_hook_mock):
+        hook = get_hook_mock.return_value = async_hook_mock()
+        hook.search_assignment = mock.AsyncMock(side_effect=[None, mock.MagicMock()])
+        trigger = BigQueryReservationAssignmentAttachedTrigger(
+            project_id=PROJECT_ID,
+            location=LOCATION,
+            poll_interval=POLL_INTERVAL,
+            attachment_probe="assignment_state",
+        )
+
+        event = await trigger.run().asend(None)
+
+        assert event.payload["status"] == "success"
+        assert hook.search_assignment.await_count == 2
+        hook.get_sync_hook.assert_not_called()
+
+
+class TestBigQueryReservationDrainedTrigger:
+    def trigger(self, end=None):
+        return BigQueryReservationDrainedTrigger(
+            project_id=PROJECT_ID,
+            location=LOCATION,
+            reservation_name=RESERVATION_NAME,
+            gcp_conn_id=GCP_CONN_ID,
+            poll_interval=POLL_INTERVAL,
+            end=end,
+        )
+
+    def test_serialize(self):
+        end = datetime.datetime(2023, 1, 1, tzinfo=datetime.timezone.utc)
+        classpath, kwargs = self.trigger(end=end).serialize()
+
+        assert classpath == (
+            "airflow_provider_bigquery_reservation.triggers.bigquery_reservation."
+            "BigQueryReservationDrainedTrigger"
+        )
+        assert kwargs == {
+            "project_id": PROJECT_ID,
+            "location": LOCATION,
+            "reservation_name": RESERVATION_NAME,
+            "gcp_conn_id": GCP_CONN_ID,
+            "impersonation_chain": None,
+            "poll_interval": POLL_INTERVAL,
+            "end": end,
+        }
+
+    @pytest.mark.asyncio
+    @mock.patch.object(BigQueryReservationDrainedTrigger, "_get_hook")
+    async def test_run_drained(self, get_hook_mock):
+        hook = get_hook_mock.return_value = mock.AsyncMock()
+        hook.count_reservation_running_jobs.side_effect = [2, 1, 0]
+
+        event = await self.trigger().run().asend(None)
+
+        assert event.payload["status"] == "success"
+        assert event.payload["drained"]
+        assert event.payload["running_jobs"] == 0
+        assert hook.count_reservation_running_jobs.call_count == 3
+        hook.count_reservation_running_jobs.assert_called_with(
+            project_id=PROJECT_ID, reservation_name=RESERVATION_NAME
+        )
+
+    @pytest.mark.asyncio
+    @mock.patch.object(BigQueryReservationDrainedTrigger, "_get_hook")
+    async def test_run_end_passed(self, get_hook_mock):
+        hook = get_hook_mock.return_value = mock.AsyncMock()
+        hook.count_reservation_running_jobs.return_value = 3
+        end = datetime.datetime(2023, 1, 1, tzinfo=datetime.timezone.utc)
+
+        event = await self.trigger(end=end).run().asend(None)
+
+        assert event.payload["status"] == "success"
+        assert not event.payload["drained"]
+        assert event.payload["running_jobs"] == 3
+        hook.count_reservation_running_jobs.assert_called_once()
+
+    @pytest.mark.asyncio
+    @mock.patch.object(BigQueryReservationDrainedTrigger, "_get_hook")
+    async def test_run_failure(self, get_hook_mock):
+        hook = get_hook_mock.return_value = mock.AsyncMock()
+        hook.count_reservation_running_jobs.side_effect = Exception("Test")
+
+        event = await self.trigger().run().asend(None)
+
+        assert event.payload == {"status": "error", "message": "Test"}
@@ -1,4 +1,7 @@
 """utils functions for mock."""
+import contextlib
+import json
+import threading
 
 
 def mock_base_gcp_hook_no_default_project_id(
@@ -8,6 +11,7 @@ def mock_base_gcp_hook_no_default_project_id(
 ):
     """Mock base gcp hook."""
     self.extras_list = {}
+    self.gcp_conn_id = gcp_conn_id
     self._conn = gcp_conn_id
     self.impersonation_chain = impersonation_chain
     self._client = None
@@ -22,3 +26,39 @@ class QueryJob:
     def __init__(self, reservation_id: bool) -> None:
         id_ = "test" if reservation_id else None
         self._properties = {"statistics": {"reservation_id": id_}}
+
+
+class AsyncPager:
+    """Async Pager Mock."""
+
+    def __init__(self, items: list) -> None:
+        self._items = items
+
+    def __aiter__(self):
+        """Iterate asynchronously over the items."""
+        return self._iterate()
+
+    async def _iterate(self):
+        for item in self._items:
+            yield item
+
+
+class VariableState:
+    """In-memory stand-in of a locked Variable row, rolled back on errors."""
+
+    def __init__(self, default: dict) -> None:
+        self.value = json.dumps(default)
+        self.lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def locked(self):
+        """Lock the row, yield its state then save it."""
+        with self.lock:
+            state = json.loads(self.value)
+            yield state
+            self.value = json.dumps(state)
+
+    @property
+    def state(self) -> dict:
+        """Saved state."""
+        return json.loads(self.value)